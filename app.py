@@ -1,5 +1,5 @@
 import click
-from flask import Flask, request, jsonify, send_from_directory, redirect, make_response
+from flask import Flask, request, jsonify, send_from_directory, redirect, make_response, Response, stream_with_context, g
 from flask.cli import with_appcontext
 from flask_mysqldb import MySQL
 from flask_jwt_extended import create_access_token, jwt_required, JWTManager, get_jwt_identity, set_access_cookies, unset_jwt_cookies
@@ -12,78 +12,26 @@ import sys
 import json
 import atexit
 import time
+import logging
+import functools
 import threading
 from hypervisor_manager import HypervisorManager
 from hypervisor_providers import VMConfig
-from ip_manager import get_available_ip
+from hypervisor_providers.base_snapshots import CLONE_MODES
+from hypervisor_providers.metrics import REGISTRY, HTTP_REQUEST_DURATION
+from hypervisor_providers.structured_logging import configure_logging, get_pipeline, load_logging_config
+from job_queue import JobQueue, DuplicateJobError, FAILED, SUCCEEDED
+from job_store import JobStore
+from ipam import LeaseReconciler
+from ip_manager import get_available_ip, get_ipam, bind_ip, release_ip, release_vm_ips
+from service_supervisor import BackgroundService, MockServerSupervisor, ServiceUnavailableError
+
+# Records are formatted and written by a background thread, never on the request path
+configure_logging(load_logging_config())
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__, static_folder='frontend')
 
-def check_mock_server_health():
-    """Check if the mock server is running and accessible"""
-    import requests
-    try:
-        response = requests.get('http://127.0.0.1:9441/api/nutanix/v3/clusters/list', timeout=5)
-        return response.status_code == 200
-    except Exception:
-        return False
-
-def start_nutanix_mock_server():
-    """Start the Nutanix mock server in a background process."""
-    global mock_server_process
-    mock_server_process = None
-    
-    try:
-        print("Starting Nutanix mock server...")
-        
-        # Check if mock server is already running
-        if check_mock_server_health():
-            print("✅ Nutanix mock server is already running and healthy")
-            return
-        
-        # Use sys.executable to ensure we use the same python interpreter
-        # Start the mock server with simple configuration
-        mock_server_process = subprocess.Popen(
-            [sys.executable, 'nutanix_mock_server.py'], 
-            cwd=r'c:\Users\saads\OneDrive\Documents\Coding\Auto-Creation-VM'
-        )
-        
-        print(f"Nutanix mock server started with PID: {mock_server_process.pid}")
-        
-        # Give the server a moment to start
-        time.sleep(3)
-        
-        # Check if the process is still running and healthy
-        if mock_server_process.poll() is None:
-            # Check if the server is responding
-            if check_mock_server_health():
-                print("✅ Nutanix mock server is running and healthy")
-            else:
-                print("⚠️ Nutanix mock server is running but not responding to health checks")
-        else:
-            print("❌ Nutanix mock server failed to start")
-
-        @atexit.register
-        def terminate_mock_server():
-            if mock_server_process and mock_server_process.poll() is None:
-                print("Stopping Nutanix mock server...")
-                mock_server_process.terminate()
-                try:
-                    mock_server_process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    print("Force killing mock server...")
-                    mock_server_process.kill()
-                    mock_server_process.wait()
-                print("Mock server stopped.")
-
-    except Exception as e:
-        print(f"Failed to start Nutanix mock server: {e}")
-        import traceback
-        traceback.print_exc()
-
-# Start the mock server when the module is loaded
-start_nutanix_mock_server()
-
 # MySQL configurations
 app.config['MYSQL_HOST'] = 'localhost'
 app.config['MYSQL_PORT'] = 3306
@@ -104,8 +52,183 @@ jwt = JWTManager(app)
 
 mysql = MySQL(app)
 
-# Initialize Hypervisor Manager
-hypervisor_manager = HypervisorManager()
+# Providers, the job store and the job queue are built on a background thread
+# the first time a request arrives, so importing the app never blocks
+hypervisor_manager = None
+job_store = None
+job_queue = None
+lease_reconciler = None
+
+def settle_job_ip_lease(job):
+    """Bind the IP leased to a create/clone job that succeeded, release it if the job failed"""
+    ip_address = job.params.get('ip_address')
+    if not ip_address:
+        return
+    if job.state == FAILED:
+        release_ip(ip_address)
+    elif job.state == SUCCEEDED:
+        bind_ip(ip_address, job.vm_name, job.provider)
+
+def build_backend():
+    """Initialize providers and the job queue, then recover work interrupted by a restart
+    
+    Everything is built and recovered in locals and published only once it all
+    succeeded; on failure the threads already started are stopped, so a retry
+    by BackgroundService never leaves a second backend running beside the first.
+    """
+    global hypervisor_manager, job_store, job_queue, lease_reconciler
+    manager = HypervisorManager()
+    store = queue = reconciler = None
+    try:
+        # Jobs and provider operations are journaled so a restart can resume or roll them back
+        state_directory = manager.config.get('state_directory', 'state')
+        store = JobStore(f"{state_directory}/jobs.db")
+        manager.attach_journal(store)
+        
+        # Create and clone requests run in per-provider worker pools instead of the request thread
+        jobs_config = manager.config.get('jobs', {})
+        queue = JobQueue(
+            workers=jobs_config.get('workers', {'vmware': 2, 'nutanix': 4}),
+            default_workers=jobs_config.get('default_workers', 2),
+            max_finished=jobs_config.get('max_finished', 500),
+            store=store,
+            max_attempts=jobs_config.get('max_attempts', 2),
+            on_finish=settle_job_ip_lease
+        )
+        # Handlers are bound to this manager: recovered jobs start before the globals are set
+        queue.register_handler('create_vm', functools.partial(run_create_vm, manager))
+        queue.register_handler('clone_vm', functools.partial(run_clone_vm, manager))
+        
+        # Resolve provider operations left open by a previous run, then resume its jobs
+        recovered_operations = manager.recover_operations()
+        recovered_jobs = queue.recover()
+        if any(recovered_operations.values()) or any(recovered_jobs.values()):
+            logger.info("Recovered after restart", extra={
+                'operations': {k: len(v) for k, v in recovered_operations.items()},
+                'jobs': {k: len(v) for k, v in recovered_jobs.items()}
+            })
+        
+        # Warm VMs left by the previous run are adopted once recovery has settled
+        manager.warm_pool.start()
+        
+        # IP leases are checked against the live inventory so orphaned addresses return to the pool
+        ipam_config = manager.config.get('ipam', {})
+        reconciler = LeaseReconciler(
+            get_ipam(),
+            manager.live_inventory,
+            is_active=lambda provider, vm_name: queue.find_active(provider, vm_name) is not None,
+            interval=ipam_config.get('reconcile_interval', 60),
+            grace=ipam_config.get('orphan_grace', 900),
+            providers=lambda: list(manager.providers)
+        )
+        reconciler.start()
+    except Exception:
+        if reconciler:
+            reconciler.stop()
+        if queue:
+            queue.shutdown()
+        manager.shutdown()
+        if store:
+            store.close()
+        raise
+    
+    hypervisor_manager, job_store, job_queue, lease_reconciler = manager, store, queue, reconciler
+    return manager
+
+def provider_attribute_stats(attribute):
+    """stats() of a component (vmrun executor, entity cache...) per provider that has it"""
+    if hypervisor_manager is None:
+        return {}
+    stats = {}
+    for name in hypervisor_manager.get_available_providers():
+        component = getattr(hypervisor_manager.get_provider(name), attribute, None)
+        if component:
+            stats[name] = component.stats()
+    return stats
+
+def job_queue_samples():
+    if job_queue is None:
+        return []
+    return [({'provider': provider, 'state': state}, count)
+            for provider, counts in job_queue.queue_depth().items() for state, count in counts.items()]
+
+def vmrun_queue_samples():
+    return [({'provider': provider, 'state': state}, stats[state])
+            for provider, stats in provider_attribute_stats('vmrun').items() for state in ('queued', 'running')]
+
+def cache_hit_ratio_samples():
+    samples = []
+    cache = getattr(hypervisor_manager, 'inventory_cache', None)
+    if cache:
+        samples.append(({'cache': 'inventory'}, cache.stats()['hit_ratio']))
+    for provider, stats in provider_attribute_stats('entity_cache').items():
+        total = stats['hits'] + stats['misses']
+        samples.append(({'cache': f'{provider}_entities'}, stats['hits'] / total if total else 0.0))
+    return samples
+
+def ip_pool_samples():
+    if hypervisor_manager is None:
+        return []
+    return [({'pool': pool}, stats['utilization']) for pool, stats in get_ipam().stats().items()]
+
+def log_pipeline_samples():
+    pipeline = get_pipeline()
+    return [({'outcome': outcome}, count) for outcome, count in pipeline.stats().items()] if pipeline else []
+
+def ip_lease_samples():
+    if hypervisor_manager is None:
+        return []
+    stats = get_ipam().lease_stats()
+    return [({'state': state}, stats[state]) for state in ('reserved', 'bound', 'expired', 'unleased')]
+
+# Gauges are read from their owning components only when /metrics is scraped
+REGISTRY.gauge('job_queue_depth', 'Create/clone jobs queued or running per provider', job_queue_samples)
+REGISTRY.gauge('vmrun_queue_depth', 'vmrun commands queued or running per provider', vmrun_queue_samples)
+REGISTRY.gauge('cache_hit_ratio', 'Share of lookups answered from cache', cache_hit_ratio_samples)
+REGISTRY.gauge('ip_pool_utilization', 'Share of each IP pool that is allocated', ip_pool_samples)
+REGISTRY.gauge('ip_leases', 'IP leases by state', ip_lease_samples)
+REGISTRY.gauge('log_records', 'Log records queued, dropped or throttled by the logging pipeline', log_pipeline_samples)
+
+backend = BackgroundService('Hypervisor backend', build_backend)
+mock_server = MockServerSupervisor()
+
+# Seconds an API request waits for the backend before answering 503
+BACKEND_READY_TIMEOUT = 30
+
+# Endpoints that do not use providers or jobs and are served while the backend starts
+BACKEND_FREE_ENDPOINTS = {'index', 'serve_frontend', 'static', 'register', 'login', 'logout',
+                          'profile', 'get_mock_server_status', 'restart_mock_server', 'get_metrics'}
+
+@app.before_request
+def start_request_timer():
+    """Timestamp the request; registered before the backend gate so 503 answers are timed too"""
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    started = g.get('request_started')
+    if started is not None:
+        # The URL rule, not the path, keeps VM names out of the label values
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_DURATION.labels(route, request.method, response.status_code).observe(
+            time.perf_counter() - started)
+    return response
+
+@app.before_request
+def wait_for_backend():
+    """Start background services on the first request and gate endpoints that need them"""
+    backend.start()
+    mock_server.start()
+    if request.endpoint is None or request.endpoint in BACKEND_FREE_ENDPOINTS:
+        return None
+    try:
+        backend.get(timeout=BACKEND_READY_TIMEOUT)
+    except ServiceUnavailableError as e:
+        response = jsonify({'success': False, 'error': str(e), 'backend': backend.status()})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    return None
 
 @click.command('create-db')
 def create_db_command():
@@ -149,44 +272,39 @@ app.cli.add_command(init_db_command)
 @jwt_required(optional=True)
 def index():
     try:
-        print("Entering index function.")
-        print("Index function - Request Headers:", request.headers)
         current_user = get_jwt_identity()
-        print(f"Current user from JWT: {current_user}")
+        logger.debug("Serving index", extra={'user': current_user, 'authenticated': bool(current_user)})
         if current_user:
-            print("User is authenticated, sending index.html.")
             return send_from_directory('frontend', 'index.html')
         else:
-            print("User is not authenticated, sending login.html.")
             return send_from_directory('frontend', 'login.html')
-    except Exception as e:
-        print(f"An error occurred in the index function: {e}")
+    except Exception:
+        logger.exception("Index page failed")
         return "An internal error occurred.", 500
 
 @app.route('/<path:path>')
 def serve_frontend(path):
-    print(f"Serving frontend file: {path}")
+    logger.debug("Serving frontend file %s", path)
     return send_from_directory('frontend', path)
 
 @app.route('/api/register', methods=['POST'])
 def register():
-    print("Received registration request. Headers:", request.headers)
     if not request.headers.get('Content-Type', '').startswith('application/json'):
-        print("Request is not JSON. Content-Type:", request.headers.get('Content-Type'))
+        logger.info("Rejected non-JSON registration", extra={'content_type': request.headers.get('Content-Type')})
         return jsonify({"message": "Unsupported Media Type: Content-Type must be application/json"}), 415
     
     data = request.get_json()
     
     # Check if data is None, which can happen if Content-Type is wrong or body is malformed
     if data is None:
-        print("Failed to parse JSON data from request.")
+        logger.info("Registration body is not valid JSON")
         return jsonify({"message": "Bad Request: Could not parse JSON data"}), 400
 
     # Validate required fields
     required_fields = ['Nom', 'Prenom', 'Username', 'password']
     for field in required_fields:
         if not data.get(field):
-            print(f"Missing required field: {field}")
+            logger.info("Registration missing field %s", field)
             return jsonify({"message": f"Missing required field: {field}"}), 400
 
     nom = data['Nom']
@@ -200,10 +318,10 @@ def register():
         cur.execute("INSERT INTO users (Nom, Prenom, Username, password) VALUES (%s, %s, %s, %s)", (nom, prenom, username, hashed_password))
         mysql.connection.commit()
         cur.close()
-        print(f"User registered successfully: {username}")
+        logger.info("User registered", extra={'username': username})
         return jsonify({'message': 'User registered successfully'}), 201
     except Exception as e:
-        print(f"Registration error: {e}")
+        logger.warning("Registration failed", extra={'username': username, 'error': str(e)})
         cur.close()
         # Check if it's a duplicate key error
         if 'Duplicate entry' in str(e) or 'UNIQUE constraint failed' in str(e):
@@ -213,16 +331,15 @@ def register():
 
 @app.route('/api/login', methods=['POST'])
 def login():
-    print("Received login request. Headers:", request.headers)
     if not request.headers.get('Content-Type', '').startswith('application/json'):
-        print("Request is not JSON. Content-Type:", request.headers.get('Content-Type'))
+        logger.info("Rejected non-JSON login", extra={'content_type': request.headers.get('Content-Type')})
         return jsonify({"message": "Unsupported Media Type: Content-Type must be application/json"}), 415
     
     data = request.get_json()
     
     # Check if data is None, which can happen if Content-Type is wrong or body is malformed
     if data is None:
-        print("Failed to parse JSON data from request.")
+        logger.info("Login body is not valid JSON")
         return jsonify({"message": "Bad Request: Could not parse JSON data"}), 400
 
     username = data.get('Username')
@@ -245,7 +362,7 @@ def login():
             'Nom': user['Nom'] or '',
             'Prenom': user['Prenom'] or ''
         }
-        print(f"Login successful for user: {user_identity}")
+        logger.info("Login succeeded", extra={'username': user_identity['Username']})
         # Store only the username in JWT token (Flask-JWT-Extended requires string identity)
         access_token = create_access_token(identity=user_identity['Username'])
         response = jsonify({'message': 'Login successful'})
@@ -265,8 +382,6 @@ def logout():
 def profile():
     try:
         username = get_jwt_identity()  # This is now just the username string
-        print(f"Profile endpoint - username from JWT: {username}")
-        print(f"Profile endpoint - username type: {type(username)}")
         
         if username:
             # Look up the full user data from database
@@ -281,18 +396,15 @@ def profile():
                     'Nom': user['Nom'] or '',
                     'Prenom': user['Prenom'] or ''
                 }
-                print(f"Profile endpoint - returning user data: {user_data}")
                 return jsonify(logged_in_as=user_data), 200
             else:
-                print(f"Profile endpoint - user not found in database: {username}")
+                logger.info("Profile not found", extra={'username': username})
                 return jsonify(logged_in_as=None), 404
         else:
-            print("Profile endpoint - no username in JWT")
+            logger.info("Profile requested without a username in the JWT")
             return jsonify(logged_in_as=None), 404
     except Exception as e:
-        print(f"Profile endpoint error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Profile lookup failed")
         return jsonify({'error': 'Profile lookup failed', 'message': str(e)}), 500
 
 # Hypervisor Management APIs
@@ -302,7 +414,8 @@ def profile():
 def get_providers_status():
     """Get status of all hypervisor providers"""
     try:
-        status = hypervisor_manager.get_provider_status()
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true')
+        status = hypervisor_manager.get_provider_status(refresh=refresh)
         return jsonify({'success': True, 'providers': status})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -323,8 +436,9 @@ def get_templates():
     """Get available templates"""
     try:
         provider = request.args.get('provider')
-        templates = hypervisor_manager.get_templates(provider)
-        return jsonify({'success': True, 'templates': templates})
+        result = hypervisor_manager.query_providers('get_templates', provider)
+        templates = hypervisor_manager.merge_templates(result)
+        return jsonify({'success': True, 'templates': templates, 'providers': result.metadata()})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -334,8 +448,9 @@ def get_clusters():
     """Get available clusters"""
     try:
         provider = request.args.get('provider')
-        clusters = hypervisor_manager.get_clusters(provider)
-        return jsonify({'success': True, 'clusters': clusters})
+        result = hypervisor_manager.query_providers('get_clusters', provider)
+        clusters = hypervisor_manager.lists_by_provider(result)
+        return jsonify({'success': True, 'clusters': clusters, 'providers': result.metadata()})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -345,8 +460,9 @@ def get_networks():
     """Get available networks"""
     try:
         provider = request.args.get('provider')
-        networks = hypervisor_manager.get_networks(provider)
-        return jsonify({'success': True, 'networks': networks})
+        result = hypervisor_manager.query_providers('get_networks', provider)
+        networks = hypervisor_manager.lists_by_provider(result)
+        return jsonify({'success': True, 'networks': networks, 'providers': result.metadata()})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -358,34 +474,47 @@ def list_vms():
     """List all VMs"""
     try:
         provider_name = request.args.get('provider')
+        use_cache = request.args.get('refresh', '').lower() not in ('1', 'true')
         
-        if provider_name:
-            # If a specific provider is requested, list VMs only from that provider
-            vms = hypervisor_manager.list_vms(provider_name)
-        else:
-            # If no provider is specified, list VMs from all enabled providers
-            vms = hypervisor_manager.list_vms()
+        # Large inventories can be streamed as newline-delimited JSON instead
+        if request.args.get('stream', '').lower() in ('1', 'true'):
+            return Response(stream_with_context(stream_vms(provider_name)),
+                            mimetype='application/x-ndjson')
+        
+        # Query the requested provider, or all enabled providers concurrently.
+        # Slow providers are reported in 'providers' instead of blocking the response.
+        result = hypervisor_manager.query_providers('list_vms', provider_name, use_cache=use_cache)
+        vms = [vm for provider_vms in result.values().values() for vm in provider_vms]
         
         # Convert VMInfo objects to dictionaries
-        vm_list = []
-        for vm in vms:
-            vm_dict = {
-                'name': vm.name,
-                'uuid': vm.uuid,
-                'state': vm.state,
-                'cpu': vm.cpu,
-                'ram': vm.ram,
-                'disk': vm.disk,
-                'ip_address': vm.ip_address,
-                'hypervisor': vm.hypervisor,
-                'cluster': vm.cluster
-            }
-            vm_list.append(vm_dict)
+        vm_list = [vm_to_dict(vm) for vm in vms]
         
-        return jsonify({'success': True, 'vms': vm_list})
+        return jsonify({'success': True, 'vms': vm_list, 'providers': result.metadata(), 'partial': result.partial})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def stream_vms(provider_name):
+    """Yield one JSON line per VM, then a line with per-provider counts and errors"""
+    summary = {}
+    for _, vm in hypervisor_manager.iter_vms(provider_name, summary=summary):
+        yield json.dumps({'vm': vm_to_dict(vm)}) + '\n'
+    yield json.dumps({'providers': summary,
+                      'partial': any(stats['error'] for stats in summary.values())}) + '\n'
+
+def vm_to_dict(vm):
+    """Serialize a VMInfo for API responses"""
+    return {
+        'name': vm.name,
+        'uuid': vm.uuid,
+        'state': vm.state,
+        'cpu': vm.cpu,
+        'ram': vm.ram,
+        'disk': vm.disk,
+        'ip_address': vm.ip_address,
+        'hypervisor': vm.hypervisor,
+        'cluster': vm.cluster
+    }
+
 @app.route('/api/vms/<vm_name>', methods=['GET'])
 @jwt_required()
 def get_vm_info(vm_name):
@@ -419,49 +548,67 @@ def create_vm():
     try:
         data = request.get_json()
         
-        # Get available IP
-        ip_address = get_available_ip()
-        
-        # Create VM configuration
-        vm_config = VMConfig(
-            name=data['vm_name'],
-            cpu=int(data.get('cpu', 2)),
-            ram=int(data.get('ram', 2048)),
-            disk=int(data.get('disk', 20)),
-            os_type=data.get('os_type', 'linux'),
-            network=data.get('network'),
-            ip_address=ip_address,
-            template=data.get('template'),
-            cluster=data.get('cluster')
-        )
+        # Validate required fields
+        missing_fields = [field for field in ['vm_name', 'provider'] if not data.get(field)]
+        if missing_fields:
+            return jsonify({'success': False, 'error': f"Missing required fields: {', '.join(missing_fields)}"}), 400
         
         provider = data.get('provider')
         
-        # Check if provider is enabled
-        status = hypervisor_manager.get_provider_status()
-        if provider not in status:
+        # Check if provider is enabled (configuration only, no backend call)
+        if provider not in hypervisor_manager.get_available_providers():
             return jsonify({'success': False, 'error': f'Provider {provider} not found'}), 400
         
-        if not status[provider]['enabled']:
+        if not hypervisor_manager.is_provider_enabled(provider):
             return jsonify({'success': False, 'error': f'Provider {provider} is not enabled. Please enable it in settings.'}), 400
         
-        result = hypervisor_manager.create_vm(vm_config, provider)
-        
-        if result.get('success'):
-            return jsonify(result)
-        else:
-            try:
-                print("Create VM error:", result.get('error', ''))
-                if 'stdout' in result and isinstance(result['stdout'], str):
-                    # Print the tail to avoid flooding logs
-                    print("Create VM stdout (tail):", result['stdout'][-2000:])
-            except Exception:
-                pass
-            return jsonify(result), 400
+        return submit_vm_job('create_vm', provider, data)
             
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def submit_vm_job(kind, provider, data):
+    """Lease an IP and queue a create/clone job with everything needed to rebuild it"""
+    ip_address = get_available_ip(provider, data.get('network'), owner=data['vm_name'])
+    if not ip_address:
+        return jsonify({'success': False, 'error': f"No free IP address for {provider} in the address pool"}), 503
+    try:
+        job = job_queue.submit(kind, provider, vm_name=data['vm_name'],
+                               params={**data, 'ip_address': ip_address})
+    except DuplicateJobError as e:
+        release_ip(ip_address)
+        return jsonify({'success': False, 'error': str(e), 'job': e.job.to_dict()}), 409
+    except Exception:
+        release_ip(ip_address)
+        raise
+    return jsonify({'success': True, 'job_id': job.id, 'status_url': f'/api/jobs/{job.id}', 'job': job.to_dict()}), 202
+
+def vm_config_from_params(params, default_os_type):
+    """Build the VMConfig for a job from its persisted parameters"""
+    return VMConfig(
+        name=params['vm_name'],
+        cpu=int(params.get('cpu', 2)),
+        ram=int(params.get('ram', 2048)),
+        disk=int(params.get('disk', 20)),
+        os_type=params.get('os_type', default_os_type),
+        network=params.get('network'),
+        ip_address=params.get('ip_address'),
+        template=params.get('template'),
+        cluster=params.get('cluster'),
+        clone_mode=params.get('clone_mode')
+    )
+
+def run_create_vm(manager, job):
+    """Create a VM on a job worker and log failures"""
+    vm_config = vm_config_from_params(job.params, 'linux')
+    result = manager.create_vm(vm_config, job.provider)
+    if not result.get('success'):
+        # Only the tail of the output, to avoid flooding logs
+        stdout = result.get('stdout')
+        logger.error("Create VM failed", extra={'job_id': job.id, 'vm_name': vm_config.name, 'error': result.get('error', ''),
+                                               'stdout_tail': stdout[-2000:] if isinstance(stdout, str) else None})
+    return result
+
 @app.route('/api/vms/clone', methods=['POST'])
 @jwt_required()
 def clone_vm():
@@ -475,42 +622,137 @@ def clone_vm():
         if missing_fields:
             return jsonify({'success': False, 'error': f"Missing required fields: {', '.join(missing_fields)}"}), 400
         
-        # Get available IP
-        ip_address = get_available_ip()
-        
-        # Create VM configuration
-        vm_config = VMConfig(
-            name=data['vm_name'],
-            cpu=int(data.get('cpu', 2)),
-            ram=int(data.get('ram', 2048)),
-            disk=int(data.get('disk', 20)),
-            os_type=data.get('os_type', 'unknown'),
-            network=data.get('network'),
-            ip_address=ip_address,
-            cluster=data.get('cluster')
-        )
+        clone_mode = data.get('clone_mode')
+        if clone_mode is not None and clone_mode not in CLONE_MODES:
+            return jsonify({'success': False, 'error': f"clone_mode must be one of {', '.join(CLONE_MODES)}"}), 400
         
         provider = data.get('provider')
         
-        # Check if provider is enabled
-        status = hypervisor_manager.get_provider_status()
-        if provider not in status:
+        # Check if provider is enabled (configuration only, no backend call)
+        if provider not in hypervisor_manager.get_available_providers():
             return jsonify({'success': False, 'error': f'Provider {provider} not found'}), 400
         
-        if not status[provider]['enabled']:
+        if not hypervisor_manager.is_provider_enabled(provider):
             return jsonify({'success': False, 'error': f'Provider {provider} is not enabled. Please enable it in settings.'}), 400
         
-        source_vm = data['source_vm']
-        result = hypervisor_manager.clone_vm(source_vm, vm_config, provider)
-        
-        if result.get('success'):
-            return jsonify(result)
-        else:
-            return jsonify(result), 400
+        # Clones take their template from the source VM
+        return submit_vm_job('clone_vm', provider, {**data, 'template': None})
             
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def run_clone_vm(manager, job):
+    """Clone a VM on a job worker, handing out a warm pool VM when one matches"""
+    vm_config = vm_config_from_params(job.params, 'unknown')
+    if job.params.get('use_warm_pool', True):
+        result = manager.warm_pool.claim(job.provider, job.params['source_vm'], vm_config)
+        if result:
+            return result
+    return manager.clone_vm(job.params['source_vm'], vm_config, job.provider)
+
+@app.route('/api/warm-pools', methods=['GET'])
+@jwt_required()
+def get_warm_pools():
+    """Warm pool sizes, hit/miss rates and refill latency"""
+    try:
+        return jsonify({'success': True, 'warm_pools': hypervisor_manager.warm_pool.stats()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/build-strategy', methods=['GET'])
+@jwt_required()
+def get_build_strategy():
+    """Recorded Packer build-mode outcomes and the mode order each build key would use"""
+    try:
+        stats = {}
+        for name in hypervisor_manager.get_available_providers():
+            strategy = getattr(hypervisor_manager.get_provider(name), 'build_strategy', None)
+            if strategy:
+                stats[name] = strategy.stats()
+        return jsonify({'success': True, 'build_strategy': stats})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request, provider, subprocess, queue, cache and IP pool metrics in Prometheus text format"""
+    return Response(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/vmrun', methods=['GET'])
+@jwt_required()
+def get_vmrun_stats():
+    """Queue state and per-command timings of the shared vmrun executor"""
+    try:
+        stats = {}
+        for name in hypervisor_manager.get_available_providers():
+            executor = getattr(hypervisor_manager.get_provider(name), 'vmrun', None)
+            if executor:
+                stats[name] = executor.stats()
+        return jsonify({'success': True, 'vmrun': stats})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/reclaim', methods=['GET'])
+@jwt_required()
+def get_reclaim_stats():
+    """Bytes and directories waiting in the trash for background deletion"""
+    try:
+        stats = {}
+        for name in hypervisor_manager.get_available_providers():
+            reclaimer = getattr(hypervisor_manager.get_provider(name), 'reclaimer', None)
+            if reclaimer:
+                stats[name] = reclaimer.stats()
+        return jsonify({'success': True, 'reclaim': stats})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/ip-leases', methods=['GET'])
+@jwt_required()
+def get_ip_leases():
+    """IP leases, pool utilization and reconciliation counters"""
+    try:
+        ipam = get_ipam()
+        return jsonify({
+            'success': True,
+            'leases': ipam.leases(),
+            'lease_stats': ipam.lease_stats(),
+            'pools': ipam.stats(),
+            'reconciler': lease_reconciler.stats() if lease_reconciler else None
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Job APIs
+
+@app.route('/api/jobs', methods=['GET'])
+@jwt_required()
+def list_jobs():
+    """List provisioning jobs, newest first"""
+    try:
+        state = request.args.get('state')
+        provider = request.args.get('provider')
+        limit = int(request.args.get('limit', 50))
+        jobs = job_queue.list_jobs(state=state, provider=provider, limit=limit)
+        return jsonify({
+            'success': True,
+            'jobs': [job.to_dict() for job in jobs],
+            'queue_depth': job_queue.queue_depth()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """Get state, progress, timings and result of a job"""
+    try:
+        job = job_queue.get(job_id)
+        if not job:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({'success': True, 'job': job.to_dict(include_events=True)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/vms/<vm_name>/start', methods=['POST'])
 @jwt_required()
 def start_vm(vm_name):
@@ -568,6 +810,7 @@ def delete_vm(vm_name):
         success = hypervisor_manager.delete_vm(vm_name, provider)
         
         if success:
+            release_vm_ips(vm_name, provider)
             return jsonify({'success': True, 'message': f"VM '{vm_name}' deleted successfully"})
         else:
             return jsonify({'success': False, 'error': f"Failed to delete VM '{vm_name}'"}), 400
@@ -713,7 +956,9 @@ def legacy_clone_vm():
         os_type = request.form['os_type']
         
         # Get available IP
-        ip_address = get_available_ip()
+        ip_address = get_available_ip('vmware', owner=vm_name)
+        if not ip_address:
+            return f"Error creating VM '{vm_name}':\n<pre>No free IP address in the address pool</pre>", 503
         
         # Create VM configuration
         vm_config = VMConfig(
@@ -727,6 +972,10 @@ def legacy_clone_vm():
         
         # Use VMware provider for legacy compatibility
         result = hypervisor_manager.clone_vm("default_template", vm_config, "vmware")
+        if result.get('success'):
+            bind_ip(ip_address, vm_name, "vmware")
+        else:
+            release_ip(ip_address)
         
         if result.get('success'):
             return f"VM '{vm_name}' created successfully!\n<pre>{result.get('message')}</pre>"
@@ -742,17 +991,10 @@ def legacy_clone_vm():
 def get_mock_server_status():
     """Get the status of the Nutanix mock server"""
     try:
-        is_healthy = check_mock_server_health()
-        is_running = mock_server_process and mock_server_process.poll() is None
-        
         return jsonify({
             'success': True,
-            'status': {
-                'running': is_running,
-                'healthy': is_healthy,
-                'pid': mock_server_process.pid if is_running else None,
-                'url': 'http://127.0.0.1:9441'
-            }
+            'status': mock_server.status(),
+            'backend': backend.status()
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -762,24 +1004,10 @@ def get_mock_server_status():
 def restart_mock_server():
     """Restart the Nutanix mock server"""
     try:
-        global mock_server_process
-        
-        # Stop existing server if running
-        if mock_server_process and mock_server_process.poll() is None:
-            print("Stopping existing mock server...")
-            mock_server_process.terminate()
-            try:
-                mock_server_process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                mock_server_process.kill()
-                mock_server_process.wait()
-        
-        # Start new server
-        start_nutanix_mock_server()
+        mock_server.restart()
         
-        # Wait a moment and check if it's healthy
-        time.sleep(3)
-        is_healthy = check_mock_server_health()
+        # Wait until the supervisor reports the server ready
+        is_healthy = mock_server.wait_ready(timeout=mock_server.ready_timeout)
         
         return jsonify({
             'success': True,
@@ -803,7 +1031,7 @@ def expired_token_callback(jwt_header, jwt_payload):
 @jwt.invalid_token_loader
 def invalid_token_callback(error):
     """Handle invalid JWT tokens (including 'Subject must be a string' errors)"""
-    print(f"Invalid token error: {error}")
+    logger.info("JWT rejected: invalid token", extra={'error': str(error)})
     return jsonify({'msg': 'Invalid token format. Please log in again.'}), 401
 
 @jwt.unauthorized_loader
@@ -814,44 +1042,44 @@ def missing_token_callback(error):
 @app.errorhandler(InvalidHeaderError)
 def handle_invalid_header_error(e):
     """Handle JWT invalid header errors"""
-    print(f"JWT Invalid header error: {e}")
+    logger.info("JWT rejected: invalid header", extra={'error': str(e)})
     return jsonify({'msg': 'Invalid authorization header format'}), 401
 
 @app.errorhandler(NoAuthorizationError)
 def handle_no_authorization_error(e):
     """Handle JWT no authorization errors"""
-    print(f"JWT No authorization error: {e}")
+    logger.info("JWT rejected: no authorization", extra={'error': str(e)})
     return jsonify({'msg': 'Authorization token is required'}), 401
 
 @app.errorhandler(CSRFError)
 def handle_csrf_error(e):
     """Handle JWT CSRF errors"""
-    print(f"JWT CSRF error: {e}")
+    logger.info("JWT rejected: csrf", extra={'error': str(e)})
     return jsonify({'msg': 'CSRF token error'}), 401
 
 @app.errorhandler(RevokedTokenError)
 def handle_revoked_token_error(e):
     """Handle JWT revoked token errors"""
-    print(f"JWT Revoked token error: {e}")
+    logger.info("JWT rejected: revoked token", extra={'error': str(e)})
     return jsonify({'msg': 'Token has been revoked'}), 401
 
 @app.errorhandler(InvalidTokenError)
 def handle_invalid_token_error(e):
     """Handle general JWT invalid token errors"""
-    print(f"JWT Invalid token error: {e}")
+    logger.info("JWT rejected: invalid token", extra={'error': str(e)})
     return jsonify({'msg': 'Invalid token. Please log in again.'}), 401
 
 @app.errorhandler(DecodeError)
 def handle_decode_error(e):
     """Handle JWT decode errors"""
-    print(f"JWT Decode error: {e}")
+    logger.info("JWT rejected: decode", extra={'error': str(e)})
     return jsonify({'msg': 'Token decode error. Please log in again.'}), 401
 
 # Handle generic JWT processing errors
 @app.errorhandler(422)
 def handle_unprocessable_entity(e):
     """Handle JWT unprocessable entity errors (like invalid header padding)"""
-    print(f"JWT Unprocessable entity error: {e}")
+    logger.info("JWT rejected: unprocessable entity", extra={'error': str(e)})
     # Check if this is a JWT-related error
     error_description = str(e.description) if hasattr(e, 'description') else str(e)
     if any(jwt_error in error_description.lower() for jwt_error in ['padding', 'token', 'jwt', 'header']):
@@ -860,4 +1088,7 @@ def handle_unprocessable_entity(e):
     return jsonify({'msg': 'Unprocessable entity'}), 422
 
 if __name__ == '__main__':
+    # Warm up in the background while the server starts accepting requests
+    backend.start()
+    mock_server.start()
     app.run(debug=True, use_reloader=False)
\ No newline at end of file
@@ -22,6 +22,8 @@ import sys
 from pathlib import Path
 from typing import Tuple
 
+from hypervisor_providers.vmx_index import shared_vmx_cache
+
 BASE_DIR = Path(__file__).resolve().parent
 
 CDROM_ADDRS = ["ide1:0", "sata0:1", "ide0:1"]
@@ -171,8 +173,7 @@ echo VM restarted.
 def process_vmx(vmx_path: Path, dry_run: bool) -> Tuple[bool, bool]:
     """Process a single VMX file. Returns (changed_vmx, wrote_scripts)."""
     print(f"Processing: {vmx_path}")
-    text = vmx_path.read_text(encoding="utf-8", errors="ignore")
-    lines = [l.rstrip("\n\r") for l in text.splitlines()]
+    lines = list(shared_vmx_cache.load(vmx_path).lines)
 
     changed = False
     lines, ch = enforce_persistence(lines)
@@ -186,6 +187,7 @@ def process_vmx(vmx_path: Path, dry_run: bool) -> Tuple[bool, bool]:
 
     if changed and not dry_run:
         vmx_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        shared_vmx_cache.invalidate(vmx_path)
         print("  - VMX updated")
     elif changed and dry_run:
         print("  - DRY: VMX would be updated")
@@ -19,11 +19,13 @@ Usage:
 
 import argparse
 import sys
-import subprocess
 import time
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from hypervisor_providers.vmx_index import VMXIndex, shared_vmx_cache
+from hypervisor_providers.vmrun_executor import get_vmrun_executor
+
 BASE_DIR = Path(__file__).resolve().parent
 
 class VMPersistenceFixer:
@@ -31,7 +33,9 @@ class VMPersistenceFixer:
     
     def __init__(self):
         self.vmrun_path = r'C:\Program Files (x86)\VMware\VMware Workstation\vmrun.exe'
+        self.vmrun = get_vmrun_executor(self.vmrun_path)
         self.base_dir = BASE_DIR
+        self.vmx_index = VMXIndex([self.base_dir / "cloned-vms", self.base_dir / "permanent_vms"])
         
     def find_all_vmx_files(self) -> List[Path]:
         """Find all VMX files in the project"""
@@ -60,6 +64,10 @@ class VMPersistenceFixer:
     
     def find_vmx_by_name(self, vm_name: str) -> Optional[Path]:
         """Find VMX file by VM name"""
+        vmx_path = self.vmx_index.locate(vm_name)
+        if vmx_path:
+            return vmx_path
+        
         all_vmx = self.find_all_vmx_files()
         
         for vmx_path in all_vmx:
@@ -74,16 +82,8 @@ class VMPersistenceFixer:
             return {"error": f"VMX file not found: {vmx_path}"}
         
         try:
-            content = vmx_path.read_text(encoding='utf-8', errors='ignore')
-            lines = content.splitlines()
-            
-            # Parse VMX settings
-            settings = {}
-            for line in lines:
-                line = line.strip()
-                if '=' in line and not line.startswith('#'):
-                    key, value = line.split('=', 1)
-                    settings[key.strip()] = value.strip().strip('"')
+            # Parse VMX settings (cached until the file changes)
+            settings = dict(shared_vmx_cache.values(vmx_path))
             
             # Check persistence settings
             issues = []
@@ -132,8 +132,7 @@ class VMPersistenceFixer:
     def is_vm_running(self, vmx_path: Path) -> bool:
         """Check if VM is currently running"""
         try:
-            result = subprocess.run([self.vmrun_path, 'list'], 
-                                  capture_output=True, text=True, timeout=30)
+            result = self.vmrun.run('list', timeout=30)
             if result.returncode == 0:
                 return str(vmx_path) in result.stdout
         except Exception:
@@ -147,8 +146,7 @@ class VMPersistenceFixer:
             return False
         
         try:
-            content = vmx_path.read_text(encoding='utf-8', errors='ignore')
-            lines = content.splitlines()
+            lines = list(shared_vmx_cache.load(vmx_path).lines)
             
             # Settings to fix
             fixes = {
@@ -184,6 +182,7 @@ class VMPersistenceFixer:
                     
                     # Write fixed file
                     vmx_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+                    shared_vmx_cache.invalidate(vmx_path)
                     print(f"✅ Fixed persistence settings for {vmx_path.name}")
                     print(f"   Backup saved as {backup_path.name}")
                 else:
@@ -227,8 +226,7 @@ class VMPersistenceFixer:
         # Check if VM is running
         if not self.is_vm_running(vmx_path):
             print("   Starting VM...")
-            result = subprocess.run([self.vmrun_path, 'start', str(vmx_path), 'nogui'],
-                                  capture_output=True, text=True)
+            result = self.vmrun.run('start', vmx_path, 'nogui')
             if result.returncode != 0:
                 print(f"❌ Failed to start VM: {result.stderr}")
                 return False
@@ -243,10 +241,8 @@ class VMPersistenceFixer:
         
         try:
             # Try to create test file using vmrun
-            result = subprocess.run([
-                self.vmrun_path, 'runProgramInGuest', str(vmx_path),
-                '/bin/bash', '-c', f'echo "{test_content}" > {test_file_path}'
-            ], capture_output=True, text=True, timeout=60)
+            result = self.vmrun.run('runProgramInGuest', vmx_path,
+                                    '/bin/bash', '-c', f'echo "{test_content}" > {test_file_path}', timeout=60)
             
             if result.returncode != 0:
                 print("⚠️  Could not create test file automatically")
@@ -257,17 +253,13 @@ class VMPersistenceFixer:
             
             # Restart VM
             print("   Restarting VM...")
-            subprocess.run([self.vmrun_path, 'reset', str(vmx_path), 'soft'],
-                         capture_output=True, text=True)
+            self.vmrun.run('reset', vmx_path, 'soft')
             
             # Wait for restart
             time.sleep(45)
             
             # Check if test file still exists
-            result = subprocess.run([
-                self.vmrun_path, 'runProgramInGuest', str(vmx_path),
-                '/bin/cat', test_file_path
-            ], capture_output=True, text=True, timeout=60)
+            result = self.vmrun.run('runProgramInGuest', vmx_path, '/bin/cat', test_file_path, timeout=60)
             
             if result.returncode == 0 and test_content in result.stdout:
                 print("✅ Persistence test PASSED - data survived restart")
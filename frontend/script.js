@@ -468,9 +468,18 @@ async function handleCloneVM(event) {
         const result = await response.json();
         
         if (result.success) {
-            showNotification(`VM '${vmData.vm_name}' cloned successfully!`, 'success');
+            // The clone runs as a background job; free the form right away
+            showNotification(`Cloning VM '${vmData.vm_name}' started`, 'info');
             event.target.reset();
             updateCloneFormOptions(); // Reset form options
+            showLoading(false);
+            
+            const job = await waitForJob(result.job_id);
+            if (job.state === 'succeeded') {
+                showNotification(`VM '${vmData.vm_name}' cloned successfully!`, 'success');
+            } else {
+                showNotification(`Error cloning VM: ${job.error}`, 'error');
+            }
         } else {
             showNotification(`Error cloning VM: ${result.error}`, 'error');
         }
@@ -898,6 +907,22 @@ async function updateNutanixOptions(prefix) {
     }
 }
 
+// Poll a provisioning job until it succeeds or fails
+async function waitForJob(jobId, intervalMs = 3000) {
+    while (true) {
+        const response = await fetch(`/api/jobs/${jobId}`);
+        const data = await response.json();
+        
+        if (!data.success) {
+            return { state: 'failed', error: data.error };
+        }
+        if (data.job.state === 'succeeded' || data.job.state === 'failed') {
+            return data.job;
+        }
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
 function showLoading(show) {
     const overlay = document.getElementById('loading-overlay');
     overlay.style.display = show ? 'flex' : 'none';
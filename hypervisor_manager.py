@@ -5,9 +5,22 @@ Unified interface for managing multiple hypervisor providers
 
 import json
 import os
+import queue
+import time
+import logging
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Iterator, Tuple
 from hypervisor_providers import BaseHypervisorProvider, VMwareProvider, NutanixProvider, VMConfig, VMInfo
+from provider_fanout import ProviderFanout, FanoutResult, ProviderResult
+from inventory_cache import InventoryCache, MISS, STALE
+from provider_health import ProviderHealthMonitor
+from warm_pool import WarmVMPool
+from hypervisor_providers.progress import checkpoint_listener, current_job_id
+from hypervisor_providers.metrics import record_operation
+from job_store import OP_SUCCEEDED, OP_FAILED, OP_COMPLETED_ON_RECOVERY, OP_ROLLED_BACK
+
+logger = logging.getLogger(__name__)
 
 class HypervisorManager:
     """Unified hypervisor management class"""
@@ -19,9 +32,15 @@ class HypervisorManager:
             config_file: Path to configuration file
         """
         self.providers: Dict[str, BaseHypervisorProvider] = {}
+        self.journal = None
         self.config_file = config_file or "hypervisor_config.json"
         self.config = self._load_config()
+        self.fanout = self._create_fanout()
+        self.inventory_cache = self._create_inventory_cache()
         self._initialize_providers()
+        self.health_monitor = self._create_health_monitor()
+        self.health_monitor.start()
+        self.warm_pool = self._create_warm_pool()
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file"""
@@ -32,13 +51,69 @@ class HypervisorManager:
                 with open(config_path, 'r') as f:
                     return json.load(f)
             except Exception as e:
-                print(f"Error loading config file: {e}")
+                logger.error("Error loading config file %s: %s", config_path, e)
         
-        # Default configuration
-                # Default configuration
         # Default configuration
         default_config = {
             "default_provider": "vmware",
+            "state_directory": "state",
+            "fanout": {
+                "max_workers": 8,
+                "default_timeout": 15
+            },
+            "jobs": {
+                "workers": {
+                    "vmware": 2,
+                    "nutanix": 4
+                },
+                "max_finished": 500,
+                "max_attempts": 2
+            },
+            "health_monitor": {
+                "interval": 30,
+                "max_interval": 300
+            },
+            "warm_pools": {
+                "refill_workers": 2,
+                "interval": 30,
+                "pools": []
+            },
+            "ipam": {
+                "pools": {
+                    "default": {
+                        "start": "192.168.122.100",
+                        "end": "192.168.122.200"
+                    }
+                },
+                "lease_ttl": 3600,
+                "reconcile_interval": 60,
+                "orphan_grace": 900
+            },
+            "logging": {
+                "level": "INFO",
+                "format": "json",
+                "levels": {
+                    "werkzeug": "WARNING"
+                },
+                "debug_sample_rate": 1.0,
+                "debug_per_second": 50,
+                "queue_size": 10000
+            },
+            "inventory_cache": {
+                "enabled": True,
+                "ttl": {
+                    "list_vms": 10,
+                    "get_templates": 300,
+                    "get_clusters": 300,
+                    "get_networks": 300
+                },
+                "stale_ttl": {
+                    "list_vms": 60,
+                    "get_templates": 3600,
+                    "get_clusters": 3600,
+                    "get_networks": 3600
+                }
+            },
             "providers": {
                 "vmware": {
                     "enabled": True,
@@ -69,7 +144,63 @@ class HypervisorManager:
             with open(self.config_file, 'w') as f:
                 json.dump(config, f, indent=2)
         except Exception as e:
-            print(f"Error saving config file: {e}")
+            logger.error("Error saving config file %s: %s", self.config_file, e)
+    
+    def _create_fanout(self) -> ProviderFanout:
+        """Create the fan-out engine used for multi-provider queries"""
+        fanout_config = self.config.get('fanout', {})
+        timeouts = {
+            name: provider_config['query_timeout']
+            for name, provider_config in self.config.get('providers', {}).items()
+            if 'query_timeout' in provider_config
+        }
+        return ProviderFanout(
+            max_workers=fanout_config.get('max_workers', 8),
+            default_timeout=fanout_config.get('default_timeout', 15),
+            timeouts=timeouts
+        )
+    
+    def _create_inventory_cache(self) -> Optional[InventoryCache]:
+        """Create the inventory cache, or None when disabled in config"""
+        cache_config = self.config.get('inventory_cache', {})
+        if not cache_config.get('enabled', True):
+            return None
+        return InventoryCache(
+            ttl=cache_config.get('ttl', {'list_vms': 10}),
+            stale_ttl=cache_config.get('stale_ttl', {'list_vms': 60}),
+            default_ttl=cache_config.get('default_ttl', 300),
+            default_stale_ttl=cache_config.get('default_stale_ttl', 3600)
+        )
+    
+    def _create_health_monitor(self) -> ProviderHealthMonitor:
+        """Create the background provider health monitor"""
+        health_config = self.config.get('health_monitor', {})
+        return ProviderHealthMonitor(
+            get_providers=lambda: dict(self.providers),
+            fanout=self.fanout,
+            interval=health_config.get('interval', 30),
+            max_interval=health_config.get('max_interval', 300)
+        )
+    
+    def _create_warm_pool(self) -> WarmVMPool:
+        """Create the warm VM pool (started by the app once recovery has run)"""
+        pool_config = self.config.get('warm_pools', {})
+        return WarmVMPool(
+            self,
+            pools=pool_config.get('pools', []),
+            refill_workers=pool_config.get('refill_workers', 2),
+            interval=pool_config.get('interval', 30),
+            max_backoff=pool_config.get('max_backoff', 600)
+        )
+    
+    def _resolve_provider_name(self, provider_name: str = None) -> str:
+        """Get the provider name an operation will actually run on"""
+        return provider_name or self.config.get('default_provider', 'vmware')
+    
+    def invalidate_inventory(self, provider_name: str = None, kind: str = None):
+        """Drop cached inventory after a write so the next read hits the provider"""
+        if self.inventory_cache:
+            self.inventory_cache.invalidate(kind=kind, provider=provider_name)
     
     def _initialize_providers(self):
         """Initialize enabled providers"""
@@ -80,18 +211,18 @@ class HypervisorManager:
             try:
                 vmware_config = providers_config['vmware']
                 self.providers['vmware'] = VMwareProvider(vmware_config)
-                print("VMware provider initialized")
+                logger.info("VMware provider initialized")
             except Exception as e:
-                print(f"Failed to initialize VMware provider: {e}")
+                logger.error("Failed to initialize VMware provider: %s", e)
         
         # Initialize Nutanix provider
         if providers_config.get('nutanix', {}).get('enabled', False):
             try:
                 nutanix_config = providers_config['nutanix']
                 self.providers['nutanix'] = NutanixProvider(nutanix_config)
-                print("Nutanix provider initialized")
+                logger.info("Nutanix provider initialized")
             except Exception as e:
-                print(f"Failed to initialize Nutanix provider: {e}")
+                logger.error("Failed to initialize Nutanix provider: %s", e)
     
     def get_provider(self, provider_name: str = None) -> Optional[BaseHypervisorProvider]:
         """Get a specific provider or default provider"""
@@ -134,6 +265,105 @@ class HypervisorManager:
             results[name] = provider.disconnect()
         return results
     
+    def shutdown(self):
+        """Stop every background thread this manager and its providers started"""
+        self.warm_pool.stop()
+        self.health_monitor.stop()
+        if self.inventory_cache:
+            self.inventory_cache.shutdown()
+        self.fanout.shutdown()
+        for provider in self.providers.values():
+            provider.shutdown()
+    
+    def _retire_providers(self, previous: Dict[str, BaseHypervisorProvider]):
+        """Shut down previous provider instances that a config change replaced or removed"""
+        for name, provider in previous.items():
+            if self.providers.get(name) is provider:
+                continue
+            try:
+                provider.shutdown()
+            except Exception as e:
+                logger.warning("Error shutting down replaced %s provider: %s", name, e)
+    
+    def attach_journal(self, journal):
+        """Record every provider operation in a JobStore operation journal"""
+        self.journal = journal
+    
+    def _run_journaled(self, kind: str, provider_name: str, vm_name: str,
+                       resources: Dict[str, Any], operation):
+        """Run a provider operation with its intent, checkpoints and outcome journaled
+        
+        Args:
+            kind: Operation name ('create_vm', 'clone_vm', ...)
+            provider_name: Provider the operation runs on
+            vm_name: VM the operation works on
+            resources: Resources known up front (IP address, source VM...)
+            operation: Callable running the provider operation
+        """
+        op_id = None
+        if self.journal:
+            op_id = self.journal.begin_operation(provider_name, kind, vm_name, resources,
+                                                 job_id=current_job_id())
+        started = time.time()
+        try:
+            if op_id is None:
+                result = operation()
+            else:
+                with checkpoint_listener(lambda checkpoint, owned: self.journal.checkpoint_operation(op_id, checkpoint, owned)):
+                    result = operation()
+        except Exception as e:
+            record_operation(provider_name, kind, time.time() - started, 'error')
+            if op_id is not None:
+                self.journal.finish_operation(op_id, OP_FAILED, str(e))
+            raise
+        
+        if isinstance(result, dict):
+            succeeded, error = result.get('success', False), result.get('error')
+        else:
+            succeeded, error = bool(result), None
+        record_operation(provider_name, kind, time.time() - started, 'ok' if succeeded else 'failed')
+        if op_id is not None:
+            self.journal.finish_operation(op_id, OP_SUCCEEDED if succeeded else OP_FAILED, error)
+        return result
+    
+    def recover_operations(self) -> Dict[str, List[int]]:
+        """Finish or roll back operations interrupted by a restart
+        
+        Only the resources recorded in the journal are inspected; nothing
+        else in the VM tree is scanned.
+        
+        Returns:
+            Operation IDs per outcome
+        """
+        summary = {'completed': [], 'rolled_back': [], 'pending': []}
+        if not self.journal:
+            return summary
+        
+        for operation in self.journal.open_operations():
+            provider = self.providers.get(operation['provider'])
+            if not provider:
+                # Provider disabled or unavailable: keep the record for a later run
+                summary['pending'].append(operation['id'])
+                continue
+            
+            try:
+                outcome = provider.recover_operation(operation)
+            except Exception as e:
+                logger.error("Error recovering %s of '%s': %s", operation['kind'], operation['vm_name'], e)
+                summary['pending'].append(operation['id'])
+                continue
+            
+            if outcome == 'completed':
+                self.journal.finish_operation(operation['id'], OP_COMPLETED_ON_RECOVERY)
+                summary['completed'].append(operation['id'])
+            else:
+                self.journal.finish_operation(operation['id'], OP_ROLLED_BACK,
+                                              "Interrupted by an application restart")
+                summary['rolled_back'].append(operation['id'])
+            self.invalidate_inventory(operation['provider'], 'list_vms')
+        
+        return summary
+    
     def create_vm(self, vm_config: VMConfig, provider_name: str = None) -> Dict[str, Any]:
         """Create a VM using specified or default provider"""
         provider = self.get_provider(provider_name)
@@ -143,7 +373,11 @@ class HypervisorManager:
                 'error': f"Provider '{provider_name or 'default'}' not available"
             }
         
-        return provider.create_vm(vm_config)
+        result = self._run_journaled('create_vm', self._resolve_provider_name(provider_name),
+                                     vm_config.name, {'ip_address': vm_config.ip_address},
+                                     lambda: provider.create_vm(vm_config))
+        self.invalidate_inventory(self._resolve_provider_name(provider_name), 'list_vms')
+        return result
     
     def clone_vm(self, source_vm: str, vm_config: VMConfig, provider_name: str = None) -> Dict[str, Any]:
         """Clone a VM using specified or default provider"""
@@ -154,7 +388,26 @@ class HypervisorManager:
                 'error': f"Provider '{provider_name or 'default'}' not available"
             }
         
-        return provider.clone_vm(source_vm, vm_config)
+        result = self._run_journaled('clone_vm', self._resolve_provider_name(provider_name),
+                                     vm_config.name, {'ip_address': vm_config.ip_address, 'source_vm': source_vm},
+                                     lambda: provider.clone_vm(source_vm, vm_config))
+        self.invalidate_inventory(self._resolve_provider_name(provider_name), 'list_vms')
+        return result
+    
+    def claim_warm_vm(self, warm_name: str, vm_config: VMConfig, provider_name: str = None) -> Dict[str, Any]:
+        """Hand out a warm pool VM under vm_config.name"""
+        provider = self.get_provider(provider_name)
+        if not provider:
+            return {
+                'success': False,
+                'error': f"Provider '{provider_name or 'default'}' not available"
+            }
+        
+        result = self._run_journaled('claim_warm_vm', self._resolve_provider_name(provider_name),
+                                     vm_config.name, {'ip_address': vm_config.ip_address, 'warm_vm': warm_name},
+                                     lambda: provider.claim_warm_vm(warm_name, vm_config))
+        self.invalidate_inventory(self._resolve_provider_name(provider_name), 'list_vms')
+        return result
     
     def delete_vm(self, vm_name: str, provider_name: str = None) -> bool:
         """Delete a VM using specified or default provider"""
@@ -162,7 +415,10 @@ class HypervisorManager:
         if not provider:
             return False
         
-        return provider.delete_vm(vm_name)
+        success = self._run_journaled('delete_vm', self._resolve_provider_name(provider_name), vm_name, {},
+                                      lambda: provider.delete_vm(vm_name))
+        self.invalidate_inventory(self._resolve_provider_name(provider_name), 'list_vms')
+        return success
     
     def start_vm(self, vm_name: str, provider_name: str = None) -> bool:
         """Start a VM using specified or default provider"""
@@ -170,7 +426,10 @@ class HypervisorManager:
         if not provider:
             return False
         
-        return provider.start_vm(vm_name)
+        success = self._run_journaled('start_vm', self._resolve_provider_name(provider_name), vm_name, {},
+                                      lambda: provider.start_vm(vm_name))
+        self.invalidate_inventory(self._resolve_provider_name(provider_name), 'list_vms')
+        return success
     
     def stop_vm(self, vm_name: str, provider_name: str = None) -> bool:
         """Stop a VM using specified or default provider"""
@@ -178,7 +437,10 @@ class HypervisorManager:
         if not provider:
             return False
         
-        return provider.stop_vm(vm_name)
+        success = self._run_journaled('stop_vm', self._resolve_provider_name(provider_name), vm_name, {},
+                                      lambda: provider.stop_vm(vm_name))
+        self.invalidate_inventory(self._resolve_provider_name(provider_name), 'list_vms')
+        return success
     
     def restart_vm(self, vm_name: str, provider_name: str = None) -> bool:
         """Restart a VM using specified or default provider"""
@@ -186,7 +448,10 @@ class HypervisorManager:
         if not provider:
             return False
         
-        return provider.restart_vm(vm_name)
+        success = self._run_journaled('restart_vm', self._resolve_provider_name(provider_name), vm_name, {},
+                                      lambda: provider.restart_vm(vm_name))
+        self.invalidate_inventory(self._resolve_provider_name(provider_name), 'list_vms')
+        return success
     
     def get_vm_info(self, vm_name: str, provider_name: str = None) -> Optional[VMInfo]:
         """Get VM information from specified or default provider"""
@@ -196,46 +461,197 @@ class HypervisorManager:
         
         return provider.get_vm_info(vm_name)
     
+    def query_providers(self, operation: str, provider_name: str = None,
+                        use_cache: bool = True) -> FanoutResult:
+        """Run a read-only provider operation on one or all providers concurrently
+        
+        Fresh cached answers are returned without touching the provider. Stale
+        answers are returned immediately and refreshed in the background.
+        Providers are called with strict=True, so a provider that cannot be
+        read is reported as failed rather than as an empty answer.
+        
+        Args:
+            operation: Provider method name ('list_vms', 'get_templates', ...)
+            provider_name: Restrict the query to a single provider
+            use_cache: Set to False to bypass the inventory cache
+            
+        Returns:
+            FanoutResult with per-provider values, errors and timings
+        """
+        if provider_name:
+            provider = self.get_provider(provider_name)
+            providers = {provider_name: provider} if provider else {}
+        else:
+            providers = dict(self.providers)
+        
+        cache = self.inventory_cache if use_cache else None
+        cached = {}
+        to_query = {}
+        generations = {}
+        for name, provider in providers.items():
+            state, value = cache.lookup(operation, name) if cache else (MISS, None)
+            if state == MISS:
+                to_query[name] = provider
+                if cache:
+                    generations[name] = cache.generation(operation, name)
+                continue
+            
+            cached[name] = value
+            if state == STALE:
+                # Strict, so an outage raises and keeps the stale entry instead of caching []
+                cache.refresh_async(operation, name,
+                                    lambda provider=provider: (True, getattr(provider, operation)(strict=True)))
+        
+        queried = (self.fanout.run(operation, to_query, kwargs={'strict': True}) if to_query
+                   else FanoutResult(operation=operation))
+        for name, error in queried.errors().items():
+            logger.warning("Error running %s on %s: %s", operation, name, error)
+        
+        result = FanoutResult(operation=operation, duration=queried.duration)
+        for name in providers:
+            if name in cached:
+                result.results[name] = ProviderResult(provider=name, value=cached[name], cached=True)
+                continue
+            
+            provider_result = queried.results[name]
+            outcome = 'ok' if provider_result.ok else 'timeout' if provider_result.timed_out else 'error'
+            record_operation(name, operation, provider_result.duration, outcome)
+            if cache and provider_result.ok:
+                cache.store(operation, name, provider_result.value, generations[name])
+            result.results[name] = provider_result
+        
+        return result
+    
     def list_vms(self, provider_name: str = None) -> List[VMInfo]:
         """List VMs from specified provider or all providers"""
+        all_vms = []
+        for vms in self.query_providers('list_vms', provider_name).values().values():
+            all_vms.extend(vms)
+        return all_vms
+    
+    def live_inventory(self) -> Dict[str, List[VMInfo]]:
+        """VMs per provider, bypassing the cache, for the providers that listed successfully
+        
+        Listings are strict: a provider that cannot be read is left out instead
+        of reported with zero VMs, so an outage is never mistaken for an empty
+        inventory.
+        """
+        result = self.fanout.run('list_vms', dict(self.providers), kwargs={'strict': True})
+        for name, provider_result in result.results.items():
+            outcome = 'ok' if provider_result.ok else 'timeout' if provider_result.timed_out else 'error'
+            record_operation(name, 'list_vms', provider_result.duration, outcome)
+        for name, error in result.errors().items():
+            logger.warning("Error running list_vms on %s: %s", name, error)
+        return result.values()
+    
+    def iter_vms(self, provider_name: str = None, summary: Dict[str, Dict[str, Any]] = None,
+                 max_buffered: int = 500) -> Iterator[Tuple[str, VMInfo]]:
+        """Stream VMs from one or all providers as they arrive
+        
+        Each provider is read on its own thread through provider.iter_vms(),
+        so paginated providers never hold their whole inventory in memory.
+        The inventory cache is bypassed. A provider that sends nothing for its
+        fan-out deadline is abandoned and reported as timed out.
+        
+        Args:
+            provider_name: Restrict the listing to a single provider
+            summary: Optional dict filled with per-provider count, error, timed_out and duration_ms
+            max_buffered: VMs buffered ahead of a slow consumer
+            
+        Yields:
+            (provider name, VMInfo) tuples
+        """
         if provider_name:
             provider = self.get_provider(provider_name)
-            if provider:
-                return provider.list_vms()
-            return []
+            providers = {provider_name: provider} if provider else {}
+        else:
+            providers = dict(self.providers)
+        if summary is None:
+            summary = {}
+        
+        buffer: "queue.Queue" = queue.Queue(maxsize=max_buffered)
+        stopped = threading.Event()
+        abandoned = {name: threading.Event() for name in providers}
+        done = object()
+        
+        def put(name: str, item) -> bool:
+            while not (stopped.is_set() or abandoned[name].is_set()):
+                try:
+                    buffer.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
         
-        # List from all providers
-        all_vms = []
-        for name, provider in self.providers.items():
+        def produce(name: str, provider: BaseHypervisorProvider):
+            error = None
             try:
-                vms = provider.list_vms()
-                all_vms.extend(vms)
+                for vm in provider.iter_vms():
+                    if not put(name, (name, vm, None)):
+                        return
             except Exception as e:
-                print(f"Error listing VMs from {name}: {e}")
+                error = str(e)
+            put(name, (name, done, error))
+        
+        started = time.monotonic()
+        for name, provider in providers.items():
+            summary[name] = {'count': 0, 'error': None, 'timed_out': False}
+            threading.Thread(target=produce, args=(name, provider),
+                             name=f'iter-vms-{name}', daemon=True).start()
+        
+        # Deadline per provider, pushed back whenever it sends something
+        deadlines = {name: started + self.fanout.get_timeout(name) for name in providers}
+        
+        def finish(name: str, error: Optional[str], timed_out: bool = False):
+            del deadlines[name]
+            stats = summary[name]
+            stats['error'] = error
+            stats['timed_out'] = timed_out
+            stats['duration_ms'] = round((time.monotonic() - started) * 1000, 1)
+            if error:
+                logger.warning("Error running iter_vms on %s: %s", name, error)
         
-        return all_vms
+        try:
+            while deadlines:
+                remaining = max(0.0, min(deadlines.values()) - time.monotonic())
+                try:
+                    name, vm, error = buffer.get(timeout=remaining)
+                except queue.Empty:
+                    now = time.monotonic()
+                    for name in [name for name, deadline in deadlines.items() if deadline <= now]:
+                        abandoned[name].set()
+                        finish(name, f"{name} did not answer within {self.fanout.get_timeout(name)}s",
+                               timed_out=True)
+                    continue
+                
+                if name not in deadlines:
+                    continue  # late output of an abandoned provider
+                if vm is done:
+                    finish(name, error)
+                    continue
+                deadlines[name] = time.monotonic() + self.fanout.get_timeout(name)
+                summary[name]['count'] += 1
+                yield name, vm
+        finally:
+            # Unblock producers if the consumer stopped early
+            stopped.set()
     
     def get_templates(self, provider_name: str = None) -> List[str]:
         """Get templates from specified provider or all providers"""
-        if provider_name:
-            provider = self.get_provider(provider_name)
-            if provider:
-                return provider.get_templates()
-            return []
-        
-        # Combine templates from all providers
+        return self.merge_templates(self.query_providers('get_templates', provider_name))
+    
+    def merge_templates(self, result: FanoutResult) -> List[str]:
+        """Combine template lists from several providers without duplicates"""
         combined_templates = []
         template_names = set()
         
-        for name, provider in self.providers.items():
-            try:
-                templates = provider.get_templates()
-                for template in templates:
-                    if template not in template_names:
-                        combined_templates.append(template)
-                        template_names.add(template)
-            except Exception as e:
-                print(f"Error getting templates from {name}: {e}")
+        # Keep provider order stable regardless of which provider answered first
+        values = result.values()
+        for name in self.providers:
+            for template in values.get(name, []):
+                if template not in template_names:
+                    combined_templates.append(template)
+                    template_names.add(template)
         
         return combined_templates
     
@@ -248,32 +664,38 @@ class HypervisorManager:
             
             self.config['providers'][provider_name] = config
             self._save_config(self.config)
+            if 'query_timeout' in config:
+                self.fanout.set_timeout(provider_name, config['query_timeout'])
+            self.invalidate_inventory(provider_name)
+            self.health_monitor.reset(provider_name)
+            previous = dict(self.providers)
             
             # Reinitialize providers if enabled
             if config.get('enabled', False):
                 if provider_name == 'vmware':
                     try:
                         self.providers['vmware'] = VMwareProvider(config)
-                        print(f"VMware provider reinitialized")
+                        logger.info("VMware provider reinitialized")
                     except Exception as e:
-                        print(f"Failed to reinitialize VMware provider: {e}")
+                        logger.error("Failed to reinitialize VMware provider: %s", e)
                         return False
                 elif provider_name == 'nutanix':
                     try:
                         self.providers['nutanix'] = NutanixProvider(config)
-                        print(f"Nutanix provider initialized")
+                        logger.info("Nutanix provider initialized")
                     except Exception as e:
-                        print(f"Failed to initialize Nutanix provider: {e}")
+                        logger.error("Failed to initialize Nutanix provider: %s", e)
                         return False
             else:
                 # Remove provider if disabled
                 if provider_name in self.providers:
                     del self.providers[provider_name]
-                    print(f"{provider_name} provider disabled")
+                    logger.info("%s provider disabled", provider_name)
             
+            self._retire_providers(previous)
             return True
         except Exception as e:
-            print(f"Error updating provider config: {e}")
+            logger.error("Error updating provider config: %s", e)
             return False
     
     def set_default_provider(self, provider_name: str) -> bool:
@@ -283,7 +705,7 @@ class HypervisorManager:
             self._save_config(self.config)
             return True
         except Exception as e:
-            print(f"Error setting default provider: {e}")
+            logger.error("Error setting default provider: %s", e)
             return False
     
     def get_config(self) -> Dict[str, Any]:
@@ -292,41 +714,16 @@ class HypervisorManager:
     
     def get_clusters(self, provider_name: str = None) -> Dict[str, List[str]]:
         """Get clusters from specified provider or all providers"""
-        if provider_name:
-            provider = self.get_provider(provider_name)
-            if provider:
-                return {provider_name: provider.get_clusters()}
-            return {}
-        
-        all_clusters = {}
-        for name, provider in self.providers.items():
-            try:
-                clusters = provider.get_clusters()
-                all_clusters[name] = clusters
-            except Exception as e:
-                print(f"Error getting clusters from {name}: {e}")
-                all_clusters[name] = []
-        
-        return all_clusters
+        return self.lists_by_provider(self.query_providers('get_clusters', provider_name))
     
     def get_networks(self, provider_name: str = None) -> Dict[str, List[str]]:
         """Get networks from specified provider or all providers"""
-        if provider_name:
-            provider = self.get_provider(provider_name)
-            if provider:
-                return {provider_name: provider.get_networks()}
-            return {}
-        
-        all_networks = {}
-        for name, provider in self.providers.items():
-            try:
-                networks = provider.get_networks()
-                all_networks[name] = networks
-            except Exception as e:
-                print(f"Error getting networks from {name}: {e}")
-                all_networks[name] = []
-        
-        return all_networks
+        return self.lists_by_provider(self.query_providers('get_networks', provider_name))
+    
+    def lists_by_provider(self, result: FanoutResult) -> Dict[str, List[str]]:
+        """Map each queried provider to its list, empty for failed providers"""
+        values = result.values()
+        return {name: values.get(name, []) for name in result.results}
     
     def create_snapshot(self, vm_name: str, snapshot_name: str, provider_name: str = None) -> bool:
         """Create a VM snapshot using specified or default provider"""
@@ -334,7 +731,11 @@ class HypervisorManager:
         if not provider:
             return False
         
-        return provider.create_snapshot(vm_name, snapshot_name)
+        success = self._run_journaled('create_snapshot', self._resolve_provider_name(provider_name), vm_name,
+                                      {'snapshot_name': snapshot_name},
+                                      lambda: provider.create_snapshot(vm_name, snapshot_name))
+        self.invalidate_inventory(self._resolve_provider_name(provider_name), 'list_vms')
+        return success
     
     def restore_snapshot(self, vm_name: str, snapshot_name: str, provider_name: str = None) -> bool:
         """Restore a VM snapshot using specified or default provider"""
@@ -342,7 +743,11 @@ class HypervisorManager:
         if not provider:
             return False
         
-        return provider.restore_snapshot(vm_name, snapshot_name)
+        success = self._run_journaled('restore_snapshot', self._resolve_provider_name(provider_name), vm_name,
+                                      {'snapshot_name': snapshot_name},
+                                      lambda: provider.restore_snapshot(vm_name, snapshot_name))
+        self.invalidate_inventory(self._resolve_provider_name(provider_name), 'list_vms')
+        return success
     
     def delete_snapshot(self, vm_name: str, snapshot_name: str, provider_name: str = None) -> bool:
         """Delete a VM snapshot using specified or default provider"""
@@ -350,7 +755,11 @@ class HypervisorManager:
         if not provider:
             return False
         
-        return provider.delete_snapshot(vm_name, snapshot_name)
+        success = self._run_journaled('delete_snapshot', self._resolve_provider_name(provider_name), vm_name,
+                                      {'snapshot_name': snapshot_name},
+                                      lambda: provider.delete_snapshot(vm_name, snapshot_name))
+        self.invalidate_inventory(self._resolve_provider_name(provider_name), 'list_vms')
+        return success
     
     def update_config(self, new_config: Dict[str, Any]):
         """Update configuration"""
@@ -358,8 +767,12 @@ class HypervisorManager:
         self._save_config(self.config)
         
         # Reinitialize providers
+        previous = dict(self.providers)
         self.providers.clear()
+        self.invalidate_inventory()
         self._initialize_providers()
+        self._retire_providers(previous)
+        self.health_monitor.reset()
     
     def enable_provider(self, provider_name: str, config: Dict[str, Any] = None):
         """Enable a provider"""
@@ -375,7 +788,10 @@ class HypervisorManager:
             self.config['providers'][provider_name].update(config)
         
         self._save_config(self.config)
+        previous = dict(self.providers)
         self._initialize_providers()
+        self._retire_providers(previous)
+        self.health_monitor.reset(provider_name)
     
     def disable_provider(self, provider_name: str):
         """Disable a provider"""
@@ -385,8 +801,11 @@ class HypervisorManager:
             
             # Remove from active providers
             if provider_name in self.providers:
-                self.providers[provider_name].disconnect()
-                del self.providers[provider_name]
+                previous = {provider_name: self.providers.pop(provider_name)}
+                previous[provider_name].disconnect()
+                self._retire_providers(previous)
+            self.invalidate_inventory(provider_name)
+            self.health_monitor.reset(provider_name)
     
     def set_default_provider(self, provider_name: str):
         """Set default provider"""
@@ -396,27 +815,28 @@ class HypervisorManager:
             return True
         return False
     
-    def get_provider_status(self) -> Dict[str, Dict[str, Any]]:
-        """Get status of all providers"""
-        status = {}
+    def is_provider_enabled(self, provider_name: str) -> bool:
+        """Check from configuration whether a provider is enabled and initialized"""
+        return provider_name in self.providers
+    
+    def get_provider_status(self, refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Get status of all providers from the health monitor snapshot
         
-        for name, provider in self.providers.items():
-            try:
-                connected = provider.connect()
-                provider.disconnect()  # Don't keep connection open
-                
-                status[name] = {
-                    'enabled': True,
-                    'connected': connected,
-                    'provider_type': provider.get_provider_name()
-                }
-            except Exception as e:
-                status[name] = {
-                    'enabled': True,
-                    'connected': False,
-                    'error': str(e),
-                    'provider_type': provider.get_provider_name()
-                }
+        Args:
+            refresh: Probe every provider now instead of serving the cached snapshot
+        """
+        if refresh:
+            self.health_monitor.probe_now()
+        
+        status = {}
+        for name, health in self.health_monitor.snapshot().items():
+            provider = self.providers.get(name)
+            status[name] = {
+                **health,
+                'enabled': True,
+                'connected': bool(health['connected']),
+                'provider_type': provider.get_provider_name() if provider else name
+            }
         
         # Add disabled providers
         for name, config in self.config.get('providers', {}).items():
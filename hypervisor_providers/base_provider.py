@@ -4,7 +4,7 @@ Abstract base class for all hypervisor providers
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterator
 from dataclasses import dataclass
 
 @dataclass
@@ -22,6 +22,7 @@ class VMConfig:
     template: Optional[str] = None
     cluster: Optional[str] = None
     storage_container: Optional[str] = None
+    clone_mode: Optional[str] = None  # full, linked or auto; None uses the provider default
 
 @dataclass
 class VMInfo:
@@ -54,6 +55,10 @@ class BaseHypervisorProvider(ABC):
         """Disconnect from the hypervisor"""
         pass
     
+    def shutdown(self):
+        """Stop the provider's background threads (watchers, pollers...)"""
+        pass
+    
     @abstractmethod
     def create_vm(self, vm_config: VMConfig) -> Dict[str, Any]:
         """Create a new VM"""
@@ -90,23 +95,36 @@ class BaseHypervisorProvider(ABC):
         pass
     
     @abstractmethod
-    def list_vms(self) -> List[VMInfo]:
-        """List all VMs"""
+    def list_vms(self, strict: bool = False) -> List[VMInfo]:
+        """List all VMs
+        
+        Args:
+            strict: Raise when the inventory cannot be read instead of
+                returning an empty or partial listing
+        """
         pass
     
+    def iter_vms(self) -> Iterator[VMInfo]:
+        """Yield VMs incrementally
+        
+        Providers with paginated inventories override this to stream pages;
+        the default yields from list_vms().
+        """
+        yield from self.list_vms()
+    
     @abstractmethod
-    def get_templates(self) -> List[str]:
-        """Get available VM templates"""
+    def get_templates(self, strict: bool = False) -> List[str]:
+        """Get available VM templates (strict: raise instead of returning an empty list)"""
         pass
     
     @abstractmethod
-    def get_clusters(self) -> List[str]:
-        """Get available clusters"""
+    def get_clusters(self, strict: bool = False) -> List[str]:
+        """Get available clusters (strict: raise instead of returning an empty list)"""
         pass
     
     @abstractmethod
-    def get_networks(self) -> List[str]:
-        """Get available networks"""
+    def get_networks(self, strict: bool = False) -> List[str]:
+        """Get available networks (strict: raise instead of returning an empty list)"""
         pass
     
     @abstractmethod
@@ -129,6 +147,47 @@ class BaseHypervisorProvider(ABC):
         """Open VM console"""
         pass
     
+    def health_check(self) -> bool:
+        """Lightweight reachability probe used by the background health monitor
+        
+        Unlike connect()/disconnect(), this must not tear down shared state
+        such as HTTP sessions.
+        """
+        return self.connect()
+    
+    def prepare_warm_vm(self, source_vm: str, vm_config: VMConfig) -> Dict[str, Any]:
+        """Clone and boot a VM kept in reserve for a warm pool
+        
+        Warm VMs are not listed with the regular inventory until claimed.
+        """
+        return {'success': False, 'error': f"{self.provider_name} does not support warm pools"}
+    
+    def claim_warm_vm(self, warm_name: str, vm_config: VMConfig) -> Dict[str, Any]:
+        """Hand a warm VM out under vm_config.name, applying its network settings"""
+        return {'success': False, 'error': f"{self.provider_name} does not support warm pools"}
+    
+    def list_warm_vms(self) -> List[str]:
+        """Names of the warm VMs held in reserve"""
+        return []
+    
+    def discard_warm_vm(self, warm_name: str) -> bool:
+        """Delete a warm VM that can no longer be handed out"""
+        return False
+    
+    def recover_operation(self, operation: Dict[str, Any]) -> str:
+        """Resolve an operation that was interrupted by an application restart
+        
+        Args:
+            operation: Journal record with kind, vm_name, checkpoint and resources
+            
+        Returns:
+            'completed' if the operation's effect is in place, 'rolled_back' otherwise
+        """
+        if operation['kind'] in ('create_vm', 'clone_vm'):
+            return 'completed' if self.get_vm_info(operation['vm_name']) else 'rolled_back'
+        # Power and snapshot operations are not resumed; the user can retry them
+        return 'rolled_back'
+    
     def validate_config(self, vm_config: VMConfig) -> bool:
         """Validate VM configuration"""
         if not vm_config.name:
@@ -0,0 +1,93 @@
+"""
+Base Snapshots
+Managed template snapshots that VMware linked clones are created from
+"""
+
+import logging
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLONE_MODES = ('full', 'linked', 'auto')
+
+BASE_SNAPSHOT_NAME = 'vmauto-base'
+
+
+class BaseSnapshotRegistry:
+    """Creates one base snapshot per template and remembers it across restarts
+
+    Linked clones share the template's disks up to this snapshot, so it is
+    taken once and reused; `vmrun listSnapshots` is only consulted when the
+    registry has no record or a clone from the recorded snapshot failed.
+    """
+
+    def __init__(self, vmrun, state_file: Path, snapshot_name: str = BASE_SNAPSHOT_NAME):
+        self.vmrun = vmrun
+        self.state_file = Path(state_file)
+        self.snapshot_name = snapshot_name
+        self._lock = threading.Lock()
+        self._template_locks: Dict[str, threading.Lock] = {}
+        self._snapshots: Dict[str, Dict[str, object]] = self._load()
+
+    def get(self, template_vmx: Path) -> Optional[str]:
+        """Return the recorded base snapshot of a template without calling vmrun"""
+        with self._lock:
+            record = self._snapshots.get(str(template_vmx))
+        return record['snapshot'] if record else None
+
+    def ensure(self, template_vmx: Path) -> str:
+        """Return the template's base snapshot, taking it first if needed
+
+        Raises:
+            RuntimeError: If vmrun cannot list or take the snapshot
+        """
+        key = str(template_vmx)
+        with self._lock:
+            template_lock = self._template_locks.setdefault(key, threading.Lock())
+
+        # Concurrent clones of the same template wait for a single snapshot
+        with template_lock:
+            snapshot = self.get(template_vmx)
+            if snapshot:
+                return snapshot
+
+            if self.snapshot_name not in self._list_snapshots(template_vmx):
+                result = self.vmrun.run('snapshot', key, self.snapshot_name, timeout=300)
+                if result.returncode != 0:
+                    raise RuntimeError(f"vmrun snapshot failed: {result.stderr or result.stdout}")
+                logger.info("Created base snapshot '%s' on %s", self.snapshot_name, template_vmx.name)
+
+            with self._lock:
+                self._snapshots[key] = {'snapshot': self.snapshot_name, 'created_at': time.time()}
+                self._save()
+            return self.snapshot_name
+
+    def forget(self, template_vmx: Path):
+        """Drop the record for a template so the next clone re-checks vmrun"""
+        with self._lock:
+            if self._snapshots.pop(str(template_vmx), None) is not None:
+                self._save()
+
+    def _list_snapshots(self, template_vmx: Path) -> list:
+        """Snapshot names of a template from `vmrun listSnapshots`"""
+        result = self.vmrun.run('listSnapshots', template_vmx, timeout=60)
+        if result.returncode != 0:
+            raise RuntimeError(f"vmrun listSnapshots failed: {result.stderr or result.stdout}")
+
+        # First line is "Total snapshots: N", then one snapshot name per line
+        return [line.strip() for line in result.stdout.splitlines()[1:] if line.strip()]
+
+    def _load(self) -> Dict[str, Dict[str, object]]:
+        try:
+            return json.loads(self.state_file.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_file = self.state_file.with_suffix('.tmp')
+        tmp_file.write_text(json.dumps(self._snapshots, indent=2))
+        tmp_file.replace(self.state_file)
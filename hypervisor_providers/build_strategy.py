@@ -0,0 +1,137 @@
+"""
+Build Strategy
+Orders Packer build modes by their recorded outcomes per template, OS type and host
+"""
+
+import json
+import time
+import threading
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+
+@dataclass
+class BuildMode:
+    """A Packer template the provider can build with"""
+    name: str
+    template_file: str
+    timeout: float
+    estimate: float  # expected seconds before any history exists
+
+
+@dataclass
+class ModeStats:
+    """Recorded outcomes of one build mode for one build key"""
+    attempts: int = 0
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    avg_success_seconds: Optional[float] = None
+    last_duration: Optional[float] = None
+    last_attempt_at: Optional[float] = None
+    last_failure_at: Optional[float] = None
+
+
+class BuildStrategy:
+    """Picks the build mode most likely to succeed fastest
+
+    Modes are ranked by expected seconds to a successful build: the average
+    successful duration (or the mode's estimate) divided by its smoothed
+    success rate. A mode that failed ``failure_streak`` times in a row is
+    skipped for ``cooldown`` seconds, after which it gets one more try.
+    History is persisted in a JSON file.
+    """
+
+    def __init__(self, modes: List[BuildMode], state_file: Path, failure_streak: int = 2,
+                 cooldown: float = 3600.0, smoothing: float = 0.3):
+        """Initialize build strategy
+
+        Args:
+            modes: Available build modes in their default fallback order
+            state_file: JSON file persisting the history
+            failure_streak: Consecutive failures after which a mode is skipped
+            cooldown: Seconds a skipped mode stays skipped
+            smoothing: Weight of the latest duration in the running average
+        """
+        self.modes = list(modes)
+        self.state_file = Path(state_file)
+        self.failure_streak = failure_streak
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._history: Dict[str, Dict[str, ModeStats]] = self._load()
+
+    @staticmethod
+    def key(template: str, os_type: str, host: str) -> str:
+        return f"{template}|{os_type}|{host}"
+
+    def plan(self, key: str) -> List[BuildMode]:
+        """Modes to try for a build, best first, without modes on a recent failure streak"""
+        now = time.time()
+        with self._lock:
+            history = self._history.get(key, {})
+            ranked = []
+            for position, mode in enumerate(self.modes):
+                stats = history.get(mode.name, ModeStats())
+                if (stats.consecutive_failures >= self.failure_streak
+                        and now - (stats.last_failure_at or 0) < self.cooldown):
+                    continue
+                ranked.append((self._expected_seconds(mode, stats), position, mode))
+
+        # Every mode failing recently: fall back to the default order rather than not building
+        if not ranked:
+            return list(self.modes)
+        return [mode for _, _, mode in sorted(ranked, key=lambda item: item[:2])]
+
+    def record(self, key: str, mode: str, success: bool, duration: float):
+        """Record the outcome of one build attempt"""
+        with self._lock:
+            stats = self._history.setdefault(key, {}).setdefault(mode, ModeStats())
+            stats.attempts += 1
+            stats.last_duration = round(duration, 1)
+            stats.last_attempt_at = time.time()
+            if success:
+                stats.successes += 1
+                stats.consecutive_failures = 0
+                if stats.avg_success_seconds is None:
+                    stats.avg_success_seconds = round(duration, 1)
+                else:
+                    stats.avg_success_seconds = round(
+                        self.smoothing * duration + (1 - self.smoothing) * stats.avg_success_seconds, 1)
+            else:
+                stats.failures += 1
+                stats.consecutive_failures += 1
+                stats.last_failure_at = stats.last_attempt_at
+            self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        """Recorded history and the current plan of every build key"""
+        with self._lock:
+            history = {key: {mode: asdict(stats) for mode, stats in modes.items()}
+                       for key, modes in self._history.items()}
+        return {
+            key: {'modes': modes, 'plan': [mode.name for mode in self.plan(key)]}
+            for key, modes in history.items()
+        }
+
+    @staticmethod
+    def _expected_seconds(mode: BuildMode, stats: ModeStats) -> float:
+        success_rate = (stats.successes + 1) / (stats.attempts + 2)
+        duration = stats.avg_success_seconds if stats.avg_success_seconds is not None else mode.estimate
+        return duration / success_rate
+
+    def _load(self) -> Dict[str, Dict[str, ModeStats]]:
+        try:
+            data = json.loads(self.state_file.read_text())
+            return {key: {mode: ModeStats(**stats) for mode, stats in modes.items()}
+                    for key, modes in data.items()}
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def _save(self):
+        tmp_file = self.state_file.with_suffix('.tmp')
+        tmp_file.write_text(json.dumps(
+            {key: {mode: asdict(stats) for mode, stats in modes.items()} for key, modes in self._history.items()},
+            indent=2))
+        tmp_file.replace(self.state_file)
@@ -0,0 +1,82 @@
+"""
+Command Runner
+Runs long external commands (Packer, vmrun) with their output streamed line by line
+"""
+
+import logging
+import time
+import threading
+import subprocess
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+LineListener = Callable[[str, str], None]
+
+
+@dataclass
+class CommandResult:
+    """Outcome of a streamed command; stdout/stderr hold only the log tail"""
+    args: List[str]
+    returncode: int
+    stdout: str
+    stderr: str
+    duration: float
+
+
+def run_streaming(args: List[str], cwd: str = None, env: Dict[str, str] = None,
+                  timeout: float = None, on_line: LineListener = None,
+                  tail_lines: int = 200) -> CommandResult:
+    """Run a command, handing each output line to on_line as it is printed
+
+    Only the last ``tail_lines`` lines of each stream are kept in memory.
+
+    Args:
+        args: Command and arguments
+        cwd: Working directory
+        env: Environment of the command
+        timeout: Seconds before the command is killed
+        on_line: Callable receiving ('stdout' or 'stderr', line without newline)
+        tail_lines: Lines of each stream kept for the result
+
+    Raises:
+        subprocess.TimeoutExpired: If the command outlives timeout (it is killed first)
+    """
+    started = time.time()
+    process = subprocess.Popen(args, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               stdin=subprocess.DEVNULL, text=True, errors='replace', bufsize=1)
+    tails = {'stdout': deque(maxlen=tail_lines), 'stderr': deque(maxlen=tail_lines)}
+
+    def pump(stream_name: str, stream):
+        for line in stream:
+            line = line.rstrip('\r\n')
+            tails[stream_name].append(line)
+            if on_line:
+                try:
+                    on_line(stream_name, line)
+                except Exception as e:
+                    logger.warning("Output listener failed: %s", e)
+        stream.close()
+
+    readers = [threading.Thread(target=pump, args=(name, getattr(process, name)),
+                                name=f'command-{name}', daemon=True)
+               for name in ('stdout', 'stderr')]
+    for reader in readers:
+        reader.start()
+
+    try:
+        returncode = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        for reader in readers:
+            reader.join(timeout=5)
+        raise subprocess.TimeoutExpired(args, timeout, output='\n'.join(tails['stdout']),
+                                        stderr='\n'.join(tails['stderr']))
+
+    for reader in readers:
+        reader.join()
+    return CommandResult(args=list(args), returncode=returncode, stdout='\n'.join(tails['stdout']),
+                         stderr='\n'.join(tails['stderr']), duration=time.time() - started)
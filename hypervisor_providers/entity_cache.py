@@ -0,0 +1,114 @@
+"""
+Entity Cache
+Name-to-UUID resolution cache with per-kind TTLs and negative entries
+"""
+
+import time
+import threading
+from typing import Dict, Optional, Any, Callable, Tuple
+
+# Sentinel stored for names known not to exist
+NOT_FOUND = object()
+
+
+class EntityCache:
+    """Thread-safe cache of resolved entities keyed by (kind, key)
+
+    A lookup that found nothing is cached for ``negative_ttl`` seconds so
+    repeated requests for a missing entity do not hit the API each time.
+    Loader errors are never cached.
+    """
+
+    def __init__(self, ttl: Dict[str, float] = None, default_ttl: float = 300.0,
+                 negative_ttl: float = 30.0):
+        """Initialize entity cache
+
+        Args:
+            ttl: Seconds an entry stays valid, per kind
+            default_ttl: TTL for kinds without an explicit value
+            negative_ttl: Seconds a "not found" result stays valid
+        """
+        self.ttl = dict(ttl or {})
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self._entries: Dict[Tuple[str, Any], Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, kind: str, key: Any) -> Tuple[bool, Any]:
+        """Look up an entry
+
+        Returns:
+            (hit, value) where value is None for a cached "not found"
+        """
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[(kind, key)]
+                self._misses += 1
+                return False, None
+            self._hits += 1
+            return True, None if entry[0] is NOT_FOUND else entry[0]
+
+    def put(self, kind: str, key: Any, value: Any):
+        """Store a value; None records a negative entry"""
+        if value is None:
+            expires = time.time() + self.negative_ttl
+            value = NOT_FOUND
+        else:
+            expires = time.time() + self.ttl.get(kind, self.default_ttl)
+        with self._lock:
+            self._entries[(kind, key)] = (value, expires)
+
+    def resolve(self, kind: str, key: Any, loader: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """Return the cached value or load and cache it
+
+        Args:
+            kind: Entity kind ('vm', 'cluster', ...)
+            key: Name (or other key) within the kind
+            loader: Returns the value, None if it does not exist, or raises on error
+        """
+        hit, value = self.get(kind, key)
+        if hit:
+            return value
+        value = loader()
+        self.put(kind, key, value)
+        return value
+
+    def put_many(self, kind: str, values: Dict[Any, Any]):
+        """Store authoritative values, e.g. from a full listing
+
+        Older keys that resolve to one of the new values are dropped, so an
+        entity that was renamed no longer answers to its previous name.
+        """
+        expires = time.time() + self.ttl.get(kind, self.default_ttl)
+        current = set(values.values())
+        with self._lock:
+            for entry_key in [k for k, entry in self._entries.items()
+                              if k[0] == kind and entry[0] in current and k[1] not in values]:
+                del self._entries[entry_key]
+            for key, value in values.items():
+                self._entries[(kind, key)] = (value, expires)
+
+    def invalidate(self, kind: str = None, key: Any = None):
+        """Drop one entry, every entry of a kind, or everything"""
+        with self._lock:
+            if kind is None:
+                self._entries.clear()
+            elif key is None:
+                for entry_key in [k for k in self._entries if k[0] == kind]:
+                    del self._entries[entry_key]
+            else:
+                self._entries.pop((kind, key), None)
+
+    def invalidate_value(self, kind: str, value: Any):
+        """Drop every entry of a kind that resolves to value (e.g. all names of a deleted UUID)"""
+        with self._lock:
+            for entry_key in [k for k, entry in self._entries.items() if k[0] == kind and entry[0] == value]:
+                del self._entries[entry_key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self._hits, 'misses': self._misses}
@@ -0,0 +1,172 @@
+"""
+Golden Images
+Cache of completed Packer builds keyed by a hash of everything the build depends on
+"""
+
+import logging
+import json
+import time
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+
+def build_fingerprint(files: List[Path], directories: List[Path], values: Dict[str, Any]) -> str:
+    """SHA-256 over file contents, every file under the directories and the build values"""
+    sha256 = hashlib.sha256()
+    paths = [Path(f) for f in files]
+    for directory in directories:
+        paths.extend(sorted(p for p in Path(directory).rglob('*') if p.is_file()))
+    for path in paths:
+        sha256.update(str(path.name).encode())
+        sha256.update(path.read_bytes() if path.exists() else b'<missing>')
+    sha256.update(json.dumps(values, sort_keys=True).encode())
+    return sha256.hexdigest()
+
+
+class GoldenImageCache:
+    """Built base images stored once and cloned for later matching requests
+
+    Images live in ``<directory>/<key>/`` and are tracked in an index file with
+    their size and last use. When the cache holds more than ``max_images``
+    images or ``max_bytes`` bytes, least recently used images are evicted,
+    except those that still have linked clones depending on their disks.
+    """
+
+    def __init__(self, directory: Path, max_images: int = 5, max_bytes: int = 100 * 1024 ** 3):
+        """Initialize golden image cache
+
+        Args:
+            directory: Directory holding the images and the index
+            max_images: Maximum number of images kept
+            max_bytes: Maximum total size of the images
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.directory / 'index.json'
+        self.max_images = max_images
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._storing: set = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='golden-image')
+        self._images: Dict[str, Dict[str, Any]] = self._load()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """VMX path of the image for key, or None"""
+        with self._lock:
+            entry = self._images.get(key)
+            if entry and Path(entry['vmx_path']).exists():
+                entry['last_used'] = time.time()
+                entry['hits'] += 1
+                self.hits += 1
+                self._save()
+                return Path(entry['vmx_path'])
+            if entry:
+                del self._images[key]
+                self._save()
+            self.misses += 1
+        return None
+
+    def record_clone(self, key: str, clone_vmx: Path):
+        """Remember a linked clone so its image is never evicted under it"""
+        with self._lock:
+            entry = self._images.get(key)
+            if entry is not None:
+                entry['linked_clones'].append(str(clone_vmx))
+                self._save()
+
+    def store_async(self, key: str, builder: Callable[[Path], Optional[Path]], inputs: Dict[str, Any] = None):
+        """Build the image for key on a background thread unless it exists or is being built
+
+        Args:
+            key: Build fingerprint
+            builder: Callable creating the image in the given directory and returning its VMX path
+            inputs: Build values recorded with the image for inspection
+        """
+        with self._lock:
+            if key in self._images or key in self._storing:
+                return
+            self._storing.add(key)
+        self._executor.submit(self._store, key, builder, inputs or {})
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until queued images are stored (used by tests and scripts)"""
+        done = threading.Event()
+        self._executor.submit(done.set)
+        return done.wait(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            images = {key: dict(entry) for key, entry in self._images.items()}
+            return {
+                'images': images,
+                'count': len(images),
+                'total_bytes': sum(entry['size_bytes'] for entry in images.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'storing': len(self._storing)
+            }
+
+    def _store(self, key: str, builder: Callable[[Path], Optional[Path]], inputs: Dict[str, Any]):
+        image_dir = self.directory / key
+        try:
+            shutil.rmtree(image_dir, ignore_errors=True)
+            vmx_path = builder(image_dir)
+            if not vmx_path or not Path(vmx_path).exists():
+                shutil.rmtree(image_dir, ignore_errors=True)
+                return
+            size_bytes = sum(p.stat().st_size for p in image_dir.rglob('*') if p.is_file())
+            now = time.time()
+            with self._lock:
+                self._images[key] = {
+                    'vmx_path': str(vmx_path),
+                    'size_bytes': size_bytes,
+                    'created_at': now,
+                    'last_used': now,
+                    'hits': 0,
+                    'inputs': inputs,
+                    'linked_clones': []
+                }
+                evicted = self._evict()
+                self._save()
+            for evicted_key in evicted:
+                shutil.rmtree(self.directory / evicted_key, ignore_errors=True)
+                logger.info("Evicted golden image %s", evicted_key[:12])
+        except Exception as e:
+            logger.error("Failed to store golden image %s: %s", key[:12], e)
+            shutil.rmtree(image_dir, ignore_errors=True)
+        finally:
+            with self._lock:
+                self._storing.discard(key)
+
+    def _evict(self) -> List[str]:
+        """Drop least recently used images beyond the limits (caller holds the lock)"""
+        evicted = []
+        for key, entry in sorted(self._images.items(), key=lambda item: item[1]['last_used']):
+            total = sum(e['size_bytes'] for e in self._images.values())
+            if len(self._images) <= self.max_images and total <= self.max_bytes:
+                break
+            entry['linked_clones'] = [clone for clone in entry['linked_clones'] if Path(clone).exists()]
+            if entry['linked_clones']:
+                continue
+            del self._images[key]
+            evicted.append(key)
+        return evicted
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json.loads(self.index_file.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_file = self.index_file.with_suffix('.tmp')
+        tmp_file.write_text(json.dumps(self._images, indent=2))
+        tmp_file.replace(self.index_file)
@@ -0,0 +1,178 @@
+"""
+Guest Readiness
+Tracks VMware guests until VMware Tools run, probing all of them from a single loop
+"""
+
+import os
+import time
+import heapq
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .vmrun_executor import VmrunExecutor
+
+
+def poll_until(probe: Callable[[], Any], timeout: float, initial_interval: float = 0.25,
+               max_interval: float = 5.0, backoff: float = 1.5) -> Any:
+    """Call probe with a growing interval until it returns a truthy value or timeout passes
+
+    Returns:
+        The first truthy result, or the last result when the deadline passed
+    """
+    deadline = time.time() + timeout
+    interval = initial_interval
+    while True:
+        result = probe()
+        remaining = deadline - time.time()
+        if result or remaining <= 0:
+            return result
+        time.sleep(min(interval, remaining))
+        interval = min(interval * backoff, max_interval)
+
+
+@dataclass
+class WatchedGuest:
+    """A guest waiting for VMware Tools and its probing schedule"""
+    key: str
+    vmx_path: str
+    deadline: float
+    future: Future
+    interval: float
+    next_probe: float
+    probing: bool = False
+
+
+class GuestReadinessWatcher:
+    """Probes `vmrun checkToolsState` for every waiting guest from one loop
+
+    Each guest is probed at sub-second intervals first and then with a
+    growing interval, up to a single deadline per guest. Probes of different
+    guests run in parallel on the vmrun executor. Callers get a Future that
+    resolves to True the moment VMware Tools report running.
+    """
+
+    def __init__(self, vmrun: VmrunExecutor, initial_interval: float = 0.25,
+                 max_interval: float = 5.0, backoff: float = 1.5, probe_timeout: float = 30.0):
+        """Initialize guest readiness watcher
+
+        Args:
+            vmrun: Executor the probes are queued on
+            initial_interval: Seconds before the first probe of a guest
+            max_interval: Upper bound of the probing interval
+            backoff: Factor applied to the interval after each probe
+            probe_timeout: Upper bound for a single checkToolsState call
+        """
+        self.vmrun = vmrun
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.probe_timeout = probe_timeout
+        self._guests: Dict[str, WatchedGuest] = {}
+        self._schedule: List[tuple] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, vmx_path, timeout: float = 300) -> Future:
+        """Start waiting for VMware Tools in a guest
+
+        Returns:
+            Future resolving to True once Tools run, or False at the deadline
+        """
+        key = os.path.normcase(os.path.abspath(str(vmx_path)))
+        now = time.time()
+        with self._lock:
+            guest = self._guests.get(key)
+            if guest is None:
+                guest = WatchedGuest(key=key, vmx_path=str(vmx_path), deadline=now + timeout, future=Future(),
+                                     interval=self.initial_interval, next_probe=now)
+                self._guests[key] = guest
+                heapq.heappush(self._schedule, (guest.next_probe, key))
+            else:
+                guest.deadline = max(guest.deadline, now + timeout)
+            self._ensure_running()
+        self._wakeup.set()
+        return guest.future
+
+    def wait(self, vmx_path, timeout: float = 300) -> bool:
+        """Block until VMware Tools run in a guest or timeout passes"""
+        return self.watch(vmx_path, timeout).result()
+
+    def wait_all(self, vmx_paths: Iterable, timeout: float = 300) -> Dict[str, bool]:
+        """Wait for several guests in parallel; returns readiness per VMX path"""
+        futures = {str(vmx_path): self.watch(vmx_path, timeout) for vmx_path in vmx_paths}
+        return {vmx_path: future.result() for vmx_path, future in futures.items()}
+
+    def pending(self) -> int:
+        """Number of guests being waited for"""
+        with self._lock:
+            return len(self._guests)
+
+    def stop(self):
+        """Stop probing; waiting guests are reported as not ready"""
+        self._stopped.set()
+        self._wakeup.set()
+        with self._lock:
+            guests = list(self._guests.values())
+        for guest in guests:
+            self._complete(guest, False)
+
+    def _ensure_running(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='guest-readiness', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            now = time.time()
+            due = []
+            with self._lock:
+                if not self._guests:
+                    # Idle: exit and let the next watch() start a new loop
+                    self._thread = None
+                    return
+                while self._schedule and self._schedule[0][0] <= now:
+                    _, key = heapq.heappop(self._schedule)
+                    guest = self._guests.get(key)
+                    if guest is not None and not guest.probing:
+                        guest.probing = True
+                        due.append(guest)
+                delay = self._schedule[0][0] - now if self._schedule else self.max_interval
+
+            for guest in due:
+                timeout = max(1.0, min(self.probe_timeout, guest.deadline - now))
+                probe = self.vmrun.submit('checkToolsState', guest.vmx_path, timeout=timeout)
+                probe.add_done_callback(lambda future, guest=guest: self._on_probe(guest, future))
+
+            if not due:
+                self._wakeup.wait(max(0.0, delay))
+                self._wakeup.clear()
+
+    def _on_probe(self, guest: WatchedGuest, probe: Future):
+        try:
+            result = probe.result()
+            ready = result.returncode == 0 and 'running' in result.stdout.lower()
+        except Exception:
+            ready = False  # Timed out or vmrun unavailable: keep probing until the deadline
+
+        now = time.time()
+        if ready or now >= guest.deadline:
+            self._complete(guest, ready)
+            return
+        guest.interval = min(guest.interval * self.backoff, self.max_interval)
+        guest.next_probe = min(now + guest.interval, guest.deadline)
+        with self._lock:
+            guest.probing = False
+            heapq.heappush(self._schedule, (guest.next_probe, guest.key))
+        self._wakeup.set()
+
+    def _complete(self, guest: WatchedGuest, ready: bool):
+        with self._lock:
+            if self._guests.pop(guest.key, None) is None:
+                return
+        guest.future.set_result(ready)
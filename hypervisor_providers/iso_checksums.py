@@ -0,0 +1,135 @@
+"""
+ISO Checksums
+Persistent SHA-256 cache for installation ISOs, filled by background hashing
+"""
+
+import logging
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+
+class ISOChecksumCache:
+    """SHA-256 of ISO files keyed by (path, size, mtime, inode)
+
+    Lookups never hash: a file whose stat does not match a stored entry is
+    queued for hashing on a background thread and reported as unknown until
+    the hash is stored. Entries are persisted in a JSON file so each ISO is
+    read once, not once per build.
+    """
+
+    def __init__(self, state_file: Path, hash_workers: int = 1):
+        """Initialize ISO checksum cache
+
+        Args:
+            state_file: JSON file persisting the checksums
+            hash_workers: Number of ISOs hashed concurrently
+        """
+        self.state_file = Path(state_file)
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=hash_workers, thread_name_prefix='iso-checksum')
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stopped = threading.Event()
+
+    def get(self, iso_path: str) -> Optional[str]:
+        """Return "sha256:<hex>" for a cached ISO, or None while it is being hashed"""
+        try:
+            signature = self._signature(iso_path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(str(iso_path))
+        if entry and entry['signature'] == signature:
+            return entry['checksum']
+        self.prefetch(iso_path)
+        return None
+
+    def prefetch(self, iso_path: str):
+        """Hash an ISO in the background unless it is cached or already queued"""
+        key = str(iso_path)
+        try:
+            signature = self._signature(iso_path)
+        except OSError:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry and entry['signature'] == signature) or key in self._pending:
+                return
+            self._pending.add(key)
+        self._executor.submit(self._hash, key)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until queued hashes are stored (used by tests and scripts)"""
+        done = threading.Event()
+        self._executor.submit(done.set)
+        return done.wait(timeout)
+
+    def start_watcher(self, directories: List[Path], interval: float = 60.0):
+        """Hash ISOs that appear or change in the given directories"""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._watcher_stopped.clear()
+
+        def watch():
+            while True:
+                for directory in directories:
+                    try:
+                        iso_files = list(Path(directory).glob('*.iso'))
+                    except OSError:
+                        continue
+                    for iso_file in iso_files:
+                        self.prefetch(str(iso_file))
+                if self._watcher_stopped.wait(interval):
+                    return
+
+        self._watcher = threading.Thread(target=watch, name='iso-checksum-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._watcher_stopped.set()
+        self._watcher = None
+
+    def _hash(self, key: str):
+        try:
+            signature = self._signature(key)
+            logger.info("Computing SHA256 for ISO in the background: %s", key)
+            sha256 = hashlib.sha256()
+            with open(key, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    sha256.update(chunk)
+
+            # A file replaced while it was read is hashed again on the next lookup
+            if self._signature(key) != signature:
+                return
+            with self._lock:
+                self._entries[key] = {'signature': signature, 'checksum': f"sha256:{sha256.hexdigest()}"}
+                self._save()
+        except Exception as e:
+            logger.error("Failed to compute ISO checksum for %s: %s", key, e)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    @staticmethod
+    def _signature(iso_path: str) -> List[int]:
+        stat = os.stat(iso_path)
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json.loads(self.state_file.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_file = self.state_file.with_suffix('.tmp')
+        tmp_file.write_text(json.dumps(self._entries, indent=2))
+        tmp_file.replace(self.state_file)
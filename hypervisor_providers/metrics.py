@@ -0,0 +1,263 @@
+"""
+Metrics
+Counters and latency histograms rendered in the Prometheus text exposition format
+"""
+
+import re
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; spans API requests (milliseconds) up to Packer builds (an hour)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# A collector returns (labels, value) samples read at scrape time
+Samples = Iterable[Tuple[Dict[str, str], float]]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values):
+        """Child metric for one combination of label values (cached, so hot paths pay a dict lookup)"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child) -> List[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonic count, e.g. errors per provider operation"""
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _render_child(self, key, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(_Metric):
+    """Distribution of durations in cumulative buckets"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _render_child(self, key, child) -> List[str]:
+        with child._lock:
+            counts, total = list(child.counts), child.sum
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class GaugeCollector:
+    """Gauge whose samples are read from a callback at scrape time
+
+    Queue depths, cache hit ratios and pool utilization already live in the
+    components that own them; reading them only when /metrics is scraped keeps
+    them off the request path entirely.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, collect: Callable[[], Samples]):
+        self.name = name
+        self.documentation = documentation
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            samples = list(self.collect() or [])
+        except Exception as e:
+            return lines + [f"# collection failed: {_escape(e)}"]
+        for labels, value in samples:
+            if value is None:
+                continue
+            lines.append(f"{self.name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics, rendered together for a /metrics scrape"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        """Add a metric, replacing a collector of the same name (collectors are re-bound on rebuilds)"""
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None and not isinstance(existing, GaugeCollector):
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, collect: Callable[[], Samples]) -> GaugeCollector:
+        return self.register(GaugeCollector(name, documentation, collect))
+
+    def get(self, name: str) -> Optional[object]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Flask request latency by route, method and status',
+    ('route', 'method', 'status'),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+
+PROVIDER_OPERATION_DURATION = REGISTRY.histogram(
+    'provider_operation_duration_seconds', 'Provider operation latency by outcome',
+    ('provider', 'operation', 'outcome'))
+
+PROVIDER_OPERATION_ERRORS = REGISTRY.counter(
+    'provider_operation_errors_total', 'Provider operations that failed, raised or timed out',
+    ('provider', 'operation'))
+
+SUBPROCESS_DURATION = REGISTRY.histogram(
+    'subprocess_duration_seconds', 'External command (vmrun, Packer) run time', ('command',))
+
+SUBPROCESS_EXITS = REGISTRY.counter(
+    'subprocess_exits_total', 'External command completions by exit code (timeout when killed)',
+    ('command', 'exit_code'))
+
+NUTANIX_API_DURATION = REGISTRY.histogram(
+    'nutanix_api_request_duration_seconds', 'Prism Central API latency by endpoint and status',
+    ('method', 'endpoint', 'status'),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60))
+
+_UUID = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+
+
+def record_operation(provider: str, operation: str, duration: float, outcome: str):
+    """Record one provider operation ('ok', 'failed', 'error' or 'timeout')"""
+    PROVIDER_OPERATION_DURATION.labels(provider, operation, outcome).observe(duration)
+    if outcome != 'ok':
+        PROVIDER_OPERATION_ERRORS.labels(provider, operation).inc()
+
+
+def record_subprocess(command: str, duration: float, exit_code):
+    """Record one external command; exit_code is None when it was killed on timeout"""
+    SUBPROCESS_DURATION.labels(command).observe(duration)
+    SUBPROCESS_EXITS.labels(command, 'timeout' if exit_code is None else exit_code).inc()
+
+
+def record_api_response(response, *args, **kwargs):
+    """requests response hook timing Prism Central calls (UUIDs collapsed to keep label values few)"""
+    path = response.request.path_url.split('?', 1)[0]
+    endpoint = _UUID.sub('{uuid}', path.split('/api/nutanix/v3', 1)[-1])
+    NUTANIX_API_DURATION.labels(response.request.method, endpoint, response.status_code).observe(
+        response.elapsed.total_seconds())
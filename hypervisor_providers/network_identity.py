@@ -0,0 +1,142 @@
+"""
+Network Identity
+Static network settings handed to a VMware guest before its first boot
+"""
+
+import json
+import uuid
+import base64
+import shutil
+import tempfile
+import ipaddress
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+# guest: configure over VMware Tools after boot; guestinfo: VMX keys read by
+# cloud-init/cloudbase-init; seed: attached cloud-init NoCloud ISO
+IP_CONFIG_MODES = ('guest', 'guestinfo', 'seed')
+
+# ISO authoring tools tried in order, with the arguments producing a "cidata" volume
+ISO_TOOLS = [
+    ('xorriso', ['-as', 'genisoimage', '-output', '{output}', '-volid', 'cidata', '-joliet', '-rock', '{source}']),
+    ('genisoimage', ['-output', '{output}', '-volid', 'cidata', '-joliet', '-rock', '{source}']),
+    ('mkisofs', ['-output', '{output}', '-volid', 'cidata', '-joliet', '-rock', '{source}']),
+    ('oscdimg', ['-lcidata', '-j1', '{source}', '{output}']),
+]
+
+SEED_CDROM = 'ide1:0'
+
+
+def network_config(ip_address: str, netmask: str = "255.255.255.0", gateway: str = None,
+                   dns: str = None) -> Dict[str, Any]:
+    """Netplan v2 network config giving the first Ethernet interface a static address"""
+    prefix = ipaddress.IPv4Network(f"0.0.0.0/{netmask}").prefixlen
+    interface: Dict[str, Any] = {
+        'match': {'name': 'e*'},
+        'dhcp4': False,
+        'addresses': [f"{ip_address}/{prefix}"]
+    }
+    if gateway:
+        interface['routes'] = [{'to': 'default', 'via': gateway}]
+    interface['nameservers'] = {'addresses': [dns or gateway or '8.8.8.8', '8.8.4.4']}
+    return {'version': 2, 'ethernets': {'primary': interface}}
+
+
+def instance_metadata(vm_name: str, net_config: Dict[str, Any]) -> Dict[str, Any]:
+    """cloud-init metadata with a fresh instance id, so a cloned guest applies it again"""
+    return {
+        'instance-id': f"{vm_name}-{uuid.uuid4().hex[:12]}",
+        'local-hostname': vm_name,
+        'network': net_config
+    }
+
+
+def guestinfo_settings(vm_name: str, ip_address: str, netmask: str = "255.255.255.0",
+                       gateway: str = None, dns: str = None) -> Dict[str, str]:
+    """VMX keys carrying the network identity in guestinfo
+
+    guestinfo.metadata is read by the cloud-init VMware datasource and by
+    cloudbase-init; the plain guestinfo.ip.* keys are for guest scripts using
+    `vmtoolsd --cmd "info-get ..."`.
+    """
+    metadata = instance_metadata(vm_name, network_config(ip_address, netmask, gateway, dns))
+    return {
+        'guestinfo.metadata': base64.b64encode(json.dumps(metadata).encode()).decode(),
+        'guestinfo.metadata.encoding': 'base64',
+        'guestinfo.ip.address': ip_address,
+        'guestinfo.ip.netmask': netmask,
+        'guestinfo.ip.gateway': gateway or '',
+        'guestinfo.ip.dns': dns or ''
+    }
+
+
+def build_seed_iso(output: Path, vm_name: str, net_config: Dict[str, Any],
+                   user_data_file: Path = None, meta_data_file: Path = None) -> Optional[Path]:
+    """Write a cloud-init NoCloud seed ISO (volume label "cidata")
+
+    meta-data starts from meta_data_file and gets a fresh instance id and the
+    hostname; user-data is user_data_file when it is plain cloud-config (an
+    installer autoinstall file is not applied to an installed clone).
+
+    Returns:
+        The ISO path, or None when no ISO authoring tool is available
+    """
+    tool = next(((name, args) for name, args in ISO_TOOLS if shutil.which(name)), None)
+    if tool is None:
+        return None
+
+    metadata = instance_metadata(vm_name, net_config)
+    meta_lines = []
+    if meta_data_file and Path(meta_data_file).exists():
+        meta_lines = [line for line in Path(meta_data_file).read_text().splitlines()
+                      if line.strip() and not line.lstrip().startswith('#')
+                      and line.split(':', 1)[0].strip() not in ('instance-id', 'local-hostname')]
+    meta_lines += [f"instance-id: {metadata['instance-id']}", f"local-hostname: {vm_name}"]
+
+    user_data = f"#cloud-config\nhostname: {vm_name}\n"
+    if user_data_file and Path(user_data_file).exists():
+        content = Path(user_data_file).read_text()
+        if content.startswith('#cloud-config') and 'autoinstall:' not in content:
+            user_data = content
+
+    with tempfile.TemporaryDirectory() as source:
+        source_dir = Path(source)
+        (source_dir / 'meta-data').write_text('\n'.join(meta_lines) + '\n')
+        (source_dir / 'user-data').write_text(user_data)
+        # JSON is valid YAML, so no YAML library is needed
+        (source_dir / 'network-config').write_text(json.dumps(net_config, indent=2) + '\n')
+
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        name, args = tool
+        command = [name] + [arg.format(output=output, source=source_dir) for arg in args]
+        result = subprocess.run(command, capture_output=True, text=True, timeout=60)
+        if result.returncode != 0 or not output.exists():
+            raise RuntimeError(f"{name} failed: {result.stderr or result.stdout}")
+    return output
+
+
+def seed_cdrom_settings(iso_path: Path) -> Dict[str, str]:
+    """VMX keys connecting a seed ISO as a CD-ROM at power-on"""
+    return {
+        f'{SEED_CDROM}.present': 'TRUE',
+        f'{SEED_CDROM}.deviceType': 'cdrom-image',
+        f'{SEED_CDROM}.fileName': str(iso_path),
+        f'{SEED_CDROM}.startConnected': 'TRUE'
+    }
+
+
+def apply_vmx_settings(lines: List[str], settings: Dict[str, str]) -> List[str]:
+    """Set VMX keys (case-insensitively), replacing existing values and appending new keys"""
+    pending = {key.lower(): (key, value) for key, value in settings.items()}
+    updated = []
+    for line in lines:
+        key = line.split('=', 1)[0].strip().lower() if '=' in line else None
+        if key in pending:
+            original_key, value = pending.pop(key)
+            updated.append(f'{original_key} = "{value}"')
+        else:
+            updated.append(line)
+    updated.extend(f'{key} = "{value}"' for key, value in pending.values())
+    return updated
@@ -3,13 +3,24 @@ Nutanix Hypervisor Provider
 Handles Nutanix AHV operations using REST APIs
 """
 
+import logging
 import requests
 import json
+import copy
 import base64
 import time
-from typing import Dict, List, Optional, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, List, Optional, Any, Iterator
 from urllib3.exceptions import InsecureRequestWarning
 from .base_provider import BaseHypervisorProvider, VMConfig, VMInfo
+from .progress import report_progress, report_checkpoint
+from .entity_cache import EntityCache
+from .task_watcher import TaskWatcher
+from .metrics import record_api_response
+
+logger = logging.getLogger(__name__)
 
 # Disable SSL warnings for self-signed certificates
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
@@ -26,12 +37,26 @@ class NutanixProvider(BaseHypervisorProvider):
         self.port = config.get('port', 9440)
         self.verify_ssl = config.get('verify_ssl', False)
         
+        # vms/list pagination (Prism Central returns at most 500 entities per page)
+        self.list_page_size = min(int(config.get('list_page_size', 500)), 500)
+        self.list_page_workers = max(1, int(config.get('list_page_workers', 4)))
+        
         # API endpoints - Support HTTP pour mock server
         use_ssl = config.get('use_ssl', True)
         protocol = "https" if use_ssl else "http"
         self.pc_base_url = f"{protocol}://{self.prism_central_ip}:{self.port}/api/nutanix/v3"
         self.pe_base_url = f"{protocol}://{self.prism_element_ip}:{self.port}/PrismGateway/services/rest/v2.0" if self.prism_element_ip else None
         
+        # Name -> UUID resolution cache shared by every operation
+        resolve_config = config.get('resolve_cache', {})
+        self.entity_cache = EntityCache(
+            ttl={
+                'vm': 300, 'vm_entity': 60, 'cluster': 3600, 'subnet': 3600,
+                'image': 600, 'snapshot': 300, **resolve_config.get('ttl', {})
+            },
+            negative_ttl=resolve_config.get('negative_ttl', 30)
+        )
+        
         # Session
         self.session = requests.Session()
         self.session.verify = self.verify_ssl
@@ -45,6 +70,10 @@ class NutanixProvider(BaseHypervisorProvider):
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         })
+        self.session.hooks['response'].append(record_api_response)
+        
+        # One polling loop for every outstanding task of this provider
+        self.task_watcher = TaskWatcher(self.session, self.pc_base_url)
     
     def connect(self) -> bool:
         """Connect to Nutanix cluster"""
@@ -54,25 +83,35 @@ class NutanixProvider(BaseHypervisorProvider):
                                        json={"kind": "cluster"}, timeout=30)
             
             if response.status_code == 200:
-                print("Successfully connected to Nutanix Prism Central")
+                logger.info("Successfully connected to Nutanix Prism Central")
                 return True
             else:
-                print(f"Failed to connect to Nutanix: {response.status_code} - {response.text}")
+                logger.error("Failed to connect to Nutanix: %s - %s", response.status_code, response.text)
                 return False
                 
         except Exception as e:
-            print(f"Error connecting to Nutanix: {e}")
+            logger.error("Error connecting to Nutanix: %s", e)
             return False
     
+    def health_check(self) -> bool:
+        """Probe Prism Central while keeping the session's connection pool"""
+        response = self.session.post(f"{self.pc_base_url}/clusters/list", 
+                                   json={"kind": "cluster", "length": 1}, timeout=10)
+        return response.status_code == 200
+    
     def disconnect(self) -> bool:
         """Disconnect from Nutanix"""
         try:
             self.session.close()
             return True
         except Exception as e:
-            print(f"Error disconnecting from Nutanix: {e}")
+            logger.error("Error disconnecting from Nutanix: %s", e)
             return False
     
+    def shutdown(self):
+        """Stop the task polling loop"""
+        self.task_watcher.stop()
+    
     def create_vm(self, vm_config: VMConfig) -> Dict[str, Any]:
         """Create a new VM on Nutanix with fast template cloning and persistent data"""
         try:
@@ -98,7 +137,7 @@ class NutanixProvider(BaseHypervisorProvider):
             if vm_config.template:
                 template_uuid = self._get_template_uuid(vm_config.template)
                 if template_uuid:
-                    print(f"Creating VM '{vm_config.name}' from template '{vm_config.template}' (fast mode)...")
+                    logger.info("Creating VM '%s' from template '%s' (fast mode)...", vm_config.name, vm_config.template)
                     return self._fast_clone_from_template(template_uuid, vm_config, cluster_uuid, network_uuid)
             
             # Prepare VM specification with persistent data optimization
@@ -169,16 +208,19 @@ class NutanixProvider(BaseHypervisorProvider):
             }
             
             # Create VM with optimized settings
-            print(f"Creating VM '{vm_config.name}' on Nutanix with persistent data...")
+            logger.info("Creating VM '%s' on Nutanix with persistent data...", vm_config.name)
             response = self.session.post(f"{self.pc_base_url}/vms", 
                                        json=vm_spec, timeout=120)  # Reduced timeout for faster response
             
             if response.status_code == 202:
                 task_uuid = response.json().get('status', {}).get('execution_context', {}).get('task_uuid')
+                report_checkpoint('task_submitted', task_uuid=task_uuid)
+                report_progress('wait_task', f"Waiting for Nutanix task {task_uuid}")
                 
                 # Wait for task completion with shorter timeout for faster creation
                 if task_uuid:
                     success = self._wait_for_task(task_uuid, timeout=120)  # 2 minutes max
+                    self.entity_cache.invalidate('vm', vm_config.name)
                     if success:
                         # Post-creation optimization for persistent data
                         self._optimize_vm_for_persistence(vm_config.name)
@@ -235,15 +277,18 @@ class NutanixProvider(BaseHypervisorProvider):
                 "api_version": "3.1.0"
             }
             
-            print(f"Cloning VM '{source_vm}' to '{vm_config.name}' on Nutanix...")
+            logger.info("Cloning VM '%s' to '%s' on Nutanix...", source_vm, vm_config.name)
             response = self.session.post(f"{self.pc_base_url}/vms/{source_vm_uuid}/clone", 
                                        json=clone_spec, timeout=120)
             
             if response.status_code == 202:
                 task_uuid = response.json().get('status', {}).get('execution_context', {}).get('task_uuid')
+                report_checkpoint('task_submitted', task_uuid=task_uuid)
+                report_progress('wait_task', f"Waiting for Nutanix task {task_uuid}")
                 
                 if task_uuid:
                     success = self._wait_for_task(task_uuid)
+                    self.entity_cache.invalidate('vm', vm_config.name)
                     if success:
                         result = {
                             'success': True,
@@ -255,13 +300,13 @@ class NutanixProvider(BaseHypervisorProvider):
                         
                         # Configure IP address if provided
                         if vm_config.ip_address:
-                            print(f"Configuring IP address {vm_config.ip_address} for VM...")
+                            logger.info("Configuring IP address %s for VM...", vm_config.ip_address)
                             ip_result = self._assign_ip_address(vm_config.name, vm_config.ip_address)
                             if ip_result['success']:
-                                print(f"✅ {ip_result['message']}")
+                                logger.info("%s", ip_result['message'])
                                 result['ip_configured'] = True
                             else:
-                                print(f"⚠️ IP assignment failed: {ip_result['error']}")
+                                logger.warning("IP assignment failed: %s", ip_result['error'])
                                 result['ip_configured'] = False
                                 result['ip_error'] = ip_result['error']
                         
@@ -290,8 +335,11 @@ class NutanixProvider(BaseHypervisorProvider):
             if not vm_uuid:
                 return False
             
-            # Stop VM first if running
-            self.stop_vm(vm_name)
+            # Stop VM first if running (the UUID is already resolved)
+            try:
+                self._set_power_state(vm_uuid, "OFF")
+            except Exception as e:
+                logger.error("Error stopping VM '%s' before deletion: %s", vm_name, e)
             
             # Delete VM
             response = self.session.delete(f"{self.pc_base_url}/vms/{vm_uuid}", timeout=120)
@@ -299,12 +347,16 @@ class NutanixProvider(BaseHypervisorProvider):
             if response.status_code == 202:
                 task_uuid = response.json().get('status', {}).get('execution_context', {}).get('task_uuid')
                 if task_uuid:
-                    return self._wait_for_task(task_uuid)
+                    success = self._wait_for_task(task_uuid)
+                    self._forget_vm(vm_uuid)
+                    return success
             
+            if response.status_code in (200, 404):
+                self._forget_vm(vm_uuid)
             return response.status_code == 200
             
         except Exception as e:
-            print(f"Error deleting VM '{vm_name}': {e}")
+            logger.error("Error deleting VM '%s': %s", vm_name, e)
             return False
     
     def start_vm(self, vm_name: str) -> bool:
@@ -328,8 +380,13 @@ class NutanixProvider(BaseHypervisorProvider):
             
             response = self.session.get(f"{self.pc_base_url}/vms/{vm_uuid}", timeout=30)
             
+            if response.status_code == 404:
+                self._forget_vm(vm_uuid)
+                return None
+            
             if response.status_code == 200:
                 vm_data = response.json()
+                self.entity_cache.put('vm_entity', vm_uuid, vm_data)
                 spec = vm_data.get('spec', {})
                 resources = spec.get('resources', {})
                 status = vm_data.get('status', {})
@@ -355,112 +412,143 @@ class NutanixProvider(BaseHypervisorProvider):
             return None
             
         except Exception as e:
-            print(f"Error getting VM info for '{vm_name}': {e}")
+            logger.error("Error getting VM info for '%s': %s", vm_name, e)
             return None
     
-    def list_vms(self) -> List[VMInfo]:
-        """List all VMs"""
+    def list_vms(self, strict: bool = False) -> List[VMInfo]:
+        """List all VMs (an empty list when Prism Central fails, unless strict)"""
         try:
-            vms = []
-            
-            # Get all VMs
-            list_spec = {
-                "kind": "vm",
-                "length": 500
-            }
-            
-            response = self.session.post(f"{self.pc_base_url}/vms/list", 
-                                       json=list_spec, timeout=60)
-            
-            if response.status_code == 200:
-                vm_list = response.json().get('entities', [])
-                
-                for vm_data in vm_list:
-                    spec = vm_data.get('spec', {})
-                    resources = spec.get('resources', {})
-                    status = vm_data.get('status', {})
-                    
-                    # Get IP address
-                    ip_address = None
-                    nic_list = status.get('resources', {}).get('nic_list', [])
-                    if nic_list and nic_list[0].get('ip_endpoint_list'):
-                        ip_address = nic_list[0]['ip_endpoint_list'][0].get('ip')
-                    
-                    vm_info = VMInfo(
-                        name=spec.get('name', 'Unknown'),
-                        uuid=vm_data.get('metadata', {}).get('uuid', ''),
-                        state=resources.get('power_state', 'UNKNOWN').lower(),
-                        cpu=resources.get('num_vcpus_per_socket', 0) * resources.get('num_sockets', 1),
-                        ram=resources.get('memory_size_mib', 0),
-                        disk=sum(disk.get('disk_size_mib', 0) for disk in resources.get('disk_list', [])) // 1024,
-                        ip_address=ip_address,
-                        hypervisor="nutanix",
-                        cluster=spec.get('cluster_reference', {}).get('name')
-                    )
-                    vms.append(vm_info)
-            
-            return vms
+            return list(self.iter_vms())
             
         except Exception as e:
-            print(f"Error listing VMs: {e}")
+            if strict:
+                raise
+            logger.error("Error listing VMs: %s", e)
             return []
     
-    def get_templates(self) -> List[str]:
+    def iter_vms(self) -> Iterator[VMInfo]:
+        """Yield every VM page by page
+        
+        The first page reports total_matches; the remaining pages are then
+        fetched concurrently, at most list_page_workers pages ahead of the
+        consumer, so memory is bounded by the page size rather than the fleet.
+        
+        Raises:
+            RuntimeError: If a page cannot be fetched
+        """
+        first_page = self._list_vms_page(0)
+        first_entities = first_page.get('entities', [])
+        total = first_page.get('metadata', {}).get('total_matches', len(first_entities))
+        yield from self._vm_infos_from_page(first_entities)
+        
+        # Servers that ignore offset/length return everything in the first page
+        if len(first_entities) >= total or len(first_entities) < self.list_page_size:
+            return
+        
+        offsets = iter(range(self.list_page_size, total, self.list_page_size))
+        with ThreadPoolExecutor(max_workers=self.list_page_workers,
+                                thread_name_prefix='nutanix-pages') as pool:
+            pending = deque(pool.submit(self._list_vms_page, offset)
+                            for offset in islice(offsets, self.list_page_workers))
+            while pending:
+                page = pending.popleft().result()
+                next_offset = next(offsets, None)
+                if next_offset is not None:
+                    pending.append(pool.submit(self._list_vms_page, next_offset))
+                yield from self._vm_infos_from_page(page.get('entities', []))
+    
+    def _list_vms_page(self, offset: int) -> Dict[str, Any]:
+        """Fetch one vms/list page"""
+        list_spec = {
+            "kind": "vm",
+            "offset": offset,
+            "length": self.list_page_size
+        }
+        
+        response = self.session.post(f"{self.pc_base_url}/vms/list", 
+                                   json=list_spec, timeout=60)
+        
+        if response.status_code != 200:
+            raise RuntimeError(f"vms/list (offset {offset}) returned {response.status_code}")
+        return response.json()
+    
+    def _vm_infos_from_page(self, vm_list: List[Dict[str, Any]]) -> Iterator[VMInfo]:
+        """Build VMInfo objects from a page of VM entities"""
+        # Every listed VM is a free name -> UUID resolution (renamed VMs drop their old name)
+        self.entity_cache.put_many('vm', {
+            vm_data.get('spec', {}).get('name'): vm_data.get('metadata', {}).get('uuid')
+            for vm_data in vm_list
+            if vm_data.get('spec', {}).get('name') and vm_data.get('metadata', {}).get('uuid')
+        })
+        
+        for vm_data in vm_list:
+            spec = vm_data.get('spec', {})
+            resources = spec.get('resources', {})
+            status = vm_data.get('status', {})
+            
+            # Get IP address
+            ip_address = None
+            nic_list = status.get('resources', {}).get('nic_list', [])
+            if nic_list and nic_list[0].get('ip_endpoint_list'):
+                ip_address = nic_list[0]['ip_endpoint_list'][0].get('ip')
+            
+            yield VMInfo(
+                name=spec.get('name', 'Unknown'),
+                uuid=vm_data.get('metadata', {}).get('uuid', ''),
+                state=resources.get('power_state', 'UNKNOWN').lower(),
+                cpu=resources.get('num_vcpus_per_socket', 0) * resources.get('num_sockets', 1),
+                ram=resources.get('memory_size_mib', 0),
+                disk=sum(disk.get('disk_size_mib', 0) for disk in resources.get('disk_list', [])) // 1024,
+                ip_address=ip_address,
+                hypervisor="nutanix",
+                cluster=spec.get('cluster_reference', {}).get('name')
+            )
+    
+    def get_templates(self, strict: bool = False) -> List[str]:
         """Get available VM templates - Only return the original 2 VMs"""
         return ["Windows Server 2019", "Ubuntu 64-bit (3)"]
     
-    def get_clusters(self) -> List[str]:
-        """Get available clusters"""
+    def get_clusters(self, strict: bool = False) -> List[str]:
+        """Get available clusters (an empty list when Prism Central fails, unless strict)"""
         try:
-            clusters = []
-            
-            list_spec = {
-                "kind": "cluster",
-                "length": 100
-            }
-            
-            response = self.session.post(f"{self.pc_base_url}/clusters/list", 
-                                       json=list_spec, timeout=30)
-            
-            if response.status_code == 200:
-                cluster_list = response.json().get('entities', [])
-                
-                for cluster in cluster_list:
-                    spec = cluster.get('spec', {})
-                    clusters.append(spec.get('name', 'Unknown'))
-            
-            return clusters
+            return self._list_entity_names('clusters', 'cluster')
             
         except Exception as e:
-            print(f"Error getting clusters: {e}")
+            if strict:
+                raise
+            logger.error("Error getting clusters: %s", e)
             return []
     
-    def get_networks(self) -> List[str]:
-        """Get available networks"""
+    def get_networks(self, strict: bool = False) -> List[str]:
+        """Get available networks (an empty list when Prism Central fails, unless strict)"""
         try:
-            networks = []
-            
-            list_spec = {
-                "kind": "subnet",
-                "length": 100
-            }
-            
-            response = self.session.post(f"{self.pc_base_url}/subnets/list", 
-                                       json=list_spec, timeout=30)
-            
-            if response.status_code == 200:
-                subnet_list = response.json().get('entities', [])
-                
-                for subnet in subnet_list:
-                    spec = subnet.get('spec', {})
-                    networks.append(spec.get('name', 'Unknown'))
-            
-            return networks
+            return self._list_entity_names('subnets', 'subnet')
             
         except Exception as e:
-            print(f"Error getting networks: {e}")
+            if strict:
+                raise
+            logger.error("Error getting networks: %s", e)
             return []
     
+    def _list_entity_names(self, endpoint: str, kind: str) -> List[str]:
+        """Names of the entities of one kind, e.g. clusters/list
+        
+        Raises:
+            RuntimeError: If Prism Central does not answer 200
+        """
+        list_spec = {
+            "kind": kind,
+            "length": 100
+        }
+        
+        response = self.session.post(f"{self.pc_base_url}/{endpoint}/list", 
+                                   json=list_spec, timeout=30)
+        if response.status_code != 200:
+            raise RuntimeError(f"{endpoint}/list returned HTTP {response.status_code}")
+        
+        return [entity.get('spec', {}).get('name', 'Unknown')
+                for entity in response.json().get('entities', [])]
+    
     def create_snapshot(self, vm_name: str, snapshot_name: str) -> bool:
         """Create a VM snapshot"""
         try:
@@ -481,6 +569,7 @@ class NutanixProvider(BaseHypervisorProvider):
             
             response = self.session.post(f"{self.pc_base_url}/vms/{vm_uuid}/snapshots", 
                                        json=snapshot_spec, timeout=120)
+            self.entity_cache.invalidate('snapshot', (vm_uuid, snapshot_name))
             
             if response.status_code == 202:
                 task_uuid = response.json().get('status', {}).get('execution_context', {}).get('task_uuid')
@@ -490,7 +579,7 @@ class NutanixProvider(BaseHypervisorProvider):
             return False
             
         except Exception as e:
-            print(f"Error creating snapshot for VM '{vm_name}': {e}")
+            logger.error("Error creating snapshot for VM '%s': %s", vm_name, e)
             return False
     
     def restore_snapshot(self, vm_name: str, snapshot_name: str) -> bool:
@@ -520,7 +609,7 @@ class NutanixProvider(BaseHypervisorProvider):
             return False
             
         except Exception as e:
-            print(f"Error restoring snapshot for VM '{vm_name}': {e}")
+            logger.error("Error restoring snapshot for VM '%s': %s", vm_name, e)
             return False
     
     def delete_snapshot(self, vm_name: str, snapshot_name: str) -> bool:
@@ -537,6 +626,7 @@ class NutanixProvider(BaseHypervisorProvider):
             
             response = self.session.delete(f"{self.pc_base_url}/vms/{vm_uuid}/snapshots/{snapshot_uuid}", 
                                          timeout=300)
+            self.entity_cache.invalidate('snapshot', (vm_uuid, snapshot_name))
             
             if response.status_code == 202:
                 task_uuid = response.json().get('status', {}).get('execution_context', {}).get('task_uuid')
@@ -546,80 +636,70 @@ class NutanixProvider(BaseHypervisorProvider):
             return response.status_code == 200
             
         except Exception as e:
-            print(f"Error deleting snapshot for VM '{vm_name}': {e}")
+            logger.error("Error deleting snapshot for VM '%s': %s", vm_name, e)
             return False
     
     # Helper methods
     
+    def _lookup_uuid(self, endpoint: str, kind: str, filter_expr: str) -> Optional[str]:
+        """Resolve a UUID with a filtered */list call
+        
+        Returns:
+            The UUID, or None if no entity matches
+        
+        Raises:
+            RuntimeError: If the API call fails (errors are not negatively cached)
+        """
+        list_spec = {
+            "kind": kind,
+            "filter": filter_expr,
+            "length": 1
+        }
+        
+        response = self.session.post(f"{self.pc_base_url}/{endpoint}/list", 
+                                   json=list_spec, timeout=30)
+        
+        if response.status_code != 200:
+            raise RuntimeError(f"{endpoint}/list returned {response.status_code}")
+        
+        entities = response.json().get('entities', [])
+        if entities:
+            return entities[0].get('metadata', {}).get('uuid')
+        return None
+    
     def _get_vm_uuid(self, vm_name: str) -> Optional[str]:
         """Get VM UUID by name"""
         try:
-            list_spec = {
-                "kind": "vm",
-                "filter": f"vm_name=={vm_name}",
-                "length": 1
-            }
-            
-            response = self.session.post(f"{self.pc_base_url}/vms/list", 
-                                       json=list_spec, timeout=30)
-            
-            if response.status_code == 200:
-                entities = response.json().get('entities', [])
-                if entities:
-                    return entities[0].get('metadata', {}).get('uuid')
-            
-            return None
-            
+            return self.entity_cache.resolve(
+                'vm', vm_name, lambda: self._lookup_uuid('vms', 'vm', f"vm_name=={vm_name}"))
         except Exception as e:
-            print(f"Error getting VM UUID for '{vm_name}': {e}")
+            logger.error("Error getting VM UUID for '%s': %s", vm_name, e)
             return None
     
     def _get_cluster_uuid(self, cluster_name: str) -> Optional[str]:
         """Get cluster UUID by name"""
         try:
-            list_spec = {
-                "kind": "cluster",
-                "filter": f"name=={cluster_name}",
-                "length": 1
-            }
-            
-            response = self.session.post(f"{self.pc_base_url}/clusters/list", 
-                                       json=list_spec, timeout=30)
-            
-            if response.status_code == 200:
-                entities = response.json().get('entities', [])
-                if entities:
-                    return entities[0].get('metadata', {}).get('uuid')
-            
-            return None
-            
+            return self.entity_cache.resolve(
+                'cluster', cluster_name, lambda: self._lookup_uuid('clusters', 'cluster', f"name=={cluster_name}"))
         except Exception as e:
-            print(f"Error getting cluster UUID for '{cluster_name}': {e}")
+            logger.error("Error getting cluster UUID for '%s': %s", cluster_name, e)
             return None
     
     def _get_network_uuid(self, network_name: str) -> Optional[str]:
         """Get network UUID by name"""
         try:
-            list_spec = {
-                "kind": "subnet",
-                "filter": f"name=={network_name}",
-                "length": 1
-            }
-            
-            response = self.session.post(f"{self.pc_base_url}/subnets/list", 
-                                       json=list_spec, timeout=30)
-            
-            if response.status_code == 200:
-                entities = response.json().get('entities', [])
-                if entities:
-                    return entities[0].get('metadata', {}).get('uuid')
-            
-            return None
-            
+            return self.entity_cache.resolve(
+                'subnet', network_name, lambda: self._lookup_uuid('subnets', 'subnet', f"name=={network_name}"))
         except Exception as e:
-            print(f"Error getting network UUID for '{network_name}': {e}")
+            logger.error("Error getting network UUID for '%s': %s", network_name, e)
             return None
     
+    def _forget_vm(self, vm_uuid: str):
+        """Drop every cached entry of a deleted (or vanished) VM"""
+        self.entity_cache.invalidate_value('vm', vm_uuid)
+        self.entity_cache.invalidate('vm_entity', vm_uuid)
+        self.entity_cache.invalidate('snapshot')
+    
     def _assign_ip_address(self, vm_name: str, ip_address: str) -> Dict[str, Any]:
         """Assign IP address to VM using the IP assignment script"""
         try:
@@ -642,7 +722,8 @@ class NutanixProvider(BaseHypervisorProvider):
                 password=self.password,
                 port=self.port,
                 use_ssl=self.use_ssl,
-                verify_ssl=self.verify_ssl
+                verify_ssl=self.verify_ssl,
+                task_watcher=self.task_watcher
             )
             
             # Assign IP address
@@ -664,41 +745,38 @@ class NutanixProvider(BaseHypervisorProvider):
     def _get_template_uuid(self, template_name: str) -> Optional[str]:
         """Get template UUID by name"""
         try:
-            list_spec = {
-                "kind": "image",
-                "filter": f"name=={template_name}",
-                "length": 1
-            }
-            
-            response = self.session.post(f"{self.pc_base_url}/images/list", 
-                                       json=list_spec, timeout=30)
-            
-            if response.status_code == 200:
-                entities = response.json().get('entities', [])
-                if entities:
-                    return entities[0].get('metadata', {}).get('uuid')
-            
-            return None
-            
+            return self.entity_cache.resolve(
+                'image', template_name, lambda: self._lookup_uuid('images', 'image', f"name=={template_name}"))
         except Exception as e:
-            print(f"Error getting template UUID for '{template_name}': {e}")
+            logger.error("Error getting template UUID for '%s': %s", template_name, e)
             return None
     
     def _get_snapshot_uuid(self, vm_uuid: str, snapshot_name: str) -> Optional[str]:
         """Get snapshot UUID by name"""
+        hit, snapshot_uuid = self.entity_cache.get('snapshot', (vm_uuid, snapshot_name))
+        if hit:
+            return snapshot_uuid
+        
         try:
             response = self.session.get(f"{self.pc_base_url}/vms/{vm_uuid}/snapshots", timeout=30)
             
             if response.status_code == 200:
-                snapshots = response.json().get('entities', [])
-                for snapshot in snapshots:
-                    if snapshot.get('spec', {}).get('name') == snapshot_name:
-                        return snapshot.get('metadata', {}).get('uuid')
+                # One listing resolves every snapshot of the VM
+                snapshots = {
+                    snapshot.get('spec', {}).get('name'): snapshot.get('metadata', {}).get('uuid')
+                    for snapshot in response.json().get('entities', [])
+                }
+                for name, uuid in snapshots.items():
+                    self.entity_cache.put('snapshot', (vm_uuid, name), uuid)
+                snapshot_uuid = snapshots.get(snapshot_name)
+                if snapshot_uuid is None:
+                    self.entity_cache.put('snapshot', (vm_uuid, snapshot_name), None)
+                return snapshot_uuid
             
             return None
             
         except Exception as e:
-            print(f"Error getting snapshot UUID for '{snapshot_name}': {e}")
+            logger.error("Error getting snapshot UUID for '%s': %s", snapshot_name, e)
             return None
     
     def _change_vm_power_state(self, vm_name: str, power_state: str) -> bool:
@@ -708,14 +786,37 @@ class NutanixProvider(BaseHypervisorProvider):
             if not vm_uuid:
                 return False
             
-            # Get current VM spec
-            response = self.session.get(f"{self.pc_base_url}/vms/{vm_uuid}", timeout=30)
-            if response.status_code != 200:
-                return False
+            result = self._set_power_state(vm_uuid, power_state)
+            if result is None:
+                # The cached UUID belonged to a VM that no longer exists; resolve once more
+                vm_uuid = self._get_vm_uuid(vm_name)
+                if not vm_uuid:
+                    return False
+                result = self._set_power_state(vm_uuid, power_state)
+            
+            return bool(result)
             
-            vm_data = response.json()
+        except Exception as e:
+            logger.error("Error changing power state for VM '%s': %s", vm_name, e)
+            return False
+    
+    def _set_power_state(self, vm_uuid: str, power_state: str) -> Optional[bool]:
+        """Change the power state of a VM by UUID
+        
+        The last known VM entity is reused for the update, so with a warm cache
+        the power action is a single PUT. A stale entity (spec_version conflict)
+        is refetched once.
+        
+        Returns:
+            Task outcome, or None if the VM does not exist
+        """
+        for attempt in range(2):
+            vm_data = self._get_vm_entity(vm_uuid, refresh=attempt > 0)
+            if vm_data is None:
+                return None
             
             # Update power state
+            vm_data = copy.deepcopy(vm_data)
             vm_data['spec']['resources']['power_state'] = power_state
             
             # Update VM
@@ -723,46 +824,50 @@ class NutanixProvider(BaseHypervisorProvider):
                                       json=vm_data, timeout=300)
             
             if response.status_code == 202:
+                metadata = vm_data.get('metadata', {})
+                if 'spec_version' in metadata:
+                    metadata['spec_version'] += 1
+                self.entity_cache.put('vm_entity', vm_uuid, vm_data)
+                
                 task_uuid = response.json().get('status', {}).get('execution_context', {}).get('task_uuid')
                 if task_uuid:
                     return self._wait_for_task(task_uuid)
+                return False
             
-            return False
-            
-        except Exception as e:
-            print(f"Error changing power state for VM '{vm_name}': {e}")
-            return False
+            self.entity_cache.invalidate('vm_entity', vm_uuid)
+            if response.status_code == 404:
+                self._forget_vm(vm_uuid)
+                return None
+            if response.status_code not in (409, 412):
+                return False
+        
+        return False
+    
+    def _get_vm_entity(self, vm_uuid: str, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """Get the VM entity (spec and metadata), cached by UUID"""
+        if not refresh:
+            hit, vm_data = self.entity_cache.get('vm_entity', vm_uuid)
+            if hit and vm_data is not None:
+                return vm_data
+        
+        response = self.session.get(f"{self.pc_base_url}/vms/{vm_uuid}", timeout=30)
+        if response.status_code == 404:
+            self._forget_vm(vm_uuid)
+            return None
+        if response.status_code != 200:
+            raise RuntimeError(f"GET vms/{vm_uuid} returned {response.status_code}")
+        
+        vm_data = response.json()
+        self.entity_cache.put('vm_entity', vm_uuid, vm_data)
+        return vm_data
     
     def _wait_for_task(self, task_uuid: str, timeout: int = 120) -> bool:
         """Wait for a task to complete"""
         try:
-            start_time = time.time()
-            
-            while time.time() - start_time < timeout:
-                response = self.session.get(f"{self.pc_base_url}/tasks/{task_uuid}", timeout=30)
-                
-                if response.status_code == 200:
-                    task_data = response.json()
-                    status = task_data.get('status')
-                    
-                    if status == 'SUCCEEDED':
-                        return True
-                    elif status == 'FAILED':
-                        error_detail = task_data.get('error_detail', 'Unknown error')
-                        print(f"Task failed: {error_detail}")
-                        return False
-                    
-                    # Task still running, wait
-                    time.sleep(5)
-                else:
-                    print(f"Error checking task status: {response.status_code}")
-                    return False
-            
-            print(f"Task {task_uuid} timed out")
-            return False
+            return self.task_watcher.wait(task_uuid, timeout)
             
         except Exception as e:
-            print(f"Error waiting for task {task_uuid}: {e}")
+            logger.error("Error waiting for task %s: %s", task_uuid, e)
             return False
     
     def _clone_from_template(self, template_uuid: str, vm_config: VMConfig, vm_spec: Dict) -> Dict[str, Any]:
@@ -783,6 +888,7 @@ class NutanixProvider(BaseHypervisorProvider):
                 
                 if task_uuid:
                     success = self._wait_for_task(task_uuid)
+                    self.entity_cache.invalidate('vm', vm_config.name)
                     if success:
                         return {
                             'success': True,
@@ -0,0 +1,82 @@
+"""
+Packer Output
+Turns `packer build -machine-readable` output into build phase events
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+# Step messages of the vmware-iso/vmware-vmx builders, in build order, with the percent reached
+PACKER_PHASES = [
+    ('clone', re.compile(r'Cloning source VM', re.I), 10),
+    ('create', re.compile(r'Creating (required )?virtual machine disk|Building and writing VMX file', re.I), 10),
+    ('boot', re.compile(r'Starting virtual machine', re.I), 20),
+    ('boot_command', re.compile(r'Typing the boot command|Waiting .* for boot', re.I), 25),
+    ('ssh_wait', re.compile(r'Waiting for (SSH|WinRM) to become available', re.I), 30),
+    ('provision', re.compile(r'Connected to (SSH|WinRM)|Provisioning with', re.I), 70),
+    ('shutdown', re.compile(r'Gracefully halting|Stopping virtual machine|Executing shutdown command', re.I), 85),
+    ('finalize', re.compile(r'Compacting|Cleaning VMX|Deleting unnecessary', re.I), 95),
+]
+
+PhaseEvent = Tuple[str, str, Optional[int]]
+
+
+def parse_machine_readable(line: str) -> Optional[Tuple[str, List[str]]]:
+    """Split a `timestamp,target,type,data...` line into its type and unescaped data"""
+    parts = line.split(',')
+    if len(parts) < 3 or not parts[0].isdigit():
+        return None
+    data = [part.replace('%!(PACKER_COMMA)', ',').replace('\\n', '\n').replace('\\r', '') for part in parts[3:]]
+    return parts[2], data
+
+
+class PackerProgressParser:
+    """Tracks the phase of a Packer build from its machine-readable output
+
+    feed() returns an event for each builder step message ("==> ..."), so a
+    job shows what Packer is doing without storing every output line.
+    """
+
+    def __init__(self, mode: str = None):
+        self.mode = mode
+        self.phase = 'build'
+        self.percent = 5
+        self.errors: List[str] = []
+        self.artifact_id: Optional[str] = None
+
+    def feed(self, line: str) -> Optional[PhaseEvent]:
+        """Consume one stdout line; return (phase, message, percent) for step messages"""
+        parsed = parse_machine_readable(line)
+        if parsed is None:
+            return None
+        kind, data = parsed
+
+        if kind == 'error' or (kind == 'ui' and data and data[0] == 'error'):
+            message = (data[-1] if data else '').strip()
+            if message:
+                self.errors.append(message)
+            return None
+        if kind == 'artifact' and len(data) >= 3 and data[1] == 'id':
+            self.artifact_id = data[2]
+            return None
+        if kind != 'ui' or len(data) < 2 or data[0] != 'say':
+            return None
+
+        message = data[1].strip()
+        if not message.startswith('==>'):
+            return None
+        message = message.lstrip('=> ')
+        if ': ' in message:
+            message = message.split(': ', 1)[1]
+
+        for phase, pattern, percent in PACKER_PHASES:
+            if pattern.search(message):
+                self.phase = phase
+                self.percent = max(self.percent, percent)
+                break
+        label = f"[{self.mode}] {message}" if self.mode else message
+        return self.phase, label, self.percent
+
+    @property
+    def last_error(self) -> Optional[str]:
+        return self.errors[-1] if self.errors else None
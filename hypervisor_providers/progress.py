@@ -0,0 +1,85 @@
+"""
+Progress Reporting
+Lets long-running provider operations report progress and checkpoints to
+whoever is running them (job workers, the operation journal)
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+ProgressListener = Callable[[str, Optional[str], Optional[int]], None]
+CheckpointListener = Callable[[str, Dict[str, Any]], None]
+
+
+@contextmanager
+def progress_listener(listener: ProgressListener, job_id: str = None):
+    """Route report_progress() calls made on this thread to listener"""
+    previous = getattr(_local, 'listener', None), getattr(_local, 'job_id', None)
+    _local.listener = listener
+    _local.job_id = job_id
+    try:
+        yield
+    finally:
+        _local.listener, _local.job_id = previous
+
+
+@contextmanager
+def checkpoint_listener(listener: CheckpointListener):
+    """Route report_checkpoint() calls made on this thread to listener"""
+    previous = getattr(_local, 'checkpoint_listener', None)
+    _local.checkpoint_listener = listener
+    try:
+        yield
+    finally:
+        _local.checkpoint_listener = previous
+
+
+def current_job_id() -> Optional[str]:
+    """ID of the job running on this thread, if any"""
+    return getattr(_local, 'job_id', None)
+
+
+def report_progress(phase: str, message: str = None, percent: int = None):
+    """Report progress of the current operation (no-op outside a job)"""
+    listener = getattr(_local, 'listener', None)
+    if listener is None:
+        return
+    try:
+        listener(phase, message, percent)
+    except Exception as e:
+        logger.warning("Progress listener failed: %s", e)
+
+
+def progress_reporter() -> ProgressListener:
+    """report_progress() bound to this thread's listener, for helper threads such as output readers"""
+    listener = getattr(_local, 'listener', None)
+
+    def report(phase: str, message: str = None, percent: int = None):
+        if listener is None:
+            return
+        try:
+            listener(phase, message, percent)
+        except Exception as e:
+            logger.warning("Progress listener failed: %s", e)
+    return report
+
+
+def report_checkpoint(checkpoint: str, **resources):
+    """Record that an operation reached a checkpoint and which resources it now owns
+
+    Resources (output directories, VMX paths, task UUIDs...) are what startup
+    recovery uses to finish or roll back an interrupted operation.
+    """
+    listener = getattr(_local, 'checkpoint_listener', None)
+    if listener is None:
+        return
+    try:
+        listener(checkpoint, resources)
+    except Exception as e:
+        logger.warning("Checkpoint listener failed: %s", e)
@@ -0,0 +1,199 @@
+"""
+Reclaimer
+Moves doomed VM directories into a trash area and deletes them in the background
+"""
+
+import logging
+import os
+import time
+import uuid
+import shutil
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+
+class DirectoryReclaimer:
+    """Deletes directories off the request path at a bounded rate
+
+    reclaim() renames a directory into the trash directory, which frees its
+    name at once, and queues it. A low-priority reaper thread measures queued
+    directories and unlinks their files, sleeping so that no more than
+    ``bytes_per_second`` are freed per second. Directories found in the trash
+    on start (left by a restart) are reaped as well.
+    """
+
+    def __init__(self, trash_directory: Path, bytes_per_second: int = 256 * 1024 ** 2,
+                 retry_interval: float = 30.0):
+        """Initialize reclaimer
+
+        Args:
+            trash_directory: Directory doomed directories are moved into; must be on
+                the same volume as them so the move is a rename
+            bytes_per_second: Maximum rate at which file contents are freed
+            retry_interval: Seconds before a directory that could not be fully removed is retried
+        """
+        self.trash_directory = Path(trash_directory)
+        self.trash_directory.mkdir(parents=True, exist_ok=True)
+        self.bytes_per_second = bytes_per_second
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._queue: deque = deque()
+        self._sizes: Dict[str, int] = {}  # trash entry -> bytes not yet freed
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reclaimed_bytes = 0
+        self.reclaimed_directories = 0
+        self.inline_removals = 0
+
+    def start(self):
+        """Start the reaper, queueing anything left in the trash"""
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            for entry in sorted(self.trash_directory.iterdir()):
+                if str(entry) not in self._sizes:
+                    self._sizes[str(entry)] = 0
+                    self._queue.append(entry)
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='reclaimer', daemon=True)
+        self._thread.start()
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def reclaim(self, directory: Path) -> bool:
+        """Move a directory to the trash for background deletion
+
+        A directory that cannot be renamed (e.g. a file in it is locked) is
+        removed inline instead.
+
+        Returns:
+            True if the directory no longer exists under its name
+        """
+        directory = Path(directory)
+        if not directory.exists():
+            return True
+        trash_entry = self.trash_directory / f"{directory.name}-{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        try:
+            os.replace(directory, trash_entry)
+        except OSError as e:
+            logger.warning("Could not move %s to trash, removing inline: %s", directory, e)
+            shutil.rmtree(directory, ignore_errors=True)
+            with self._lock:
+                self.inline_removals += 1
+            return not directory.exists()
+
+        with self._lock:
+            self._sizes[str(trash_entry)] = 0
+            self._queue.append(trash_entry)
+        self._wakeup.set()
+        return True
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the trash is empty (used by tests and scripts)"""
+        deadline = time.time() + timeout if timeout is not None else None
+        while True:
+            with self._lock:
+                if not self._sizes:
+                    return True
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'pending_bytes': sum(self._sizes.values()),
+                'pending_directories': len(self._sizes),
+                'reclaimed_bytes': self.reclaimed_bytes,
+                'reclaimed_directories': self.reclaimed_directories,
+                'inline_removals': self.inline_removals,
+                'bytes_per_second': self.bytes_per_second
+            }
+
+    def _run(self):
+        self._lower_priority()
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.retry_interval)
+            self._wakeup.clear()
+            with self._lock:
+                entries = list(self._queue)
+                self._queue.clear()
+
+            # Measure everything queued first so pending bytes reflect the whole backlog
+            for entry in entries:
+                size = self._measure(entry)
+                with self._lock:
+                    self._sizes[str(entry)] = size
+
+            for entry in entries:
+                if self._stopped.is_set():
+                    return
+                if not self._reap(entry):
+                    with self._lock:
+                        self._queue.append(entry)
+
+    def _reap(self, entry: Path) -> bool:
+        """Delete one trash entry at the rate limit; False if something could not be removed"""
+        window_start, window_bytes = time.time(), 0
+        for root, dirs, files in os.walk(entry, topdown=False):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    size = os.lstat(path).st_size
+                    os.unlink(path)
+                except OSError:
+                    continue  # Already gone or locked; a locked file fails the final rmdir
+                window_bytes += size
+                with self._lock:
+                    self._sizes[str(entry)] = max(0, self._sizes.get(str(entry), 0) - size)
+                    self.reclaimed_bytes += size
+                ahead = window_bytes / self.bytes_per_second - (time.time() - window_start)
+                if ahead > 0 and self._stopped.wait(ahead):
+                    return False
+            for name in dirs:
+                try:
+                    os.rmdir(os.path.join(root, name))
+                except OSError:
+                    pass
+
+        try:
+            if entry.is_dir():
+                entry.rmdir()
+            elif entry.exists():
+                entry.unlink()
+        except OSError as e:
+            logger.warning("Could not fully reclaim %s, retrying later: %s", entry.name, e)
+            return False
+        with self._lock:
+            self._sizes.pop(str(entry), None)
+            self.reclaimed_directories += 1
+        return True
+
+    @staticmethod
+    def _measure(entry: Path) -> int:
+        if not entry.is_dir():
+            return entry.stat().st_size if entry.exists() else 0
+        total = 0
+        for root, _, files in os.walk(entry):
+            for name in files:
+                try:
+                    total += os.lstat(os.path.join(root, name)).st_size
+                except OSError:
+                    pass
+        return total
+
+    @staticmethod
+    def _lower_priority():
+        """Run the reaper thread at the lowest CPU priority where the OS allows it per thread"""
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
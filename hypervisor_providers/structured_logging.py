@@ -0,0 +1,194 @@
+"""
+Structured Logging
+JSON log records written off the request path, with sampled and rate-limited debug output
+"""
+
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and the record's extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DebugThrottle(logging.Filter):
+    """Keeps a sample of DEBUG records and at most ``per_second`` of them per logger per second
+
+    Records above DEBUG always pass. Rejected records are counted, never queued.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, per_second: int = 50):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.per_second = per_second
+        self._windows: Dict[str, list] = {}  # logger name -> [second, records kept]
+        self.sampled_out = 0
+        self.rate_limited = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.sampled_out += 1
+            return False
+        second = int(record.created)
+        window = self._windows.get(record.name)
+        if window is None or window[0] != second:
+            window = self._windows[record.name] = [second, 0]
+        window[1] += 1
+        if window[1] > self.per_second:
+            self.rate_limited += 1
+            return False
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that drops records when the writer falls behind instead of blocking the caller"""
+
+    def __init__(self, record_queue: queue.Queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now (arguments may change later) but
+        # keep extra fields apart so the formatter can emit them as JSON keys
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BoundedQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # The queue may be full; wait for the writer to make room rather than fail to stop
+        self.queue.put(self._sentinel)
+
+
+class LoggingPipeline:
+    """Root-logger handler chain: throttle -> bounded queue -> writer thread -> stream"""
+
+    def __init__(self, config: Dict[str, Any], stream=None):
+        """Initialize pipeline
+
+        Args:
+            config: The 'logging' config section: 'level', 'format' ('json' or 'text'),
+                'levels' (logger name -> level), 'debug_sample_rate', 'debug_per_second',
+                'queue_size' and optional 'file'
+            stream: Stream written to when no file is configured (stdout by default)
+        """
+        self.config = config
+        if config.get('file'):
+            output = logging.FileHandler(config['file'], encoding='utf-8')
+        else:
+            output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if config.get('format', 'json') == 'json'
+                            else logging.Formatter(TEXT_FORMAT))
+
+        self.queue: queue.Queue = queue.Queue(maxsize=config.get('queue_size', 10000))
+        self.throttle = DebugThrottle(config.get('debug_sample_rate', 1.0), config.get('debug_per_second', 50))
+        self.handler = NonBlockingQueueHandler(self.queue)
+        self.handler.addFilter(self.throttle)
+        self.output = output
+        self.listener = _BoundedQueueListener(self.queue, output, respect_handler_level=True)
+
+    def start(self):
+        root = logging.getLogger()
+        root.addHandler(self.handler)
+        root.setLevel(self.config.get('level', 'INFO'))
+        for name, level in self.config.get('levels', {}).items():
+            logging.getLogger(name).setLevel(level)
+        self.listener.start()
+
+    def stop(self):
+        """Detach from the root logger and flush what is queued"""
+        logging.getLogger().removeHandler(self.handler)
+        if self.listener._thread is not None:
+            self.listener.stop()
+        self.output.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'queued': self.queue.qsize(),
+            'dropped': self.handler.dropped,
+            'sampled_out': self.throttle.sampled_out,
+            'rate_limited': self.throttle.rate_limited
+        }
+
+
+_pipeline: Optional[LoggingPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def configure_logging(config: Dict[str, Any] = None, stream=None) -> LoggingPipeline:
+    """Install (or replace) the process-wide logging pipeline
+
+    Modules keep using logging.getLogger(__name__); this only decides where
+    their records go. Calling it again swaps the pipeline, e.g. after a
+    config change.
+    """
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is not None:
+            _pipeline.stop()
+        _pipeline = LoggingPipeline(config or {}, stream)
+        _pipeline.start()
+        return _pipeline
+
+
+def get_pipeline() -> Optional[LoggingPipeline]:
+    return _pipeline
+
+
+def load_logging_config(config_file: str = "hypervisor_config.json") -> Dict[str, Any]:
+    """The 'logging' section of the configuration file (empty when it cannot be read)"""
+    try:
+        with open(config_file, 'r') as f:
+            return json.load(f).get('logging', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def _shutdown():
+    with _pipeline_lock:
+        if _pipeline is not None:
+            _pipeline.stop()
+
+
+atexit.register(_shutdown)
@@ -0,0 +1,265 @@
+"""
+Task Watcher
+Tracks every outstanding Nutanix task from a single polling loop
+"""
+
+import logging
+import time
+import heapq
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# Terminal states reported by Prism Central
+SUCCEEDED = 'SUCCEEDED'
+FAILED = 'FAILED'
+ABORTED = 'ABORTED'
+TERMINAL_STATES = (SUCCEEDED, FAILED, ABORTED)
+
+# States set by the watcher itself
+TIMED_OUT = 'TIMED_OUT'
+ERROR = 'ERROR'
+
+
+@dataclass
+class WatchedTask:
+    """An outstanding task and its polling schedule"""
+    uuid: str
+    deadline: float
+    future: Future
+    interval: float
+    next_poll: Optional[float]
+    callbacks: List[Callable[[Dict[str, Any]], None]] = field(default_factory=list)
+
+
+class TaskWatcher:
+    """Polls all outstanding tasks of a Prism Central endpoint in one loop
+
+    Each task is polled quickly at first and then with a growing interval.
+    Whenever one task is due, every task within ``coalesce`` of its interval
+    from being due is polled with it, so their schedules converge and they
+    share one tasks/list call when the server supports it (otherwise they are
+    read with concurrent GETs). Callers get a Future that completes as soon as
+    the task reaches a terminal state.
+    """
+
+    def __init__(self, session, base_url: str, initial_interval: float = 0.5,
+                 max_interval: float = 10.0, backoff: float = 1.5, lookup_workers: int = 4,
+                 coalesce: float = 0.5):
+        """Initialize task watcher
+
+        Args:
+            session: requests.Session authenticated against Prism Central
+            base_url: Prism Central v3 API base URL
+            initial_interval: Seconds before the first status check of a task
+            max_interval: Upper bound of the polling interval
+            backoff: Factor applied to the interval after each check
+            lookup_workers: Concurrent GETs when tasks/list is unavailable
+            coalesce: Fraction of its interval a task may be polled early to join a lookup
+        """
+        self.session = session
+        self.base_url = base_url
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.lookup_workers = lookup_workers
+        self.coalesce = coalesce
+        self._tasks: Dict[str, WatchedTask] = {}
+        self._schedule: List[tuple] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lookup_pool: Optional[ThreadPoolExecutor] = None
+        self._list_supported: Optional[bool] = None
+
+    def watch(self, task_uuid: str, timeout: float = 120,
+              callback: Callable[[Dict[str, Any]], None] = None) -> Future:
+        """Start tracking a task
+
+        Args:
+            task_uuid: Task to track
+            timeout: Seconds before the task is reported as TIMED_OUT
+            callback: Optional callable invoked with the final task data
+
+        Returns:
+            Future resolving to the final task data (its 'status' is terminal,
+            TIMED_OUT or ERROR)
+        """
+        now = time.time()
+        with self._lock:
+            task = self._tasks.get(task_uuid)
+            if task is None:
+                task = WatchedTask(uuid=task_uuid, deadline=now + timeout, future=Future(),
+                                   interval=self.initial_interval, next_poll=now + self.initial_interval)
+                self._tasks[task_uuid] = task
+                heapq.heappush(self._schedule, (task.next_poll, task_uuid))
+            else:
+                task.deadline = max(task.deadline, now + timeout)
+            if callback:
+                task.callbacks.append(callback)
+            self._ensure_running()
+        self._wakeup.set()
+        return task.future
+
+    def wait(self, task_uuid: str, timeout: float = 120) -> bool:
+        """Block until a task finishes
+
+        Returns:
+            True if the task succeeded
+        """
+        task_data = self.watch(task_uuid, timeout).result()
+        status = task_data.get('status')
+        if status == TIMED_OUT:
+            logger.warning("Task %s timed out", task_uuid)
+        elif status != SUCCEEDED:
+            logger.error("Task failed: %s", task_data.get('error_detail', status))
+        return status == SUCCEEDED
+
+    def pending(self) -> int:
+        """Number of tasks being tracked"""
+        with self._lock:
+            return len(self._tasks)
+
+    def stop(self):
+        """Stop polling; outstanding tasks are reported as ERROR"""
+        self._stopped.set()
+        self._wakeup.set()
+        with self._lock:
+            tasks = list(self._tasks.values())
+        for task in tasks:
+            self._complete(task, {'status': ERROR, 'error_detail': 'Task watcher stopped'})
+
+    def _ensure_running(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='nutanix-task-watcher', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            due = self._due_tasks()
+            if not due:
+                with self._lock:
+                    if not self._tasks:
+                        # Idle: exit and let the next watch() start a new loop
+                        self._thread = None
+                        return
+                    self._prune_schedule()
+                    delay = self._schedule[0][0] - time.time() if self._schedule else self.initial_interval
+                self._wakeup.wait(max(0.0, delay))
+                self._wakeup.clear()
+                continue
+
+            statuses = self._lookup([task.uuid for task in due])
+            now = time.time()
+            for task in due:
+                task_data = statuses.get(task.uuid)
+                if task_data is not None and (task_data.get('status') in TERMINAL_STATES
+                                              or task_data.get('status') == ERROR):
+                    self._complete(task, task_data)
+                elif now >= task.deadline:
+                    self._complete(task, {**(task_data or {}), 'status': TIMED_OUT})
+                else:
+                    self._reschedule(task, now)
+
+    def _due_tasks(self) -> List[WatchedTask]:
+        """Tasks to poll now: none until one is due, then every task close to being due"""
+        now = time.time()
+        with self._lock:
+            self._prune_schedule()
+            if not self._schedule or self._schedule[0][0] > now:
+                return []
+            due = [task for task in self._tasks.values()
+                   if task.next_poll is not None and task.next_poll <= now + task.interval * self.coalesce]
+            for task in due:
+                task.next_poll = None  # Entries left in the schedule are stale until rescheduled
+        return due
+
+    def _prune_schedule(self):
+        """Drop schedule entries of finished tasks or of polls already made (lock held)"""
+        while self._schedule:
+            next_poll, task_uuid = self._schedule[0]
+            task = self._tasks.get(task_uuid)
+            if task is not None and task.next_poll == next_poll:
+                return
+            heapq.heappop(self._schedule)
+
+    def _reschedule(self, task: WatchedTask, now: float):
+        task.interval = min(task.interval * self.backoff, self.max_interval)
+        task.next_poll = min(now + task.interval, task.deadline)
+        with self._lock:
+            heapq.heappush(self._schedule, (task.next_poll, task.uuid))
+
+    def _complete(self, task: WatchedTask, task_data: Dict[str, Any]):
+        with self._lock:
+            if self._tasks.pop(task.uuid, None) is None:
+                return
+        task.future.set_result(task_data)
+        for callback in task.callbacks:
+            try:
+                callback(task_data)
+            except Exception as e:
+                logger.warning("Task callback failed for %s: %s", task.uuid, e)
+
+    def _lookup(self, task_uuids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch the status of several tasks; tasks that could not be read are omitted"""
+        statuses: Dict[str, Dict[str, Any]] = {}
+        if len(task_uuids) > 1 and self._list_supported is not False:
+            statuses = self._lookup_batch(task_uuids)
+
+        missing = [task_uuid for task_uuid in task_uuids if task_uuid not in statuses]
+        if len(missing) == 1:
+            result = self._lookup_one(missing[0])
+            if result is not None:
+                statuses[missing[0]] = result
+        elif missing:
+            if self._lookup_pool is None:
+                self._lookup_pool = ThreadPoolExecutor(max_workers=self.lookup_workers,
+                                                       thread_name_prefix='nutanix-task-lookup')
+            for task_uuid, result in zip(missing, self._lookup_pool.map(self._lookup_one, missing)):
+                if result is not None:
+                    statuses[task_uuid] = result
+        return statuses
+
+    def _lookup_batch(self, task_uuids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Read several tasks with one tasks/list call"""
+        try:
+            response = self.session.post(f"{self.base_url}/tasks/list", json={
+                "kind": "task",
+                "filter": ",".join(f"uuid=={task_uuid}" for task_uuid in task_uuids),
+                "length": len(task_uuids)
+            }, timeout=30)
+        except Exception as e:
+            logger.error("Error listing task status: %s", e)
+            return {}
+
+        if response.status_code != 200:
+            # Fall back to one GET per task from now on
+            self._list_supported = False
+            return {}
+
+        self._list_supported = True
+        statuses = {}
+        for entity in response.json().get('entities', []):
+            task_uuid = entity.get('uuid') or entity.get('metadata', {}).get('uuid')
+            if task_uuid in task_uuids:
+                statuses[task_uuid] = entity
+        return statuses
+
+    def _lookup_one(self, task_uuid: str) -> Optional[Dict[str, Any]]:
+        try:
+            response = self.session.get(f"{self.base_url}/tasks/{task_uuid}", timeout=30)
+        except Exception as e:
+            # Transient error: keep polling until the deadline
+            logger.error("Error checking task status: %s", e)
+            return None
+
+        if response.status_code == 200:
+            return response.json()
+        logger.error("Error checking task status: %s", response.status_code)
+        return {'status': ERROR, 'error_detail': f"HTTP {response.status_code}"}
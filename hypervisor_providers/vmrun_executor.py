@@ -0,0 +1,243 @@
+"""
+vmrun Executor
+Host-wide queue for vmrun commands with per-VMX ordering, deduplication and timings
+"""
+
+import time
+import threading
+import subprocess
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Any
+
+from .command_runner import LineListener, run_streaming
+from .metrics import record_subprocess
+
+# Commands that do not change VM state: never serialized, identical in-flight calls share one run
+READ_ONLY_COMMANDS = frozenset({
+    'list', 'listSnapshots', 'checkToolsState', 'getGuestIPAddress', 'readVariable',
+    'listProcessesInGuest', 'fileExistsInGuest', 'directoryExistsInGuest'
+})
+
+DEFAULT_TIMEOUTS = {
+    'list': 30,
+    'listSnapshots': 60,
+    'checkToolsState': 30,
+    'getGuestIPAddress': 60,
+    'start': 300,
+    'stop': 300,
+    'reset': 300,
+    'clone': 1800,
+    'snapshot': 600,
+    'revertToSnapshot': 600,
+    'deleteSnapshot': 600,
+    'runProgramInGuest': 300,
+}
+DEFAULT_TIMEOUT = 120
+
+
+@dataclass
+class CommandTimings:
+    """Aggregated outcomes of one vmrun command"""
+    calls: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    deduplicated: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    total_wait_seconds: float = 0.0
+
+
+@dataclass
+class _Call:
+    future: Future
+    command: str
+    args: Tuple[str, ...]
+    timeout: float
+    on_line: Optional[LineListener]
+    serial_key: Optional[str]
+    submitted_at: float
+
+
+class VmrunExecutor:
+    """Runs vmrun commands on bounded pools of worker threads
+
+    At most ``max_concurrency`` VM-changing vmrun processes run on the host at
+    once. Read-only commands (inventory, readiness and health probes) run in
+    their own lane of ``read_concurrency`` workers, so long clones can never
+    hold them back. Commands that change a VM run one at a time per VMX path,
+    in submission order; later commands for the same VMX wait in a queue
+    without holding a worker. Identical read-only commands submitted while one
+    is running share its result. A command that outlives its timeout is killed
+    and its future raises subprocess.TimeoutExpired, as subprocess.run would.
+    """
+
+    def __init__(self, vmrun_path: str, max_concurrency: int = 4, timeouts: Dict[str, float] = None,
+                 read_concurrency: int = 2):
+        """Initialize vmrun executor
+
+        Args:
+            vmrun_path: Path to the vmrun executable
+            max_concurrency: Maximum number of VM-changing vmrun processes running at once
+            timeouts: Per-command timeouts in seconds overriding the defaults
+            read_concurrency: Maximum number of read-only vmrun processes running at once
+        """
+        self.vmrun_path = vmrun_path
+        self.max_concurrency = max_concurrency
+        self.read_concurrency = read_concurrency
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='vmrun')
+        self._read_pool = ThreadPoolExecutor(max_workers=read_concurrency, thread_name_prefix='vmrun-read')
+        self._lock = threading.Lock()
+        self._queues: Dict[str, deque] = {}  # VMX path -> calls waiting behind the running one
+        self._in_flight: Dict[Tuple[str, ...], Future] = {}
+        self._timings: Dict[str, CommandTimings] = {}
+        self._running = 0
+
+    def submit(self, command: str, *args, lock: Any = None, timeout: float = None,
+               on_line: LineListener = None) -> Future:
+        """Queue a vmrun command
+
+        Args:
+            command: vmrun command, e.g. 'start'
+            *args: Command arguments; the first one is the VMX path for VM commands
+            lock: Path serializing the command instead of the first argument
+                (e.g. the destination of a clone)
+            timeout: Seconds before the command is killed, instead of the command default
+            on_line: Callable receiving each output line as it is printed
+
+        Returns:
+            Future resolving to the completed process
+        """
+        args = tuple(str(arg) for arg in args)
+        timeout = timeout or self.timeouts.get(command, DEFAULT_TIMEOUT)
+        read_only = command in READ_ONLY_COMMANDS and on_line is None
+
+        with self._lock:
+            timings = self._timings.setdefault(command, CommandTimings())
+            if read_only:
+                existing = self._in_flight.get((command,) + args)
+                if existing is not None:
+                    timings.deduplicated += 1
+                    return existing
+
+            serial_key = None
+            if not read_only:
+                target = lock if lock is not None else (args[0] if args else None)
+                serial_key = self._serial_key(target) if target is not None else None
+            call = _Call(Future(), command, args, timeout, on_line, serial_key, time.time())
+            if read_only:
+                self._in_flight[(command,) + args] = call.future
+
+            if serial_key is not None:
+                if serial_key in self._queues:
+                    self._queues[serial_key].append(call)
+                    return call.future
+                self._queues[serial_key] = deque()
+            (self._read_pool if read_only else self._pool).submit(self._execute, call)
+        return call.future
+
+    def run(self, command: str, *args, lock: Any = None, timeout: float = None,
+            on_line: LineListener = None):
+        """Run a vmrun command and wait for it (see submit)
+
+        Raises:
+            subprocess.TimeoutExpired: If the command outlived its timeout
+        """
+        return self.submit(command, *args, lock=lock, timeout=timeout, on_line=on_line).result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-command timings and the current queue state"""
+        with self._lock:
+            commands = {}
+            for command, timings in self._timings.items():
+                entry = asdict(timings)
+                entry['avg_seconds'] = round(timings.total_seconds / timings.calls, 3) if timings.calls else None
+                entry['avg_wait_seconds'] = (round(timings.total_wait_seconds / timings.calls, 3)
+                                             if timings.calls else None)
+                entry['total_seconds'] = round(timings.total_seconds, 3)
+                entry['max_seconds'] = round(timings.max_seconds, 3)
+                entry['total_wait_seconds'] = round(timings.total_wait_seconds, 3)
+                commands[command] = entry
+            return {
+                'max_concurrency': self.max_concurrency,
+                'read_concurrency': self.read_concurrency,
+                'running': self._running,
+                'queued': sum(len(queue) for queue in self._queues.values()),
+                'serialized_vms': len(self._queues),
+                'commands': commands
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+        self._read_pool.shutdown(wait=False)
+
+    def _execute(self, call: _Call):
+        started = time.time()
+        with self._lock:
+            self._running += 1
+
+        result, error, timed_out = None, None, False
+        try:
+            command = [self.vmrun_path, call.command, *call.args]
+            if call.on_line:
+                result = run_streaming(command, timeout=call.timeout, on_line=call.on_line)
+            else:
+                result = subprocess.run(command, capture_output=True, text=True, timeout=call.timeout)
+        except subprocess.TimeoutExpired as e:
+            error, timed_out = e, True
+        except Exception as e:
+            error = e
+
+        duration = time.time() - started
+        record_subprocess(f"vmrun {call.command}", duration, None if timed_out or result is None else result.returncode)
+        with self._lock:
+            self._running -= 1
+            timings = self._timings[call.command]
+            timings.calls += 1
+            timings.total_seconds += duration
+            timings.max_seconds = max(timings.max_seconds, duration)
+            timings.total_wait_seconds += started - call.submitted_at
+            if timed_out:
+                timings.timeouts += 1
+            if error is not None or result.returncode != 0:
+                timings.failures += 1
+            if self._in_flight.get((call.command,) + call.args) is call.future:
+                del self._in_flight[(call.command,) + call.args]
+
+            # Hand the VMX to the next queued command before waking the caller
+            if call.serial_key is not None:
+                queue = self._queues[call.serial_key]
+                if queue:
+                    self._pool.submit(self._execute, queue.popleft())
+                else:
+                    del self._queues[call.serial_key]
+
+        if error is not None:
+            call.future.set_exception(error)
+        else:
+            call.future.set_result(result)
+
+    @staticmethod
+    def _serial_key(path: Any) -> str:
+        return str(Path(str(path))).lower()
+
+
+_executors: Dict[str, VmrunExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_vmrun_executor(vmrun_path: str, max_concurrency: int = 4,
+                       timeouts: Dict[str, float] = None, read_concurrency: int = 2) -> VmrunExecutor:
+    """Shared executor for a vmrun binary, so every caller on the host uses one queue
+
+    The concurrency limits and timeouts of the first caller apply.
+    """
+    with _executors_lock:
+        executor = _executors.get(vmrun_path)
+        if executor is None:
+            executor = VmrunExecutor(vmrun_path, max_concurrency, timeouts, read_concurrency)
+            _executors[vmrun_path] = executor
+        return executor
@@ -3,14 +3,34 @@ VMware Hypervisor Provider
 Handles VMware Workstation operations using vmrun and Packer
 """
 
+import logging
 import os
 import sys
+import socket
 import subprocess
 import json
-import hashlib
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from .base_provider import BaseHypervisorProvider, VMConfig, VMInfo
+from .progress import report_progress, report_checkpoint, progress_reporter
+from .vmx_index import VMXIndex
+from .base_snapshots import BaseSnapshotRegistry, CLONE_MODES
+from .iso_checksums import ISOChecksumCache
+from .command_runner import run_streaming
+from .metrics import record_subprocess
+from .packer_output import PackerProgressParser
+from .build_strategy import BuildStrategy, BuildMode
+from .golden_images import GoldenImageCache, build_fingerprint
+from .vmrun_executor import get_vmrun_executor
+from .reclaimer import DirectoryReclaimer
+from .guest_readiness import GuestReadinessWatcher
+from .network_identity import (IP_CONFIG_MODES, apply_vmx_settings, build_seed_iso, guestinfo_settings,
+                               network_config, seed_cdrom_settings)
+
+logger = logging.getLogger(__name__)
 
 class VMwareProvider(BaseHypervisorProvider):
     """VMware Workstation provider using vmrun and Packer"""
@@ -19,16 +39,94 @@ class VMwareProvider(BaseHypervisorProvider):
         super().__init__(config)
         self.vmrun_path = config.get('vmrun_path', r'C:\ Program Files (x86)\VMware\VMware Workstation\vmrun.exe')
         self.base_directory = Path(config.get('base_directory', os.getcwd()))
+        
+        # Every vmrun call on the host goes through one queue (see vmrun_executor)
+        self.vmrun = get_vmrun_executor(
+            self.vmrun_path,
+            max_concurrency=config.get('vmrun_max_concurrency', 4),
+            timeouts=config.get('vmrun_timeouts'),
+            read_concurrency=config.get('vmrun_read_concurrency', 2)
+        )
+        self.guest_readiness = GuestReadinessWatcher(self.vmrun)
         self.templates_directory = Path(config.get('templates_directory', 
             r'C:\Users\saads\OneDrive\Documents\Virtual Machines'))
         self.cloned_vms_directory = self.base_directory / 'cloned-vms'
         self.permanent_vms_directory = self.base_directory / 'permanent_vms'
         self.created_machines_directory = self.base_directory / 'createdMachines'
+        self.warm_pool_directory = self.base_directory / 'warm-pool'
         
         # Ensure directories exist
         self.cloned_vms_directory.mkdir(exist_ok=True)
         self.permanent_vms_directory.mkdir(exist_ok=True)
         self.created_machines_directory.mkdir(exist_ok=True)
+        self.warm_pool_directory.mkdir(exist_ok=True)
+        
+        # VM name -> VMX location index and parsed-VMX cache (priority: cloned, permanent, created)
+        self.vmx_index = VMXIndex(
+            [self.cloned_vms_directory, self.permanent_vms_directory, self.created_machines_directory],
+            template_roots=[self.templates_directory],
+            scan_interval=config.get('vmx_scan_interval', 2.0),
+            alias_file=self.base_directory / 'vm_aliases.json'
+        )
+        if config.get('watch_vm_directories', False):
+            self.vmx_index.start_watcher()
+        
+        # Guest IP lookups for listings: bounded concurrency and a short-lived cache
+        self.ip_lookup_workers = config.get('ip_lookup_workers', 8)
+        self.guest_ip_cache_ttl = config.get('guest_ip_cache_ttl', 30)
+        self._guest_ip_cache: Dict[str, tuple] = {}
+        self._guest_ip_lock = threading.Lock()
+
+        # Clone strategy and the managed template snapshots linked clones are taken from
+        self.clone_mode = config.get('clone_mode', 'full')
+        if self.clone_mode not in CLONE_MODES:
+            raise ValueError(f"clone_mode must be one of {', '.join(CLONE_MODES)}")
+        
+        # How a clone's static IP reaches the guest: after boot over VMware Tools, or before boot
+        self.ip_config_mode = config.get('ip_config_mode', 'guest')
+        if self.ip_config_mode not in IP_CONFIG_MODES:
+            raise ValueError(f"ip_config_mode must be one of {', '.join(IP_CONFIG_MODES)}")
+        self.base_snapshots = BaseSnapshotRegistry(self.vmrun, self.base_directory / 'base_snapshots.json')
+        self.warm_ready_timeout = config.get('warm_ready_timeout', 600)
+        self.output_tail_lines = config.get('output_tail_lines', 200)
+
+        # Packer build modes, ordered per build by their recorded outcomes
+        strategy_config = config.get('build_strategy', {})
+        self.build_strategy = BuildStrategy(
+            [
+                BuildMode('fast', "build-fast.pkr.hcl", timeout=300, estimate=120),          # template cloning
+                BuildMode('headless', "build-headless.pkr.hcl", timeout=900, estimate=600),  # headless installation
+                BuildMode('GUI', "build.pkr.hcl", timeout=1200, estimate=900)                # GUI installation
+            ],
+            self.base_directory / 'build_history.json',
+            failure_streak=strategy_config.get('failure_streak', 2),
+            cooldown=strategy_config.get('cooldown', 3600)
+        )
+
+        # Completed builds are kept as golden images and cloned for identical requests
+        golden_config = config.get('golden_images', {})
+        self.golden_images = GoldenImageCache(
+            self.base_directory / 'golden-images',
+            max_images=golden_config.get('max_images', 5),
+            max_bytes=int(golden_config.get('max_gb', 100) * 1024 ** 3)
+        ) if golden_config.get('enabled', True) else None
+        self.golden_clone_mode = golden_config.get('clone_mode', 'full')
+
+        # Deleted VM directories are renamed into a trash area and removed by a rate-limited reaper
+        self.reclaimer = DirectoryReclaimer(
+            self.base_directory / 'trash',
+            bytes_per_second=int(config.get('reclaim_mb_per_second', 256) * 1024 ** 2)
+        )
+        self.reclaimer.start()
+        
+        # ISO checksums are hashed once in the background, never during a build
+        self.iso_checksums = ISOChecksumCache(self.base_directory / 'iso_checksums.json')
+        self.iso_checksums.prefetch(self._iso_path())
+        if config.get('watch_iso_directories', True):
+            self.iso_checksums.start_watcher(
+                [Path(directory) for directory in config.get('iso_directories', [Path(self._iso_path()).parent])],
+                interval=config.get('iso_scan_interval', 60)
+            )
 
         # Template alias mapping (case-insensitive keys)
         self.template_aliases = {
@@ -43,17 +141,28 @@ class VMwareProvider(BaseHypervisorProvider):
     def connect(self) -> bool:
         """Connect to VMware (check if vmrun is available)"""
         try:
-            result = subprocess.run([self.vmrun_path, 'list'], 
-                                  capture_output=True, text=True, timeout=30)
+            result = self.vmrun.run('list', timeout=30)
             return result.returncode == 0
         except Exception as e:
-            print(f"Failed to connect to VMware: {e}")
+            logger.error("Failed to connect to VMware: %s", e)
             return False
     
+    def health_check(self) -> bool:
+        """Check that vmrun answers"""
+        result = self.vmrun.run('list', timeout=10)
+        return result.returncode == 0
+    
     def disconnect(self) -> bool:
         """Disconnect from VMware (no action needed for vmrun)"""
         return True
     
+    def shutdown(self):
+        """Stop watchers, the reclaimer and readiness probing (the vmrun executor is shared per path)"""
+        self.vmx_index.stop_watcher()
+        self.iso_checksums.stop_watcher()
+        self.reclaimer.stop()
+        self.guest_readiness.stop()
+    
     def create_vm(self, vm_config: VMConfig) -> Dict[str, Any]:
         """Create a new VM using Packer"""
         try:
@@ -62,11 +171,21 @@ class VMwareProvider(BaseHypervisorProvider):
             # Clean up existing output directory to prevent Packer conflicts
             self._cleanup_existing_output_directory(vm_config.name)
             
+            # Record the directory Packer will write so an interrupted build can be rolled back
+            output_dir = self.created_machines_directory / vm_config.name
+            report_checkpoint('packer_build', output_dir=str(output_dir))
+            
             # Determine ISO path and checksum
-            iso_path = os.environ.get("ISO_PATH")
-            if not iso_path:
-                iso_path = r"C:/Users/saads/OneDrive/Documents/Coding/demo-automation/templates/ubuntu-24.04.2-desktop-amd64.iso"
-            iso_checksum = self._compute_iso_checksum()
+            iso_path = self._iso_path()
+            iso_checksum = self._iso_checksum(iso_path)
+            
+            # Identical build inputs were built before: clone the stored image instead
+            golden_key = self._golden_key(vm_config, iso_checksum)
+            golden_vmx = self.golden_images.lookup(golden_key) if golden_key else None
+            if golden_vmx:
+                result = self._create_from_golden_image(golden_key, golden_vmx, vm_config, output_dir)
+                if result:
+                    return result
             
             # Set environment variables
             env = os.environ.copy()
@@ -82,6 +201,7 @@ class VMwareProvider(BaseHypervisorProvider):
             # Build Packer command
             packer_command = [
                 "packer", "build",
+                "-machine-readable",
                 "-on-error=abort",
                 "-var", f"vm_name={vm_config.name}",
                 "-var", f"cpu={vm_config.cpu}",
@@ -97,81 +217,52 @@ class VMwareProvider(BaseHypervisorProvider):
             if iso_checksum:
                 packer_command += ["-var", f"iso_checksum={iso_checksum}"]
             
-            # Try fast mode first, then headless, then GUI as fallbacks
-            packer_command_fast = packer_command + ["build-fast.pkr.hcl"]
-            packer_command_headless = packer_command + ["build-headless.pkr.hcl"]
-            packer_command_gui = packer_command + ["build.pkr.hcl"]
-            
-            print(f"Creating VM '{vm_config.name}' with Packer (trying fast mode first)...")
-            result = subprocess.run(
-                packer_command_fast,
-                cwd=str(self.base_directory),
-                capture_output=True,
-                text=True,
-                env=env,
-                timeout=300   # 5 minutes timeout for fast mode (template cloning)
-            )
+            # Try the mode most likely to succeed fastest first, the others as fallbacks
+            build_key = BuildStrategy.key(vm_config.template or Path(iso_path).name, vm_config.os_type,
+                                          socket.gethostname())
+            build_modes = self.build_strategy.plan(build_key)
             
-            # If fast mode failed, try headless mode as fallback
-            if result.returncode != 0:
-                print(f"Fast build failed. Trying headless mode as fallback...")
-                print(f"Fast error (full): {result.stderr}")
-                if result.stdout:
-                    print(f"Fast stdout: {result.stdout}")
-                
-                # Clean up any partial build artifacts before retry
-                self._cleanup_existing_output_directory(vm_config.name)
-                
-                print("Retrying with headless mode...")
-                result = subprocess.run(
-                    packer_command_headless,
-                    cwd=str(self.base_directory),
-                    capture_output=True,
-                    text=True,
-                    env=env,
-                    timeout=900   # 15 minutes timeout for headless installation
-                )
-                
-                # If headless also failed, try GUI mode as final fallback
-                if result.returncode != 0:
-                    print(f"Headless build also failed. Trying GUI mode as final fallback...")
-                    print(f"Headless error (full): {result.stderr}")
-                    if result.stdout:
-                        print(f"Headless stdout: {result.stdout}")
-                    
+            logger.info("Creating VM '%s' with Packer (modes: %s)...", vm_config.name, ', '.join(mode.name for mode in build_modes))
+            for attempt, mode in enumerate(build_modes):
+                if attempt:
                     # Clean up any partial build artifacts before retry
                     self._cleanup_existing_output_directory(vm_config.name)
-                    
-                    print("Retrying with GUI mode...")
-                    result = subprocess.run(
-                        packer_command_gui,
-                        cwd=str(self.base_directory),
-                        capture_output=True,
-                        text=True,
-                        env=env,
-                        timeout=1200  # 20 minutes timeout for GUI installation
-                    )
-                    
-                    if result.returncode == 0:
-                        print("✅ GUI build succeeded!")
-                    else:
-                        print(f"❌ All build modes failed")
-                        print(f"GUI error (full): {result.stderr}")
-                        if result.stdout:
-                            print(f"GUI stdout: {result.stdout}")
-                else:
-                    print("✅ Headless build succeeded!")
+                    logger.info("Retrying with %s mode...", mode.name)
+                
+                report_progress('build', f"Packer build ({mode.name} mode)")
+                started = time.time()
+                try:
+                    result, parser = self._run_packer(packer_command + [mode.template_file], env,
+                                                      mode.timeout, mode.name)
+                except subprocess.TimeoutExpired as e:
+                    result = subprocess.CompletedProcess(e.cmd, -1, e.output or '', e.stderr or '')
+                    parser = PackerProgressParser(mode.name)
+                    parser.errors.append(f"timed out after {mode.timeout}s")
+                self.build_strategy.record(build_key, mode.name, result.returncode == 0, time.time() - started)
+                if result.returncode == 0:
+                    logger.info("%s build succeeded", mode.name)
+                    break
+                
+                error = parser.last_error or result.stderr
+                logger.warning("%s build failed: %s", mode.name, error, extra={'output_tail': result.stdout})
             else:
-                print("✅ Fast build succeeded!")
+                logger.error("All build modes failed")
             
             if result.returncode != 0:
                 return {
                     'success': False,
-                    'error': f"Packer build failed: {result.stderr}",
+                    'error': f"Packer build failed: {error}",
                     'stdout': result.stdout
                 }
             
             # The VM is already created in the createdMachines directory by Packer.
+            built_vmx = output_dir / f"{vm_config.name}.vmx"
+            report_checkpoint('built', vmx_path=str(built_vmx))
+            self.vmx_index.invalidate(vm_config.name)
+            if golden_key:
+                self.golden_images.store_async(
+                    golden_key, lambda image_dir: self._capture_golden_image(built_vmx, image_dir),
+                    inputs={'os_type': vm_config.os_type, 'disk_gb': vm_config.disk, 'iso': Path(iso_path).name})
             
             return {
                 'success': True,
@@ -200,7 +291,7 @@ class VMwareProvider(BaseHypervisorProvider):
             source_vm_name = self.template_aliases.get(source_vm.lower(), source_vm)
 
             # Find source VMX file from templates directory only
-            source_vmx_path = self._find_template_vmx(source_vm_name)
+            source_vmx_path = self.vmx_index.locate_template(source_vm_name)
             if not source_vmx_path:
                 return {
                     'success': False,
@@ -217,37 +308,43 @@ class VMwareProvider(BaseHypervisorProvider):
                     'error': f"Destination directory '{dest_dir}' already exists"
                 }
             
-            # Clone using vmrun
-            clone_command = [
-                self.vmrun_path, "clone",
-                str(source_vmx_path),
-                str(dest_vmx_path),
-                "full",
-                f"-cloneName={vm_config.name}"
-            ]
+            clone_mode = vm_config.clone_mode or self.clone_mode
+            if clone_mode not in CLONE_MODES:
+                return {
+                    'success': False,
+                    'error': f"Unknown clone mode '{clone_mode}'"
+                }
             
-            print(f"Cloning VM '{source_vm}' to '{vm_config.name}'...")
-            result = subprocess.run(clone_command, capture_output=True, text=True, timeout=1800)
+            logger.info("Cloning VM '%s' to '%s'...", source_vm, vm_config.name)
+            report_checkpoint('cloning', dest_dir=str(dest_dir))
+            report_progress('clone', f"Cloning '{source_vm_name}' ({clone_mode})")
+            result, clone_mode = self._run_clone(source_vmx_path, dest_vmx_path, vm_config.name, clone_mode)
             
             if result.returncode != 0:
                 return {
                     'success': False,
-                    'error': f"vmrun clone failed: {result.stderr}"
+                    'error': f"vmrun clone failed: {result.stderr or result.stdout}"
                 }
+            report_checkpoint('cloned', vmx_path=str(dest_vmx_path))
+            self.vmx_index.invalidate(vm_config.name)
             
             # Configure cloned VM
+            report_progress('configure', "Configuring cloned VM")
             self._configure_cloned_vm(dest_vmx_path, vm_config)
+            report_checkpoint('configured')
             
             # Start VM
-            subprocess.run([self.vmrun_path, "start", str(dest_vmx_path)], 
-                         check=False)
+            report_progress('start', "Starting VM")
+            self.vmrun.run("start", dest_vmx_path)
+            report_checkpoint('started')
             
             return {
                 'success': True,
                 'vm_name': vm_config.name,
                 'provider': 'vmware',
                 'vmx_path': str(dest_vmx_path),
-                'message': f"VM '{vm_config.name}' cloned successfully"
+                'clone_mode': clone_mode,
+                'message': f"VM '{vm_config.name}' cloned successfully ({clone_mode} clone)"
             }
             
         except Exception as e:
@@ -256,6 +353,231 @@ class VMwareProvider(BaseHypervisorProvider):
                 'error': f"Error cloning VM: {str(e)}"
             }
     
+    def _golden_key(self, vm_config: VMConfig, iso_checksum: Optional[str]) -> Optional[str]:
+        """Fingerprint of the Packer templates, http/ seed files, ISO and build variables
+        
+        None when golden images are disabled or the ISO checksum is not known yet.
+        """
+        if not self.golden_images or not iso_checksum or iso_checksum == "none":
+            return None
+        return build_fingerprint(
+            [self.base_directory / mode.template_file for mode in self.build_strategy.modes],
+            [self.base_directory / 'http'],
+            {'iso_checksum': iso_checksum, 'os_type': vm_config.os_type, 'disk_gb': vm_config.disk,
+             'template': vm_config.template}
+        )
+    
+    def _create_from_golden_image(self, golden_key: str, golden_vmx: Path, vm_config: VMConfig,
+                                  output_dir: Path) -> Optional[Dict[str, Any]]:
+        """Clone a golden image into the createdMachines directory
+        
+        Returns:
+            The create result, or None if the clone failed and the VM should be built
+        """
+        dest_vmx_path = output_dir / f"{vm_config.name}.vmx"
+        report_progress('clone', f"Cloning golden image {golden_key[:12]}")
+        result, clone_mode = self._run_clone(golden_vmx, dest_vmx_path, vm_config.name, self.golden_clone_mode)
+        if result.returncode != 0:
+            logger.warning("Golden image clone failed, building with Packer: %s", result.stderr or result.stdout)
+            self._remove_partial_directory(output_dir)
+            return None
+        if clone_mode == 'linked':
+            self.golden_images.record_clone(golden_key, dest_vmx_path)
+        report_checkpoint('built', vmx_path=str(dest_vmx_path))
+        self.vmx_index.invalidate(vm_config.name)
+        
+        report_progress('configure', "Configuring VM")
+        self._configure_cloned_vm(dest_vmx_path, vm_config)
+        
+        return {
+            'success': True,
+            'vm_name': vm_config.name,
+            'provider': 'vmware',
+            'golden_image': golden_key[:12],
+            'clone_mode': clone_mode,
+            'message': f"VM '{vm_config.name}' created from a golden image"
+        }
+    
+    def _capture_golden_image(self, built_vmx: Path, image_dir: Path) -> Optional[Path]:
+        """Full-clone a freshly built VM into the golden image directory"""
+        image_vmx = image_dir / "golden.vmx"
+        result = self.vmrun.run("clone", built_vmx, image_vmx, "full",
+                                f"-cloneName=golden-{image_dir.name[:12]}", lock=image_vmx)
+        if result.returncode != 0:
+            logger.error("Failed to capture golden image: %s", result.stderr or result.stdout)
+            return None
+        return image_vmx
+    
+    def _run_packer(self, command: List[str], env: Dict[str, str], timeout: float,
+                    mode: str) -> tuple:
+        """Run a Packer build, publishing its step messages as progress events
+        
+        Returns:
+            The command result (with only the output tail) and the output parser
+        """
+        parser = PackerProgressParser(mode)
+        report = progress_reporter()
+        
+        def on_line(stream: str, line: str):
+            event = parser.feed(line) if stream == 'stdout' else None
+            if event:
+                report(*event)
+        
+        started = time.time()
+        try:
+            result = run_streaming(command, cwd=str(self.base_directory), env=env, timeout=timeout,
+                                   on_line=on_line, tail_lines=self.output_tail_lines)
+        except subprocess.TimeoutExpired:
+            record_subprocess('packer build', time.time() - started, None)
+            raise
+        record_subprocess('packer build', result.duration, result.returncode)
+        return result, parser
+    
+    def _run_clone(self, source_vmx_path: Path, dest_vmx_path: Path, clone_name: str,
+                   clone_mode: str) -> tuple:
+        """Run `vmrun clone` in the requested mode
+        
+        Linked clones are taken from the template's managed base snapshot. In
+        `auto` mode a template that cannot be snapshotted or linked from falls
+        back to a full clone.
+        
+        Returns:
+            The vmrun result and the clone mode actually used
+        """
+        if clone_mode in ('linked', 'auto'):
+            try:
+                snapshot = self.base_snapshots.ensure(source_vmx_path)
+            except Exception as e:
+                if clone_mode == 'linked':
+                    return subprocess.CompletedProcess([], 1, '', str(e)), clone_mode
+                logger.warning("Base snapshot unavailable, falling back to a full clone: %s", e)
+            else:
+                result = self.vmrun.run("clone", source_vmx_path, dest_vmx_path, "linked",
+                                        f"-snapshot={snapshot}", f"-cloneName={clone_name}",
+                                        lock=dest_vmx_path)
+                if result.returncode == 0:
+                    return result, 'linked'
+                
+                # The snapshot may have been removed outside the provider; re-check next time
+                self.base_snapshots.forget(source_vmx_path)
+                if clone_mode == 'linked':
+                    return result, clone_mode
+                logger.warning("Linked clone failed, falling back to a full clone: %s", result.stderr or result.stdout)
+                self._remove_partial_directory(dest_vmx_path.parent)
+        
+        result = self.vmrun.run("clone", source_vmx_path, dest_vmx_path, "full",
+                                f"-cloneName={clone_name}", lock=dest_vmx_path)
+        return result, 'full'
+    
+    def prepare_warm_vm(self, source_vm: str, vm_config: VMConfig) -> Dict[str, Any]:
+        """Clone a template into the warm pool directory, boot it and wait for VMware Tools"""
+        try:
+            self.validate_config(vm_config)
+            source_vm_name = self.template_aliases.get(source_vm.lower(), source_vm)
+            source_vmx_path = self.vmx_index.locate_template(source_vm_name)
+            if not source_vmx_path:
+                return {
+                    'success': False,
+                    'error': f"Source VM '{source_vm_name}' not found in templates directory"
+                }
+            
+            dest_dir = self.warm_pool_directory / vm_config.name
+            dest_vmx_path = dest_dir / f"{vm_config.name}.vmx"
+            if dest_dir.exists():
+                return {
+                    'success': False,
+                    'error': f"Destination directory '{dest_dir}' already exists"
+                }
+            
+            result, clone_mode = self._run_clone(source_vmx_path, dest_vmx_path, vm_config.name,
+                                                 vm_config.clone_mode or 'auto')
+            if result.returncode != 0:
+                self._remove_partial_directory(dest_dir)
+                return {
+                    'success': False,
+                    'error': f"vmrun clone failed: {result.stderr or result.stdout}"
+                }
+            self._configure_cloned_vm(dest_vmx_path, vm_config)
+            
+            result = self.vmrun.run("start", dest_vmx_path, "nogui")
+            if result.returncode != 0 or not self._wait_for_tools(dest_vmx_path, self.warm_ready_timeout):
+                self._remove_partial_directory(dest_dir)
+                return {
+                    'success': False,
+                    'error': f"Warm VM '{vm_config.name}' did not become ready: {result.stderr or result.stdout}"
+                }
+            
+            return {
+                'success': True,
+                'vm_name': vm_config.name,
+                'vmx_path': str(dest_vmx_path),
+                'clone_mode': clone_mode
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f"Error preparing warm VM: {str(e)}"
+            }
+    
+    def claim_warm_vm(self, warm_name: str, vm_config: VMConfig) -> Dict[str, Any]:
+        """Hand out a running warm VM under a new name
+        
+        The VM keeps its directory (a running VM's files cannot be moved): it
+        gets a new display name and becomes reachable under vm_config.name
+        through a persistent alias, then receives its IP address.
+        """
+        try:
+            vmx_path = self.warm_pool_directory / warm_name / f"{warm_name}.vmx"
+            if not vmx_path.exists() or vmx_path in self.vmx_index.aliases().values():
+                return {'success': False, 'error': f"Warm VM '{warm_name}' not found"}
+            if self._find_vmx_file(vm_config.name):
+                return {'success': False, 'error': f"VM '{vm_config.name}' already exists"}
+            if self._vmx_key(vmx_path) not in self._running_vmx_paths():
+                return {'success': False, 'error': f"Warm VM '{warm_name}' is not running"}
+            
+            report_progress('claim', f"Claiming warm VM '{warm_name}'")
+            self.vmrun.run("writeVariable", vmx_path, "runtimeConfig", "displayName", vm_config.name,
+                           timeout=60)
+            self.vmx_index.add_alias(vm_config.name, vmx_path)
+            report_checkpoint('claimed', vmx_path=str(vmx_path))
+            
+            if vm_config.ip_address:
+                report_progress('configure', f"Assigning IP {vm_config.ip_address}")
+                ip_result = self._assign_ip_address(vmx_path, vm_config.ip_address, vm_config.gateway, vm_config.dns)
+                if not ip_result['success']:
+                    logger.warning("IP assignment failed: %s", ip_result['error'])
+            
+            return {
+                'success': True,
+                'vm_name': vm_config.name,
+                'provider': 'vmware',
+                'vmx_path': str(vmx_path),
+                'warm_vm': warm_name,
+                'message': f"VM '{vm_config.name}' handed out from the warm pool"
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f"Error claiming warm VM: {str(e)}"
+            }
+    
+    def list_warm_vms(self) -> List[str]:
+        """Warm VMs in the warm pool directory that have not been claimed"""
+        claimed = set(self.vmx_index.aliases().values())
+        return sorted(
+            entry.name for entry in self.warm_pool_directory.iterdir()
+            if (entry / f"{entry.name}.vmx").exists() and entry / f"{entry.name}.vmx" not in claimed
+        )
+    
+    def discard_warm_vm(self, warm_name: str) -> bool:
+        return self._remove_partial_directory(self.warm_pool_directory / warm_name)
+    
+    def _wait_for_tools(self, vmx_path: Path, timeout: float) -> bool:
+        """Wait until VMware Tools run in the guest"""
+        return self.guest_readiness.wait(vmx_path, timeout)
+    
     def delete_vm(self, vm_name: str) -> bool:
         """Delete a VM"""
         try:
@@ -264,18 +586,19 @@ class VMwareProvider(BaseHypervisorProvider):
                 return False
             
             # Stop VM if running
-            subprocess.run([self.vmrun_path, "stop", str(vmx_path)], 
-                         capture_output=True, check=False)
+            self.vmrun.run("stop", vmx_path)
             
             # Delete VM directory
             vm_dir = vmx_path.parent
-            import shutil
-            shutil.rmtree(vm_dir, ignore_errors=True)
+            report_checkpoint('deleting', vm_dir=str(vm_dir))
+            self.reclaimer.reclaim(vm_dir)
+            self.vmx_index.remove_alias(vm_name)
+            self.vmx_index.invalidate(vm_name)
             
             return True
             
         except Exception as e:
-            print(f"Error deleting VM '{vm_name}': {e}")
+            logger.error("Error deleting VM '%s': %s", vm_name, e)
             return False
     
     def start_vm(self, vm_name: str) -> bool:
@@ -285,12 +608,11 @@ class VMwareProvider(BaseHypervisorProvider):
             if not vmx_path:
                 return False
             
-            result = subprocess.run([self.vmrun_path, "start", str(vmx_path), "nogui"], 
-                                  capture_output=True, text=True)
+            result = self.vmrun.run("start", vmx_path, "nogui")
             return result.returncode == 0
             
         except Exception as e:
-            print(f"Error starting VM '{vm_name}': {e}")
+            logger.error("Error starting VM '%s': %s", vm_name, e)
             return False
     
     def stop_vm(self, vm_name: str) -> bool:
@@ -300,12 +622,11 @@ class VMwareProvider(BaseHypervisorProvider):
             if not vmx_path:
                 return False
             
-            result = subprocess.run([self.vmrun_path, "stop", str(vmx_path)], 
-                                  capture_output=True, text=True)
+            result = self.vmrun.run("stop", vmx_path)
             return result.returncode == 0
             
         except Exception as e:
-            print(f"Error stopping VM '{vm_name}': {e}")
+            logger.error("Error stopping VM '%s': %s", vm_name, e)
             return False
     
     def restart_vm(self, vm_name: str) -> bool:
@@ -319,74 +640,117 @@ class VMwareProvider(BaseHypervisorProvider):
             if not vmx_path:
                 return None
             
-            # Read VMX file for configuration
-            vmx_content = vmx_path.read_text()
-            
-            # Extract configuration
-            cpu = self._extract_vmx_value(vmx_content, 'numvcpus', '2')
-            ram = self._extract_vmx_value(vmx_content, 'memsize', '2048')
-            
-            # Get VM state
-            result = subprocess.run([self.vmrun_path, "list"], 
-                                  capture_output=True, text=True)
-            is_running = str(vmx_path) in result.stdout if result.returncode == 0 else False
-            state = "running" if is_running else "stopped"
-            
-            # Get IP address if running
-            ip_address = None
-            if is_running:
-                try:
-                    ip_result = subprocess.run([self.vmrun_path, "getGuestIPAddress", str(vmx_path)],
-                                               capture_output=True, text=True, timeout=10)
-                    if ip_result.returncode == 0 and ip_result.stdout.strip():
-                        ip_address = ip_result.stdout.strip()
-                except Exception as e:
-                    print(f"Could not retrieve IP for {vm_name}: {e}")
-
-            return VMInfo(
-                name=vm_name,
-                uuid=vm_name,  # VMware doesn't expose UUID easily via vmrun
-                state=state,
-                cpu=int(cpu),
-                ram=int(ram),
-                disk=0,  # Would need additional parsing
-                ip_address=ip_address,
-                hypervisor="vmware"
-            )
+            is_running = self._vmx_key(vmx_path) in self._running_vmx_paths()
+            ip_address = self._get_guest_ip(vmx_path) if is_running else None
+            return self._build_vm_info(vm_name, vmx_path, is_running, ip_address)
             
         except Exception as e:
-            print(f"Error getting VM info for '{vm_name}': {e}")
+            logger.error("Error getting VM info for '%s': %s", vm_name, e)
             return None
     
-    def list_vms(self) -> List[VMInfo]:
-        """List all VMs including cloned and created machines"""
-        vms = []
+    def list_vms(self, strict: bool = False) -> List[VMInfo]:
+        """List all VMs including cloned and created machines
+        
+        One `vmrun list` snapshot is shared by the whole listing and guest IPs
+        of running VMs are resolved concurrently. When strict, a failed
+        `vmrun list` or an unreadable VMX raises instead of being skipped.
+        """
+        # Search in cloned VMs and created machines directories
+        found = []
+        for directory in (self.cloned_vms_directory, self.created_machines_directory):
+            for vm_name in self.vmx_index.names_in(directory):
+                vmx_path = self._find_vmx_file(vm_name)
+                if vmx_path:
+                    found.append((vm_name, vmx_path))
+        # VMs handed out from the warm pool keep their directory under another name
+        found.extend(self.vmx_index.aliases().items())
         
-        # Search in cloned VMs directory
-        for vm_dir in self.cloned_vms_directory.iterdir():
-            if vm_dir.is_dir():
-                vm_info = self.get_vm_info(vm_dir.name)
-                if vm_info:
-                    vms.append(vm_info)
+        running_paths = self._running_vmx_paths(strict)
+        running = {vm_name: self._vmx_key(vmx_path) in running_paths for vm_name, vmx_path in found}
         
-        # Search in created machines directory
-        for vm_dir in self.created_machines_directory.iterdir():
-            if vm_dir.is_dir():
-                vm_info = self.get_vm_info(vm_dir.name)
-                if vm_info:
-                    vms.append(vm_info)
+        ip_addresses = {}
+        to_resolve = [(vm_name, vmx_path) for vm_name, vmx_path in found if running[vm_name]]
+        if to_resolve:
+            with ThreadPoolExecutor(max_workers=min(self.ip_lookup_workers, len(to_resolve)),
+                                    thread_name_prefix='vmware-guest-ip') as pool:
+                lookups = pool.map(lambda item: self._get_guest_ip(item[1]), to_resolve)
+                ip_addresses = {vm_name: ip for (vm_name, _), ip in zip(to_resolve, lookups)}
         
+        vms = []
+        for vm_name, vmx_path in found:
+            try:
+                vms.append(self._build_vm_info(vm_name, vmx_path, running[vm_name],
+                                               ip_addresses.get(vm_name)))
+            except Exception as e:
+                if strict:
+                    raise
+                logger.error("Error getting VM info for '%s': %s", vm_name, e)
         return vms
     
-    def get_templates(self) -> List[str]:
+    def _build_vm_info(self, vm_name: str, vmx_path: Path, is_running: bool,
+                       ip_address: Optional[str]) -> VMInfo:
+        """Build VMInfo from the VMX file and an already known power state"""
+        # Read VMX file for configuration
+        vmx_values = self.vmx_index.cache.values(vmx_path)
+        
+        return VMInfo(
+            name=vm_name,
+            uuid=vm_name,  # VMware doesn't expose UUID easily via vmrun
+            state="running" if is_running else "stopped",
+            cpu=int(vmx_values.get('numvcpus', '2')),
+            ram=int(vmx_values.get('memsize', '2048')),
+            disk=0,  # Would need additional parsing
+            ip_address=ip_address,
+            hypervisor="vmware"
+        )
+    
+    def _running_vmx_paths(self, strict: bool = False) -> set:
+        """Snapshot of running VMs from a single `vmrun list` call"""
+        result = self.vmrun.run("list")
+        if result.returncode != 0:
+            if strict:
+                raise RuntimeError(f"vmrun list failed: {(result.stderr or result.stdout).strip()}")
+            return set()
+        
+        # First line is "Total running VMs: N", then one VMX path per line
+        return {self._vmx_key(line.strip()) for line in result.stdout.splitlines()[1:] if line.strip()}
+    
+    @staticmethod
+    def _vmx_key(vmx_path) -> str:
+        """Normalize a VMX path for comparisons with `vmrun list` output"""
+        return os.path.normcase(os.path.abspath(str(vmx_path)))
+    
+    def _get_guest_ip(self, vmx_path: Path) -> Optional[str]:
+        """Guest IP of a running VM, cached for guest_ip_cache_ttl seconds"""
+        key = self._vmx_key(vmx_path)
+        with self._guest_ip_lock:
+            cached = self._guest_ip_cache.get(key)
+            if cached and cached[1] > time.time():
+                return cached[0]
+        
+        ip_address = None
+        try:
+            ip_result = self.vmrun.run("getGuestIPAddress", vmx_path, timeout=10)
+            if ip_result.returncode == 0 and ip_result.stdout.strip():
+                ip_address = ip_result.stdout.strip()
+        except Exception as e:
+            logger.warning("Could not retrieve IP for %s: %s", vmx_path.stem, e)
+        
+        # Only cache answers; a VM still booting is asked again next time
+        if ip_address:
+            with self._guest_ip_lock:
+                self._guest_ip_cache[key] = (ip_address, time.time() + self.guest_ip_cache_ttl)
+        return ip_address
+    
+    def get_templates(self, strict: bool = False) -> List[str]:
         """Get available VM templates - only return actual templates"""
         return ["Ubuntu 64-bit (3)", "Windows Server 2019"]
     
-    def get_clusters(self) -> List[str]:
+    def get_clusters(self, strict: bool = False) -> List[str]:
         """Get available clusters (not applicable for VMware Workstation)"""
         return ["local"]
     
-    def get_networks(self) -> List[str]:
+    def get_networks(self, strict: bool = False) -> List[str]:
         """Get available networks"""
         return ["NAT", "Bridged", "Host-only"]
     
@@ -397,14 +761,12 @@ class VMwareProvider(BaseHypervisorProvider):
             if not vmx_path:
                 return False
             
-            result = subprocess.run([
-                self.vmrun_path, "snapshot", str(vmx_path), snapshot_name
-            ], capture_output=True, text=True)
+            result = self.vmrun.run("snapshot", vmx_path, snapshot_name)
             
             return result.returncode == 0
             
         except Exception as e:
-            print(f"Error creating snapshot for VM '{vm_name}': {e}")
+            logger.error("Error creating snapshot for VM '%s': %s", vm_name, e)
             return False
     
     def restore_snapshot(self, vm_name: str, snapshot_name: str) -> bool:
@@ -414,14 +776,12 @@ class VMwareProvider(BaseHypervisorProvider):
             if not vmx_path:
                 return False
             
-            result = subprocess.run([
-                self.vmrun_path, "revertToSnapshot", str(vmx_path), snapshot_name
-            ], capture_output=True, text=True)
+            result = self.vmrun.run("revertToSnapshot", vmx_path, snapshot_name)
             
             return result.returncode == 0
             
         except Exception as e:
-            print(f"Error restoring snapshot for VM '{vm_name}': {e}")
+            logger.error("Error restoring snapshot for VM '%s': %s", vm_name, e)
             return False
     
     def delete_snapshot(self, vm_name: str, snapshot_name: str) -> bool:
@@ -431,69 +791,94 @@ class VMwareProvider(BaseHypervisorProvider):
             if not vmx_path:
                 return False
             
-            result = subprocess.run([
-                self.vmrun_path, "deleteSnapshot", str(vmx_path), snapshot_name
-            ], capture_output=True, text=True)
+            result = self.vmrun.run("deleteSnapshot", vmx_path, snapshot_name)
             
             return result.returncode == 0
             
         except Exception as e:
-            print(f"Error deleting snapshot for VM '{vm_name}': {e}")
+            logger.error("Error deleting snapshot for VM '%s': %s", vm_name, e)
             return False
     
+    def recover_operation(self, operation: Dict[str, Any]) -> str:
+        """Finish or roll back an interrupted operation from its journaled resources"""
+        kind = operation['kind']
+        checkpoint = operation.get('checkpoint')
+        resources = operation.get('resources', {})
+        vmx_path = resources.get('vmx_path')
+        
+        if kind == 'create_vm':
+            if checkpoint == 'built' and vmx_path and Path(vmx_path).exists():
+                return 'completed'
+            if resources.get('output_dir'):
+                self._remove_partial_directory(Path(resources['output_dir']))
+            return 'rolled_back'
+        
+        if kind == 'clone_vm':
+            if checkpoint in ('cloned', 'configured', 'started') and vmx_path and Path(vmx_path).exists():
+                return 'completed'
+            if resources.get('dest_dir'):
+                self._remove_partial_directory(Path(resources['dest_dir']))
+            return 'rolled_back'
+        
+        if kind == 'claim_warm_vm':
+            # The claim is in effect once the VM answers to its new name
+            return 'completed' if operation['vm_name'] in self.vmx_index.aliases() else 'rolled_back'
+        
+        if kind == 'delete_vm' and resources.get('vm_dir'):
+            # The VM was already stopped; finish removing its directory
+            if self._remove_partial_directory(Path(resources['vm_dir'])):
+                return 'completed'
+        
+        return 'rolled_back'
+    
+    def _remove_partial_directory(self, directory: Path) -> bool:
+        """Stop VMs in and remove a directory left behind by an interrupted operation
+        
+        Returns:
+            True if the directory no longer exists
+        """
+        # Never follow a journal entry outside the directories this provider owns
+        owned = (self.cloned_vms_directory, self.created_machines_directory, self.permanent_vms_directory,
+                 self.warm_pool_directory)
+        resolved = directory.resolve()
+        if not any(resolved.parent == root.resolve() for root in owned):
+            logger.warning("Refusing to remove %s: not a VM directory managed by this provider", directory)
+            return False
+        if not directory.exists():
+            return True
+        
+        logger.info("Rolling back partial VM directory: %s", directory)
+        for vmx_file in directory.glob("*.vmx"):
+            try:
+                self.vmrun.run("stop", vmx_file, "hard", timeout=30)
+            except Exception:
+                pass
+        self.reclaimer.reclaim(directory)
+        self.vmx_index.invalidate(directory.name)
+        return not directory.exists()
+    
     def _find_vmx_file(self, vm_name: str) -> Optional[Path]:
-        """Find VMX file for a VM (cloned, permanent, or template)"""
-        # Search in cloned VMs
-        cloned_vmx = self.cloned_vms_directory / vm_name / f"{vm_name}.vmx"
-        if cloned_vmx.exists():
-            return cloned_vmx
-        
-        # Search in permanent VMs
-        permanent_vmx = self.permanent_vms_directory / vm_name / f"{vm_name}.vmx"
-        if permanent_vmx.exists():
-            return permanent_vmx
-        
-        # Search in created machines
-        created_vmx = self.created_machines_directory / vm_name / f"{vm_name}.vmx"
-        if created_vmx.exists():
-            return created_vmx
-
-        # Search in templates directory
-        template_vmx = self.templates_directory / vm_name 
-        if template_vmx.is_dir():
-            vmx_files = list(template_vmx.glob('*.vmx'))
-            if vmx_files:
-                return vmx_files[0]
-
-        return None
-
+        """Find VMX file for a VM (cloned, permanent, created, or template)"""
+        return self.vmx_index.locate(vm_name)
+    
     def _find_template_vmx(self, template_name: str) -> Optional[Path]:
         """Find VMX file for a template in the templates directory only"""
-        for template_dir in self.templates_directory.iterdir():
-            if template_dir.is_dir() and template_dir.name == template_name:
-                vmx_files = list(template_dir.glob('*.vmx'))
-                if vmx_files:
-                    return vmx_files[0]
-        return None
-    
-    def _compute_iso_checksum(self) -> Optional[str]:
-        """Compute ISO checksum if ISO exists"""
-        try:
-            iso_path = os.environ.get("ISO_PATH")
-            if not iso_path:
-                iso_path = r"C:/Users/saads/OneDrive/Documents/Coding/demo-automation/templates/ubuntu-24.04.2-desktop-amd64.iso"
-            
-            if os.path.exists(iso_path):
-                print(f"Computing SHA256 for ISO: {iso_path}")
-                sha256 = hashlib.sha256()
-                with open(iso_path, 'rb') as f:
-                    for chunk in iter(lambda: f.read(1024*1024), b''):
-                        sha256.update(chunk)
-                return f"sha256:{sha256.hexdigest()}"
-        except Exception as e:
-            print(f"Failed to compute ISO checksum: {e}")
-        
-        return None
+        return self.vmx_index.locate_template(template_name)
+    
+    def _iso_path(self) -> str:
+        """Installation ISO used by Packer builds"""
+        return os.environ.get("ISO_PATH") or self.config.get(
+            'iso_path', r"C:/Users/saads/OneDrive/Documents/Coding/demo-automation/templates/ubuntu-24.04.2-desktop-amd64.iso")
+    
+    def _iso_checksum(self, iso_path: str) -> Optional[str]:
+        """Cached ISO checksum; "none" while a new or changed ISO is still being hashed"""
+        if not os.path.exists(iso_path):
+            return None
+        checksum = self.iso_checksums.get(iso_path)
+        if checksum is None:
+            logger.info("ISO checksum not cached yet for %s; building without verification", iso_path)
+            return "none"
+        return checksum
     
     def _configure_cloned_vm(self, vmx_path: Path, vm_config: VMConfig):
         """Configure cloned VM settings by modifying VMX file directly"""
@@ -502,42 +887,56 @@ class VMwareProvider(BaseHypervisorProvider):
             vmx_content = vmx_path.read_text()
             lines = vmx_content.split('\n')
             
-            # Update CPU and RAM settings
-            new_lines = []
-            cpu_updated = False
-            ram_updated = False
-            
-            for line in lines:
-                if line.strip().startswith('numvcpus ='):
-                    new_lines.append(f'numvcpus = "{vm_config.cpu}"')
-                    cpu_updated = True
-                elif line.strip().startswith('memsize ='):
-                    new_lines.append(f'memsize = "{vm_config.ram}"')
-                    ram_updated = True
-                else:
-                    new_lines.append(line)
-            
-            # Add settings if they weren't found
-            if not cpu_updated:
-                new_lines.append(f'numvcpus = "{vm_config.cpu}"')
-            if not ram_updated:
-                new_lines.append(f'memsize = "{vm_config.ram}"')
+            # Update CPU and RAM settings, plus the network identity when it is set before boot
+            settings = {'numvcpus': str(vm_config.cpu), 'memsize': str(vm_config.ram)}
+            preboot_ip = self._network_identity_settings(vmx_path, vm_config) if vm_config.ip_address else None
+            if preboot_ip:
+                settings.update(preboot_ip)
             
             # Write back to VMX file
-            vmx_path.write_text('\n'.join(new_lines))
-            print(f"Configured VM with {vm_config.cpu} CPUs and {vm_config.ram}MB RAM")
+            vmx_path.write_text('\n'.join(apply_vmx_settings(lines, settings)))
+            self.vmx_index.cache.invalidate(vmx_path)
+            logger.info("Configured VM with %s CPUs and %sMB RAM", vm_config.cpu, vm_config.ram)
             
-            # Configure IP address if provided
-            if vm_config.ip_address:
-                print(f"Configuring IP address {vm_config.ip_address} for VM...")
+            # Otherwise configure the IP address in the running guest
+            if preboot_ip:
+                logger.info("IP address %s will be applied by the guest at first boot", vm_config.ip_address)
+            elif vm_config.ip_address:
+                logger.info("Configuring IP address %s for VM...", vm_config.ip_address)
                 ip_result = self._assign_ip_address(vmx_path, vm_config.ip_address, vm_config.gateway, vm_config.dns)
                 if ip_result['success']:
-                    print(f"✅ {ip_result['message']}")
+                    logger.info("%s", ip_result['message'])
                 else:
-                    print(f"⚠️ IP assignment failed: {ip_result['error']}")
+                    logger.warning("IP assignment failed: %s", ip_result['error'])
             
         except Exception as e:
-            print(f"Error configuring cloned VM: {e}")
+            logger.error("Error configuring cloned VM: %s", e)
+    
+    def _network_identity_settings(self, vmx_path: Path, vm_config: VMConfig) -> Optional[Dict[str, str]]:
+        """VMX keys handing the static IP to the guest before its first boot
+        
+        In `seed` mode a cloud-init NoCloud ISO is written next to the VMX and
+        attached; Windows guests, or hosts without an ISO tool, use `guestinfo`.
+        
+        Returns:
+            The settings, or None in `guest` mode or when the identity cannot be prepared
+        """
+        if self.ip_config_mode == 'guest':
+            return None
+        try:
+            if self.ip_config_mode == 'seed' and vm_config.os_type != 'windows':
+                net_config = network_config(vm_config.ip_address, gateway=vm_config.gateway, dns=vm_config.dns)
+                seed_iso = build_seed_iso(vmx_path.parent / 'seed.iso', vm_config.name, net_config,
+                                          self.base_directory / 'http' / 'user-data',
+                                          self.base_directory / 'http' / 'meta-data')
+                if seed_iso:
+                    return seed_cdrom_settings(seed_iso)
+                logger.info("No ISO authoring tool found for the cloud-init seed, using guestinfo")
+            return guestinfo_settings(vm_config.name, vm_config.ip_address,
+                                      gateway=vm_config.gateway, dns=vm_config.dns)
+        except Exception as e:
+            logger.warning("Could not prepare pre-boot network identity, assigning after boot: %s", e)
+            return None
     
     def _assign_ip_address(self, vmx_path: Path, ip_address: str, gateway: str, dns: str) -> Dict[str, Any]:
         """Assign IP address to VM using the IP assignment script"""
@@ -549,7 +948,8 @@ class VMwareProvider(BaseHypervisorProvider):
             from assign_ip_vmware import VMwareIPAssigner
             
             # Create IP assigner
-            assigner = VMwareIPAssigner(self.vmrun_path)
+            assigner = VMwareIPAssigner(self.vmrun_path, executor=self.vmrun,
+                                        readiness_watcher=self.guest_readiness)
             
             # Assign IP address
             result = assigner.assign_static_ip(str(vmx_path), ip_address, gateway=gateway, dns=dns)
@@ -567,19 +967,10 @@ class VMwareProvider(BaseHypervisorProvider):
                 'error': f"Error assigning IP address: {str(e)}"
             }
     
-    def _extract_vmx_value(self, vmx_content: str, key: str, default: str) -> str:
-        """Extract value from VMX content"""
-        for line in vmx_content.split('\n'):
-            if line.strip().startswith(f'{key} ='):
-                return line.split('=')[1].strip().strip('"')
-        return default
-    
     # _move_created_vm_to_created_machines_directory is removed as it is no longer needed.
     
     def _cleanup_existing_output_directory(self, vm_name: str):
-        """Clean up existing Packer output directory to prevent conflicts"""
-        import shutil
-        
+        """Move existing Packer output directories to the trash to prevent conflicts"""
         # Common output directory patterns that Packer might use
         output_dirs = [
             self.base_directory / "output-ubuntu",
@@ -591,33 +982,24 @@ class VMwareProvider(BaseHypervisorProvider):
         
         for output_dir in output_dirs:
             if output_dir.exists():
-                print(f"Cleaning up existing output directory: {output_dir}")
+                logger.info("Cleaning up existing output directory: %s", output_dir)
                 try:
                     # Stop any VMs that might be using files in this directory
                     vmx_files = list(output_dir.glob("*.vmx"))
                     for vmx_file in vmx_files:
                         try:
-                            subprocess.run([self.vmrun_path, "stop", str(vmx_file)], 
-                                         capture_output=True, check=False, timeout=30)
+                            self.vmrun.run("stop", vmx_file, timeout=30)
                         except:
                             pass  # Ignore errors if VM is not running
                     
-                    # Remove the directory
-                    shutil.rmtree(str(output_dir), ignore_errors=True)
-                    print(f"Successfully cleaned up: {output_dir}")
+                    # Free the name now; the reaper deletes the contents in the background
+                    if self.reclaimer.reclaim(output_dir):
+                        logger.info("Successfully cleaned up: %s", output_dir)
+                    else:
+                        logger.warning("Could not fully clean up %s", output_dir)
                     
                 except Exception as e:
-                    print(f"Warning: Could not fully clean up {output_dir}: {e}")
-                    # Try to remove individual files if directory removal fails
-                    try:
-                        for file_path in output_dir.rglob("*"):
-                            if file_path.is_file():
-                                try:
-                                    file_path.unlink()
-                                except:
-                                    pass
-                    except:
-                        pass
+                    logger.warning("Could not fully clean up %s: %s", output_dir, e)
     
     def open_console(self, vm_name: str) -> Dict[str, Any]:
         """Open VM console in VMware Workstation"""
@@ -639,7 +1021,7 @@ class VMwareProvider(BaseHypervisorProvider):
                 }
             
             # Launch VMware Workstation with the VM
-            print(f"Opening console for VM '{vm_name}'...")
+            logger.info("Opening console for VM '%s'...", vm_name)
             subprocess.Popen([vmware_exe, str(vmx_path)], 
                            cwd=str(vmx_path.parent))
             
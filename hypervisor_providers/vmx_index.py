@@ -0,0 +1,280 @@
+"""
+VMX Index
+VM name to VMX path index and parsed-VMX cache shared by the VMware tooling
+"""
+
+import os
+import json
+import time
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+@dataclass
+class VMXFile:
+    """A parsed VMX file and the stat it was parsed from"""
+    path: Path
+    mtime_ns: int
+    size: int
+    lines: List[str]
+    values: Dict[str, str]
+
+
+def parse_vmx(content: str) -> Dict[str, str]:
+    """Parse every key = "value" line of a VMX file in one pass"""
+    values = {}
+    for line in content.splitlines():
+        line = line.strip()
+        if '=' in line and not line.startswith('#'):
+            key, value = line.split('=', 1)
+            values[key.strip()] = value.strip().strip('"')
+    return values
+
+
+class VMXCache:
+    """Parsed VMX files keyed by path, revalidated by mtime and size"""
+
+    def __init__(self):
+        self._files: Dict[str, VMXFile] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def load(self, vmx_path: Path) -> VMXFile:
+        """Return the parsed file, re-reading it only if it changed on disk
+
+        Raises:
+            OSError: If the file does not exist or cannot be read
+        """
+        vmx_path = Path(vmx_path)
+        key = str(vmx_path)
+        stat = vmx_path.stat()
+        with self._lock:
+            cached = self._files.get(key)
+            if cached and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+                self._hits += 1
+                return cached
+            self._misses += 1
+
+        content = vmx_path.read_text(encoding='utf-8', errors='ignore')
+        vmx_file = VMXFile(path=vmx_path, mtime_ns=stat.st_mtime_ns, size=stat.st_size,
+                           lines=content.splitlines(), values=parse_vmx(content))
+        with self._lock:
+            self._files[key] = vmx_file
+        return vmx_file
+
+    def values(self, vmx_path: Path) -> Dict[str, str]:
+        """Parsed key/value settings of a VMX file"""
+        return self.load(vmx_path).values
+
+    def invalidate(self, vmx_path: Path = None):
+        """Forget one file (or all)"""
+        with self._lock:
+            if vmx_path is None:
+                self._files.clear()
+            else:
+                self._files.pop(str(vmx_path), None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'files': len(self._files), 'hits': self._hits, 'misses': self._misses}
+
+
+# One parse cache for every VMware provider and maintenance script in the process
+shared_vmx_cache = VMXCache()
+
+
+class VMXIndex:
+    """Maps VM names to VMX paths across the VM directories
+
+    VMs live in ``<root>/<name>/<name>.vmx`` for each root, in priority
+    order; template roots accept any ``*.vmx`` in ``<root>/<name>/``. A known
+    location costs one stat to confirm; unknown names fall back to probing the
+    candidate paths. Root directory listings are rescanned when their mtime
+    changes, checked at most every ``scan_interval`` seconds or by the optional
+    background watcher. VMs renamed while running keep their directory and are
+    found through aliases, persisted in ``alias_file`` when one is given.
+    """
+
+    def __init__(self, roots: List[Path], template_roots: List[Path] = None,
+                 cache: VMXCache = None, scan_interval: float = 2.0, alias_file: Path = None):
+        """Initialize VMX index
+
+        Args:
+            roots: Directories holding <name>/<name>.vmx, highest priority first
+            template_roots: Directories holding <name>/*.vmx
+            cache: Parsed-VMX cache (defaults to the process-wide cache)
+            scan_interval: Seconds between root mtime checks without a watcher
+            alias_file: JSON file persisting VM name aliases
+        """
+        self.roots = [Path(root) for root in roots]
+        self.template_roots = [Path(root) for root in (template_roots or [])]
+        self.cache = cache or shared_vmx_cache
+        self.scan_interval = scan_interval
+        self._locations: Dict[tuple, Path] = {}
+        self._listings: Dict[Path, tuple] = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stopped = threading.Event()
+        self.alias_file = Path(alias_file) if alias_file else None
+        self._aliases: Dict[str, Path] = self._load_aliases()
+
+    def locate(self, vm_name: str) -> Optional[Path]:
+        """Find the VMX file of a VM (aliases, VM roots, then template roots)"""
+        with self._lock:
+            vmx_path = self._aliases.get(vm_name)
+        if vmx_path is not None and vmx_path.exists():
+            return vmx_path
+        return self._locate(('vm', vm_name), lambda: self._probe(vm_name, self.roots) or
+                            self._probe_templates(vm_name))
+
+    def locate_template(self, template_name: str) -> Optional[Path]:
+        """Find the VMX file of a template in the template roots only"""
+        return self._locate(('template', template_name), lambda: self._probe_templates(template_name))
+
+    def _locate(self, key: tuple, probe) -> Optional[Path]:
+        with self._lock:
+            vmx_path = self._locations.get(key)
+        if vmx_path is not None:
+            if vmx_path.exists():
+                return vmx_path
+            with self._lock:
+                self._locations.pop(key, None)
+
+        vmx_path = probe()
+        if vmx_path is not None:
+            with self._lock:
+                self._locations[key] = vmx_path
+        return vmx_path
+
+    def load(self, vm_name: str) -> Optional[VMXFile]:
+        """Parsed VMX file of a VM, or None if it has none"""
+        vmx_path = self.locate(vm_name)
+        if vmx_path is None:
+            return None
+        try:
+            return self.cache.load(vmx_path)
+        except FileNotFoundError:
+            self.invalidate(vm_name)
+            return None
+
+    def names_in(self, root: Path) -> List[str]:
+        """Names of the VM directories under a root, from the cached listing"""
+        root = Path(root)
+        if self._watcher is None:
+            self._check_roots()
+        with self._lock:
+            listing = self._listings.get(root)
+        if listing is None:
+            listing = self._scan(root)
+        return list(listing[1])
+
+    def invalidate(self, vm_name: str = None):
+        """Forget the location of one VM (or all) and rescan listings on next use"""
+        with self._lock:
+            if vm_name is None:
+                self._locations.clear()
+            else:
+                for key in (('vm', vm_name), ('template', vm_name)):
+                    vmx_path = self._locations.pop(key, None)
+                    if vmx_path is not None:
+                        self.cache.invalidate(vmx_path)
+            self._listings.clear()
+
+    def add_alias(self, vm_name: str, vmx_path: Path):
+        """Make a VMX file reachable under another VM name"""
+        with self._lock:
+            self._aliases[vm_name] = Path(vmx_path)
+            self._save_aliases()
+
+    def remove_alias(self, vm_name: str):
+        with self._lock:
+            if self._aliases.pop(vm_name, None) is not None:
+                self._save_aliases()
+
+    def aliases(self) -> Dict[str, Path]:
+        """Aliased VM names whose VMX file still exists"""
+        with self._lock:
+            aliases = dict(self._aliases)
+        return {vm_name: vmx_path for vm_name, vmx_path in aliases.items() if vmx_path.exists()}
+
+    def start_watcher(self, interval: float = 2.0):
+        """Rescan changed root directories in the background"""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._watcher_stopped.clear()
+
+        def watch():
+            while not self._watcher_stopped.wait(interval):
+                self._check_roots(force=True)
+
+        self._watcher = threading.Thread(target=watch, name='vmx-index-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._watcher_stopped.set()
+        self._watcher = None
+
+    def _check_roots(self, force: bool = False):
+        """Rescan roots whose mtime changed since the last listing"""
+        now = time.time()
+        if not force and now - self._last_check < self.scan_interval:
+            return
+        self._last_check = now
+        for root in self.roots + self.template_roots:
+            with self._lock:
+                listing = self._listings.get(root)
+            if listing is None:
+                continue
+            try:
+                mtime_ns = root.stat().st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            if mtime_ns != listing[0]:
+                self._scan(root)
+
+    def _scan(self, root: Path) -> tuple:
+        try:
+            mtime_ns = root.stat().st_mtime_ns
+            names = [entry.name for entry in os.scandir(root) if entry.is_dir()]
+        except OSError:
+            mtime_ns, names = None, []
+        listing = (mtime_ns, names)
+        with self._lock:
+            self._listings[root] = listing
+        return listing
+
+    def _load_aliases(self) -> Dict[str, Path]:
+        if self.alias_file is None:
+            return {}
+        try:
+            return {vm_name: Path(vmx_path) for vm_name, vmx_path in json.loads(self.alias_file.read_text()).items()}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_aliases(self):
+        if self.alias_file is None:
+            return
+        tmp_file = self.alias_file.with_suffix('.tmp')
+        tmp_file.write_text(json.dumps({vm_name: str(vmx_path) for vm_name, vmx_path in self._aliases.items()}, indent=2))
+        tmp_file.replace(self.alias_file)
+
+    @staticmethod
+    def _probe(vm_name: str, roots: List[Path]) -> Optional[Path]:
+        for root in roots:
+            candidate = root / vm_name / f"{vm_name}.vmx"
+            if candidate.exists():
+                return candidate
+        return None
+
+    def _probe_templates(self, vm_name: str) -> Optional[Path]:
+        for root in self.template_roots:
+            template_dir = root / vm_name
+            if template_dir.is_dir():
+                vmx_files = list(template_dir.glob('*.vmx'))
+                if vmx_files:
+                    return vmx_files[0]
+        return None
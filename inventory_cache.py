@@ -0,0 +1,176 @@
+"""
+Inventory Cache
+In-memory TTL cache for provider inventory with stale-while-revalidate refresh
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Callable, Tuple, Hashable
+
+logger = logging.getLogger(__name__)
+
+FRESH = 'fresh'
+STALE = 'stale'
+MISS = 'miss'
+
+
+@dataclass
+class CacheEntry:
+    """Cached value with the time it was stored"""
+    value: Any
+    stored_at: float
+    generation: int
+
+
+class InventoryCache:
+    """TTL cache keyed by (kind, provider) with background revalidation
+
+    An entry is fresh for ``ttl`` seconds, then served stale for another
+    ``stale_ttl`` seconds while a background refresh runs, then dropped.
+    Invalidation bumps a per-key generation so a refresh that started before
+    a write can never overwrite the invalidated state.
+    """
+
+    def __init__(self, ttl: Dict[str, float] = None, stale_ttl: Dict[str, float] = None,
+                 default_ttl: float = 30.0, default_stale_ttl: float = 120.0,
+                 refresh_workers: int = 2):
+        """Initialize inventory cache
+
+        Args:
+            ttl: Freshness window in seconds per kind
+            stale_ttl: Extra window per kind during which stale data is served
+            default_ttl: Freshness window for kinds without an explicit one
+            default_stale_ttl: Stale window for kinds without an explicit one
+            refresh_workers: Number of background refresh threads
+        """
+        self.ttl = dict(ttl or {})
+        self.stale_ttl = dict(stale_ttl or {})
+        self.default_ttl = default_ttl
+        self.default_stale_ttl = default_stale_ttl
+        self._entries: Dict[Hashable, CacheEntry] = {}
+        self._generations: Dict[Hashable, int] = {}
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers,
+                                            thread_name_prefix='inventory-refresh')
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get_ttl(self, kind: str) -> float:
+        return self.ttl.get(kind, self.default_ttl)
+
+    def get_stale_ttl(self, kind: str) -> float:
+        return self.stale_ttl.get(kind, self.default_stale_ttl)
+
+    def lookup(self, kind: str, provider: str) -> Tuple[str, Any]:
+        """Look up an entry
+
+        Returns:
+            Tuple of (state, value) where state is FRESH, STALE or MISS
+        """
+        key = (kind, provider)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS, None
+
+            age = now - entry.stored_at
+            if age < self.get_ttl(kind):
+                self.hits += 1
+                return FRESH, entry.value
+            if age < self.get_ttl(kind) + self.get_stale_ttl(kind):
+                self.stale_hits += 1
+                return STALE, entry.value
+
+            del self._entries[key]
+            self.misses += 1
+            return MISS, None
+
+    def generation(self, kind: str, provider: str) -> int:
+        """Current generation of a key, captured before loading it"""
+        with self._lock:
+            return self._generations.get((kind, provider), 0)
+
+    def store(self, kind: str, provider: str, value: Any, generation: int = None) -> bool:
+        """Store a value
+
+        Args:
+            generation: Generation captured before the load started; the value
+                is discarded if the key was invalidated in the meantime
+
+        Returns:
+            True if the value was stored
+        """
+        key = (kind, provider)
+        with self._lock:
+            current = self._generations.get(key, 0)
+            if generation is not None and generation != current:
+                return False
+            self._entries[key] = CacheEntry(value=value, stored_at=time.monotonic(),
+                                            generation=current)
+            return True
+
+    def invalidate(self, kind: str = None, provider: str = None):
+        """Drop entries matching kind and/or provider (all entries when both are None)"""
+        with self._lock:
+            keys = set(self._entries) | set(self._generations)
+            for key in keys:
+                entry_kind, entry_provider = key
+                if kind is not None and entry_kind != kind:
+                    continue
+                if provider is not None and entry_provider != provider:
+                    continue
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def refresh_async(self, kind: str, provider: str, loader: Callable[[], Tuple[bool, Any]]):
+        """Reload an entry in the background unless a refresh is already running
+
+        Args:
+            loader: Callable returning (ok, value); value is stored only when ok
+        """
+        key = (kind, provider)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            generation = self._generations.get(key, 0)
+
+        def run():
+            try:
+                ok, value = loader()
+                if ok:
+                    self.store(kind, provider, value, generation)
+            except Exception as e:
+                logger.warning("Background refresh of %s for %s failed: %s", kind, provider, e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(run)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current entry ages"""
+        now = time.monotonic()
+        with self._lock:
+            total = self.hits + self.stale_hits + self.misses
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'hit_ratio': round((self.hits + self.stale_hits) / total, 3) if total else 0.0,
+                'entries': {
+                    f"{kind}:{provider}": round(now - entry.stored_at, 1)
+                    for (kind, provider), entry in self._entries.items()
+                },
+                'refreshing': [f"{kind}:{provider}" for kind, provider in self._refreshing]
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
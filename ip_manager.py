@@ -1,59 +1,67 @@
+"""
+IP Manager
+Allocates VM addresses from the IPAM pools configured in hypervisor_config.json
+"""
 
-import os
-import time
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
 
-IP_FILE = "ips.txt"
-LOCK_FILE = "ips.lock"
+from ipam import IPAM
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = "hypervisor_config.json"
+IP_FILE = "ips.txt"  # legacy allocation file, imported once
 IP_RANGE_START = 100
 IP_RANGE_END = 200
 IP_PREFIX = "192.168.122"
 
-def acquire_lock():
-    while os.path.exists(LOCK_FILE):
-        time.sleep(0.1)
-    open(LOCK_FILE, "w").close()
+_ipam: Optional[IPAM] = None
+_ipam_lock = threading.Lock()
 
-def release_lock():
-    if os.path.exists(LOCK_FILE):
-        os.remove(LOCK_FILE)
+def get_ipam(config_file: str = CONFIG_FILE) -> IPAM:
+    """Shared IPAM of this process, built from the 'ipam' section of the config"""
+    global _ipam
+    with _ipam_lock:
+        if _ipam is None:
+            config = {}
+            try:
+                config = json.loads(Path(config_file).read_text())
+            except (OSError, ValueError):
+                pass
+            ipam_config = config.get('ipam', {})
+            state_file = Path(ipam_config.get('state_file',
+                                              Path(config.get('state_directory', 'state')) / 'ipam.json'))
+            pools = ipam_config.get('pools') or {
+                'default': {'start': f"{IP_PREFIX}.{IP_RANGE_START}", 'end': f"{IP_PREFIX}.{IP_RANGE_END}"}
+            }
+            first_run = not state_file.exists()
+            _ipam = IPAM(state_file, pools, lease_ttl=ipam_config.get('lease_ttl', 3600))
+            if first_run and Path(IP_FILE).exists():
+                imported = _ipam.import_legacy_file(Path(IP_FILE))
+                logger.info("Imported %d used addresses from %s", imported, IP_FILE)
+        return _ipam
 
 def initialize_ip_pool():
-    if not os.path.exists(IP_FILE):
-        with open(IP_FILE, "w") as f:
-            for i in range(IP_RANGE_START, IP_RANGE_END + 1):
-                f.write(f"{IP_PREFIX}.{i}\n")
-
-def get_available_ip():
-    acquire_lock()
-    try:
-        with open(IP_FILE, "r+") as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if not line.endswith(" # used"):
-                    ip = line
-                    lines[i] = f"{line} # used\n"
-                    f.seek(0)
-                    f.writelines(lines)
-                    return ip
-    finally:
-        release_lock()
-    return None
+    get_ipam()
+
+def get_available_ip(provider: str = None, network: str = None, owner: str = None) -> Optional[str]:
+    """Lease the next free address of the pool serving provider/network to the VM named owner"""
+    return get_ipam().lease(owner=owner, provider=provider, network=network)
+
+def bind_ip(ip: str, owner: str = None, provider: str = None) -> bool:
+    """Mark a leased address as in use by a VM that now exists"""
+    return get_ipam().bind(ip, owner=owner, provider=provider)
 
 def release_ip(ip_to_release):
-    acquire_lock()
-    try:
-        with open(IP_FILE, "r+") as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                if line.strip() == f"{ip_to_release} # used":
-                    lines[i] = f"{ip_to_release}\n"
-                    f.seek(0)
-                    f.writelines(lines)
-                    f.truncate()
-                    break
-    finally:
-        release_lock()
+    return get_ipam().release(ip_to_release)
+
+def release_vm_ips(vm_name: str, provider: str = None):
+    """Release every address leased to a VM, e.g. after it was deleted"""
+    return get_ipam().release_owner(vm_name, provider)
 
 if __name__ == "__main__":
     initialize_ip_pool()
@@ -0,0 +1,547 @@
+"""
+IP Address Management
+Bitmap-backed IP pools shared safely between API workers and CLI processes
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import ipaddress
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Any
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Lease states: reserved for an operation, bound to a VM that exists, released back to the pool
+RESERVED = 'reserved'
+BOUND = 'bound'
+RELEASED = 'released'
+
+
+@dataclass
+class IPPool:
+    """A contiguous address range and which of its addresses are allocated"""
+    name: str
+    start: ipaddress.IPv4Address
+    end: ipaddress.IPv4Address
+    providers: List[str] = field(default_factory=list)
+    networks: List[str] = field(default_factory=list)
+    bitmap: bytearray = field(default_factory=bytearray)
+    free: deque = field(default_factory=deque)  # free offsets, allocation order
+
+    @property
+    def size(self) -> int:
+        return int(self.end) - int(self.start) + 1
+
+    def offset(self, ip: str) -> Optional[int]:
+        try:
+            value = int(ipaddress.IPv4Address(ip)) - int(self.start)
+        except ValueError:
+            return None
+        return value if 0 <= value < self.size else None
+
+    def is_set(self, offset: int) -> bool:
+        return bool(self.bitmap[offset >> 3] & (1 << (offset & 7)))
+
+    def set(self, offset: int, used: bool):
+        if used:
+            self.bitmap[offset >> 3] |= 1 << (offset & 7)
+        else:
+            self.bitmap[offset >> 3] &= ~(1 << (offset & 7)) & 0xFF
+
+    def rebuild_free_list(self):
+        self.free = deque(offset for offset in range(self.size) if not self.is_set(offset))
+
+
+class FileLock:
+    """Exclusive lock on a file, held across processes (flock, or msvcrt on Windows)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    @contextmanager
+    def hold(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a+b') as handle:
+            if fcntl:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            else:
+                handle.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue  # LK_LOCK gives up after ~10 s; keep waiting
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+                else:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class IPAM:
+    """Allocates addresses from named pools with O(1) allocate and release
+
+    Allocation state is a bitmap per pool, persisted in a JSON state file
+    that is replaced atomically. Every change is made under an exclusive
+    file lock; the in-memory free lists are rebuilt only when another process
+    changed the file since this one last read it.
+
+    Addresses handed to create/clone operations carry a lease: reserved
+    with an expiry while the operation runs, bound once the VM exists, and
+    released (removed) when the operation fails or the VM is deleted.
+    """
+
+    def __init__(self, state_file: Path, pools: Dict[str, Dict[str, Any]], lease_ttl: float = 3600.0):
+        """Initialize IPAM
+
+        Args:
+            state_file: JSON file persisting the bitmaps (a '.lock' file is created next to it)
+            pools: Pool name -> {'start', 'end', optional 'providers' and 'networks' served}
+            lease_ttl: Seconds a reserved lease lives unless renewed or bound
+        """
+        self.state_file = Path(state_file)
+        self.lease_ttl = lease_ttl
+        self._leases: Dict[str, Dict[str, Any]] = {}
+        self.released_leases = 0
+        self.file_lock = FileLock(self.state_file.with_name(self.state_file.name + '.lock'))
+        self._lock = threading.Lock()
+        self._pools: Dict[str, IPPool] = {}
+        for name, pool_config in pools.items():
+            pool = IPPool(name=name,
+                          start=ipaddress.IPv4Address(pool_config['start']),
+                          end=ipaddress.IPv4Address(pool_config['end']),
+                          providers=list(pool_config.get('providers', [])),
+                          networks=list(pool_config.get('networks', [])))
+            if pool.size <= 0:
+                raise ValueError(f"IP pool '{name}' ends before it starts")
+            pool.bitmap = bytearray((pool.size + 7) // 8)
+            pool.rebuild_free_list()
+            self._pools[name] = pool
+        self._signature = None
+        # Requests no pool claims go to 'default', else to the first pool without restrictions
+        unrestricted = [pool.name for pool in self._pools.values() if not pool.providers and not pool.networks]
+        self.default_pool = 'default' if 'default' in self._pools else next(iter(unrestricted or self._pools), None)
+
+    def pool_for(self, provider: str = None, network: str = None) -> Optional[str]:
+        """Name of the pool serving a provider/network: exact match, then provider, then the default"""
+        for pool in self._pools.values():
+            if network and network in pool.networks and (not provider or not pool.providers
+                                                         or provider in pool.providers):
+                return pool.name
+        for pool in self._pools.values():
+            if provider and provider in pool.providers and not pool.networks:
+                return pool.name
+        return self.default_pool
+
+    def allocate(self, pool: str = None, provider: str = None, network: str = None) -> Optional[str]:
+        """Take the next free address of a pool, or None if it is exhausted"""
+        name = pool or self.pool_for(provider, network)
+        with self._transaction():
+            return self._allocate(name)
+
+    def lease(self, owner: str = None, provider: str = None, network: str = None,
+              ttl: float = None) -> Optional[str]:
+        """Allocate an address with a reserved lease for the VM an operation creates
+
+        Args:
+            owner: Name of the VM the address is for
+            provider: Provider the VM is created on (also selects the pool)
+            network: Network the VM is attached to (also selects the pool)
+            ttl: Seconds before the reservation expires, instead of lease_ttl
+
+        Returns:
+            The address, or None if the pool is exhausted
+        """
+        now = time.time()
+        with self._transaction():
+            ip = self._allocate(self.pool_for(provider, network))
+            if ip:
+                self._leases[ip] = {'state': RESERVED, 'owner': owner, 'provider': provider,
+                                    'reserved_at': now, 'expires_at': now + (ttl or self.lease_ttl)}
+            return ip
+
+    def bind(self, ip: str, owner: str = None, provider: str = None) -> bool:
+        """Mark a lease bound to an existing VM; it no longer expires"""
+        with self._transaction():
+            lease = self._leases.get(ip)
+            if lease is None:
+                ip_pool, offset = self._locate(ip)
+                if ip_pool is None or not ip_pool.is_set(offset):
+                    return False
+                lease = self._leases[ip] = {'owner': owner, 'provider': provider, 'reserved_at': time.time()}
+            lease.update(state=BOUND, bound_at=time.time(), expires_at=None)
+            lease.pop('missing_since', None)
+            if owner:
+                lease['owner'] = owner
+            if provider:
+                lease['provider'] = provider
+            return True
+
+    def renew(self, ip: str, ttl: float = None) -> bool:
+        """Push back the expiry of a reserved lease"""
+        with self._transaction():
+            lease = self._leases.get(ip)
+            if lease is None or lease['state'] != RESERVED:
+                return False
+            lease['expires_at'] = time.time() + (ttl or self.lease_ttl)
+            return True
+
+    def mark_missing(self, ip: str, missing: bool) -> Optional[float]:
+        """Record since when a leased VM is absent from the inventory
+
+        Returns:
+            The time it was first seen missing, or None once it is present again
+        """
+        with self._transaction():
+            lease = self._leases.get(ip)
+            if lease is None:
+                return None
+            if not missing:
+                lease.pop('missing_since', None)
+                return None
+            return lease.setdefault('missing_since', time.time())
+
+    def release_owner(self, owner: str, provider: str = None) -> List[str]:
+        """Release every address leased to a VM (e.g. after it was deleted)"""
+        with self._transaction():
+            released = [ip for ip, lease in self._leases.items()
+                        if lease.get('owner') == owner and provider in (None, lease.get('provider'))]
+            for ip in released:
+                self._release(ip)
+            return released
+
+    def leases(self) -> Dict[str, Dict[str, Any]]:
+        """Current leases by address"""
+        with self._transaction(write=False):
+            return {ip: dict(lease) for ip, lease in self._leases.items()}
+
+    def reserve(self, ip: str) -> bool:
+        """Mark a specific address as allocated; False if it is already taken or in no pool"""
+        with self._transaction():
+            ip_pool, offset = self._locate(ip)
+            if ip_pool is None or ip_pool.is_set(offset):
+                return False
+            ip_pool.set(offset, True)
+            return True
+
+    def adopt(self, ip: str) -> bool:
+        """Give an allocated address without a lease an unowned bound lease
+
+        Reconciliation then treats it like any other bound lease: it is bound
+        to the VM reporting the address, or released after the grace period.
+        """
+        with self._transaction():
+            ip_pool, offset = self._locate(ip)
+            if ip in self._leases or ip_pool is None or not ip_pool.is_set(offset):
+                return False
+            now = time.time()
+            self._leases[ip] = {'state': BOUND, 'owner': None, 'provider': None,
+                                'reserved_at': now, 'bound_at': now, 'expires_at': None}
+            return True
+
+    def release(self, ip: str) -> bool:
+        """Return an address to its pool; False if it was not allocated"""
+        with self._transaction():
+            return self._release(ip)
+
+    def is_allocated(self, ip: str) -> bool:
+        with self._transaction(write=False):
+            ip_pool, offset = self._locate(ip)
+            return ip_pool is not None and ip_pool.is_set(offset)
+
+    def allocated(self, pool: str = None) -> List[str]:
+        """Allocated addresses of one pool or of all pools"""
+        with self._transaction(write=False):
+            return [str(ip_pool.start + offset)
+                    for ip_pool in self._pools.values() if pool in (None, ip_pool.name)
+                    for offset in self._allocated_offsets(ip_pool)]
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and utilization of every pool"""
+        with self._transaction(write=False):
+            stats = {}
+            for ip_pool in self._pools.values():
+                used = sum(bin(byte).count('1') for byte in ip_pool.bitmap)
+                stats[ip_pool.name] = {
+                    'start': str(ip_pool.start),
+                    'end': str(ip_pool.end),
+                    'size': ip_pool.size,
+                    'allocated': used,
+                    'free': ip_pool.size - used,
+                    'utilization': round(used / ip_pool.size, 3)
+                }
+            return stats
+
+    def lease_stats(self) -> Dict[str, Any]:
+        """Lease counts by state"""
+        with self._transaction(write=False):
+            now = time.time()
+            counts = {RESERVED: 0, BOUND: 0}
+            for lease in self._leases.values():
+                counts[lease['state']] += 1
+            return {
+                **counts,
+                'expired': sum(1 for lease in self._leases.values()
+                               if lease['state'] == RESERVED and lease['expires_at'] < now),
+                'unleased': sum(len(self._allocated_offsets(ip_pool)) for ip_pool in self._pools.values())
+                            - len(self._leases),
+                RELEASED: self.released_leases
+            }
+
+    def import_legacy_file(self, ip_file: Path) -> int:
+        """Adopt addresses flagged '# used' in an ips.txt file (first run only)
+
+        ips.txt never recorded which VM holds an address, so each one gets an
+        unowned lease: reconciliation binds it to the VM reporting the address
+        or releases it once no VM does.
+        """
+        count = 0
+        for line in Path(ip_file).read_text().splitlines():
+            ip = line.split('#')[0].strip()
+            if line.strip().endswith('# used') and self.reserve(ip) and self.adopt(ip):
+                count += 1
+        return count
+
+    @contextmanager
+    def _transaction(self, write: bool = True):
+        """Hold the thread and file locks with state current; persist changes on success"""
+        with self._lock, self.file_lock.hold():
+            self._refresh()
+            try:
+                yield
+            except BaseException:
+                self._signature = None  # Re-read the persisted state rather than trust a half-applied change
+                raise
+            if write:
+                self._save()
+
+    def _allocate(self, name: str) -> Optional[str]:
+        ip_pool = self._pools[name]
+        while ip_pool.free:
+            offset = ip_pool.free.popleft()
+            if not ip_pool.is_set(offset):
+                ip_pool.set(offset, True)
+                return str(ip_pool.start + offset)
+        return None
+
+    def _release(self, ip: str) -> bool:
+        if self._leases.pop(ip, None) is not None:
+            self.released_leases += 1
+        ip_pool, offset = self._locate(ip)
+        if ip_pool is None or not ip_pool.is_set(offset):
+            return False
+        ip_pool.set(offset, False)
+        ip_pool.free.append(offset)
+        return True
+
+    @staticmethod
+    def _allocated_offsets(ip_pool: IPPool) -> List[int]:
+        return [offset for offset in range(ip_pool.size) if ip_pool.is_set(offset)]
+
+    def _locate(self, ip: str):
+        for ip_pool in self._pools.values():
+            offset = ip_pool.offset(ip)
+            if offset is not None:
+                return ip_pool, offset
+        return None, None
+
+    def _file_signature(self):
+        try:
+            stat = self.state_file.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _refresh(self):
+        """Reload the bitmaps if another process wrote the state file"""
+        signature = self._file_signature()
+        if signature is None or signature == self._signature:
+            return
+        try:
+            data = json.loads(self.state_file.read_text())
+        except (OSError, ValueError) as e:
+            logger.error("Could not read IPAM state %s: %s", self.state_file, e)
+            return
+        for name, saved in data.get('pools', {}).items():
+            ip_pool = self._pools.get(name)
+            if ip_pool is None:
+                continue
+            if saved.get('start') == str(ip_pool.start) and saved.get('end') == str(ip_pool.end):
+                ip_pool.bitmap = bytearray.fromhex(saved['bitmap'])
+            else:
+                # The pool's range changed in config: keep saved allocations that still fit
+                saved_pool = IPPool(name=name, start=ipaddress.IPv4Address(saved['start']),
+                                    end=ipaddress.IPv4Address(saved['end']),
+                                    bitmap=bytearray.fromhex(saved['bitmap']))
+                ip_pool.bitmap = bytearray((ip_pool.size + 7) // 8)
+                for offset in range(saved_pool.size):
+                    new_offset = ip_pool.offset(str(saved_pool.start + offset))
+                    if saved_pool.is_set(offset) and new_offset is not None:
+                        ip_pool.set(new_offset, True)
+            ip_pool.rebuild_free_list()
+        self._leases = data.get('leases', {})
+        self._signature = signature
+
+    def _save(self):
+        data = {'pools': {
+            ip_pool.name: {'start': str(ip_pool.start), 'end': str(ip_pool.end), 'bitmap': ip_pool.bitmap.hex()}
+            for ip_pool in self._pools.values()
+        }, 'leases': self._leases}
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file.with_name(f"{self.state_file.name}.{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(data, indent=2))
+        os.replace(tmp_file, self.state_file)
+        self._signature = self._file_signature()
+
+
+class LeaseReconciler:
+    """Background loop matching IP leases against the live VM inventory
+
+    Every ``interval`` seconds it lists VMs on all providers and:
+
+    - renews reserved leases whose operation is still running, binds those whose
+      VM now exists and releases those that expired;
+    - releases bound leases whose VM has been missing from its provider's
+      inventory for longer than ``grace`` (a provider that failed to list is
+      never taken as evidence that its VMs are gone);
+    - binds allocated addresses without a lease when a VM reports them.
+    """
+
+    def __init__(self, ipam: IPAM, inventory: Callable[[], Dict[str, List[Any]]],
+                 is_active: Callable[[str, str], bool] = None, interval: float = 60.0,
+                 grace: float = 900.0, providers: Callable[[], List[str]] = None):
+        """Initialize reconciler
+
+        Args:
+            ipam: IPAM holding the leases
+            inventory: Returns provider name -> VMs (objects with name and ip_address)
+                for the providers that listed successfully
+            is_active: is_active(provider, vm_name) tells whether an operation for the VM is in flight
+            interval: Seconds between passes
+            grace: Seconds a bound VM may be missing before its address is released
+            providers: Returns the names of every configured provider. Addresses no
+                provider is known for are only released by passes in which all of
+                them listed; without it every pass counts as complete.
+        """
+        self.ipam = ipam
+        self.inventory = inventory
+        self.is_active = is_active or (lambda provider, owner: False)
+        self.interval = interval
+        self.grace = grace
+        self.providers = providers
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.passes = 0
+        self.renewed = 0
+        self.bound = 0
+        self.expired = 0
+        self.orphaned = 0
+        self.last_error: Optional[str] = None
+        self.last_run: Optional[float] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='lease-reconciler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def reconcile_once(self) -> Dict[str, int]:
+        """Run one pass
+
+        Returns:
+            Number of leases renewed, bound, expired and released as orphans in this pass
+        """
+        inventory = self.inventory()
+        by_name: Dict[str, Dict[str, Any]] = {}
+        by_ip: Dict[str, tuple] = {}
+        for provider, vms in inventory.items():
+            for vm in vms or []:
+                by_name.setdefault(provider, {})[vm.name] = vm
+                if vm.ip_address:
+                    by_ip[vm.ip_address] = (provider, vm.name)
+
+        # Unowned addresses may belong to any provider, so they need a full listing
+        complete = self.providers is None or set(self.providers()) <= set(inventory)
+
+        counts = {'renewed': 0, 'bound': 0, 'expired': 0, 'orphaned': 0}
+        now = time.time()
+        leases = self.ipam.leases()
+        for ip, lease in leases.items():
+            provider, owner = lease.get('provider'), lease.get('owner')
+            seen = by_ip.get(ip)
+            if owner and provider in by_name and owner in by_name[provider]:
+                seen = (provider, owner)
+
+            if lease['state'] == RESERVED:
+                if self.is_active(provider, owner):
+                    counts['renewed'] += self.ipam.renew(ip)
+                elif seen:
+                    counts['bound'] += self.ipam.bind(ip, seen[1], seen[0])
+                elif lease['expires_at'] < now:
+                    counts['expired'] += self.ipam.release(ip)
+            elif seen and not owner:
+                counts['bound'] += self.ipam.bind(ip, seen[1], seen[0])
+            elif seen or self.is_active(provider, owner):
+                self.ipam.mark_missing(ip, False)
+            elif provider in inventory if provider else complete:
+                missing_since = self.ipam.mark_missing(ip, True)
+                if missing_since is not None and time.time() - missing_since >= self.grace:
+                    counts['orphaned'] += self.ipam.release(ip)
+
+        for ip in self.ipam.allocated():
+            if ip in leases:
+                continue
+            if ip in by_ip:
+                counts['bound'] += self.ipam.bind(ip, by_ip[ip][1], by_ip[ip][0])
+            elif complete:
+                self.ipam.adopt(ip)  # released by a later pass once the grace period ends
+
+        self.passes += 1
+        self.renewed += counts['renewed']
+        self.bound += counts['bound']
+        self.expired += counts['expired']
+        self.orphaned += counts['orphaned']
+        self.last_run = now
+        return counts
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'passes': self.passes,
+            'renewed': self.renewed,
+            'bound': self.bound,
+            'expired': self.expired,
+            'orphaned': self.orphaned,
+            'interval': self.interval,
+            'grace': self.grace,
+            'last_run': self.last_run,
+            'last_error': self.last_error
+        }
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.reconcile_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error("Lease reconciliation failed: %s", e)
@@ -0,0 +1,370 @@
+"""
+Job Queue
+Runs long VM provisioning operations in bounded per-provider worker pools
+"""
+
+import time
+import uuid
+import logging
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Callable
+
+from hypervisor_providers.progress import progress_listener
+from job_store import OP_COMPLETED_ON_RECOVERY
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class DuplicateJobError(Exception):
+    """Raised when a VM already has a queued or running job"""
+
+    def __init__(self, job: 'Job'):
+        super().__init__(f"VM '{job.vm_name}' already has a {job.kind} job in progress")
+        self.job = job
+
+
+@dataclass
+class Job:
+    """A provisioning operation and its progress"""
+    id: str
+    kind: str
+    provider: str
+    vm_name: Optional[str] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+    state: str = QUEUED
+    phase: str = QUEUED
+    message: Optional[str] = None
+    percent: Optional[int] = None
+    attempts: int = 0
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    events: deque = field(default_factory=lambda: deque(maxlen=50))
+
+    def update_progress(self, phase: str, message: str = None, percent: int = None):
+        """Record a progress event"""
+        self.phase = phase
+        if message is not None:
+            self.message = message
+        if percent is not None:
+            self.percent = max(0, min(100, percent))
+        self.events.append({
+            'time': time.time(),
+            'phase': phase,
+            'message': message,
+            'percent': self.percent
+        })
+
+    def to_record(self) -> Dict[str, Any]:
+        """Serialize every field for the job store"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'provider': self.provider,
+            'vm_name': self.vm_name,
+            'params': self.params,
+            'state': self.state,
+            'phase': self.phase,
+            'message': self.message,
+            'percent': self.percent,
+            'attempts': self.attempts,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'result': self.result,
+            'error': self.error,
+            'events': list(self.events)
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> 'Job':
+        """Rebuild a job loaded from the job store"""
+        fields = dict(record)
+        events = fields.pop('events', None) or []
+        job = cls(**fields)
+        job.events.extend(events)
+        return job
+
+    def to_dict(self, include_events: bool = False) -> Dict[str, Any]:
+        """Serialize for API responses"""
+        now = time.time()
+        queued_until = self.started_at or now
+        data = {
+            'id': self.id,
+            'kind': self.kind,
+            'provider': self.provider,
+            'vm_name': self.vm_name,
+            'state': self.state,
+            'phase': self.phase,
+            'message': self.message,
+            'percent': self.percent,
+            'attempts': self.attempts,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'queue_seconds': round(queued_until - self.created_at, 3),
+            'run_seconds': round((self.finished_at or now) - self.started_at, 3) if self.started_at else None,
+            'result': self.result,
+            'error': self.error
+        }
+        if include_events:
+            data['events'] = list(self.events)
+        return data
+
+
+class JobQueue:
+    """Per-provider bounded worker pools for create/clone jobs
+
+    Jobs are executed by handlers registered per kind, so a job persisted in
+    the job store can be rebuilt from its parameters and resumed after a
+    restart.
+    """
+
+    def __init__(self, workers: Dict[str, int] = None, default_workers: int = 2,
+                 max_finished: int = 500, store=None, max_attempts: int = 2,
+                 on_finish: Callable[[Job], None] = None):
+        """Initialize job queue
+
+        Args:
+            workers: Number of concurrent jobs per provider
+            default_workers: Concurrency for providers without an explicit value
+            max_finished: Number of finished jobs kept for status queries
+            store: Optional JobStore that makes jobs durable across restarts
+            max_attempts: Attempts allowed for a job interrupted by a restart
+            on_finish: Callback invoked once a job has succeeded or failed for good
+        """
+        self.workers = dict(workers or {})
+        self.default_workers = default_workers
+        self.max_finished = max_finished
+        self.store = store
+        self.max_attempts = max_attempts
+        self.on_finish = on_finish
+        self._handlers: Dict[str, Callable[[Job], Dict[str, Any]]] = {}
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+
+    def register_handler(self, kind: str, handler: Callable[[Job], Dict[str, Any]]):
+        """Register the function that executes jobs of a kind
+
+        Args:
+            kind: Operation type ('create_vm', 'clone_vm', ...)
+            handler: Callable taking the Job and returning a provider result dict
+        """
+        self._handlers[kind] = handler
+
+    def _get_executor(self, provider: str) -> ThreadPoolExecutor:
+        executor = self._executors.get(provider)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=self.workers.get(provider, self.default_workers),
+                thread_name_prefix=f'jobs-{provider}')
+            self._executors[provider] = executor
+        return executor
+
+    def submit(self, kind: str, provider: str, vm_name: str = None,
+               params: Dict[str, Any] = None) -> Job:
+        """Enqueue an operation
+
+        Args:
+            kind: Operation type with a registered handler
+            provider: Provider whose worker pool runs the job
+            vm_name: VM the job works on, used to reject duplicates
+            params: JSON-serializable parameters passed to the handler
+
+        Returns:
+            The queued Job
+
+        Raises:
+            DuplicateJobError: If vm_name already has an active job on this provider
+            ValueError: If no handler is registered for kind
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+
+        job = Job(id=uuid.uuid4().hex, kind=kind, provider=provider,
+                  vm_name=vm_name, params=dict(params or {}))
+        job.update_progress(QUEUED, f"Waiting for a {provider} worker")
+
+        with self._lock:
+            if vm_name:
+                active = self._find_active(provider, vm_name)
+                if active:
+                    raise DuplicateJobError(active)
+            self._jobs[job.id] = job
+            self._prune()
+
+        self._persist(job)
+        self._enqueue(job)
+        return job
+
+    def _enqueue(self, job: Job):
+        with self._lock:
+            executor = self._get_executor(job.provider)
+        executor.submit(self._execute, job)
+
+    def _execute(self, job: Job):
+        """Run a job on a worker thread and record the outcome"""
+        job.state = RUNNING
+        job.started_at = time.time()
+        job.attempts += 1
+        job.update_progress(RUNNING, f"{job.kind} started")
+        self._persist(job)
+
+        def on_progress(phase, message=None, percent=None):
+            job.update_progress(phase, message, percent)
+            if self.store:
+                self.store.update_job(job.id, phase=job.phase, message=job.message,
+                                      percent=job.percent, events=list(job.events))
+
+        try:
+            with progress_listener(on_progress, job_id=job.id):
+                result = self._handlers[job.kind](job)
+        except Exception as e:
+            result = {'success': False, 'error': f"Unexpected error: {str(e)}"}
+
+        self._finish(job, result)
+
+    def _finish(self, job: Job, result: Dict[str, Any]):
+        """Record the final outcome of a job"""
+        job.result = result
+        job.finished_at = time.time()
+        if result.get('success'):
+            job.state = SUCCEEDED
+            job.update_progress(SUCCEEDED, result.get('message'), 100)
+        else:
+            job.state = FAILED
+            job.error = result.get('error', 'Unknown error')
+            job.update_progress(FAILED, job.error)
+        self._persist(job)
+
+        if self.on_finish:
+            try:
+                self.on_finish(job)
+            except Exception as e:
+                logger.error("Job finish callback failed for %s: %s", job.id, e)
+
+    def _persist(self, job: Job):
+        if self.store:
+            try:
+                self.store.save_job(job.to_record())
+            except Exception as e:
+                logger.error("Failed to persist job %s: %s", job.id, e)
+
+    def recover(self) -> Dict[str, List[str]]:
+        """Reload jobs from the store after a restart
+
+        Queued jobs are resumed. Running jobs are resolved from the operation
+        journal: if their provider operation was completed during recovery the
+        job succeeds, otherwise it is retried until max_attempts and then fails.
+        Run HypervisorManager.recover_operations() first.
+
+        Returns:
+            Job IDs per outcome ('resumed', 'completed', 'failed')
+        """
+        summary = {'resumed': [], 'completed': [], 'failed': []}
+        if not self.store:
+            return summary
+
+        for record in self.store.load_jobs(limit=self.max_finished):
+            job = Job.from_record(record)
+            with self._lock:
+                self._jobs[job.id] = job
+
+        for record in self.store.load_jobs(states=list(ACTIVE_STATES)):
+            job = self._jobs.get(record['id']) or Job.from_record(record)
+            with self._lock:
+                self._jobs[job.id] = job
+
+            if job.kind not in self._handlers:
+                self._finish(job, {'success': False, 'error': f"No handler for job kind '{job.kind}' after restart"})
+                summary['failed'].append(job.id)
+                continue
+
+            if job.state == RUNNING:
+                operations = self.store.operations_for_job(job.id)
+                if operations and operations[-1]['state'] == OP_COMPLETED_ON_RECOVERY:
+                    self._finish(job, {
+                        'success': True,
+                        'vm_name': job.vm_name,
+                        'provider': job.provider,
+                        'recovered': True,
+                        'message': f"{job.kind} for '{job.vm_name}' completed before the restart"
+                    })
+                    summary['completed'].append(job.id)
+                    continue
+
+                if job.attempts >= self.max_attempts:
+                    self._finish(job, {'success': False, 'error': "Interrupted by an application restart and rolled back"})
+                    summary['failed'].append(job.id)
+                    continue
+
+            job.state = QUEUED
+            job.started_at = None
+            job.update_progress(QUEUED, "Resumed after application restart")
+            self._persist(job)
+            self._enqueue(job)
+            summary['resumed'].append(job.id)
+
+        return summary
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond max_finished"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.state not in ACTIVE_STATES]
+        excess = max(0, len(finished) - self.max_finished)
+        for job_id in finished[:excess]:
+            del self._jobs[job_id]
+        if excess and self.store:
+            self.store.prune_jobs(self.max_finished)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by ID"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find_active(self, provider: str, vm_name: str) -> Optional[Job]:
+        """Find a queued or running job for the same VM"""
+        with self._lock:
+            return self._find_active(provider, vm_name)
+
+    def _find_active(self, provider: str, vm_name: str) -> Optional[Job]:
+        for job in self._jobs.values():
+            if job.provider == provider and job.vm_name == vm_name and job.state in ACTIVE_STATES:
+                return job
+        return None
+
+    def list_jobs(self, state: str = None, provider: str = None, limit: int = 50) -> List[Job]:
+        """List jobs, newest first"""
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+        if state:
+            jobs = [job for job in jobs if job.state == state]
+        if provider:
+            jobs = [job for job in jobs if job.provider == provider]
+        return jobs[:limit]
+
+    def queue_depth(self) -> Dict[str, Dict[str, int]]:
+        """Number of queued and running jobs per provider"""
+        depth: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for job in self._jobs.values():
+                if job.state in ACTIVE_STATES:
+                    counts = depth.setdefault(job.provider, {QUEUED: 0, RUNNING: 0})
+                    counts[job.state] += 1
+        return depth
+
+    def shutdown(self, wait: bool = False):
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
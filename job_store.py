@@ -0,0 +1,191 @@
+"""
+Job Store
+Durable SQLite journal of provisioning jobs and provider operations
+"""
+
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+# Operation states
+OP_STARTED = 'started'
+OP_SUCCEEDED = 'succeeded'
+OP_FAILED = 'failed'
+OP_COMPLETED_ON_RECOVERY = 'completed_on_recovery'
+OP_ROLLED_BACK = 'rolled_back'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    vm_name TEXT,
+    params TEXT NOT NULL,
+    state TEXT NOT NULL,
+    phase TEXT,
+    message TEXT,
+    percent INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT,
+    events TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+
+CREATE TABLE IF NOT EXISTS operations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT,
+    provider TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    vm_name TEXT,
+    state TEXT NOT NULL,
+    checkpoint TEXT,
+    resources TEXT NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS operations_state ON operations (state);
+"""
+
+
+class JobStore:
+    """WAL-mode SQLite store shared by the job queue and the operation journal"""
+
+    def __init__(self, db_path: str = "state/jobs.db"):
+        """Open (and create if needed) the job database
+
+        Args:
+            db_path: Path to the SQLite file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                                     isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # Jobs
+
+    def save_job(self, job: Dict[str, Any]):
+        """Insert or replace a job record"""
+        self._execute(
+            """INSERT OR REPLACE INTO jobs
+               (id, kind, provider, vm_name, params, state, phase, message, percent, attempts,
+                created_at, started_at, finished_at, result, error, events)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (job['id'], job['kind'], job['provider'], job.get('vm_name'),
+             json.dumps(job.get('params', {})), job['state'], job.get('phase'),
+             job.get('message'), job.get('percent'), job.get('attempts', 0),
+             job['created_at'], job.get('started_at'), job.get('finished_at'),
+             json.dumps(job.get('result')) if job.get('result') is not None else None,
+             job.get('error'), json.dumps(job.get('events', [])))
+        )
+
+    def update_job(self, job_id: str, **fields):
+        """Update selected columns of a job"""
+        if not fields:
+            return
+        for key in ('params', 'result', 'events'):
+            if key in fields and fields[key] is not None:
+                fields[key] = json.dumps(fields[key])
+        columns = ', '.join(f"{key} = ?" for key in fields)
+        self._execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def load_jobs(self, states: List[str] = None, limit: int = None) -> List[Dict[str, Any]]:
+        """Load jobs, oldest first"""
+        sql = "SELECT * FROM jobs"
+        params: tuple = ()
+        if states:
+            sql += f" WHERE state IN ({', '.join('?' for _ in states)})"
+            params = tuple(states)
+        if limit:
+            sql = f"SELECT * FROM ({sql} ORDER BY created_at DESC LIMIT {int(limit)})"
+        sql += " ORDER BY created_at"
+        return [self._job_from_row(row) for row in self._query(sql, params)]
+
+    def prune_jobs(self, keep: int):
+        """Delete finished jobs beyond the newest ``keep``"""
+        self._execute(
+            """DELETE FROM jobs WHERE state NOT IN ('queued', 'running') AND id NOT IN
+               (SELECT id FROM jobs WHERE state NOT IN ('queued', 'running')
+                ORDER BY created_at DESC LIMIT ?)""", (keep,))
+
+    @staticmethod
+    def _job_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['params'] = json.loads(job['params'] or '{}')
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        job['events'] = json.loads(job['events'] or '[]')
+        return job
+
+    # Operation journal
+
+    def begin_operation(self, provider: str, kind: str, vm_name: str = None,
+                        resources: Dict[str, Any] = None, job_id: str = None) -> int:
+        """Record the intent to run a provider operation
+
+        Returns:
+            Operation ID used for checkpoints and the outcome
+        """
+        now = time.time()
+        cursor = self._execute(
+            """INSERT INTO operations
+               (job_id, provider, kind, vm_name, state, checkpoint, resources, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (job_id, provider, kind, vm_name, OP_STARTED, 'intent',
+             json.dumps(resources or {}), now, now)
+        )
+        return cursor.lastrowid
+
+    def checkpoint_operation(self, op_id: int, checkpoint: str, resources: Dict[str, Any] = None):
+        """Record progress of an operation and merge newly owned resources"""
+        with self._lock:
+            row = self._conn.execute("SELECT resources FROM operations WHERE id = ?", (op_id,)).fetchone()
+            if row is None:
+                return
+            merged = json.loads(row['resources'] or '{}')
+            merged.update({key: value for key, value in (resources or {}).items() if value is not None})
+            self._conn.execute(
+                "UPDATE operations SET checkpoint = ?, resources = ?, updated_at = ? WHERE id = ?",
+                (checkpoint, json.dumps(merged), time.time(), op_id))
+
+    def finish_operation(self, op_id: int, state: str, error: str = None):
+        """Record the outcome of an operation"""
+        self._execute("UPDATE operations SET state = ?, error = ?, updated_at = ? WHERE id = ?",
+                      (state, error, time.time(), op_id))
+
+    def open_operations(self) -> List[Dict[str, Any]]:
+        """Operations that started but never recorded an outcome"""
+        rows = self._query("SELECT * FROM operations WHERE state = ? ORDER BY id", (OP_STARTED,))
+        operations = []
+        for row in rows:
+            operation = dict(row)
+            operation['resources'] = json.loads(operation['resources'] or '{}')
+            operations.append(operation)
+        return operations
+
+    def operations_for_job(self, job_id: str) -> List[Dict[str, Any]]:
+        rows = self._query("SELECT * FROM operations WHERE job_id = ? ORDER BY id", (job_id,))
+        return [dict(row, resources=json.loads(row['resources'] or '{}')) for row in rows]
@@ -0,0 +1,182 @@
+"""
+Provider Fan-out
+Runs the same query against several hypervisor providers concurrently
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Callable, Tuple
+
+
+@dataclass
+class ProviderResult:
+    """Outcome of one provider call inside a fan-out"""
+    provider: str
+    value: Any = None
+    error: Optional[str] = None
+    timed_out: bool = False
+    duration: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.timed_out
+
+
+@dataclass
+class FanoutResult:
+    """Aggregated outcome of a fan-out across providers"""
+    operation: str
+    results: Dict[str, ProviderResult] = field(default_factory=dict)
+    duration: float = 0.0
+
+    def values(self) -> Dict[str, Any]:
+        """Values of the providers that answered in time"""
+        return {name: result.value for name, result in self.results.items() if result.ok}
+
+    def errors(self) -> Dict[str, str]:
+        """Error message per failed or late provider"""
+        errors = {}
+        for name, result in self.results.items():
+            if result.timed_out:
+                errors[name] = result.error or "timed out"
+            elif result.error:
+                errors[name] = result.error
+        return errors
+
+    @property
+    def partial(self) -> bool:
+        return any(not result.ok for result in self.results.values())
+
+    def metadata(self) -> Dict[str, Dict[str, Any]]:
+        """Per-provider status and timing, suitable for JSON responses"""
+        return {
+            name: {
+                'ok': result.ok,
+                'timed_out': result.timed_out,
+                'cached': result.cached,
+                'error': result.error,
+                'duration_ms': round(result.duration * 1000, 1)
+            }
+            for name, result in self.results.items()
+        }
+
+
+class ProviderFanout:
+    """Bounded worker pool that queries providers in parallel with per-provider deadlines"""
+
+    def __init__(self, max_workers: int = 8, default_timeout: float = 15.0,
+                 timeouts: Dict[str, float] = None):
+        """Initialize fan-out engine
+
+        Args:
+            max_workers: Maximum number of concurrent provider calls
+            default_timeout: Deadline in seconds for providers without an explicit one
+            timeouts: Optional per-provider deadline overrides
+        """
+        self.default_timeout = default_timeout
+        self.timeouts = dict(timeouts or {})
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='provider-fanout')
+        self._lock = threading.Lock()
+        # Calls still running past their deadline, keyed by (provider, operation, arguments).
+        # A new request joins the running call instead of piling up more work.
+        self._inflight: Dict[Tuple[str, str, tuple], Tuple[Future, float]] = {}
+
+    def get_timeout(self, provider_name: str) -> float:
+        """Get the deadline for a provider"""
+        return self.timeouts.get(provider_name, self.default_timeout)
+
+    def set_timeout(self, provider_name: str, timeout: float):
+        """Set the deadline for a provider"""
+        self.timeouts[provider_name] = timeout
+
+    def run(self, operation: str, providers: Dict[str, Any],
+            call: Callable[[Any], Any] = None, kwargs: Dict[str, Any] = None) -> FanoutResult:
+        """Run an operation on every provider concurrently
+
+        Args:
+            operation: Provider method name (used as call when call is None)
+            providers: Mapping of provider name to provider instance
+            call: Optional callable taking the provider and returning the value.
+                Custom calls may close over arguments, so they are never shared
+                with another caller's in-flight call.
+            kwargs: Keyword arguments for the provider method when call is None;
+                only calls made with the same arguments are shared
+
+        Returns:
+            FanoutResult with values, errors and timings per provider
+        """
+        shared = call is None
+        kwargs = kwargs or {}
+        if call is None:
+            call = lambda provider: getattr(provider, operation)(**kwargs)
+
+        started = time.monotonic()
+        submitted: Dict[str, Tuple[Future, float]] = {}
+        for name, provider in providers.items():
+            submitted[name] = self._submit(name, operation, provider, call, shared, kwargs)
+
+        fanout = FanoutResult(operation=operation)
+        for name, (future, call_started) in submitted.items():
+            deadline = started + self.get_timeout(name)
+            remaining = max(0.0, deadline - time.monotonic())
+            try:
+                value, error, duration = future.result(timeout=remaining)
+                fanout.results[name] = ProviderResult(
+                    provider=name, value=value, error=error, duration=duration)
+            except FutureTimeoutError:
+                fanout.results[name] = ProviderResult(
+                    provider=name, timed_out=True,
+                    error=f"{name} did not answer within {self.get_timeout(name)}s",
+                    duration=time.monotonic() - call_started)
+
+        fanout.duration = time.monotonic() - started
+        return fanout
+
+    def _submit(self, name: str, operation: str, provider: Any, call: Callable[[Any], Any],
+                shared: bool = True, kwargs: Dict[str, Any] = None) -> Tuple[Future, float]:
+        """Submit a provider call, reusing one that is still in flight when shared"""
+        if not shared:
+            return self._executor.submit(self._invoke, call, provider), time.monotonic()
+
+        key = (name, operation, tuple(sorted((kwargs or {}).items())))
+        with self._lock:
+            inflight = self._inflight.get(key)
+            if inflight and not inflight[0].done():
+                return inflight
+
+            future = self._executor.submit(self._invoke, call, provider)
+            entry = (future, time.monotonic())
+            self._inflight[key] = entry
+
+        future.add_done_callback(lambda f, key=key: self._forget(key, f))
+        return entry
+
+    @staticmethod
+    def _invoke(call: Callable[[Any], Any], provider: Any) -> Tuple[Any, Optional[str], float]:
+        """Run a provider call and return (value, error, duration)"""
+        started = time.monotonic()
+        try:
+            return call(provider), None, time.monotonic() - started
+        except Exception as e:
+            return None, str(e), time.monotonic() - started
+
+    def _forget(self, key: Tuple[str, str, tuple], future: Future):
+        """Drop a finished call from the in-flight table"""
+        with self._lock:
+            inflight = self._inflight.get(key)
+            if inflight and inflight[0] is future:
+                del self._inflight[key]
+
+    def inflight(self) -> List[Tuple[str, str]]:
+        """List (provider, operation) pairs currently running"""
+        with self._lock:
+            return [key[:2] for key, (future, _) in self._inflight.items() if not future.done()]
+
+    def shutdown(self):
+        """Stop accepting work; running calls finish in the background"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,136 @@
+"""
+Provider Health Monitor
+Probes hypervisor providers in the background and keeps a cached status snapshot
+"""
+
+import time
+import logging
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Any, Callable
+
+from provider_fanout import ProviderFanout
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProviderHealth:
+    """Last known health of a provider"""
+    connected: Optional[bool] = None
+    latency_ms: Optional[float] = None
+    last_check: Optional[float] = None
+    last_success: Optional[float] = None
+    consecutive_failures: int = 0
+    error: Optional[str] = None
+    next_probe: float = 0.0
+
+
+class ProviderHealthMonitor:
+    """Background prober with exponential backoff on failing providers"""
+
+    def __init__(self, get_providers: Callable[[], Dict[str, Any]], fanout: ProviderFanout,
+                 interval: float = 30.0, max_interval: float = 300.0):
+        """Initialize health monitor
+
+        Args:
+            get_providers: Callable returning the current name -> provider mapping
+            fanout: Fan-out engine used to run probes with per-provider deadlines
+            interval: Seconds between probes of a healthy provider
+            max_interval: Upper bound of the backoff for failing providers
+        """
+        self.get_providers = get_providers
+        self.fanout = fanout
+        self.interval = interval
+        self.max_interval = max_interval
+        self._health: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background probe loop"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='provider-health', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background probe loop"""
+        self._stopped.set()
+        self._wakeup.set()
+
+    def reset(self, provider_name: str = None):
+        """Forget the status of a provider (or all) and probe it again soon"""
+        with self._lock:
+            if provider_name is None:
+                self._health.clear()
+            else:
+                self._health.pop(provider_name, None)
+        self._wakeup.set()
+
+    def probe_now(self, provider_name: str = None):
+        """Probe synchronously and update the snapshot"""
+        providers = self.get_providers()
+        if provider_name is not None:
+            providers = {provider_name: providers[provider_name]} if provider_name in providers else {}
+        self._probe(providers)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Copy of the cached status of every known provider"""
+        now = time.time()
+        with self._lock:
+            health = {name: asdict(entry) for name, entry in self._health.items()}
+        for name in self.get_providers():
+            health.setdefault(name, asdict(ProviderHealth()))
+        for entry in health.values():
+            entry['next_probe_in'] = max(0.0, round(entry.pop('next_probe') - now, 1))
+        return health
+
+    def _run(self):
+        """Probe loop: wake for the next due provider or an explicit reset"""
+        while not self._stopped.is_set():
+            now = time.time()
+            providers = self.get_providers()
+            with self._lock:
+                due = {
+                    name: provider for name, provider in providers.items()
+                    if self._health.get(name, ProviderHealth()).next_probe <= now
+                }
+            if due:
+                try:
+                    self._probe(due)
+                except Exception as e:
+                    logger.error("Provider health probe failed: %s", e)
+
+            with self._lock:
+                upcoming = [self._health[name].next_probe for name in providers if name in self._health]
+            wait = min(upcoming) - time.time() if upcoming else self.interval
+            self._wakeup.wait(timeout=max(0.5, wait))
+            self._wakeup.clear()
+
+    def _probe(self, providers: Dict[str, Any]):
+        """Run health checks concurrently and record the outcome"""
+        if not providers:
+            return
+        result = self.fanout.run('health_check', providers)
+        now = time.time()
+        with self._lock:
+            for name, provider_result in result.results.items():
+                entry = self._health.setdefault(name, ProviderHealth())
+                connected = provider_result.ok and bool(provider_result.value)
+                entry.connected = connected
+                entry.latency_ms = round(provider_result.duration * 1000, 1)
+                entry.last_check = now
+                if connected:
+                    entry.last_success = now
+                    entry.consecutive_failures = 0
+                    entry.error = None
+                    entry.next_probe = now + self.interval
+                else:
+                    entry.consecutive_failures += 1
+                    entry.error = provider_result.error or "health check failed"
+                    backoff = self.interval * (2 ** (entry.consecutive_failures - 1))
+                    entry.next_probe = now + min(backoff, self.max_interval)
@@ -4,17 +4,27 @@ Nutanix IP Assignment Script
 Assigns IP addresses to Nutanix VMs after cloning
 """
 
+import logging
 import sys
 import time
 import requests
 import json
+from pathlib import Path
 from typing import Dict, Any, Optional
 
+# Make the hypervisor_providers package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hypervisor_providers.task_watcher import TaskWatcher
+
+logger = logging.getLogger(__name__)
+
 class NutanixIPAssigner:
     """Handles IP assignment for Nutanix VMs"""
     
     def __init__(self, prism_central_ip: str, username: str, password: str, 
-                 port: int = 9440, use_ssl: bool = True, verify_ssl: bool = False):
+                 port: int = 9440, use_ssl: bool = True, verify_ssl: bool = False,
+                 task_watcher: TaskWatcher = None):
         """Initialize Nutanix IP assigner
         
         Args:
@@ -24,6 +34,7 @@ class NutanixIPAssigner:
             port: Port number (default: 9440)
             use_ssl: Use HTTPS (default: True)
             verify_ssl: Verify SSL certificates (default: False)
+            task_watcher: Shared TaskWatcher (default: a watcher for this session)
         """
         self.prism_central_ip = prism_central_ip
         self.username = username
@@ -44,6 +55,7 @@ class NutanixIPAssigner:
         # Base URLs
         protocol = "https" if use_ssl else "http"
         self.pc_base_url = f"{protocol}://{prism_central_ip}:{port}/api/nutanix/v3"
+        self.task_watcher = task_watcher or TaskWatcher(self.session, self.pc_base_url)
     
     def assign_static_ip(self, vm_name: str, ip_address: str, subnet_uuid: str = None,
                         netmask: str = "255.255.255.0", gateway: str = "192.168.122.1") -> Dict[str, Any]:
@@ -60,7 +72,7 @@ class NutanixIPAssigner:
             Dict with success status and message
         """
         try:
-            print(f"Assigning IP {ip_address} to Nutanix VM: {vm_name}")
+            logger.info("Assigning IP %s to Nutanix VM: %s", ip_address, vm_name)
             
             # Get VM UUID
             vm_uuid = self._get_vm_uuid(vm_name)
@@ -91,10 +103,7 @@ class NutanixIPAssigner:
             result = self._update_vm_network(vm_uuid, vm_details, ip_address, subnet_uuid)
             
             if result['success']:
-                # Wait for VM to be updated
-                time.sleep(10)
-                
-                # Verify IP assignment
+                # The update task has completed; verify IP assignment
                 verify_result = self._verify_ip_assignment(vm_uuid, ip_address)
                 if verify_result:
                     return {
@@ -136,7 +145,7 @@ class NutanixIPAssigner:
             return None
             
         except Exception as e:
-            print(f"Error getting VM UUID: {e}")
+            logger.error("Error getting VM UUID: %s", e)
             return None
     
     def _get_vm_details(self, vm_uuid: str) -> Optional[Dict[str, Any]]:
@@ -150,7 +159,7 @@ class NutanixIPAssigner:
             return None
             
         except Exception as e:
-            print(f"Error getting VM details: {e}")
+            logger.error("Error getting VM details: %s", e)
             return None
     
     def _get_default_subnet_uuid(self) -> Optional[str]:
@@ -173,7 +182,7 @@ class NutanixIPAssigner:
             return None
             
         except Exception as e:
-            print(f"Error getting subnet UUID: {e}")
+            logger.error("Error getting subnet UUID: %s", e)
             return None
     
     def _update_vm_network(self, vm_uuid: str, vm_details: Dict[str, Any], 
@@ -256,29 +265,7 @@ class NutanixIPAssigner:
     
     def _wait_for_task(self, task_uuid: str, timeout: int = 300) -> bool:
         """Wait for task completion"""
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
-            try:
-                response = self.session.get(f"{self.pc_base_url}/tasks/{task_uuid}", timeout=30)
-                
-                if response.status_code == 200:
-                    task_data = response.json()
-                    status = task_data.get('status')
-                    
-                    if status == 'SUCCEEDED':
-                        return True
-                    elif status == 'FAILED':
-                        print(f"Task failed: {task_data.get('error_detail', 'Unknown error')}")
-                        return False
-                
-            except Exception as e:
-                print(f"Error checking task status: {e}")
-            
-            time.sleep(10)
-        
-        print("Task timed out")
-        return False
+        return self.task_watcher.wait(task_uuid, timeout)
     
     def _verify_ip_assignment(self, vm_uuid: str, expected_ip: str) -> bool:
         """Verify IP assignment"""
@@ -298,12 +285,13 @@ class NutanixIPAssigner:
             return False
             
         except Exception as e:
-            print(f"Error verifying IP assignment: {e}")
+            logger.error("Error verifying IP assignment: %s", e)
             return False
 
 
 def main():
     """Main function for command line usage"""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     if len(sys.argv) < 6:
         print("Usage: python assign_ip_nutanix.py <prism_central_ip> <username> <password> <vm_name> <ip_address> [subnet_uuid]")
         sys.exit(1)
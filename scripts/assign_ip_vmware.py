@@ -4,24 +4,41 @@ VMware IP Assignment Script
 Assigns IP addresses to VMware VMs after cloning
 """
 
+import logging
 import os
 import sys
-import time
 import subprocess
 import tempfile
 from pathlib import Path
 from typing import Optional, Dict, Any
 
+# Allow running from the scripts directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hypervisor_providers.vmrun_executor import VmrunExecutor, get_vmrun_executor
+from hypervisor_providers.guest_readiness import GuestReadinessWatcher, poll_until
+
+logger = logging.getLogger(__name__)
+
 class VMwareIPAssigner:
     """Handles IP assignment for VMware VMs"""
     
-    def __init__(self, vmrun_path: str = None):
+    def __init__(self, vmrun_path: str = None, executor: VmrunExecutor = None,
+                 readiness_watcher: GuestReadinessWatcher = None):
         """Initialize VMware IP assigner
         
         Args:
             vmrun_path: Path to vmrun executable
+            executor: Shared VmrunExecutor (default: the host-wide executor for vmrun_path)
+            readiness_watcher: Shared GuestReadinessWatcher (default: a watcher on the executor)
         """
         self.vmrun_path = vmrun_path or r"C:\Program Files (x86)\VMware\VMware Workstation\vmrun.exe"
+        self.executor = executor or get_vmrun_executor(self.vmrun_path)
+        self.readiness_watcher = readiness_watcher or GuestReadinessWatcher(self.executor)
+    
+    def _vmrun(self, command: str, *args, timeout: float = None) -> subprocess.CompletedProcess:
+        """Run a vmrun command on the shared executor"""
+        return self.executor.run(command, *args, timeout=timeout)
     
     def assign_static_ip(self, vmx_path: str, ip_address: str, netmask: str = "255.255.255.0", 
                         gateway: str = None, dns: str = None) -> Dict[str, Any]:
@@ -45,7 +62,7 @@ class VMwareIPAssigner:
                     'error': f"VMX file not found: {vmx_path}"
                 }
             
-            print(f"Assigning IP {ip_address} to VM: {vmx_path.name}")
+            logger.info("Assigning IP %s to VM: %s", ip_address, vmx_path.name)
             
             # Check if VM is running
             is_running = self._is_vm_running(vmx_path)
@@ -53,24 +70,18 @@ class VMwareIPAssigner:
             
             if not is_running:
                 # Start VM if not running
-                print("Starting VM for IP configuration...")
-                start_result = subprocess.run([
-                    self.vmrun_path, "start", str(vmx_path), "nogui"
-                ], capture_output=True, text=True, timeout=120)
+                logger.info("Starting VM for IP configuration...")
+                start_result = self._vmrun("start", vmx_path, "nogui", timeout=120)
                 
                 if start_result.returncode != 0:
                     return {
                         'success': False,
                         'error': f"Failed to start VM: {start_result.stderr}"
                     }
-                
-                # Wait for VM to boot
-                print("Waiting for VM to boot...")
-                time.sleep(30)
                 vm_was_stopped = True
             
-            # Wait for VMware Tools to be ready
-            print("Waiting for VMware Tools...")
+            # Proceed as soon as VMware Tools report running
+            logger.info("Waiting for VMware Tools...")
             tools_ready = self._wait_for_tools(vmx_path, timeout=300)
             if not tools_ready:
                 return {
@@ -93,10 +104,8 @@ class VMwareIPAssigner:
             
             # Stop VM if it was stopped initially
             if vm_was_stopped and result.get('success'):
-                print("Stopping VM after IP configuration...")
-                subprocess.run([
-                    self.vmrun_path, "stop", str(vmx_path)
-                ], capture_output=True, text=True, timeout=60)
+                logger.info("Stopping VM after IP configuration...")
+                self._vmrun("stop", vmx_path, timeout=60)
             
             return result
             
@@ -109,30 +118,29 @@ class VMwareIPAssigner:
     def _is_vm_running(self, vmx_path: Path) -> bool:
         """Check if VM is running"""
         try:
-            result = subprocess.run([self.vmrun_path, "list"], 
-                                  capture_output=True, text=True, timeout=30)
+            result = self._vmrun("list", timeout=30)
             return str(vmx_path) in result.stdout if result.returncode == 0 else False
         except:
             return False
     
     def _wait_for_tools(self, vmx_path: Path, timeout: int = 300) -> bool:
         """Wait for VMware Tools to be ready"""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            try:
-                result = subprocess.run([
-                    self.vmrun_path, "checkToolsState", str(vmx_path)
-                ], capture_output=True, text=True, timeout=30)
-                
-                if result.returncode == 0 and "running" in result.stdout.lower():
-                    return True
-                    
-            except:
-                pass
-            
-            time.sleep(10)
+        return self.readiness_watcher.wait(vmx_path, timeout)
+    
+    def _verify_ip(self, vmx_path: Path, ip_address: str, program: list, timeout: float = 30):
+        """Re-run a guest command with backoff until its output shows the IP
+        
+        Returns:
+            The last command result
+        """
+        results = []
+        
+        def probe():
+            results.append(self._vmrun("runProgramInGuest", vmx_path, *program, timeout=30))
+            return ip_address in results[-1].stdout
         
-        return False
+        poll_until(probe, timeout, initial_interval=0.5)
+        return results[-1]
     
     def _detect_guest_os(self, vmx_path: Path) -> str:
         """Detect guest OS from VMX file"""
@@ -178,10 +186,8 @@ class VMwareIPAssigner:
             
             try:
                 # Copy netplan config to VM
-                copy_result = subprocess.run([
-                    self.vmrun_path, "CopyFileFromHostToGuest", str(vmx_path),
-                    temp_config, "/tmp/01-netcfg.yaml"
-                ], capture_output=True, text=True, timeout=60)
+                copy_result = self._vmrun("CopyFileFromHostToGuest", vmx_path,
+                                          temp_config, "/tmp/01-netcfg.yaml", timeout=60)
                 
                 if copy_result.returncode != 0:
                     return {
@@ -197,20 +203,14 @@ class VMwareIPAssigner:
                 ]
                 
                 for cmd in commands:
-                    result = subprocess.run([
-                        self.vmrun_path, "runProgramInGuest", str(vmx_path),
-                        "/bin/bash", "-c", cmd
-                    ], capture_output=True, text=True, timeout=60)
+                    result = self._vmrun("runProgramInGuest", vmx_path, "/bin/bash", "-c", cmd, timeout=60)
                     
                     if result.returncode != 0:
-                        print(f"Warning: Command failed: {cmd} - {result.stderr}")
+                        logger.warning("Command failed: %s - %s", cmd, result.stderr)
                 
                 # Verify IP assignment
-                time.sleep(10)
-                verify_result = subprocess.run([
-                    self.vmrun_path, "runProgramInGuest", str(vmx_path),
-                    "/bin/bash", "-c", "ip addr show ens33 | grep 'inet '"
-                ], capture_output=True, text=True, timeout=30)
+                verify_result = self._verify_ip(vmx_path, ip_address,
+                                                ["/bin/bash", "-c", "ip addr show ens33 | grep 'inet '"])
                 
                 if ip_address in verify_result.stdout:
                     return {
@@ -248,20 +248,13 @@ class VMwareIPAssigner:
             ]
             
             for cmd in commands:
-                result = subprocess.run([
-                    self.vmrun_path, "runProgramInGuest", str(vmx_path),
-                    "cmd.exe", "/c", cmd
-                ], capture_output=True, text=True, timeout=60)
+                result = self._vmrun("runProgramInGuest", vmx_path, "cmd.exe", "/c", cmd, timeout=60)
                 
                 if result.returncode != 0:
-                    print(f"Warning: Command failed: {cmd} - {result.stderr}")
+                    logger.warning("Command failed: %s - %s", cmd, result.stderr)
             
             # Verify IP assignment
-            time.sleep(10)
-            verify_result = subprocess.run([
-                self.vmrun_path, "runProgramInGuest", str(vmx_path),
-                "cmd.exe", "/c", "ipconfig"
-            ], capture_output=True, text=True, timeout=30)
+            verify_result = self._verify_ip(vmx_path, ip_address, ["cmd.exe", "/c", "ipconfig"])
             
             if ip_address in verify_result.stdout:
                 return {
@@ -283,6 +276,7 @@ class VMwareIPAssigner:
 
 def main():
     """Main function for command line usage"""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     if len(sys.argv) < 5:
         print("Usage: python assign_ip_vmware.py <vmx_path> <ip_address> <gateway> <dns> [netmask]")
         sys.exit(1)
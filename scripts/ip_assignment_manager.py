@@ -4,6 +4,7 @@ IP Assignment Manager
 Unified interface for assigning IP addresses to VMs across different hypervisors
 """
 
+import logging
 import sys
 import os
 from pathlib import Path
@@ -15,6 +16,8 @@ sys.path.append(str(Path(__file__).parent))
 from assign_ip_vmware import VMwareIPAssigner
 from assign_ip_nutanix import NutanixIPAssigner
 
+logger = logging.getLogger(__name__)
+
 class IPAssignmentManager:
     """Unified IP assignment manager for multiple hypervisors"""
     
@@ -201,12 +204,13 @@ def load_hypervisor_config() -> Dict[str, Any]:
         }
         
     except Exception as e:
-        print(f"Error loading hypervisor config: {e}")
+        logger.error("Error loading hypervisor config: %s", e)
         return {}
 
 
 def main():
     """Main function for command line usage"""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     if len(sys.argv) < 4:
         print("Usage: python ip_assignment_manager.py <provider> <vm_identifier> <ip_address> [additional_args...]")
         print("  provider: 'vmware' or 'nutanix'")
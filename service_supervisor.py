@@ -0,0 +1,267 @@
+"""
+Service Supervisor
+Starts slow backend services on background threads so the web app can serve immediately
+"""
+
+import sys
+import time
+import atexit
+import logging
+import threading
+import subprocess
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceUnavailableError(Exception):
+    """Raised when a background service is not ready in time"""
+
+
+class BackgroundService:
+    """Builds an expensive object on a background thread, retrying with exponential backoff"""
+
+    def __init__(self, name: str, factory: Callable[[], Any],
+                 initial_backoff: float = 1.0, max_backoff: float = 60.0):
+        """Initialize background service
+
+        Args:
+            name: Name used in logs and thread names
+            factory: Callable building the service; exceptions trigger a retry
+            initial_backoff: Seconds before the first retry
+            max_backoff: Upper bound of the retry delay
+        """
+        self.name = name
+        self.factory = factory
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self._value = None
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._attempts = 0
+        self._last_error: Optional[str] = None
+        self._started_at: Optional[float] = None
+        self._ready_at: Optional[float] = None
+
+    def start(self):
+        """Start building the service (no-op once started)"""
+        with self._lock:
+            if self._thread:
+                return
+            self._started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name=f'{self.name}-init', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop retrying a service that is not ready yet"""
+        self._stopped.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def get(self, timeout: float = None) -> Any:
+        """Return the service, starting it and waiting up to timeout seconds
+
+        Raises:
+            ServiceUnavailableError: If the service is not ready in time
+        """
+        self.start()
+        if not self._ready.wait(timeout):
+            raise ServiceUnavailableError(f"{self.name} is still starting"
+                                          + (f" (last error: {self._last_error})" if self._last_error else ""))
+        return self._value
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'ready': self.ready,
+            'attempts': self._attempts,
+            'last_error': self._last_error,
+            'startup_seconds': round(self._ready_at - self._started_at, 3) if self._ready_at else None
+        }
+
+    def _run(self):
+        backoff = self.initial_backoff
+        while not self._stopped.is_set():
+            self._attempts += 1
+            try:
+                self._value = self.factory()
+            except Exception as e:
+                self._last_error = str(e)
+                logger.warning("Failed to start %s (attempt %d): %s; retrying in %.1fs", self.name, self._attempts, e, backoff)
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            self._last_error = None
+            self._ready_at = time.time()
+            self._ready.set()
+            logger.info("%s ready in %.2fs", self.name, self._ready_at - self._started_at)
+            return
+
+
+class MockServerSupervisor:
+    """Keeps the Nutanix mock server running as a child process
+
+    The server is probed periodically; when it stops answering it is
+    restarted, with exponential backoff between failed starts. A server that
+    is already running (started outside the app) is used as-is.
+    """
+
+    def __init__(self, command: List[str] = None, health_url: str = 'http://127.0.0.1:9441/api/nutanix/v3/clusters/list',
+                 cwd: str = None, probe_interval: float = 10.0, ready_timeout: float = 15.0,
+                 initial_backoff: float = 2.0, max_backoff: float = 120.0):
+        """Initialize mock server supervisor
+
+        Args:
+            command: Command starting the server (defaults to nutanix_mock_server.py)
+            health_url: URL that answers 200 once the server is ready
+            cwd: Working directory of the server (defaults to this file's directory)
+            probe_interval: Seconds between health probes of a running server
+            ready_timeout: Seconds a freshly started server has to become ready
+            initial_backoff: Delay before the first restart after a failed start
+            max_backoff: Upper bound of the restart delay
+        """
+        self.cwd = cwd or str(Path(__file__).parent)
+        self.command = command or [sys.executable, 'nutanix_mock_server.py']
+        self.health_url = health_url
+        self.probe_interval = probe_interval
+        self.ready_timeout = ready_timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.process: Optional[subprocess.Popen] = None
+        self._healthy = False
+        self._failures = 0
+        self._starts = 0
+        self._last_error: Optional[str] = None
+        self._next_attempt = 0.0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start supervising (no-op once started)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='mock-server-supervisor', daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stop supervising and terminate the server started by this supervisor"""
+        self._stopped.set()
+        self._wakeup.set()
+        self._terminate()
+
+    def restart(self):
+        """Terminate the server and start it again without waiting for the backoff"""
+        self._terminate()
+        with self._lock:
+            self._healthy = False
+            self._failures = 0
+            self._next_attempt = 0.0
+        self.start()
+        self._wakeup.set()
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for the server to become healthy"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self._healthy:
+                return True
+            time.sleep(0.1)
+        return self._healthy
+
+    def is_healthy(self) -> bool:
+        """Probe the health URL"""
+        try:
+            with urllib.request.urlopen(self.health_url, timeout=5) as response:
+                return response.status == 200
+        except Exception:
+            return False
+
+    def status(self) -> Dict[str, Any]:
+        running = self.process is not None and self.process.poll() is None
+        return {
+            'running': running,
+            'healthy': self._healthy,
+            'pid': self.process.pid if running else None,
+            'url': self.health_url.split('/api/')[0],
+            'starts': self._starts,
+            'consecutive_failures': self._failures,
+            'last_error': self._last_error,
+            'next_attempt_in': round(max(0.0, self._next_attempt - time.time()), 1) if not self._healthy else None
+        }
+
+    def _run(self):
+        while not self._stopped.is_set():
+            if self.is_healthy():
+                self._healthy = True
+                self._failures = 0
+                self._wait(self.probe_interval)
+                continue
+
+            self._healthy = False
+            delay = self._next_attempt - time.time()
+            if delay > 0:
+                self._wait(delay)
+                continue
+
+            if self._spawn_and_wait_ready():
+                self._healthy = True
+                self._failures = 0
+                self._last_error = None
+                logger.info("Nutanix mock server is running and healthy")
+            else:
+                self._failures += 1
+                backoff = min(self.initial_backoff * 2 ** (self._failures - 1), self.max_backoff)
+                self._next_attempt = time.time() + backoff
+                logger.error("Nutanix mock server failed to start (%s); retrying in %.1fs", self._last_error, backoff)
+
+    def _spawn_and_wait_ready(self) -> bool:
+        """Start the server and poll readiness with a growing interval"""
+        self._terminate()
+        try:
+            self.process = subprocess.Popen(self.command, cwd=self.cwd)
+        except Exception as e:
+            self._last_error = str(e)
+            return False
+        self._starts += 1
+        logger.info("Nutanix mock server started with PID: %s", self.process.pid)
+
+        deadline = time.time() + self.ready_timeout
+        interval = 0.1
+        while time.time() < deadline and not self._stopped.is_set():
+            if self.process.poll() is not None:
+                self._last_error = f"exited with code {self.process.returncode}"
+                return False
+            if self.is_healthy():
+                return True
+            self._stopped.wait(interval)
+            interval = min(interval * 2, 2.0)
+
+        self._last_error = f"not ready after {self.ready_timeout:.0f}s"
+        return False
+
+    def _terminate(self):
+        process = self.process
+        if process and process.poll() is None:
+            logger.info("Stopping Nutanix mock server...")
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                logger.warning("Force killing mock server...")
+                process.kill()
+                process.wait()
+
+    def _wait(self, seconds: float):
+        self._wakeup.wait(seconds)
+        self._wakeup.clear()
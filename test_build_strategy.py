@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test Build Strategy
+Tests Packer build-mode ranking from recorded outcomes
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.build_strategy import BuildStrategy, BuildMode
+from testing_support import run_tests
+
+MODES = [
+    BuildMode('fast', 'build-fast.pkr.hcl', timeout=300, estimate=120),
+    BuildMode('headless', 'build-headless.pkr.hcl', timeout=900, estimate=600),
+    BuildMode('GUI', 'build.pkr.hcl', timeout=1200, estimate=900)
+]
+
+def plan(strategy, key):
+    return [mode.name for mode in strategy.plan(key)]
+
+def test_failure_streak_skips_mode():
+    """A mode failing repeatedly is skipped for that key only, and the history persists"""
+    print("🧪 Testing failure streaks...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        state_file = Path(temp_dir) / 'build_history.json'
+        strategy = BuildStrategy(MODES, state_file, failure_streak=2, cooldown=3600)
+        key = BuildStrategy.key('ubuntu.iso', 'linux', 'host-a')
+
+        assert plan(strategy, key) == ['fast', 'headless', 'GUI'], f"Unexpected default plan: {plan(strategy, key)}"
+
+        strategy.record(key, 'fast', False, 300)
+        strategy.record(key, 'fast', False, 300)
+        strategy.record(key, 'headless', True, 500)
+        assert plan(strategy, key) == ['headless', 'GUI'], f"Failing mode was not skipped: {plan(strategy, key)}"
+
+        other = BuildStrategy.key('ubuntu.iso', 'linux', 'host-b')
+        assert plan(strategy, other)[0] == 'fast', "Failures leaked to another host"
+
+        # After the cooldown the mode is tried again
+        restarted = BuildStrategy(MODES, state_file, failure_streak=2, cooldown=0)
+        assert 'fast' in plan(restarted, key) and restarted.stats()[key]['modes']['fast']['failures'] == 2, \
+            f"History was not persisted: {restarted.stats()}"
+
+    print("✅ Failing mode skipped until its cooldown ends")
+
+def test_fastest_reliable_mode_first():
+    """Measured durations reorder modes"""
+    print("\n🧪 Testing duration ranking...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        strategy = BuildStrategy(MODES, Path(temp_dir) / 'build_history.json')
+        key = BuildStrategy.key('Windows Server 2019', 'windows', 'host-a')
+        for _ in range(3):
+            strategy.record(key, 'fast', True, 1500)
+            strategy.record(key, 'GUI', True, 400)
+        assert plan(strategy, key)[0] == 'GUI', f"Faster mode not preferred: {plan(strategy, key)}"
+
+    print("✅ Fastest reliable mode is tried first")
+
+def main():
+    """Main test function"""
+    return run_tests("Build Strategy", [
+        ("Failure Streak", test_failure_streak_skips_mode),
+        ("Duration Ranking", test_fastest_reliable_mode_first)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test Command Runner
+Tests streamed command output and Packer machine-readable progress parsing
+"""
+
+import sys
+import time
+import subprocess
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.command_runner import run_streaming
+from hypervisor_providers.packer_output import PackerProgressParser
+from hypervisor_providers.progress import progress_listener
+from hypervisor_providers.vmware_provider import VMwareProvider
+from testing_support import run_tests
+
+FAKE_PACKER = r'''
+import sys, time
+lines = [
+    "1700000000,,ui,say,==> vmware-iso.ubuntu: Creating required virtual machine disks",
+    "1700000001,,ui,message,    vmware-iso.ubuntu: noise",
+    "1700000002,,ui,say,==> vmware-iso.ubuntu: Starting virtual machine...",
+    "1700000003,,ui,say,==> vmware-iso.ubuntu: Waiting for SSH to become available...",
+    "1700000004,,ui,say,==> vmware-iso.ubuntu: Connected to SSH!",
+    "1700000005,,ui,say,==> vmware-iso.ubuntu: Gracefully halting virtual machine...",
+    "1700000006,ubuntu,artifact,0,id,VM%!(PACKER_COMMA)1",
+]
+for line in lines:
+    print(line, flush=True)
+    time.sleep(0.05)
+for i in range(1000):
+    print(f"1700000007,,ui,message,log line {i}")
+print("1700000008,,ui,error,Build 'ubuntu' errored: boom", flush=True)
+print("stderr noise", file=sys.stderr)
+sys.exit(int(sys.argv[1]))
+'''
+
+def test_streaming_and_tail():
+    """Lines arrive while the command runs and only the tail is kept"""
+    print("🧪 Testing streamed output...")
+
+    seen = []
+    started = time.time()
+    result = run_streaming([sys.executable, '-c', FAKE_PACKER, '3'],
+                           on_line=lambda stream, line: seen.append((time.time() - started, stream, line)),
+                           tail_lines=10)
+    stdout_lines = [line for _, stream, line in seen if stream == 'stdout']
+    assert result.returncode == 3 and len(stdout_lines) == 1008 and ('stderr', 'stderr noise') in [s[1:] for s in seen], \
+        f"Unexpected result: rc={result.returncode}, {len(stdout_lines)} lines"
+    assert len(result.stdout.splitlines()) == 10 and result.stdout.endswith('boom'), \
+        f"Tail not bounded: {result.stdout!r}"
+    assert seen[0][0] <= result.duration - 0.2, "Output was not streamed before the command ended"
+
+    try:
+        run_streaming([sys.executable, '-c', 'import time; print("start", flush=True); time.sleep(30)'], timeout=0.5)
+    except subprocess.TimeoutExpired as e:
+        assert e.output == 'start', f"Timeout lost the output tail: {e.output!r}"
+    else:
+        raise AssertionError("Timeout was not enforced")
+
+    print(f"✅ Streamed {len(seen)} lines, kept {len(result.stdout.splitlines())}")
+
+def test_packer_progress_events():
+    """Packer step messages become phase events published to the job"""
+    print("\n🧪 Testing Packer progress events...")
+
+    import tempfile
+    with tempfile.TemporaryDirectory() as temp_dir:
+        provider = VMwareProvider({'vmrun_path': 'vmrun', 'base_directory': temp_dir,
+                                   'templates_directory': temp_dir, 'watch_iso_directories': False})
+        events = []
+        with progress_listener(lambda phase, message=None, percent=None: events.append((phase, message, percent))):
+            result, parser = provider._run_packer([sys.executable, '-c', FAKE_PACKER, '1'], None, 30, 'headless')
+
+    phases = [phase for phase, _, _ in events]
+    assert phases == ['create', 'boot', 'ssh_wait', 'provision', 'shutdown'], f"Unexpected phases: {events}"
+    assert events[2] == ('ssh_wait', '[headless] Waiting for SSH to become available...', 30), \
+        f"Unexpected event: {events[2]}"
+    assert parser.last_error == "Build 'ubuntu' errored: boom" and parser.artifact_id == 'VM,1', \
+        f"Errors/artifact not parsed: {parser.errors}, {parser.artifact_id}"
+    assert PackerProgressParser().feed('plain text line') is None, "Non machine-readable line produced an event"
+
+    print(f"✅ Phases: {phases}")
+
+def main():
+    """Main test function"""
+    return run_tests("Command Runner", [
+        ("Streaming", test_streaming_and_tail),
+        ("Packer Progress", test_packer_progress_events)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test Entity Cache
+Tests Nutanix name-to-UUID resolution caching and the power action hot path
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.entity_cache import EntityCache
+from testing_support import FakeResponse, make_nutanix_provider, run_tests
+
+class FakeSession:
+    """Minimal Prism Central v3 API recording every call"""
+
+    def __init__(self):
+        self.calls = []
+        self.vms = {'uuid-web-1': {'metadata': {'uuid': 'uuid-web-1', 'spec_version': 1},
+                                   'spec': {'name': 'web-1', 'resources': {'power_state': 'OFF'}}}}
+
+    def post(self, url, json=None, timeout=None):
+        self.calls.append(('POST', url))
+        name = json['filter'].split('==', 1)[1]
+        entities = [vm for vm in self.vms.values() if vm['spec']['name'] == name]
+        return FakeResponse(200, {'entities': entities})
+
+    def get(self, url, timeout=None):
+        self.calls.append(('GET', url))
+        if '/tasks/' in url:
+            return FakeResponse(200, {'status': 'SUCCEEDED'})
+        vm = self.vms.get(url.rsplit('/', 1)[1])
+        return FakeResponse(200, vm) if vm else FakeResponse(404)
+
+    def put(self, url, json=None, timeout=None):
+        self.calls.append(('PUT', url))
+        vm = self.vms.get(url.rsplit('/', 1)[1])
+        if vm is None:
+            return FakeResponse(404)
+        if json['metadata']['spec_version'] != vm['metadata']['spec_version']:
+            return FakeResponse(409)
+        vm['spec'] = json['spec']
+        vm['metadata']['spec_version'] += 1
+        return FakeResponse(202, {'status': {'execution_context': {'task_uuid': 'task-1'}}})
+
+def api_calls(session):
+    """Calls other than task polling"""
+    return [call for call in session.calls if '/tasks/' not in call[1]]
+
+def test_negative_and_ttl():
+    """Missing names are cached briefly and entries expire per kind"""
+    print("🧪 Testing negative caching and TTLs...")
+
+    cache = EntityCache(ttl={'vm': 0.1}, negative_ttl=0.1)
+    loads = []
+    loader = lambda: loads.append(1)
+
+    cache.resolve('vm', 'ghost', loader)
+    cache.resolve('vm', 'ghost', loader)
+    time.sleep(0.15)
+    cache.resolve('vm', 'ghost', loader)
+
+    assert len(loads) == 2, f"Expected 2 loads, got {len(loads)}"
+
+    print(f"✅ Cache stats: {cache.stats()}")
+
+def test_power_action_hot_path():
+    """A power action on a resolved VM costs a single API call"""
+    print("\n🧪 Testing power action hot path...")
+
+    provider = make_nutanix_provider(FakeSession())
+    session = provider.session
+
+    provider.start_vm('web-1')
+    cold = len(api_calls(session))
+    session.calls.clear()
+
+    provider.stop_vm('web-1')
+    hot = api_calls(session)
+
+    assert cold == 3 and len(hot) == 1 and hot[0][0] == 'PUT', f"Unexpected calls: cold={cold}, hot={hot}"
+
+    print(f"✅ Cold path: {cold} calls, hot path: {[call[0] for call in hot]}")
+
+def test_stale_entries_recovered():
+    """Spec version conflicts and deleted VMs fall back to the API"""
+    print("\n🧪 Testing stale cache recovery...")
+
+    provider = make_nutanix_provider(FakeSession())
+    session = provider.session
+    provider.start_vm('web-1')
+
+    # Someone else updated the VM: the cached spec_version is stale
+    session.vms['uuid-web-1']['metadata']['spec_version'] += 1
+    assert provider.stop_vm('web-1'), "Conflict was not retried with a fresh entity"
+
+    # The VM was recreated with a new UUID outside the app
+    vm = session.vms.pop('uuid-web-1')
+    vm['metadata']['uuid'] = 'uuid-web-1b'
+    session.vms['uuid-web-1b'] = vm
+    assert provider.start_vm('web-1'), "Stale UUID was not re-resolved"
+
+    print("✅ Stale entries recovered")
+
+def main():
+    """Main test function"""
+    return run_tests("Entity Cache", [
+        ("Negative Caching", test_negative_and_ttl),
+        ("Power Action Hot Path", test_power_action_hot_path),
+        ("Stale Entries", test_stale_entries_recovered)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
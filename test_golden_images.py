@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test Golden Images
+Tests the golden-image build cache and its LRU eviction
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.base_provider import VMConfig
+from hypervisor_providers.golden_images import GoldenImageCache
+from hypervisor_providers.vmware_provider import VMwareProvider
+from testing_support import run_tests, write_fake_tool
+
+FAKE_TOOL = '''#!{python}
+import sys
+from pathlib import Path
+base = Path({base!r})
+with open(base / 'calls.log', 'a') as log:
+    log.write(Path(sys.argv[0]).name + ' ' + sys.argv[1] + '\\n')
+if Path(sys.argv[0]).name == 'packer':
+    name = [a.split('=', 1)[1] for a in sys.argv if a.startswith('vm_name=')][0]
+    vmx = base / 'createdMachines' / name / (name + '.vmx')
+    vmx.parent.mkdir(parents=True)
+    vmx.write_text('numvcpus = "2"\\nmemsize = "2048"\\n')
+elif sys.argv[1] == 'clone':
+    dest = Path(sys.argv[3])
+    dest.parent.mkdir(parents=True)
+    dest.write_text(Path(sys.argv[2]).read_text())
+'''
+
+def make_provider(base):
+    bin_dir = base / 'bin'
+    bin_dir.mkdir()
+    for tool in ('packer', 'vmrun'):
+        write_fake_tool(bin_dir / tool, FAKE_TOOL, base=str(base))
+    for template_file in ('build-fast.pkr.hcl', 'build-headless.pkr.hcl', 'build.pkr.hcl'):
+        (base / template_file).write_text('source "vmware-iso" "ubuntu" {}\n')
+    (base / 'http').mkdir()
+    (base / 'http' / 'user-data').write_text('#cloud-config\n')
+    (base / 'ubuntu.iso').write_bytes(b'iso')
+    provider = VMwareProvider({'vmrun_path': str(bin_dir / 'vmrun'), 'base_directory': str(base),
+                               'templates_directory': str(base / 'templates'), 'iso_path': str(base / 'ubuntu.iso'),
+                               'watch_iso_directories': False})
+    provider.iso_checksums.wait(timeout=10)
+    return provider
+
+def create(provider, name):
+    return provider.create_vm(VMConfig(name=name, cpu=2, ram=2048, disk=20, os_type='linux'))
+
+def packer_runs(base):
+    return sum(1 for line in (base / 'calls.log').read_text().splitlines() if line.startswith('packer'))
+
+def test_matching_build_is_cloned():
+    """A second build with the same inputs clones the stored image; changed seed files rebuild"""
+    print("🧪 Testing golden-image reuse...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        old_path = os.environ['PATH']
+        os.environ['PATH'] = f"{base / 'bin'}{os.pathsep}{old_path}"
+        try:
+            provider = make_provider(base)
+            first = create(provider, 'build-1')
+            provider.golden_images.wait(timeout=10)
+            second = create(provider, 'build-2')
+            assert first['success'] and second['success'] and 'golden_image' in second, \
+                f"Golden image not used: {first}, {second}"
+            assert packer_runs(base) == 1 and (base / 'createdMachines' / 'build-2' / 'build-2.vmx').exists(), \
+                f"Unexpected Packer runs: {packer_runs(base)}"
+
+            (base / 'http' / 'user-data').write_text('#cloud-config\npackages: [nginx]\n')
+            third = create(provider, 'build-3')
+            provider.golden_images.wait(timeout=10)
+            assert third['success'] and 'golden_image' not in third and packer_runs(base) == 2, \
+                f"Changed seed file reused a stale image: {third}"
+            assert provider.golden_images.stats()['count'] == 2, \
+                f"Rebuilt image was not stored: {provider.golden_images.stats()}"
+        finally:
+            os.environ['PATH'] = old_path
+
+    print("✅ Matching build cloned from the golden image")
+
+def make_image(image_dir, size):
+    image_dir.mkdir(parents=True)
+    (image_dir / 'disk.vmdk').write_bytes(b'x' * size)
+    vmx = image_dir / 'golden.vmx'
+    vmx.write_text('')
+    return vmx
+
+def test_lru_eviction():
+    """Least recently used images are evicted, unless linked clones depend on them"""
+    print("\n🧪 Testing golden-image eviction...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        cache = GoldenImageCache(base / 'golden', max_images=2, max_bytes=10_000)
+        for key in ('a', 'b'):
+            cache.store_async(key, lambda image_dir: make_image(image_dir, 1000))
+            cache.wait(timeout=5)
+        clone_vmx = base / 'clone.vmx'
+        clone_vmx.write_text('')
+        cache.lookup('a')
+        cache.record_clone('b', clone_vmx)
+
+        # 'b' is least recently used but has a linked clone; 'a' goes instead
+        cache.store_async('c', lambda image_dir: make_image(image_dir, 1000))
+        cache.wait(timeout=5)
+        assert sorted(cache.stats()['images']) == ['b', 'c'] and not (base / 'golden' / 'a').exists(), \
+            f"Unexpected images: {sorted(cache.stats()['images'])}"
+
+        # Size limit: a large image pushes out the oldest unprotected one
+        clone_vmx.unlink()
+        cache.store_async('d', lambda image_dir: make_image(image_dir, 9500))
+        cache.wait(timeout=5)
+        assert sorted(cache.stats()['images']) == ['d'], f"Size limit not enforced: {cache.stats()}"
+
+    print("✅ LRU and size limits enforced")
+
+def main():
+    """Main test function"""
+    return run_tests("Golden Image", [
+        ("Golden Image Reuse", test_matching_build_is_cloned),
+        ("Eviction", test_lru_eviction)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
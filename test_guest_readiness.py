@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test Guest Readiness
+Tests backoff probing of VMware Tools across several guests with per-guest deadlines
+"""
+
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.vmrun_executor import VmrunExecutor
+from hypervisor_providers.guest_readiness import GuestReadinessWatcher, poll_until
+from testing_support import run_tests, write_fake_tool
+
+# checkToolsState reports running once <vmx>.ready exists
+FAKE_VMRUN = '''#!{python}
+import sys
+from pathlib import Path
+if sys.argv[1] == 'checkToolsState':
+    print('running' if Path(sys.argv[2] + '.ready').exists() else 'installed')
+'''
+
+def make_executor(base):
+    vmrun = write_fake_tool(base / 'vmrun', FAKE_VMRUN)
+    return VmrunExecutor(str(vmrun), max_concurrency=4)
+
+def test_guests_ready_without_fixed_sleeps():
+    """Each guest resolves shortly after its Tools start, independently of the others"""
+    print("🧪 Testing parallel guest readiness...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        watcher = GuestReadinessWatcher(make_executor(base), initial_interval=0.1, max_interval=0.5)
+        vmx_paths = [base / f"vm{i}.vmx" for i in range(3)]
+        ready_at = {}
+
+        def boot(vmx_path, delay):
+            time.sleep(delay)
+            ready_at[str(vmx_path)] = time.time()
+            Path(str(vmx_path) + '.ready').write_text('')
+
+        for vmx_path, delay in zip(vmx_paths, (0.2, 0.8, 1.5)):
+            threading.Thread(target=boot, args=(vmx_path, delay), daemon=True).start()
+
+        futures = {str(vmx_path): watcher.watch(vmx_path, timeout=10) for vmx_path in vmx_paths}
+        resolved_at = {}
+        for vmx_path, future in futures.items():
+            future.add_done_callback(lambda _, vmx_path=vmx_path: resolved_at.setdefault(vmx_path, time.time()))
+        results = {vmx_path: future.result(timeout=15) for vmx_path, future in futures.items()}
+
+        assert all(results.values()), f"Guests not reported ready: {results}"
+        lags = [resolved_at[vmx_path] - ready_at[vmx_path] for vmx_path in results]
+        assert max(lags) <= 1.0, f"Readiness detected too late: {lags}"
+        assert not watcher.pending(), "Watcher still tracking finished guests"
+
+    print("✅ Guests reported ready as soon as Tools ran")
+
+def test_deadline():
+    """A guest whose Tools never start is reported not ready at its deadline"""
+    print("\n🧪 Testing readiness deadline...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        watcher = GuestReadinessWatcher(make_executor(base), initial_interval=0.1, max_interval=0.3)
+        started = time.time()
+        ready = watcher.wait(base / 'never.vmx', timeout=1.0)
+        elapsed = time.time() - started
+        assert not ready and 0.9 <= elapsed < 3, f"Unexpected result {ready} after {elapsed:.2f}s"
+
+    calls = []
+    result = poll_until(lambda: calls.append(time.time()) or len(calls) >= 4, timeout=5,
+                        initial_interval=0.05, backoff=2)
+    assert result and len(calls) == 4 and calls[-1] - calls[0] <= 1, \
+        f"poll_until did not back off as expected: {len(calls)} calls"
+
+    print("✅ Deadline honored")
+
+def main():
+    """Main test function"""
+    return run_tests("Guest Readiness", [
+        ("Parallel Readiness", test_guests_ready_without_fixed_sleeps),
+        ("Deadline", test_deadline)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
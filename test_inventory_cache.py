@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test Inventory Cache
+Tests TTL expiry, stale-while-revalidate and write invalidation
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from inventory_cache import InventoryCache, FRESH, STALE, MISS
+from testing_support import FakeResponse, make_manager, make_nutanix_provider, run_tests
+
+class ClusterSession:
+    """clusters/list endpoint that can be taken down"""
+
+    def __init__(self):
+        self.down = False
+
+    def post(self, url, json=None, timeout=None):
+        if self.down:
+            raise ConnectionError("Prism Central unreachable")
+        return FakeResponse(200, {'entities': [{'spec': {'name': 'cluster-1'}}]})
+
+def test_ttl_states():
+    """Entries go fresh -> stale -> miss"""
+    print("🧪 Testing TTL states...")
+
+    cache = InventoryCache(ttl={'list_vms': 0.1}, stale_ttl={'list_vms': 0.1})
+    cache.store('list_vms', 'vmware', ['vm-a'])
+
+    states = [cache.lookup('list_vms', 'vmware')[0]]
+    time.sleep(0.12)
+    states.append(cache.lookup('list_vms', 'vmware')[0])
+    time.sleep(0.1)
+    states.append(cache.lookup('list_vms', 'vmware')[0])
+    cache.shutdown()
+
+    assert states == [FRESH, STALE, MISS], f"Unexpected states: {states}"
+
+    print("✅ Entry expired through fresh, stale and miss")
+
+def test_refresh_after_invalidation_is_dropped():
+    """A refresh that started before a write must not resurrect old data"""
+    print("\n🧪 Testing invalidation during refresh...")
+
+    cache = InventoryCache(ttl={'list_vms': 0}, stale_ttl={'list_vms': 60})
+    cache.store('list_vms', 'vmware', ['vm-a'])
+
+    def slow_loader():
+        time.sleep(0.2)
+        return True, ['vm-a']
+
+    cache.refresh_async('list_vms', 'vmware', slow_loader)
+    cache.invalidate(kind='list_vms', provider='vmware')
+    time.sleep(0.3)
+    state, _ = cache.lookup('list_vms', 'vmware')
+    cache.shutdown()
+
+    assert state == MISS, f"Old inventory came back after invalidation ({state})"
+
+    print("✅ Stale refresh discarded after invalidation")
+
+def test_outage_never_cached():
+    """A failed provider call is not cached, and a failed refresh keeps the stale answer"""
+    print("\n🧪 Testing outages are not cached...")
+
+    session = ClusterSession()
+    manager = make_manager({'nutanix': make_nutanix_provider(session)})
+    cache = manager.inventory_cache = InventoryCache(ttl={'get_clusters': 0}, stale_ttl={'get_clusters': 60})
+
+    session.down = True
+    assert manager.query_providers('get_clusters').partial
+    assert cache.lookup('get_clusters', 'nutanix')[0] == MISS, "Outage cached as an empty cluster list"
+
+    session.down = False
+    assert manager.query_providers('get_clusters').values() == {'nutanix': ['cluster-1']}
+    session.down = True
+    assert manager.query_providers('get_clusters').values() == {'nutanix': ['cluster-1']}
+    time.sleep(0.2)  # let the background refresh fail
+    state, value = cache.lookup('get_clusters', 'nutanix')
+    cache.shutdown()
+    manager.fanout.shutdown()
+
+    assert state == STALE and value == ['cluster-1'], f"Refresh replaced the cached clusters: {state} {value}"
+
+    print("✅ Only successful answers cached")
+
+def main():
+    """Main test function"""
+    return run_tests("Inventory Cache", [
+        ("TTL States", test_ttl_states),
+        ("Invalidation During Refresh", test_refresh_after_invalidation_is_dropped),
+        ("Outage Not Cached", test_outage_never_cached)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
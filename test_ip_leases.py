@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test IP Leases
+Tests the reserved/bound/released lease lifecycle and reconciliation against VM inventory
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ipam import IPAM, LeaseReconciler, RESERVED, BOUND
+from hypervisor_providers.base_provider import VMInfo
+from testing_support import UnreachableSession, make_manager, make_nutanix_provider, run_tests
+
+POOLS = {'default': {'start': '10.0.0.1', 'end': '10.0.0.10'}}
+
+def vm(name, ip=None):
+    return VMInfo(name=name, uuid=name, state='poweredOn', cpu=1, ram=1024, disk=10, ip_address=ip)
+
+def test_lease_lifecycle():
+    """Leases are reserved, bound, persisted and released per VM"""
+    print("🧪 Testing lease lifecycle...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ipam = IPAM(Path(temp_dir) / 'ipam.json', POOLS, lease_ttl=60)
+        web = ipam.lease(owner='web-1', provider='vmware')
+        db = ipam.lease(owner='db-1', provider='vmware')
+        assert ipam.leases()[web]['state'] == RESERVED and ipam.bind(web), \
+            f"Lease not reserved then bound: {ipam.leases()}"
+
+        other = IPAM(Path(temp_dir) / 'ipam.json', POOLS)
+        leases = other.leases()
+        assert leases[web]['state'] == BOUND and leases[web]['expires_at'] is None and leases[db]['owner'] == 'db-1', \
+            f"Leases not persisted: {leases}"
+
+        assert other.release_owner('web-1', 'vmware') == [web] and not other.is_allocated(web), \
+            "Deleted VM's address not released"
+        stats = other.lease_stats()
+        assert stats['bound'] == 0 and stats['reserved'] == 1 and stats['released'] == 1, \
+            f"Unexpected lease stats: {stats}"
+
+    print("✅ Leases reserved, bound and released")
+
+def test_reconciler():
+    """Expired reservations and vanished VMs are reclaimed; running jobs and failed listings are not"""
+    print("\n🧪 Testing lease reconciliation...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ipam = IPAM(Path(temp_dir) / 'ipam.json', POOLS, lease_ttl=60)
+        running = ipam.lease(owner='building', provider='vmware', ttl=-1)
+        appeared = ipam.lease(owner='web-1', provider='vmware', ttl=-1)
+        abandoned = ipam.lease(owner='crashed', provider='vmware', ttl=-1)
+        deleted = ipam.lease(owner='old-1', provider='vmware')
+        unreachable = ipam.lease(owner='far-1', provider='nutanix')
+        ipam.bind(deleted)
+        ipam.bind(unreachable)
+        legacy = '10.0.0.9'
+        ipam.reserve(legacy)
+
+        inventory = {'vmware': [vm('web-1'), vm('imported', legacy)]}  # nutanix failed to list
+        reconciler = LeaseReconciler(ipam, lambda: inventory,
+                                     is_active=lambda provider, owner: owner == 'building', grace=0)
+        counts = reconciler.reconcile_once()
+
+        leases = ipam.leases()
+        assert counts == {'renewed': 1, 'bound': 2, 'expired': 1, 'orphaned': 1}, f"Unexpected pass counts: {counts}"
+        assert leases[running]['expires_at'] >= time.time() and leases[appeared]['state'] == BOUND, \
+            f"Leases not renewed or bound: {leases}"
+        assert not ipam.is_allocated(abandoned) and not ipam.is_allocated(deleted), \
+            f"Leases not reclaimed: {leases}"
+        assert leases[unreachable]['state'] == BOUND and leases[legacy]['owner'] == 'imported', \
+            f"Unlisted provider or adopted address wrong: {leases}"
+
+    print("✅ Leases renewed, bound and reclaimed against inventory")
+
+def test_orphan_grace():
+    """A bound VM missing from one pass keeps its address until the grace period ends"""
+    print("\n🧪 Testing orphan grace period...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ipam = IPAM(Path(temp_dir) / 'ipam.json', POOLS)
+        ip = ipam.lease(owner='web-1', provider='vmware')
+        ipam.bind(ip)
+        inventory = {'vmware': []}
+        reconciler = LeaseReconciler(ipam, lambda: inventory, grace=3600)
+
+        reconciler.reconcile_once()
+        assert ipam.is_allocated(ip) and 'missing_since' in ipam.leases()[ip], \
+            "Address released before the grace period"
+        inventory['vmware'] = [vm('web-1')]
+        reconciler.reconcile_once()
+        assert 'missing_since' not in ipam.leases()[ip], "Reappeared VM still marked missing"
+
+    print("✅ Grace period respected")
+
+def test_provider_outage():
+    """A provider whose API fails is skipped by reconciliation instead of read as having no VMs"""
+    print("\n🧪 Testing provider outage...")
+
+    manager = make_manager({'nutanix': make_nutanix_provider(UnreachableSession())})
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ipam = IPAM(Path(temp_dir) / 'ipam.json', POOLS)
+        ip = ipam.lease(owner='far-1', provider='nutanix')
+        ipam.bind(ip)
+        reconciler = LeaseReconciler(ipam, manager.live_inventory, grace=0)
+        counts = reconciler.reconcile_once()
+        manager.fanout.shutdown()
+
+        lease = ipam.leases().get(ip, {})
+        assert not counts['orphaned'] and lease.get('state') == BOUND and 'missing_since' not in lease, \
+            f"Lease released during an outage: {counts}, {lease}"
+
+    print("✅ Bound lease kept while the provider was unreachable")
+
+def test_legacy_import_reclaimed():
+    """Addresses imported from the shipped ips.txt are adopted by their VM or returned to the pool"""
+    print("\n🧪 Testing legacy ips.txt import...")
+
+    pools = {'default': {'start': '192.168.122.100', 'end': '192.168.122.200'}}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ipam = IPAM(Path(temp_dir) / 'ipam.json', pools)
+        imported = ipam.import_legacy_file(Path(__file__).parent / 'ips.txt')
+        assert imported == 101 and ipam.lease(owner='web-2', provider='vmware') is None, \
+            f"Legacy file not imported: {imported}"
+
+        inventory = {'vmware': [vm('web-1', '192.168.122.100')]}
+        providers = ['vmware', 'nutanix']
+        reconciler = LeaseReconciler(ipam, lambda: inventory, grace=0, providers=lambda: providers)
+        reconciler.reconcile_once()
+        assert ipam.stats()['default']['free'] == 0, "Unowned addresses released while nutanix was not listed"
+
+        inventory['nutanix'] = []
+        counts = reconciler.reconcile_once()
+        leases = ipam.leases()
+        assert counts['orphaned'] == 100, f"Unexpected pass counts: {counts}"
+        assert leases['192.168.122.100']['owner'] == 'web-1' and leases['192.168.122.100']['state'] == BOUND, \
+            f"Listed VM did not adopt its address: {leases['192.168.122.100']}"
+        assert ipam.lease(owner='web-2', provider='vmware') is not None, "Reclaimed addresses not leasable"
+
+    print("✅ Legacy addresses bound or reclaimed")
+
+def main():
+    """Main test function"""
+    return run_tests("IP Lease", [
+        ("Lease Lifecycle", test_lease_lifecycle),
+        ("Reconciler", test_reconciler),
+        ("Orphan Grace", test_orphan_grace),
+        ("Provider Outage", test_provider_outage),
+        ("Legacy Import", test_legacy_import_reclaimed)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
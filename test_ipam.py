@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test IPAM
+Tests bitmap IP pools, pool routing and allocation safety across processes
+"""
+
+import sys
+import tempfile
+import subprocess
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ipam import IPAM
+from testing_support import run_tests
+
+POOLS = {
+    'lab': {'start': '10.0.0.10', 'end': '10.0.0.12', 'providers': ['vmware']},
+    'prod': {'start': '10.1.0.1', 'end': '10.1.0.100', 'providers': ['nutanix'], 'networks': ['prod-net']},
+    'default': {'start': '192.168.122.100', 'end': '192.168.122.200'}
+}
+
+WORKER = '''
+import sys
+sys.path.insert(0, {root!r})
+from ipam import IPAM
+ipam = IPAM({state!r}, {{'default': {{'start': '192.168.122.100', 'end': '192.168.122.200'}}}})
+for _ in range(20):
+    print(ipam.allocate())
+'''
+
+def test_allocate_release_and_routing():
+    """Pools are chosen by provider/network; released addresses are reused"""
+    print("🧪 Testing IP pools...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ipam = IPAM(Path(temp_dir) / 'ipam.json', POOLS)
+        lab = [ipam.allocate(provider='vmware') for _ in range(4)]
+        assert lab == ['10.0.0.10', '10.0.0.11', '10.0.0.12', None], f"Unexpected lab allocations: {lab}"
+        assert ipam.allocate(provider='nutanix', network='prod-net') == '10.1.0.1', "Network pool not used"
+        assert ipam.allocate(provider='nutanix') == '192.168.122.100', "Default pool not used for an unmatched request"
+
+        assert ipam.release('10.0.0.11') and not ipam.release('10.0.0.11'), "Release not reported exactly once"
+        assert ipam.allocate(pool='lab') == '10.0.0.11', "Released address not reused"
+
+        # A second instance (another process) sees the persisted state
+        other = IPAM(Path(temp_dir) / 'ipam.json', POOLS)
+        stats = other.stats()
+        assert stats['lab']['allocated'] == 3 and stats['prod']['free'] == 99 and other.is_allocated('10.1.0.1'), \
+            f"State not persisted: {stats}"
+
+    print("✅ Pools routed, exhausted and reused correctly")
+
+def test_concurrent_processes():
+    """Processes allocating at the same time never receive the same address"""
+    print("\n🧪 Testing allocation across processes...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        state = str(Path(temp_dir) / 'ipam.json')
+        script = WORKER.format(root=str(Path(__file__).parent), state=state)
+        workers = [subprocess.Popen([sys.executable, '-c', script], stdout=subprocess.PIPE, text=True)
+                   for _ in range(4)]
+        allocated = []
+        for worker in workers:
+            output, _ = worker.communicate(timeout=60)
+            allocated += output.split()
+
+        assert len(allocated) == 80 and len(set(allocated)) == 80 and 'None' not in allocated, \
+            f"Duplicate or missing allocations: {len(allocated)} total, {len(set(allocated))} unique"
+        final = IPAM(state, {'default': {'start': '192.168.122.100', 'end': '192.168.122.200'}}).stats()
+        assert final['default']['allocated'] == 80, f"Persisted state disagrees: {final}"
+
+    print("✅ 80 concurrent allocations, all unique")
+
+def test_legacy_import():
+    """Addresses marked used in ips.txt stay allocated"""
+    print("\n🧪 Testing ips.txt import...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ip_file = Path(temp_dir) / 'ips.txt'
+        ip_file.write_text("192.168.122.100 # used\n192.168.122.101\n192.168.122.102 # used\n")
+        ipam = IPAM(Path(temp_dir) / 'ipam.json', {'default': POOLS['default']})
+        assert ipam.import_legacy_file(ip_file) == 2 and ipam.allocate() == '192.168.122.101', \
+            f"Legacy allocations not imported: {ipam.allocated()}"
+
+    print("✅ Legacy allocations imported")
+
+def main():
+    """Main test function"""
+    return run_tests("IPAM", [
+        ("Pools", test_allocate_release_and_routing),
+        ("Concurrent Processes", test_concurrent_processes),
+        ("Legacy Import", test_legacy_import)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
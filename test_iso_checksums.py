@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test ISO Checksums
+Tests the persistent, background-filled ISO checksum cache
+"""
+
+import os
+import sys
+import time
+import hashlib
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.iso_checksums import ISOChecksumCache
+from testing_support import run_tests
+
+def test_background_hash_and_persistence():
+    """Lookups never hash; a stored checksum survives a restart and is dropped when the ISO changes"""
+    print("🧪 Testing ISO checksum cache...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        iso_path = base / 'ubuntu.iso'
+        iso_path.write_bytes(os.urandom(3 * 1024 * 1024))
+        expected = f"sha256:{hashlib.sha256(iso_path.read_bytes()).hexdigest()}"
+
+        cache = ISOChecksumCache(base / 'iso_checksums.json')
+        assert cache.get(str(iso_path)) is None, "First lookup should not block on hashing"
+        cache.wait(timeout=10)
+        assert cache.get(str(iso_path)) == expected, "Background hash was not stored"
+
+        restarted = ISOChecksumCache(base / 'iso_checksums.json')
+        assert restarted.get(str(iso_path)) == expected, "Checksum was not persisted"
+
+        iso_path.write_bytes(os.urandom(1024))
+        stat = iso_path.stat()
+        os.utime(iso_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert restarted.get(str(iso_path)) is None, "Changed ISO served a stale checksum"
+        restarted.wait(timeout=10)
+        assert restarted.get(str(iso_path)) == f"sha256:{hashlib.sha256(iso_path.read_bytes()).hexdigest()}", \
+            "Changed ISO was not re-hashed"
+
+    print("✅ ISO hashed once in the background and persisted")
+
+def test_watcher_hashes_new_isos():
+    """ISOs dropped into a watched directory are hashed without a lookup"""
+    print("\n🧪 Testing ISO directory watcher...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        cache = ISOChecksumCache(base / 'iso_checksums.json')
+        cache.start_watcher([base], interval=0.1)
+        try:
+            (base / 'new.iso').write_bytes(b'iso')
+            deadline = time.time() + 5
+            while time.time() < deadline and not (base / 'iso_checksums.json').exists():
+                time.sleep(0.05)
+        finally:
+            cache.stop_watcher()
+        assert cache.get(str(base / 'new.iso')) == f"sha256:{hashlib.sha256(b'iso').hexdigest()}", \
+            "New ISO was not hashed by the watcher"
+
+    print("✅ Watcher hashed the new ISO")
+
+def main():
+    """Main test function"""
+    return run_tests("ISO Checksum", [
+        ("Background Hash", test_background_hash_and_persistence),
+        ("Directory Watcher", test_watcher_hashes_new_isos)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
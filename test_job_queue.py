@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test Job Queue
+Tests background execution, per-provider concurrency, progress reporting
+and recovery of persisted jobs
+"""
+
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from job_queue import JobQueue, DuplicateJobError, SUCCEEDED, FAILED
+from job_store import JobStore, OP_COMPLETED_ON_RECOVERY
+from hypervisor_providers.progress import report_progress
+from testing_support import run_tests
+
+def wait_until_finished(queue, jobs, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if all(queue.get(job.id).state in (SUCCEEDED, FAILED) for job in jobs):
+            return True
+        time.sleep(0.02)
+    return False
+
+def test_submit_returns_immediately():
+    """Submitting a slow job does not block the caller"""
+    print("🧪 Testing non-blocking submit...")
+
+    queue = JobQueue(workers={'vmware': 1})
+
+    def slow_build(job):
+        report_progress('build', 'Running Packer', 50)
+        time.sleep(0.3)
+        return {'success': True, 'message': 'built'}
+
+    queue.register_handler('create_vm', slow_build)
+    started = time.time()
+    job = queue.submit('create_vm', 'vmware', vm_name='vm-a')
+    elapsed = time.time() - started
+
+    assert elapsed <= 0.1, f"submit() blocked for {elapsed:.2f}s"
+    assert wait_until_finished(queue, [job]), "Job did not finish"
+
+    data = queue.get(job.id).to_dict(include_events=True)
+    phases = [event['phase'] for event in data['events']]
+    assert data['state'] == SUCCEEDED and 'build' in phases, f"Unexpected job state: {data}"
+
+    print(f"✅ Job finished with phases {phases}")
+
+def test_per_provider_limits():
+    """A provider never runs more jobs than its worker count"""
+    print("\n🧪 Testing per-provider concurrency...")
+
+    queue = JobQueue(workers={'vmware': 2, 'nutanix': 1})
+    running = {'vmware': 0, 'nutanix': 0}
+    peak = {'vmware': 0, 'nutanix': 0}
+    lock = threading.Lock()
+
+    def run(job):
+        provider = job.provider
+        with lock:
+            running[provider] += 1
+            peak[provider] = max(peak[provider], running[provider])
+        time.sleep(0.1)
+        with lock:
+            running[provider] -= 1
+        return {'success': True}
+
+    queue.register_handler('clone_vm', run)
+    jobs = [queue.submit('clone_vm', provider, vm_name=f'{provider}-{i}')
+            for provider in ('vmware', 'nutanix') for i in range(4)]
+    wait_until_finished(queue, jobs)
+
+    assert peak == {'vmware': 2, 'nutanix': 1}, f"Unexpected peak concurrency: {peak}"
+
+    print(f"✅ Peak concurrency per provider: {peak}")
+
+def test_duplicate_vm_rejected():
+    """A VM with a job in flight cannot be queued twice"""
+    print("\n🧪 Testing duplicate job rejection...")
+
+    queue = JobQueue()
+    queue.register_handler('clone_vm', lambda job: (time.sleep(0.2), {'success': True})[1])
+    job = queue.submit('clone_vm', 'vmware', vm_name='vm-a')
+    try:
+        queue.submit('clone_vm', 'vmware', vm_name='vm-a')
+    except DuplicateJobError as e:
+        assert e.job.id == job.id, "Conflict reported the wrong job"
+    else:
+        raise AssertionError("Duplicate job was accepted")
+
+    print("✅ Duplicate job rejected")
+
+def test_recover_after_restart():
+    """Persisted jobs are resumed, completed or failed by a new queue"""
+    print("\n🧪 Testing job recovery after restart...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = JobStore(str(Path(temp_dir) / 'jobs.db'))
+        blocker = threading.Event()
+
+        # First "process": three jobs that never finish before the restart
+        queue = JobQueue(workers={'vmware': 2}, store=store)
+        queue.register_handler('clone_vm', lambda job: (blocker.wait(2), {'success': True})[1])
+        running_done = queue.submit('clone_vm', 'vmware', vm_name='vm-done', params={'cpu': 2})
+        running_lost = queue.submit('clone_vm', 'vmware', vm_name='vm-lost')
+        waiting = queue.submit('clone_vm', 'vmware', vm_name='vm-waiting')
+        time.sleep(0.1)
+
+        # vm-done's provider operation was finished by operation recovery
+        op_id = store.begin_operation('vmware', 'clone_vm', 'vm-done', job_id=running_done.id)
+        store.finish_operation(op_id, OP_COMPLETED_ON_RECOVERY)
+        store.update_job(running_lost.id, attempts=2)
+
+        # Second "process" sharing the same database
+        restarted = JobQueue(workers={'vmware': 2}, store=store, max_attempts=2)
+        restarted.register_handler('clone_vm', lambda job: {'success': True, 'params': job.params})
+        summary = restarted.recover()
+        blocker.set()
+        queue.shutdown(wait=True)
+
+        expected = {'resumed': [waiting.id], 'completed': [running_done.id], 'failed': [running_lost.id]}
+        assert summary == expected, f"Unexpected recovery summary: {summary}"
+
+        resumed = [restarted.get(waiting.id)]
+        assert wait_until_finished(restarted, resumed) and restarted.get(waiting.id).state == SUCCEEDED, \
+            "Resumed job did not complete"
+        assert restarted.get(running_done.id).result.get('recovered') is True, \
+            "Completed job was not marked as recovered"
+
+        restarted.shutdown(wait=True)
+        store.close()
+
+    print(f"✅ Recovery summary: { {key: len(ids) for key, ids in summary.items()} }")
+
+def main():
+    """Main test function"""
+    return run_tests("Job Queue", [
+        ("Non-blocking Submit", test_submit_returns_immediately),
+        ("Per-provider Limits", test_per_provider_limits),
+        ("Duplicate Rejection", test_duplicate_vm_rejected),
+        ("Restart Recovery", test_recover_after_restart)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
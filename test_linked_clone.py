@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test Linked Clone
+Tests linked-clone mode and the managed base snapshots of VMware templates
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.base_provider import VMConfig
+from hypervisor_providers.vmware_provider import VMwareProvider
+from testing_support import run_tests, write_fake_tool
+
+FAKE_VMRUN = '''#!{python}
+import sys
+from pathlib import Path
+base = Path({base!r})
+with open(base / 'calls.log', 'a') as log:
+    log.write(' '.join(sys.argv[1:2] + [a for a in sys.argv[2:] if a in ('full', 'linked')]) + '\\n')
+snapshots = base / 'snapshots.txt'
+names = snapshots.read_text().split() if snapshots.exists() else []
+if sys.argv[1] == 'listSnapshots':
+    print(f"Total snapshots: {{len(names)}}")
+    for name in names:
+        print(name)
+elif sys.argv[1] == 'snapshot':
+    if (base / 'template-running').exists():
+        print('Error: The virtual machine is in use')
+        sys.exit(1)
+    with open(snapshots, 'a') as f:
+        f.write(sys.argv[3] + '\\n')
+elif sys.argv[1] == 'clone':
+    if sys.argv[4] == 'linked' and sys.argv[5][len('-snapshot='):] not in names:
+        print('Error: Invalid snapshot')
+        sys.exit(1)
+    dest = Path(sys.argv[3])
+    dest.parent.mkdir(parents=True)
+    dest.write_text('numvcpus = "2"\\nmemsize = "2048"\\n')
+'''
+
+def make_provider(base, **config):
+    vmrun = write_fake_tool(base / 'vmrun', FAKE_VMRUN, base=str(base))
+    template_vmx = base / 'templates' / 'Ubuntu 64-bit (3)' / 'Ubuntu.vmx'
+    template_vmx.parent.mkdir(parents=True)
+    template_vmx.write_text('numvcpus = "2"\n')
+    return VMwareProvider({'vmrun_path': str(vmrun), 'base_directory': str(base),
+                           'templates_directory': str(base / 'templates'), **config})
+
+def clone(provider, name, clone_mode=None):
+    config = VMConfig(name=name, cpu=4, ram=4096, disk=20, os_type='linux', clone_mode=clone_mode)
+    return provider.clone_vm('ubuntu', config)
+
+def calls(base):
+    return (base / 'calls.log').read_text().splitlines()
+
+def test_linked_clone_reuses_base_snapshot():
+    """The base snapshot is taken once and survives a provider restart"""
+    print("🧪 Testing linked clones...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        provider = make_provider(base)
+
+        results = [clone(provider, f'test-{i}', 'linked') for i in range(3)]
+        assert all(r['success'] and r['clone_mode'] == 'linked' for r in results), f"Linked clones failed: {results}"
+
+        # A restarted provider trusts the recorded snapshot without asking vmrun
+        restarted = VMwareProvider(provider.config)
+        result = clone(restarted, 'test-3', 'linked')
+        log = calls(base)
+        assert result['success'] and log.count('snapshot') == 1 and log.count('listSnapshots') == 1, \
+            f"Base snapshot was not reused: {log}"
+        assert log.count('clone linked') == 4 and 'clone full' not in log, f"Unexpected clone calls: {log}"
+
+    print("✅ Four linked clones from one base snapshot")
+
+def test_auto_falls_back_to_full():
+    """Auto mode uses a full clone when the template cannot be snapshotted"""
+    print("\n🧪 Testing auto clone mode...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        provider = make_provider(base, clone_mode='auto')
+        (base / 'template-running').touch()
+
+        result = clone(provider, 'auto-1')
+        assert result['success'] and result['clone_mode'] == 'full', f"Auto mode did not fall back: {result}"
+
+        # Linked mode reports the failure instead of silently copying the template
+        result = clone(provider, 'linked-1', 'linked')
+        assert not result['success'] and not (provider.cloned_vms_directory / 'linked-1').exists(), \
+            f"Linked mode should fail without a base snapshot: {result}"
+
+        (base / 'template-running').unlink()
+        result = clone(provider, 'auto-2')
+        assert result['success'] and result['clone_mode'] == 'linked', f"Auto mode did not use a linked clone: {result}"
+
+        # Snapshot removed outside the provider: auto re-checks after a full clone
+        (base / 'snapshots.txt').unlink()
+        result = clone(provider, 'auto-3')
+        template_vmx = base / 'templates' / 'Ubuntu 64-bit (3)' / 'Ubuntu.vmx'
+        assert result['success'] and result['clone_mode'] == 'full' and not provider.base_snapshots.get(template_vmx), \
+            f"Stale base snapshot was not forgotten: {result}"
+
+    print("✅ Auto mode picks linked clones when it can")
+
+def main():
+    """Main test function"""
+    return run_tests("Linked Clone", [
+        ("Linked Clone", test_linked_clone_reuses_base_snapshot),
+        ("Auto Clone Mode", test_auto_falls_back_to_full)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test Metrics
+Tests histogram/counter exposition, scrape-time gauges and instrumentation of provider operations and vmrun
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.metrics import MetricsRegistry, REGISTRY
+from hypervisor_providers.vmrun_executor import VmrunExecutor
+from testing_support import make_manager, run_tests, write_fake_tool
+
+FAKE_VMRUN = '''#!{python}
+import sys
+sys.exit(0 if sys.argv[1] == 'list' else 3)
+'''
+
+def sample(text, line_start):
+    """Value of the exposition line starting with line_start"""
+    for line in text.splitlines():
+        if line.startswith(line_start + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+def test_exposition():
+    """Histograms are cumulative, labels are escaped and collectors are read at scrape time"""
+    print("🧪 Testing text exposition...")
+
+    registry = MetricsRegistry()
+    latency = registry.histogram('latency_seconds', 'Latency', ('route',), buckets=(0.1, 1))
+    errors = registry.counter('errors_total', 'Errors', ('kind',))
+    depth = {'vmware': 3}
+    registry.gauge('depth', 'Depth', lambda: [({'provider': p}, n) for p, n in depth.items()])
+
+    for value in (0.05, 0.5, 5):
+        latency.labels('/api/vms/<vm_name>').observe(value)
+    errors.labels('say "hi"').inc()
+    depth['vmware'] = 7
+    text = registry.render()
+
+    expected = {
+        'latency_seconds_bucket{route="/api/vms/<vm_name>",le="0.1"}': 1,
+        'latency_seconds_bucket{route="/api/vms/<vm_name>",le="1"}': 2,
+        'latency_seconds_bucket{route="/api/vms/<vm_name>",le="+Inf"}': 3,
+        'latency_seconds_count{route="/api/vms/<vm_name>"}': 3,
+        'latency_seconds_sum{route="/api/vms/<vm_name>"}': 5.55,
+        'errors_total{kind="say \\"hi\\""}': 1,
+        'depth{provider="vmware"}': 7
+    }
+    for line_start, value in expected.items():
+        assert sample(text, line_start) == value, f"{line_start} != {value}:\n{text}"
+    assert '# TYPE latency_seconds histogram' in text and '# TYPE depth gauge' in text, f"Missing TYPE lines:\n{text}"
+
+    print("✅ Exposition format correct")
+
+def test_instrumentation():
+    """Provider operations and vmrun commands are timed with their outcome and exit code"""
+    print("\n🧪 Testing instrumentation...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        vmrun = write_fake_tool(Path(temp_dir) / 'vmrun', FAKE_VMRUN)
+        executor = VmrunExecutor(str(vmrun))
+        executor.run('list')
+        executor.run('start', 'a.vmx')
+        executor.shutdown()
+
+        manager = make_manager({})
+        manager._run_journaled('stop_vm', 'test', 'web-1', {}, lambda: False)
+        try:
+            manager._run_journaled('stop_vm', 'test', 'web-1', {}, lambda: 1 / 0)
+        except ZeroDivisionError:
+            pass
+
+    text = REGISTRY.render()
+    expected = {
+        'subprocess_exits_total{command="vmrun list",exit_code="0"}': 1,
+        'subprocess_exits_total{command="vmrun start",exit_code="3"}': 1,
+        'subprocess_duration_seconds_count{command="vmrun list"}': 1,
+        'provider_operation_duration_seconds_count{provider="test",operation="stop_vm",outcome="failed"}': 1,
+        'provider_operation_duration_seconds_count{provider="test",operation="stop_vm",outcome="error"}': 1,
+        'provider_operation_errors_total{provider="test",operation="stop_vm"}': 2
+    }
+    for line_start, value in expected.items():
+        assert sample(text, line_start) == value, f"{line_start} != {value}"
+
+    print("✅ Provider operations and subprocesses recorded")
+
+def main():
+    """Main test function"""
+    return run_tests("Metrics", [
+        ("Exposition", test_exposition),
+        ("Instrumentation", test_instrumentation)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
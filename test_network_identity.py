@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test Network Identity
+Tests pre-boot static IP injection into cloned VMware VMs via guestinfo and cloud-init seeds
+"""
+
+import os
+import sys
+import json
+import base64
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.base_provider import VMConfig
+from hypervisor_providers.vmware_provider import VMwareProvider
+from testing_support import run_tests, write_fake_tool
+
+# Stands in for genisoimage: "writes" the ISO as a JSON dump of the seed files
+FAKE_GENISOIMAGE = '''#!{python}
+import sys, json
+from pathlib import Path
+args = sys.argv[1:]
+output = Path(args[args.index('-output') + 1])
+source = Path(args[-1])
+output.write_text(json.dumps({{p.name: p.read_text() for p in source.iterdir()}}))
+'''
+
+VMX = 'displayName = "template"\nnumvcpus = "1"\nmemsize = "1024"\nide1:0.fileName = "ubuntu.iso"\n'
+
+def make_provider(base, mode):
+    (base / 'http').mkdir()
+    (base / 'http' / 'user-data').write_text('#cloud-config\nautoinstall:\n  version: 1\n')
+    (base / 'http' / 'meta-data').write_text('# empty\n')
+    provider = VMwareProvider({'vmrun_path': str(base / 'vmrun'), 'base_directory': str(base),
+                               'templates_directory': str(base / 'templates'), 'iso_path': str(base / 'none.iso'),
+                               'watch_iso_directories': False, 'ip_config_mode': mode})
+    provider.post_boot_assignments = []
+    provider._assign_ip_address = lambda *args: provider.post_boot_assignments.append(args) or {
+        'success': False, 'error': 'post-boot assignment used'}
+    return provider
+
+def make_vmx(base, name):
+    vmx_path = base / 'cloned-vms' / name / f"{name}.vmx"
+    vmx_path.parent.mkdir(parents=True)
+    vmx_path.write_text(VMX)
+    return vmx_path
+
+def read_vmx(vmx_path):
+    settings = {}
+    for line in vmx_path.read_text().splitlines():
+        if '=' in line:
+            key, value = line.split('=', 1)
+            settings[key.strip()] = value.strip().strip('"')
+    return settings
+
+def config(name):
+    return VMConfig(name=name, cpu=4, ram=4096, disk=20, os_type='linux',
+                    ip_address='192.168.1.50', gateway='192.168.1.1', dns='1.1.1.1')
+
+def test_guestinfo_mode():
+    """The VMX carries cloud-init metadata with the static address before boot"""
+    print("🧪 Testing guestinfo network identity...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        provider = make_provider(base, 'guestinfo')
+        vmx_path = make_vmx(base, 'web-1')
+        provider._configure_cloned_vm(vmx_path, config('web-1'))
+
+        settings = read_vmx(vmx_path)
+        metadata = json.loads(base64.b64decode(settings.get('guestinfo.metadata', '')))
+        interface = metadata['network']['ethernets']['primary']
+        assert settings['numvcpus'] == '4' and settings['memsize'] == '4096' and not provider.post_boot_assignments, \
+            f"CPU/RAM not configured: {settings}"
+        assert (interface['addresses'] == ['192.168.1.50/24'] and interface['routes'][0]['via'] == '192.168.1.1'
+                and metadata['local-hostname'] == 'web-1' and settings['guestinfo.ip.address'] == '192.168.1.50'), \
+            f"Unexpected guestinfo metadata: {metadata}"
+
+    print("✅ Network identity written to guestinfo")
+
+def test_seed_mode():
+    """A NoCloud seed ISO is generated and attached in place of the installer CD-ROM"""
+    print("\n🧪 Testing cloud-init seed network identity...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        bin_dir = base / 'bin'
+        bin_dir.mkdir()
+        write_fake_tool(bin_dir / 'genisoimage', FAKE_GENISOIMAGE)
+        old_path = os.environ['PATH']
+        os.environ['PATH'] = str(bin_dir)
+        try:
+            provider = make_provider(base, 'seed')
+            vmx_path = make_vmx(base, 'web-2')
+            provider._configure_cloned_vm(vmx_path, config('web-2'))
+        finally:
+            os.environ['PATH'] = old_path
+
+        settings = read_vmx(vmx_path)
+        seed_iso = vmx_path.parent / 'seed.iso'
+        assert (settings.get('ide1:0.fileName') == str(seed_iso) and settings.get('ide1:0.startConnected') == 'TRUE'
+                and not provider.post_boot_assignments), f"Seed ISO not attached: {settings}"
+        seed = json.loads(seed_iso.read_text())
+        network = json.loads(seed['network-config'])
+        assert (network['ethernets']['primary']['addresses'] == ['192.168.1.50/24']
+                and 'local-hostname: web-2' in seed['meta-data'] and 'autoinstall' not in seed['user-data']), \
+            f"Unexpected seed contents: {seed}"
+
+    print("✅ Seed ISO generated and attached")
+
+def main():
+    """Main test function"""
+    return run_tests("Network Identity", [
+        ("Guestinfo Mode", test_guestinfo_mode),
+        ("Seed Mode", test_seed_mode)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test Nutanix Pagination
+Tests paginated, streaming VM inventory retrieval
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from testing_support import FakeResponse, make_nutanix_provider, run_tests
+
+class PagedSession:
+    """vms/list endpoint honouring offset/length over a large fleet"""
+
+    def __init__(self, total):
+        self.total = total
+        self.offsets = []
+        self.lock = threading.Lock()
+
+    def post(self, url, json=None, timeout=None):
+        offset, length = json.get('offset', 0), json['length']
+        with self.lock:
+            self.offsets.append(offset)
+        entities = [{'metadata': {'uuid': f'uuid-{i}'},
+                     'spec': {'name': f'vm-{i}', 'resources': {'power_state': 'ON'}}}
+                    for i in range(offset, min(offset + length, self.total))]
+        return FakeResponse(200, {'metadata': {'total_matches': self.total}, 'entities': entities})
+
+def make_provider(total, page_size):
+    return make_nutanix_provider(PagedSession(total), list_page_size=page_size, list_page_workers=3)
+
+def test_all_pages_listed():
+    """Every VM beyond the first page is returned, in order"""
+    print("🧪 Testing paginated listing...")
+
+    provider = make_provider(total=1234, page_size=100)
+    vms = provider.list_vms()
+    names = [vm.name for vm in vms]
+
+    assert names == [f'vm-{i}' for i in range(1234)], f"Got {len(names)} VMs"
+    assert sorted(provider.session.offsets) == list(range(0, 1234, 100)), \
+        f"Unexpected page offsets: {sorted(provider.session.offsets)}"
+
+    print(f"✅ Listed {len(vms)} VMs in {len(provider.session.offsets)} pages")
+
+def test_streaming_is_bounded():
+    """The iterator only fetches a few pages ahead of the consumer"""
+    print("\n🧪 Testing bounded streaming...")
+
+    provider = make_provider(total=5000, page_size=100)
+    iterator = provider.iter_vms()
+    for _ in range(150):
+        next(iterator)
+    fetched = len(provider.session.offsets)
+    iterator.close()
+
+    assert fetched <= 1 + 1 + provider.list_page_workers, f"Fetched {fetched} pages to yield 150 VMs"
+
+    print(f"✅ Fetched {fetched} pages to yield 150 of 5000 VMs")
+
+def main():
+    """Main test function"""
+    return run_tests("Nutanix Pagination", [
+        ("Paginated Listing", test_all_pages_listed),
+        ("Bounded Streaming", test_streaming_is_bounded)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
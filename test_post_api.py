@@ -112,15 +112,20 @@ class VMAPITester:
                 f"{self.base_url}/api/vms",
                 json=vm_data,
                 headers={"Content-Type": "application/json"},
-                timeout=3600  # 1 hour timeout for VM creation
+                timeout=60  # The build runs as a background job
             )
             
             result = {
                 'status_code': response.status_code,
                 'response': response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text,
-                'success': response.status_code == 200
+                'success': False
             }
             
+            if response.status_code == 202:
+                job = self.wait_for_job(result['response']['job_id'])
+                result['response'] = job
+                result['success'] = job.get('state') == 'succeeded'
+            
             if result['success']:
                 print("✅ VM creation request successful")
             else:
@@ -136,6 +141,19 @@ class VMAPITester:
             print(f"❌ VM creation error: {e}")
             return {'status_code': 500, 'response': str(e), 'success': False}
     
+    def wait_for_job(self, job_id: str, timeout: int = 3600) -> Dict[str, Any]:
+        """Poll a provisioning job until it finishes"""
+        start_time = time.time()
+        while time.time() - start_time < timeout:
+            response = self.session.get(f"{self.base_url}/api/jobs/{job_id}", timeout=30)
+            job = response.json().get('job', {})
+            if job.get('state') in ('succeeded', 'failed'):
+                return job
+            print(f"   Job {job_id[:8]}: {job.get('phase')} {job.get('message') or ''}")
+            time.sleep(5)
+        
+        return {'state': 'timeout', 'error': f"Job {job_id} did not finish within {timeout}s"}
+    
     def list_vms(self) -> Dict[str, Any]:
         """List all VMs"""
         try:
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test Provider Fan-out
+Tests concurrent multi-provider queries with per-provider deadlines
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from provider_fanout import ProviderFanout
+from testing_support import UnreachableSession, make_manager, make_nutanix_provider, run_tests
+
+class FakeProvider:
+    """Provider stub answering list_vms after a delay"""
+
+    def __init__(self, vms, delay=0.0, error=None):
+        self.vms = vms
+        self.delay = delay
+        self.error = error
+
+    def list_vms(self, strict=False):
+        time.sleep(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        return self.vms
+
+    def get_clusters(self, strict=False):
+        return ['local']
+
+    def get_networks(self, strict=False):
+        return ['NAT']
+
+    def iter_vms(self):
+        yield from self.list_vms()
+
+def test_concurrent_queries():
+    """Providers are queried in parallel, not one after the other"""
+    print("🧪 Testing concurrent fan-out...")
+
+    fanout = ProviderFanout(max_workers=4, default_timeout=5)
+    providers = {
+        'vmware': FakeProvider(['vm-a'], delay=0.3),
+        'nutanix': FakeProvider(['vm-b'], delay=0.3)
+    }
+
+    result = fanout.run('list_vms', providers)
+    fanout.shutdown()
+
+    assert result.values() == {'vmware': ['vm-a'], 'nutanix': ['vm-b']}, f"Unexpected values: {result.values()}"
+    assert result.duration < 0.55, f"Fan-out took {result.duration:.2f}s, providers ran sequentially"
+
+    print(f"✅ Both providers answered in {result.duration:.2f}s")
+
+def test_partial_results():
+    """A slow or failing provider does not hide the others"""
+    print("\n🧪 Testing partial results...")
+
+    fanout = ProviderFanout(max_workers=4, default_timeout=5, timeouts={'nutanix': 0.2})
+    providers = {
+        'vmware': FakeProvider(['vm-a']),
+        'nutanix': FakeProvider(['vm-b'], delay=1.0),
+        'broken': FakeProvider([], error="vmrun not found")
+    }
+
+    started = time.monotonic()
+    result = fanout.run('list_vms', providers)
+    elapsed = time.monotonic() - started
+    fanout.shutdown()
+
+    metadata = result.metadata()
+    assert result.values() == {'vmware': ['vm-a']}, f"Unexpected values: {result.values()}"
+    assert metadata['nutanix']['timed_out'] and metadata['broken']['error'] == "vmrun not found", \
+        f"Unexpected metadata: {metadata}"
+    assert result.partial
+    assert elapsed < 0.9, f"Fan-out waited {elapsed:.2f}s for the slow provider"
+
+    print(f"✅ Partial result returned after {elapsed:.2f}s: {metadata}")
+
+def test_inflight_calls_are_shared():
+    """A call still running past its deadline is joined, not duplicated"""
+    print("\n🧪 Testing in-flight call sharing...")
+
+    calls = []
+
+    class CountingProvider(FakeProvider):
+        def list_vms(self):
+            calls.append(time.monotonic())
+            return super().list_vms()
+
+    fanout = ProviderFanout(max_workers=4, default_timeout=0.1)
+    providers = {'nutanix': CountingProvider(['vm-b'], delay=0.5)}
+
+    fanout.run('list_vms', providers)
+    fanout.run('list_vms', providers)
+    fanout.shutdown()
+
+    assert len(calls) == 1, f"Provider was called {len(calls)} times"
+
+    print("✅ Second query joined the running call")
+
+def test_custom_calls_not_shared():
+    """Concurrent fan-outs with the same operation name but different calls get their own results"""
+    print("\n🧪 Testing custom calls are not shared...")
+
+    fanout = ProviderFanout(max_workers=4, default_timeout=0.1)
+    providers = {'nutanix': FakeProvider(['vm-b'], delay=0.3)}
+
+    def get_vm(vm_name):
+        return lambda provider: (time.sleep(provider.delay), vm_name)[1]
+
+    # The first call outlives its deadline and is still running when the second starts
+    fanout.run('get_vm_info', providers, call=get_vm('web-1'))
+    fanout.set_timeout('nutanix', 1.0)
+    second = fanout.run('get_vm_info', providers, call=get_vm('db-1'))
+    fanout.shutdown()
+
+    assert second.values().get('nutanix') == 'db-1', \
+        f"Custom call answered with another call's result: {second.values()}"
+
+    print("✅ Each custom call ran on its own")
+
+def test_streaming_deadline():
+    """A hung provider is dropped from a streamed listing after its deadline"""
+    print("\n🧪 Testing streaming deadline...")
+
+    manager = make_manager({
+        'vmware': FakeProvider(['vm-a', 'vm-b']),
+        'nutanix': FakeProvider(['vm-c'], delay=30)
+    }, timeouts={'nutanix': 0.2})
+
+    summary = {}
+    started = time.time()
+    vms = list(manager.iter_vms(summary=summary))
+    elapsed = time.time() - started
+    manager.fanout.shutdown()
+
+    assert vms == [('vmware', 'vm-a'), ('vmware', 'vm-b')] and elapsed < 1.0, f"Got {vms} after {elapsed:.2f}s"
+    assert summary['nutanix']['timed_out'] and summary['nutanix']['error'], f"Unexpected summary: {summary}"
+    assert summary['vmware']['count'] == 2, f"Unexpected summary: {summary}"
+
+    print(f"✅ Hung provider reported as timed out after {elapsed:.2f}s")
+
+def test_provider_outage_reported():
+    """A provider whose API fails is reported as failed, not as an empty answer"""
+    print("\n🧪 Testing provider outage...")
+
+    manager = make_manager({'vmware': FakeProvider(['vm-a']),
+                            'nutanix': make_nutanix_provider(UnreachableSession())})
+    for operation in ('list_vms', 'get_clusters', 'get_networks'):
+        result = manager.query_providers(operation, use_cache=False)
+        metadata = result.metadata()
+        assert result.partial and not metadata['nutanix']['ok'], f"{operation}: {metadata}"
+        assert 'unreachable' in metadata['nutanix']['error'], f"{operation}: {metadata}"
+        assert metadata['vmware']['ok'], f"{operation}: {metadata}"
+    manager.fanout.shutdown()
+
+    print("✅ Outage reported for list_vms, get_clusters and get_networks")
+
+def main():
+    """Main test function"""
+    return run_tests("Provider Fan-out", [
+        ("Concurrent Queries", test_concurrent_queries),
+        ("Partial Results", test_partial_results),
+        ("In-flight Sharing", test_inflight_calls_are_shared),
+        ("Custom Calls", test_custom_calls_not_shared),
+        ("Streaming Deadline", test_streaming_deadline),
+        ("Provider Outage", test_provider_outage_reported)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test Reclaimer
+Tests trash renames and the rate-limited background deletion of VM directories
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.reclaimer import DirectoryReclaimer
+from testing_support import run_tests
+
+def make_vm_directory(directory, files=4, size=50_000):
+    directory.mkdir(parents=True)
+    (directory / f"{directory.name}.vmx").write_text('displayName = "vm"\n')
+    for i in range(files):
+        (directory / f"disk-s00{i}.vmdk").write_bytes(b'x' * size)
+    return directory
+
+def test_reclaim_is_immediate_and_rate_limited():
+    """The name is freed at once; contents are freed no faster than the limit"""
+    print("🧪 Testing background reclamation...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        reclaimer = DirectoryReclaimer(base / 'trash', bytes_per_second=200_000)
+        vm_dir = make_vm_directory(base / 'cloned-vms' / 'web-1')
+
+        started = time.time()
+        reclaimed = reclaimer.reclaim(vm_dir)
+        assert reclaimed and not vm_dir.exists() and time.time() - started <= 0.5, \
+            "Directory was not moved out of the way immediately"
+
+        reclaimer.start()
+        time.sleep(0.3)
+        pending = reclaimer.stats()['pending_bytes']
+        assert 0 < pending < 200_000, f"Pending bytes not reported while reaping: {reclaimer.stats()}"
+        assert reclaimer.wait(timeout=10), f"Trash not emptied: {reclaimer.stats()}"
+        elapsed = time.time() - started
+        stats = reclaimer.stats()
+        reclaimer.stop()
+        assert elapsed >= 0.9 and stats['reclaimed_directories'] == 1 and not list((base / 'trash').iterdir()), \
+            f"Unexpected reclamation after {elapsed:.2f}s: {stats}"
+
+    print("✅ Directory renamed at once and reaped at the rate limit")
+
+def test_leftovers_reaped_on_start():
+    """Entries left in the trash by a previous process are reaped"""
+    print("\n🧪 Testing trash leftovers...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        make_vm_directory(base / 'trash' / 'old-vm-1700000000-abcd1234', files=2, size=1000)
+        reclaimer = DirectoryReclaimer(base / 'trash')
+        reclaimer.start()
+        emptied = reclaimer.wait(timeout=10)
+        reclaimer.stop()
+        assert emptied and not list((base / 'trash').iterdir()), f"Leftover not reaped: {reclaimer.stats()}"
+
+    print("✅ Leftovers reaped")
+
+def main():
+    """Main test function"""
+    return run_tests("Reclaimer", [
+        ("Background Reclamation", test_reclaim_is_immediate_and_rate_limited),
+        ("Trash Leftovers", test_leftovers_reaped_on_start)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
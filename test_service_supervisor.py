@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test Service Supervisor
+Tests background service startup with retries and mock server supervision
+"""
+
+import sys
+import time
+import json
+import socket
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from service_supervisor import BackgroundService, MockServerSupervisor, ServiceUnavailableError
+from hypervisor_manager import HypervisorManager
+from testing_support import run_tests
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def test_background_service_retries():
+    """start() returns immediately and failed builds are retried with backoff"""
+    print("🧪 Testing background service startup...")
+
+    calls = []
+
+    def factory():
+        calls.append(time.time())
+        time.sleep(0.1)
+        if len(calls) < 3:
+            raise RuntimeError("provider not reachable")
+        return 'backend'
+
+    service = BackgroundService('test-backend', factory, initial_backoff=0.05, max_backoff=0.2)
+    started = time.time()
+    service.start()
+    assert time.time() - started <= 0.05, "start() blocked"
+
+    try:
+        service.get(timeout=0.05)
+    except ServiceUnavailableError:
+        pass
+    else:
+        raise AssertionError("get() returned before the service was ready")
+
+    assert service.get(timeout=2) == 'backend' and len(calls) == 3, \
+        f"Unexpected result after {len(calls)} attempts: {service.status()}"
+
+    print(f"✅ Ready after {service.status()['attempts']} attempts")
+
+def test_mock_server_restarted():
+    """The supervisor starts the server, waits for readiness and restarts it after a crash"""
+    print("\n🧪 Testing mock server supervision...")
+
+    port = free_port()
+    supervisor = MockServerSupervisor(
+        command=[sys.executable, '-m', 'http.server', str(port), '--bind', '127.0.0.1'],
+        health_url=f'http://127.0.0.1:{port}/',
+        probe_interval=0.2, ready_timeout=10, initial_backoff=0.1)
+    try:
+        supervisor.start()
+        assert supervisor.wait_ready(10), f"Server never became ready: {supervisor.status()}"
+        first_pid = supervisor.status()['pid']
+
+        supervisor.process.kill()
+        supervisor.process.wait()
+        time.sleep(0.3)
+        assert supervisor.wait_ready(10) and supervisor.status()['pid'] != first_pid, \
+            f"Server was not restarted: {supervisor.status()}"
+    finally:
+        supervisor.stop()
+
+    print(f"✅ Server restarted ({supervisor.status()['starts']} starts)")
+
+def test_manager_shutdown():
+    """A backend torn down after a failed build leaves none of its threads behind"""
+    print("\n🧪 Testing backend shutdown...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_file = Path(temp_dir) / 'config.json'
+        config_file.write_text(json.dumps({'providers': {}, 'inventory_cache': {'enabled': False}}))
+        manager = HypervisorManager(str(config_file))
+        manager.shutdown()
+        threads = [manager.health_monitor._thread, manager.warm_pool._thread]
+        for thread in threads:
+            if thread:
+                thread.join(5)
+
+    # Only this manager's threads: other test modules leave managers running
+    leftover = [thread.name for thread in threads if thread and thread.is_alive()]
+    assert not leftover, f"Threads still running: {leftover}"
+
+    print("✅ Background threads stopped")
+
+def test_replaced_providers_shut_down():
+    """Config changes shut down the provider instances they replace or remove"""
+    print("\n🧪 Testing replaced provider shutdown...")
+
+    nutanix = {'enabled': True, 'prism_central_ip': '127.0.0.1', 'username': 'admin', 'password': 'secret'}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_file = Path(temp_dir) / 'config.json'
+        config_file.write_text(json.dumps({'providers': {'nutanix': nutanix}, 'inventory_cache': {'enabled': False}}))
+        manager = HypervisorManager(str(config_file))
+        stopped = []
+
+        def current():
+            provider = manager.providers['nutanix']
+            provider.shutdown = lambda: stopped.append(provider)
+            return provider
+
+        changes = [
+            ("update_provider_config", lambda: manager.update_provider_config('nutanix', nutanix)),
+            ("update_config", lambda: manager.update_config({'default_provider': 'nutanix'})),
+            ("enable_provider", lambda: manager.enable_provider('nutanix')),
+            ("disable_provider", lambda: manager.disable_provider('nutanix'))
+        ]
+        try:
+            for name, change in changes:
+                old = current()
+                change()
+                assert stopped[-1:] == [old] and manager.providers.get('nutanix') is not old, \
+                    f"{name} left the replaced provider running"
+        finally:
+            manager.shutdown()
+
+    print("✅ Replaced providers shut down")
+
+def main():
+    """Main test function"""
+    return run_tests("Service Supervisor", [
+        ("Background Service", test_background_service_retries),
+        ("Mock Server Supervision", test_mock_server_restarted),
+        ("Manager Shutdown", test_manager_shutdown),
+        ("Replaced Provider Shutdown", test_replaced_providers_shut_down)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
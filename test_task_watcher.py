@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test Task Watcher
+Tests multiplexed polling of Nutanix tasks
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.task_watcher import TaskWatcher, SUCCEEDED, FAILED, TIMED_OUT
+from testing_support import FakeResponse, run_tests
+
+class TaskSession:
+    """Tasks that finish at a given time, readable one by one or via tasks/list"""
+
+    def __init__(self, finish_at, supports_list=True):
+        self.finish_at = finish_at
+        self.supports_list = supports_list
+        self.gets = 0
+        self.lists = 0
+        self.threads = set()
+
+    def _task(self, task_uuid):
+        done_at, final = self.finish_at[task_uuid]
+        return {'uuid': task_uuid, 'status': final if time.time() >= done_at else 'RUNNING'}
+
+    def get(self, url, timeout=None):
+        self.gets += 1
+        self.threads.add(threading.current_thread().name)
+        return FakeResponse(200, self._task(url.rsplit('/', 1)[1]))
+
+    def post(self, url, json=None, timeout=None):
+        if not self.supports_list:
+            return FakeResponse(404)
+        self.lists += 1
+        uuids = [term.split('==', 1)[1] for term in json['filter'].split(',')]
+        return FakeResponse(200, {'entities': [self._task(task_uuid) for task_uuid in uuids]})
+
+def test_many_tasks_batched():
+    """Concurrent tasks are tracked by one loop and read with tasks/list"""
+    print("🧪 Testing batched polling...")
+
+    now = time.time()
+    finish_at = {f'task-{i}': (now + 0.3, SUCCEEDED) for i in range(20)}
+    finish_at['task-bad'] = (now + 0.3, FAILED)
+    session = TaskSession(finish_at)
+    watcher = TaskWatcher(session, 'http://pc/api/nutanix/v3', initial_interval=0.05, max_interval=0.2)
+
+    futures = {task_uuid: watcher.watch(task_uuid, timeout=5) for task_uuid in finish_at}
+    results = {task_uuid: future.result(timeout=5)['status'] for task_uuid, future in futures.items()}
+
+    assert results == {**{f'task-{i}': SUCCEEDED for i in range(20)}, 'task-bad': FAILED}, results
+    assert not session.gets and session.lists <= 10, \
+        f"Expected a few batched lookups, got {session.lists} lists and {session.gets} GETs"
+
+    print(f"✅ 21 tasks resolved with {session.lists} tasks/list calls")
+
+def test_fast_completion_and_fallback():
+    """Results land shortly after the task finishes, using GETs without tasks/list"""
+    print("\n🧪 Testing completion latency and GET fallback...")
+
+    finish_at = {'task-a': (time.time() + 0.2, SUCCEEDED), 'task-b': (time.time() + 0.2, SUCCEEDED)}
+    session = TaskSession(finish_at, supports_list=False)
+    watcher = TaskWatcher(session, 'http://pc/api/nutanix/v3', initial_interval=0.05, max_interval=10)
+
+    started = time.time()
+    future_b = watcher.watch('task-b', timeout=5)
+    ok = watcher.wait('task-a', timeout=5)
+    elapsed = time.time() - started
+    future_b.result(timeout=5)
+
+    assert ok
+    assert elapsed <= 0.6, f"Task result took {elapsed:.2f}s"
+
+    print(f"✅ Task result after {elapsed:.2f}s using {session.gets} GETs")
+
+def test_timeout():
+    """A task that never finishes is reported as timed out"""
+    print("\n🧪 Testing task timeout...")
+
+    session = TaskSession({'task-slow': (time.time() + 60, SUCCEEDED)})
+    watcher = TaskWatcher(session, 'http://pc/api/nutanix/v3', initial_interval=0.05)
+    result = watcher.watch('task-slow', timeout=0.3).result(timeout=5)
+
+    assert result['status'] == TIMED_OUT, f"Unexpected result: {result}"
+    assert not watcher.pending()
+
+    print("✅ Task timed out")
+
+def main():
+    """Main test function"""
+    return run_tests("Task Watcher", [
+        ("Batched Polling", test_many_tasks_batched),
+        ("Completion Latency", test_fast_completion_and_fallback),
+        ("Timeout", test_timeout)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test vmrun Executor
+Tests concurrency limits, per-VMX ordering, deduplication and timeouts of vmrun calls
+"""
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.vmrun_executor import VmrunExecutor
+from testing_support import run_tests, write_fake_tool
+
+FAKE_VMRUN = '''#!{python}
+import os
+import sys
+import time
+from pathlib import Path
+log = Path({log!r})
+with open(log, 'a') as f:
+    f.write(f"start {{sys.argv[1]}} {{' '.join(sys.argv[2:])}} {{time.time()}}\\n")
+time.sleep(float(os.environ.get('FAKE_VMRUN_DELAY_' + sys.argv[1], os.environ.get('FAKE_VMRUN_DELAY', '0.3'))))
+with open(log, 'a') as f:
+    f.write(f"end {{sys.argv[1]}} {{' '.join(sys.argv[2:])}} {{time.time()}}\\n")
+print("ok")
+'''
+
+def make_vmrun(base):
+    return write_fake_tool(base / 'vmrun', FAKE_VMRUN, log=str(base / 'calls.log'))
+
+def read_events(base):
+    events = []
+    for line in (base / 'calls.log').read_text().splitlines():
+        kind, rest = line.split(' ', 1)
+        call, stamp = rest.rsplit(' ', 1)
+        events.append((float(stamp), kind, call))
+    return sorted(events)
+
+def max_overlap(events):
+    running = peak = 0
+    for _, kind, _ in events:
+        running += 1 if kind == 'start' else -1
+        peak = max(peak, running)
+    return peak
+
+def test_concurrency_and_ordering():
+    """Host-wide cap holds and commands on one VMX run one at a time, in order"""
+    print("🧪 Testing vmrun concurrency limit and per-VMX ordering...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        executor = VmrunExecutor(str(make_vmrun(base)), max_concurrency=2)
+        futures = [executor.submit('start', base / f'vm{i}.vmx', 'nogui') for i in range(4)]
+        futures += [executor.submit(command, base / 'vm0.vmx') for command in ('stop', 'reset')]
+        results = [future.result(timeout=30) for future in futures]
+        assert all(result.returncode == 0 for result in results), "vmrun calls failed"
+
+        events = read_events(base)
+        assert max_overlap(events) <= 2, f"More than 2 vmrun processes ran at once: {max_overlap(events)}"
+        vm0 = [(kind, call.split()[0]) for _, kind, call in events if 'vm0.vmx' in call]
+        expected = [('start', 'start'), ('end', 'start'), ('start', 'stop'), ('end', 'stop'),
+                    ('start', 'reset'), ('end', 'reset')]
+        assert vm0 == expected, f"Commands on one VMX overlapped or ran out of order: {vm0}"
+
+    print("✅ Concurrency capped and VMX commands serialized")
+
+def test_read_only_deduplication():
+    """Identical read-only calls in flight share one vmrun process"""
+    print("\n🧪 Testing read-only call deduplication...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        executor = VmrunExecutor(str(make_vmrun(base)), max_concurrency=4)
+        futures = [executor.submit('list') for _ in range(5)]
+        assert len({id(future) for future in futures}) == 1, "Identical list calls were not shared"
+        futures[0].result(timeout=10)
+        executor.run('list')
+
+        starts = [call for _, kind, call in read_events(base) if kind == 'start']
+        stats = executor.stats()['commands']['list']
+        assert len(starts) == 2 and stats['deduplicated'] == 4 and stats['calls'] == 2, \
+            f"Unexpected list runs: {starts}, {stats}"
+
+    print("✅ Read-only calls deduplicated")
+
+def test_timeout_is_recorded():
+    """A command outliving its timeout is killed, raised and counted"""
+    print("\n🧪 Testing vmrun timeouts...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        os.environ['FAKE_VMRUN_DELAY'] = '5'
+        try:
+            executor = VmrunExecutor(str(make_vmrun(base)), timeouts={'stop': 0.5})
+            started = time.time()
+            try:
+                executor.run('stop', base / 'vm.vmx')
+                raise AssertionError("Timeout not raised")
+            except subprocess.TimeoutExpired:
+                pass
+            assert time.time() - started <= 3, "Command was not killed at its timeout"
+
+            # The VMX is released after a timeout
+            executor.timeouts['start'] = 0.5
+            try:
+                executor.run('start', base / 'vm.vmx')
+            except subprocess.TimeoutExpired:
+                pass
+        finally:
+            del os.environ['FAKE_VMRUN_DELAY']
+
+        stats = executor.stats()
+        assert stats['commands']['stop']['timeouts'] == 1 and not stats['queued'] and not stats['serialized_vms'], \
+            f"Unexpected stats after timeout: {stats}"
+
+    print("✅ Timeouts enforced and recorded")
+
+def test_read_only_lane():
+    """Inventory and probes are not held back by long VM-changing commands"""
+    print("\n🧪 Testing read-only lane...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        os.environ['FAKE_VMRUN_DELAY_clone'] = '3'
+        try:
+            executor = VmrunExecutor(str(make_vmrun(base)), max_concurrency=1)
+            clones = [executor.submit('clone', base / 'template.vmx', base / f'vm{i}.vmx') for i in range(2)]
+            time.sleep(0.2)
+            started = time.time()
+            result = executor.run('list')
+            elapsed = time.time() - started
+            for clone in clones:
+                clone.result(timeout=30)
+        finally:
+            del os.environ['FAKE_VMRUN_DELAY_clone']
+        executor.shutdown()
+
+        assert result.returncode == 0
+        assert elapsed < 2, f"list waited {elapsed:.2f}s behind clones"
+
+    print(f"✅ list answered in {elapsed:.2f}s while clones held the VM lane")
+
+def main():
+    """Main test function"""
+    return run_tests("vmrun Executor", [
+        ("Concurrency And Ordering", test_concurrency_and_ordering),
+        ("Read-only Deduplication", test_read_only_deduplication),
+        ("Timeouts", test_timeout_is_recorded),
+        ("Read-only Lane", test_read_only_lane)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
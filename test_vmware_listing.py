@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test VMware Listing
+Tests that a VMware listing shares one vmrun list snapshot and resolves guest IPs concurrently
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.vmware_provider import VMwareProvider
+from testing_support import run_tests, write_fake_tool
+
+FAKE_VMRUN = '''#!{python}
+import sys, time
+from pathlib import Path
+base = Path({base!r})
+with open(base / 'calls.log', 'a') as log:
+    log.write(sys.argv[1] + '\\n')
+if sys.argv[1] == 'list':
+    running = sorted((base / 'cloned-vms').glob('*/*.vmx'))[::2]
+    print(f"Total running VMs: {{len(running)}}")
+    for vmx in running:
+        print(vmx)
+elif sys.argv[1] == 'getGuestIPAddress':
+    time.sleep(0.3)
+    print('192.168.122.' + str(len(Path(sys.argv[2]).stem)))
+'''
+
+def make_provider(base, vm_count):
+    vmrun = write_fake_tool(base / 'vmrun', FAKE_VMRUN, base=str(base))
+    provider = VMwareProvider({'vmrun_path': str(vmrun), 'base_directory': str(base),
+                               'templates_directory': str(base / 'templates')})
+    for i in range(vm_count):
+        vm_dir = provider.cloned_vms_directory / f'vm-{i:03d}'
+        vm_dir.mkdir()
+        (vm_dir / f'vm-{i:03d}.vmx').write_text('numvcpus = "4"\nmemsize = "4096"\n')
+    return provider
+
+def calls(base):
+    return (base / 'calls.log').read_text().split()
+
+def test_single_snapshot_and_concurrent_ips():
+    """One vmrun list per listing; IP lookups overlap"""
+    print("🧪 Testing batched VMware listing...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        provider = make_provider(base, vm_count=16)
+
+        started = time.time()
+        vms = provider.list_vms()
+        elapsed = time.time() - started
+
+        running = [vm for vm in vms if vm.state == 'running']
+        log = calls(base)
+        assert len(vms) == 16 and len(running) == 8 and log.count('list') == 1, \
+            f"Unexpected listing: {len(vms)} VMs, {len(running)} running, calls={log}"
+        assert all(vm.ip_address is not None and vm.cpu == 4 for vm in running), \
+            "Running VMs are missing IPs or VMX settings"
+        assert elapsed <= 8 * 0.3, f"Guest IP lookups ran serially ({elapsed:.2f}s)"
+
+        # Second listing within the TTL reuses the cached guest IPs
+        provider.list_vms()
+        assert calls(base).count('getGuestIPAddress') == 8, "Guest IPs were not cached"
+
+    print(f"✅ Listed 16 VMs in {elapsed:.2f}s with one vmrun list")
+
+def main():
+    """Main test function"""
+    return run_tests("VMware Listing", [
+        ("Batched Listing", test_single_snapshot_and_concurrent_ips)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
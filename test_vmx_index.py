@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test VMX Index
+Tests the parsed-VMX cache and the VM name to VMX location index
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.vmx_index import VMXCache, VMXIndex
+from testing_support import run_tests
+
+def make_vm(root, name, content='numvcpus = "2"\n'):
+    vm_dir = root / name
+    vm_dir.mkdir(parents=True)
+    vmx_path = vm_dir / f'{name}.vmx'
+    vmx_path.write_text(content)
+    return vmx_path
+
+def test_cache_revalidation():
+    """Unchanged files are parsed once; edits are picked up"""
+    print("🧪 Testing parsed-VMX cache...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        vmx_path = make_vm(Path(temp_dir), 'web-1', 'numvcpus = "2"\n# memsize = "1"\nmemsize = "2048"\n')
+        cache = VMXCache()
+
+        first = cache.values(vmx_path)
+        cache.values(vmx_path)
+        assert cache.stats()['misses'] == 1 and first == {'numvcpus': '2', 'memsize': '2048'}, \
+            f"Unexpected parse: {first}, stats={cache.stats()}"
+
+        vmx_path.write_text('numvcpus = "8"\nmemsize = "2048"\n')
+        stat = vmx_path.stat()
+        os.utime(vmx_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert cache.values(vmx_path)['numvcpus'] == '8', "Edited VMX was served from the cache"
+
+    print(f"✅ Cache stats: {cache.stats()}")
+
+def test_index_locate_and_listing():
+    """Known VMs resolve by priority without probing; new directories appear in listings"""
+    print("\n🧪 Testing VMX location index...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        cloned, permanent, templates = base / 'cloned', base / 'permanent', base / 'templates'
+        for root in (cloned, permanent, templates):
+            root.mkdir()
+        make_vm(permanent, 'db-1')
+        make_vm(cloned, 'db-1')
+        template_vmx = templates / 'ubuntu' / 'Ubuntu 22.04.vmx'
+        template_vmx.parent.mkdir()
+        template_vmx.write_text('memsize = "4096"\n')
+
+        index = VMXIndex([cloned, permanent], template_roots=[templates], cache=VMXCache(), scan_interval=0)
+        assert index.locate('db-1') == cloned / 'db-1' / 'db-1.vmx', "Cloned VMs should take priority"
+        assert index.locate_template('ubuntu') == template_vmx and index.locate_template('db-1') is None, \
+            "Templates were not resolved from the template roots only"
+
+        # A removed VM falls back to the next root
+        (cloned / 'db-1' / 'db-1.vmx').unlink()
+        assert index.locate('db-1') == permanent / 'db-1' / 'db-1.vmx', "Stale location was not re-probed"
+
+        assert index.names_in(cloned) == ['db-1'], f"Unexpected listing: {index.names_in(cloned)}"
+        make_vm(cloned, 'web-2')
+        stat = cloned.stat()
+        os.utime(cloned, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert sorted(index.names_in(cloned)) == ['db-1', 'web-2'], "New VM directory was not picked up"
+        assert index.load('web-2').values == {'numvcpus': '2'}, "Parsed VMX not returned"
+
+    print("✅ Index resolved VMs and tracked directory changes")
+
+def main():
+    """Main test function"""
+    return run_tests("VMX Index", [
+        ("Cache Revalidation", test_cache_revalidation),
+        ("Locate and Listing", test_index_locate_and_listing)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Test Warm Pool
+Tests the warm VM pool refiller, claims and the VMware warm VM lifecycle
+"""
+
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hypervisor_providers.base_provider import VMConfig
+from hypervisor_providers.vmware_provider import VMwareProvider
+from warm_pool import WarmVMPool
+from testing_support import run_tests, write_fake_tool
+
+class FakeProvider:
+    """Provider whose warm VMs take a fixed time to build"""
+
+    def __init__(self, build_seconds=0.2):
+        self.build_seconds = build_seconds
+        self.warm = []
+        self.claimed = {}
+        self.fail_claims = set()
+        self.lock = threading.Lock()
+
+    def prepare_warm_vm(self, source_vm, vm_config):
+        time.sleep(self.build_seconds)
+        with self.lock:
+            self.warm.append(vm_config.name)
+        return {'success': True, 'vm_name': vm_config.name}
+
+    def list_warm_vms(self):
+        return list(self.warm)
+
+    def discard_warm_vm(self, warm_name):
+        with self.lock:
+            self.warm.remove(warm_name)
+        return True
+
+    def claim_warm_vm(self, warm_name, vm_config):
+        if warm_name in self.fail_claims:
+            return {'success': False, 'error': 'not running'}
+        with self.lock:
+            self.warm.remove(warm_name)
+            self.claimed[vm_config.name] = warm_name
+        return {'success': True, 'vm_name': vm_config.name}
+
+class FakeManager:
+    def __init__(self, provider):
+        self.provider = provider
+
+    def get_provider(self, provider_name=None):
+        return self.provider
+
+    def claim_warm_vm(self, warm_name, vm_config, provider_name=None):
+        return self.provider.claim_warm_vm(warm_name, vm_config)
+
+POOLS = [{'provider': 'vmware', 'template': 'Ubuntu', 'cpu': 2, 'ram': 2048, 'disk': 20, 'size': 3}]
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+def request(name, cpu=2):
+    return VMConfig(name=name, cpu=cpu, ram=2048, disk=20, os_type='linux')
+
+def test_refill_and_claim():
+    """Pools fill to target, claims hit and are replaced, other sizes miss"""
+    print("🧪 Testing warm pool refill and claims...")
+
+    provider = FakeProvider()
+    pool = WarmVMPool(FakeManager(provider), POOLS, refill_workers=3, interval=0.5)
+    pool.start()
+    try:
+        assert wait_for(lambda: pool.stats()['ready'] == 3), f"Pool did not fill: {pool.stats()}"
+        stats = pool.stats()['pools'][0]
+        assert stats['refills'] == 3 and stats['avg_refill_seconds'] is not None, f"Unexpected refill stats: {stats}"
+
+        result = pool.claim('vmware', 'ubuntu', request('web-1'))
+        assert result and result['warm_pool'] and 'web-1' in provider.claimed, \
+            f"Claim did not hand out a warm VM: {result}"
+
+        # Unpooled sizes fall through to a regular clone without touching the pool
+        assert pool.claim('vmware', 'ubuntu', request('big-1', cpu=8)) is None, \
+            "A request without a matching pool was served"
+
+        assert wait_for(lambda: pool.stats()['ready'] == 3), f"Claimed VM was not replaced: {pool.stats()}"
+    finally:
+        pool.stop()
+
+    stats = pool.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 0, f"Unexpected hit/miss counters: {stats}"
+
+    print(f"✅ Pool stats: {stats['pools'][0]}")
+
+def test_empty_pool_and_stale_vm():
+    """An empty pool counts a miss; a VM that cannot be claimed is discarded"""
+    print("\n🧪 Testing warm pool misses...")
+
+    provider = FakeProvider()
+    provider.warm = ['stale-vm']
+    pool = WarmVMPool(FakeManager(provider), POOLS, refill_workers=1)
+    state = next(iter(pool._pools.values()))
+    provider.warm.append(f"{state.key.prefix}left-over")
+    provider.fail_claims.add(f"{state.key.prefix}left-over")
+
+    # Adopting only picks up VMs named after this pool
+    pool._adopt_existing()
+    assert list(state.ready) == [f"{state.key.prefix}left-over"], f"Unexpected adopted VMs: {list(state.ready)}"
+
+    assert pool.claim('vmware', 'ubuntu', request('web-2')) is None, "A stale warm VM was handed out"
+    assert wait_for(lambda: provider.warm == ['stale-vm']), f"Stale warm VM was not discarded: {provider.warm}"
+    pool.stop()
+
+    stats = pool.stats()
+    assert stats['misses'] == 1 and stats['hit_rate'] == 0, f"Unexpected counters: {stats}"
+
+    print("✅ Empty pool falls back to a regular clone")
+
+FAKE_VMRUN = '''#!{python}
+import sys
+from pathlib import Path
+base = Path({base!r})
+running = base / 'running.txt'
+if sys.argv[1] == 'list':
+    paths = running.read_text().split('\\n') if running.exists() else []
+    paths = [p for p in paths if p]
+    print(f"Total running VMs: {{len(paths)}}")
+    for path in paths:
+        print(path)
+elif sys.argv[1] == 'listSnapshots':
+    print("Total snapshots: 0")
+elif sys.argv[1] == 'start':
+    with open(running, 'a') as f:
+        f.write(sys.argv[2] + '\\n')
+elif sys.argv[1] == 'checkToolsState':
+    print('running')
+elif sys.argv[1] == 'clone':
+    dest = Path(sys.argv[3])
+    dest.parent.mkdir(parents=True)
+    dest.write_text('numvcpus = "2"\\nmemsize = "2048"\\n')
+'''
+
+def test_vmware_warm_vm_lifecycle():
+    """A warm VM is hidden until claimed, then listed and deleted under its new name"""
+    print("\n🧪 Testing VMware warm VMs...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base = Path(temp_dir)
+        vmrun = write_fake_tool(base / 'vmrun', FAKE_VMRUN, base=str(base))
+        template_vmx = base / 'templates' / 'Ubuntu 64-bit (3)' / 'Ubuntu.vmx'
+        template_vmx.parent.mkdir(parents=True)
+        template_vmx.write_text('numvcpus = "2"\n')
+        config = {'vmrun_path': str(vmrun), 'base_directory': str(base),
+                  'templates_directory': str(base / 'templates')}
+        provider = VMwareProvider(config)
+
+        result = provider.prepare_warm_vm('ubuntu', request('warm-abc-1'))
+        assert result['success'] and provider.list_warm_vms() == ['warm-abc-1'] and not provider.list_vms(), \
+            f"Warm VM was not prepared out of sight: {result}"
+
+        result = provider.claim_warm_vm('warm-abc-1', request('web-3'))
+        assert result['success'], f"Claim failed: {result}"
+
+        # The alias survives a restart of the provider
+        provider = VMwareProvider(config)
+        vms = provider.list_vms()
+        assert not provider.list_warm_vms() and [(vm.name, vm.state) for vm in vms] == [('web-3', 'running')], \
+            f"Claimed VM not listed under its new name: {vms}"
+
+        assert provider.delete_vm('web-3') and not provider.list_vms() and not provider.vmx_index.aliases(), \
+            "Claimed VM was not deleted"
+
+    print("✅ Warm VM claimed, listed and deleted")
+
+def main():
+    """Main test function"""
+    return run_tests("Warm Pool", [
+        ("Refill And Claim", test_refill_and_claim),
+        ("Empty Pool", test_empty_pool_and_stale_vm),
+        ("VMware Warm VM", test_vmware_warm_vm_lifecycle)
+    ])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Testing Support
+Fakes and the script runner shared by the test_*.py files
+"""
+
+import os
+import sys
+import traceback
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from hypervisor_manager import HypervisorManager
+from hypervisor_providers.nutanix_provider import NutanixProvider
+from provider_fanout import ProviderFanout
+
+
+class FakeResponse:
+    """requests.Response stand-in with a status code and a JSON body"""
+
+    def __init__(self, status_code: int = 200, body: Any = None):
+        self.status_code = status_code
+        self._body = body if body is not None else {}
+        self.text = str(self._body)
+
+    def json(self):
+        return self._body
+
+
+class UnreachableSession:
+    """Prism Central connection that fails on every request"""
+
+    def post(self, url, json=None, timeout=None):
+        raise ConnectionError("Prism Central unreachable")
+
+    def get(self, url, timeout=None):
+        raise ConnectionError("Prism Central unreachable")
+
+
+def make_nutanix_provider(session, **config) -> NutanixProvider:
+    """NutanixProvider talking to a fake session instead of Prism Central"""
+    provider = NutanixProvider({'prism_central_ip': '127.0.0.1', 'username': 'admin', 'password': 'secret',
+                                'use_ssl': False, **config})
+    provider.session = provider.task_watcher.session = session
+    return provider
+
+
+def make_manager(providers: Dict[str, Any], default_timeout: float = 5,
+                 timeouts: Dict[str, float] = None) -> HypervisorManager:
+    """HypervisorManager over the given providers, without config, cache or background threads"""
+    manager = HypervisorManager.__new__(HypervisorManager)
+    manager.providers = providers
+    manager.journal = None
+    manager.inventory_cache = None
+    manager.fanout = ProviderFanout(max_workers=4, default_timeout=default_timeout, timeouts=timeouts)
+    return manager
+
+
+def write_fake_tool(path: Path, template: str, **values) -> Path:
+    """Write an executable Python script standing in for vmrun, Packer, genisoimage...
+
+    The template is formatted with ``python`` (this interpreter) and ``values``.
+    """
+    path = Path(path)
+    path.write_text(template.format(python=sys.executable, **values))
+    os.chmod(path, 0o755)
+    return path
+
+
+def run_tests(title: str, tests: List[Tuple[str, Callable[[], None]]]) -> int:
+    """Run (name, test) pairs as a script; a test fails by raising, as under pytest
+
+    Returns:
+        Process exit code: 0 when every test passed
+    """
+    print(f"🚀 Starting {title} Tests...\n")
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            passed += 1
+        except Exception:
+            print(f"❌ {test_name} failed:")
+            traceback.print_exc()
+
+    print(f"\nPassed: {passed}/{len(tests)}")
+    return 0 if passed == len(tests) else 1
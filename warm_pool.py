@@ -0,0 +1,251 @@
+"""
+Warm VM Pool
+Keeps pre-cloned, booted VMs in reserve so clone requests can be answered without waiting for a clone
+"""
+
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any
+
+from hypervisor_providers import VMConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolKey:
+    """Provider, template and size a warm VM was built for"""
+    provider: str
+    template: str
+    cpu: int
+    ram: int
+    disk: int
+
+    @property
+    def prefix(self) -> str:
+        """Name prefix of this pool's warm VMs, stable across restarts"""
+        digest = hashlib.sha1(f"{self.provider}|{self.template}|{self.cpu}|{self.ram}|{self.disk}".encode()).hexdigest()
+        return f"warm-{digest[:8]}-"
+
+
+@dataclass
+class WarmPoolState:
+    """Reserve and counters of one pool"""
+    key: PoolKey
+    target: int
+    clone_mode: Optional[str] = None
+    ready: deque = field(default_factory=deque)
+    refilling: int = 0
+    hits: int = 0
+    misses: int = 0
+    refills: int = 0
+    refill_failures: int = 0
+    consecutive_failures: int = 0
+    refill_seconds_total: float = 0.0
+    last_refill_seconds: Optional[float] = None
+    last_error: Optional[str] = None
+    next_refill: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            'provider': self.key.provider,
+            'template': self.key.template,
+            'cpu': self.key.cpu,
+            'ram': self.key.ram,
+            'disk': self.key.disk,
+            'clone_mode': self.clone_mode,
+            'target': self.target,
+            'ready': len(self.ready),
+            'refilling': self.refilling,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / requests, 3) if requests else None,
+            'refills': self.refills,
+            'refill_failures': self.refill_failures,
+            'avg_refill_seconds': round(self.refill_seconds_total / self.refills, 1) if self.refills else None,
+            'last_refill_seconds': self.last_refill_seconds,
+            'last_error': self.last_error,
+            'next_refill_in': max(0.0, round(self.next_refill - time.time(), 1))
+        }
+
+
+class WarmVMPool:
+    """Per (provider, template, size) reserves of booted VMs with a background refiller
+
+    A clone request matching a pool claims one of its VMs, which the provider
+    renames and gives its network settings; the refiller then builds a
+    replacement. Failing refills back off exponentially per pool.
+    """
+
+    def __init__(self, manager, pools: List[Dict[str, Any]] = None, refill_workers: int = 2,
+                 interval: float = 30.0, max_backoff: float = 600.0):
+        """Initialize warm VM pool
+
+        Args:
+            manager: HypervisorManager providing the providers and journaled claims
+            pools: Pool definitions (provider, template, cpu, ram, disk, size, clone_mode)
+            refill_workers: Number of warm VMs built concurrently
+            interval: Seconds between reserve checks when nothing wakes the refiller
+            max_backoff: Upper bound of the retry delay of a failing pool
+        """
+        self.manager = manager
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self._pools: Dict[PoolKey, WarmPoolState] = {}
+        for pool in pools or []:
+            key = PoolKey(pool['provider'], pool['template'].lower(), int(pool.get('cpu', 2)),
+                          int(pool.get('ram', 2048)), int(pool.get('disk', 20)))
+            self._pools[key] = WarmPoolState(key=key, target=int(pool.get('size', 1)),
+                                             clone_mode=pool.get('clone_mode'))
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=refill_workers, thread_name_prefix='warm-pool')
+
+    def start(self):
+        """Adopt warm VMs left by a previous run and start the refiller"""
+        if not self._pools or (self._thread and self._thread.is_alive()):
+            return
+        self._adopt_existing()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='warm-pool-refiller', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the refiller; warm VMs are kept for the next run"""
+        self._stopped.set()
+        self._wakeup.set()
+        self._executor.shutdown(wait=False)
+
+    def claim(self, provider_name: str, source_vm: str, vm_config: VMConfig) -> Optional[Dict[str, Any]]:
+        """Hand out a warm VM matching a clone request
+
+        Returns:
+            The provider result of the claim, or None if the request has no
+            pool or its pool is empty (the caller clones as usual)
+        """
+        key = PoolKey(provider_name, source_vm.lower(), vm_config.cpu, vm_config.ram, vm_config.disk)
+        state = self._pools.get(key)
+        if state is None or (vm_config.clone_mode and vm_config.clone_mode != state.clone_mode):
+            return None
+
+        while True:
+            with self._lock:
+                warm_name = state.ready.popleft() if state.ready else None
+                if warm_name is None:
+                    state.misses += 1
+            self._wakeup.set()
+            if warm_name is None:
+                return None
+
+            result = self.manager.claim_warm_vm(warm_name, vm_config, provider_name)
+            if result.get('success'):
+                with self._lock:
+                    state.hits += 1
+                return {**result, 'warm_pool': True}
+
+            # A warm VM that cannot be handed out is replaced, never retried
+            logger.warning("Discarding warm VM '%s': %s", warm_name, result.get('error'))
+            self._executor.submit(self._discard, provider_name, warm_name)
+
+    def stats(self) -> Dict[str, Any]:
+        """Reserve sizes, hit/miss counters and refill latency of every pool"""
+        with self._lock:
+            pools = [state.to_dict() for state in self._pools.values()]
+        hits = sum(pool['hits'] for pool in pools)
+        misses = sum(pool['misses'] for pool in pools)
+        return {
+            'pools': pools,
+            'ready': sum(pool['ready'] for pool in pools),
+            'target': sum(pool['target'] for pool in pools),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None
+        }
+
+    def _adopt_existing(self):
+        """Put warm VMs found on the providers back into their pools"""
+        for provider_name in {key.provider for key in self._pools}:
+            provider = self.manager.get_provider(provider_name)
+            if not provider:
+                continue
+            try:
+                warm_names = provider.list_warm_vms()
+            except Exception as e:
+                logger.warning("Could not list warm VMs of %s: %s", provider_name, e)
+                continue
+            for warm_name in warm_names:
+                for state in self._pools.values():
+                    if state.key.provider == provider_name and warm_name.startswith(state.key.prefix):
+                        state.ready.append(warm_name)
+                        break
+
+    def _run(self):
+        """Refill loop: top pools up to their target, honoring per-pool backoff"""
+        while not self._stopped.is_set():
+            now = time.time()
+            with self._lock:
+                for state in self._pools.values():
+                    missing = state.target - len(state.ready) - state.refilling
+                    if missing <= 0 or state.next_refill > now:
+                        continue
+                    # A failing pool retries one VM at a time
+                    for _ in range(missing if state.consecutive_failures == 0 else min(missing, 1)):
+                        state.refilling += 1
+                        self._executor.submit(self._refill, state)
+                upcoming = [state.next_refill for state in self._pools.values() if state.next_refill > now]
+            wait = min(upcoming + [now + self.interval]) - now
+            self._wakeup.wait(timeout=max(0.5, wait))
+            self._wakeup.clear()
+
+    def _refill(self, state: WarmPoolState):
+        """Build one warm VM for a pool"""
+        key = state.key
+        warm_name = f"{key.prefix}{uuid.uuid4().hex[:6]}"
+        vm_config = VMConfig(name=warm_name, cpu=key.cpu, ram=key.ram, disk=key.disk,
+                             os_type='unknown', clone_mode=state.clone_mode)
+        started = time.time()
+        try:
+            provider = self.manager.get_provider(key.provider)
+            if not provider:
+                raise RuntimeError(f"Provider '{key.provider}' not available")
+            result = provider.prepare_warm_vm(key.template, vm_config)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        elapsed = round(time.time() - started, 1)
+
+        with self._lock:
+            state.refilling -= 1
+            if result.get('success'):
+                state.ready.append(warm_name)
+                state.refills += 1
+                state.refill_seconds_total += elapsed
+                state.last_refill_seconds = elapsed
+                state.consecutive_failures = 0
+                state.last_error = None
+                state.next_refill = 0.0
+            else:
+                state.refill_failures += 1
+                state.consecutive_failures += 1
+                state.last_error = result.get('error', 'Unknown error')
+                backoff = self.interval * (2 ** (state.consecutive_failures - 1))
+                state.next_refill = time.time() + min(backoff, self.max_backoff)
+        if not result.get('success'):
+            logger.warning("Warm VM refill for %s on %s failed: %s", key.template, key.provider, state.last_error)
+        self._wakeup.set()
+
+    def _discard(self, provider_name: str, warm_name: str):
+        provider = self.manager.get_provider(provider_name)
+        try:
+            if provider:
+                provider.discard_warm_vm(warm_name)
+        except Exception as e:
+            logger.error("Failed to discard warm VM '%s': %s", warm_name, e)